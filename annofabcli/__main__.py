@@ -12,11 +12,13 @@ import annofabcli.annotation_specs.subcommand_annotation_specs
 import annofabcli.annotation_zip.subcommand_annotation_zip
 import annofabcli.comment.subcommand_comment
 import annofabcli.common.cli
+import annofabcli.common.profiling
 import annofabcli.experimental.subcommand_experimental
 import annofabcli.filesystem.subcommand_filesystem
 import annofabcli.input_data.subcommand_input_data
 import annofabcli.instruction.subcommand_instruction
 import annofabcli.job.subcommand_job
+import annofabcli.mirror.subcommand_mirror
 import annofabcli.my_account.subcommand_my_account
 import annofabcli.organization.subcommand_organization
 import annofabcli.organization_member.subcommand_organization_member
@@ -91,7 +93,8 @@ def main(arguments: list[str] | None = None) -> None:
             if arguments is not None:
                 argv = ["annofabcli", *list(arguments)]
             logger.info(f"argv={mask_sensitive_value_in_argv(argv)}")
-            args.subcommand_func(args)
+            with annofabcli.common.profiling.profile_from_args(args):
+                args.subcommand_func(args)
         except Exception as e:
             logger.exception(e)  # noqa: TRY401
             raise e  # noqa: TRY201
@@ -115,6 +118,7 @@ def create_parser() -> argparse.ArgumentParser:
     annofabcli.input_data.subcommand_input_data.add_parser(subparsers)
     annofabcli.instruction.subcommand_instruction.add_parser(subparsers)
     annofabcli.job.subcommand_job.add_parser(subparsers)
+    annofabcli.mirror.subcommand_mirror.add_parser(subparsers)
     annofabcli.my_account.subcommand_my_account.add_parser(subparsers)
     annofabcli.organization.subcommand_organization.add_parser(subparsers)
     annofabcli.organization_member.subcommand_organization_member.add_parser(subparsers)
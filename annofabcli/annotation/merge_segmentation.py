@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import argparse
 import copy
+import io
 import logging
 import multiprocessing
 import sys
@@ -102,9 +103,9 @@ class MergeSegmentationMain(CommandLineWithConfirm):
             updated_annotation_id = segmentation_details[0]["annotation_id"]
             deleted_annotation_id_list = [e["annotation_id"] for e in segmentation_details[1:]]
             for detail in segmentation_details:
-                segmentation_response = self.annofab_service.wrapper.execute_http_get(detail["body"]["url"], stream=True)
-                segmentation_response.raw.decode_content = True
-                binary_image_array_list.append(read_binary_image(segmentation_response.raw))
+                # streamで読み込まずにレスポンスボディをすべて読み込む理由：コネクションをプールに戻して、次のリクエストで再利用するため
+                segmentation_response = self.annofab_service.wrapper.execute_http_get(detail["body"]["url"])
+                binary_image_array_list.append(read_binary_image(io.BytesIO(segmentation_response.content)))
 
             merged_binary_image_array = merge_binary_image_array(binary_image_array_list)
             output_file_path = output_dir / f"{updated_annotation_id}.png"
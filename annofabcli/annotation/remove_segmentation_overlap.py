@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import argparse
 import copy
+import io
 import logging
 import multiprocessing
 import sys
@@ -104,9 +105,9 @@ class RemoveSegmentationOverlapMain(CommandLineWithConfirm):
             if detail["body"]["_type"] != "Outer":
                 continue
 
-            segmentation_response = self.annofab_service.wrapper.execute_http_get(detail["body"]["url"], stream=True)
-            segmentation_response.raw.decode_content = True
-            input_binary_image_array_by_annotation[detail["annotation_id"]] = read_binary_image(segmentation_response.raw)
+            # streamで読み込まずにレスポンスボディをすべて読み込む理由：コネクションをプールに戻して、次のリクエストで再利用するため
+            segmentation_response = self.annofab_service.wrapper.execute_http_get(detail["body"]["url"])
+            input_binary_image_array_by_annotation[detail["annotation_id"]] = read_binary_image(io.BytesIO(segmentation_response.content))
             segmentation_annotation_id_list.append(detail["annotation_id"])
 
         # reversedを使っている理由:
@@ -0,0 +1,474 @@
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+from collections.abc import Callable, Collection, Mapping, Sequence
+from dataclasses import dataclass, replace
+from typing import Any
+
+import annofabapi
+from annofabapi.util.annotation_specs import get_attribute_name_en, get_choice_name_en, get_label_name_en
+
+import annofabcli.common.cli
+from annofabcli.annotation_specs.add_attribute import build_request_body_for_add_attribute, resolve_attribute_input
+from annofabcli.annotation_specs.add_choice_attribute import parse_choice_input_from_dict
+from annofabcli.annotation_specs.add_choices_to_attribute import build_request_body_for_add_choices_to_attribute, resolve_added_choices_input
+from annofabcli.annotation_specs.add_label import build_request_body_for_add_label, resolve_new_label_input, validate_field_values_input
+from annofabcli.annotation_specs.delete_choices import AffectingAnnotation as AffectingChoiceAnnotation
+from annofabcli.annotation_specs.delete_choices import DeleteChoicesMain, build_request_body_for_delete_choices, resolve_choice_deletion
+from annofabcli.annotation_specs.delete_labels import AffectingAnnotation as AffectingLabelAnnotation
+from annofabcli.annotation_specs.delete_labels import DeleteLabelsMain, build_request_body_for_delete_labels, resolve_label_deletion
+from annofabcli.annotation_specs.diff_compare import create_annotation_specs_diff
+from annofabcli.annotation_specs.diff_text_formatter import format_annotation_specs_diff_as_text
+from annofabcli.annotation_specs.put_label_color import create_comment_for_label_color, create_request_body_for_label_color
+from annofabcli.annotation_specs.reorder_labels import build_request_body_for_reorder_labels, resolve_label_reorder
+from annofabcli.annotation_specs.update_labels import (
+    build_request_body_for_update_labels,
+    parse_label_update_input_from_dict,
+    resolve_label_update_inputs,
+    validate_label_name_ens_not_duplicated,
+)
+from annofabcli.common.annofab.annotation_specs import validate_keybind_input
+from annofabcli.common.cli import ArgumentParser, CommandLine, CommandLineWithConfirm, build_annofabapi_resource_and_login, get_json_from_args
+from annofabcli.common.facade import AnnofabApiFacade
+from annofabcli.common.utils import duplicated_set
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class PlanOperation:
+    """
+    プランファイルに記載された操作1件分。
+    """
+
+    index: int
+    """エラーメッセージ用の1始まりの位置"""
+
+    operation_type: str
+    """操作の種類。既存のサブコマンド名と同じです。"""
+
+    arguments: dict[str, Any]
+    """操作の引数。キーは既存のサブコマンドのコマンドライン引数名と同じです。"""
+
+
+@dataclass(frozen=True)
+class AnnotationSpecsPlan:
+    """
+    アノテーション仕様に適用する操作の一覧。
+    """
+
+    operations: list[PlanOperation]
+
+    comment: str | None = None
+    """アノテーション仕様の変更コメント。Noneなら各操作のコメントを連結します。"""
+
+
+@dataclass(frozen=True)
+class PlanOperationDefinition:
+    """
+    プランファイルに指定できる操作の定義。
+    """
+
+    apply: Callable[[dict[str, Any], Mapping[str, Any]], dict[str, Any]]
+    """アノテーション仕様に操作を適用して、変更後のアノテーション仕様（コメント付き）を返す関数。引数のアノテーション仕様は変更しません。"""
+
+    keys: frozenset[str]
+    """指定できる引数のキー"""
+
+    required_keys: frozenset[str] = frozenset()
+    """必須の引数のキー"""
+
+
+def _get_list(arguments: Mapping[str, Any], key: str) -> list[str] | None:
+    value = arguments.get(key)
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return [value]
+    if not isinstance(value, list):
+        raise TypeError(f"`{key}` には文字列または文字列の配列を指定してください。")
+    return value
+
+
+def _apply_add_label(annotation_specs: dict[str, Any], arguments: Mapping[str, Any]) -> dict[str, Any]:
+    label_name_en = arguments["label_name_en"]
+    resolved_new_label_input = resolve_new_label_input(
+        annotation_specs,
+        label_name_en=label_name_en,
+        annotation_type=arguments["annotation_type"],
+        label_id=arguments.get("label_id"),
+        label_name_ja=arguments.get("label_name_ja"),
+        label_name_vi=arguments.get("label_name_vi"),
+        color_code=arguments.get("color"),
+        keybind=None if arguments.get("keybind") is None else validate_keybind_input(arguments["keybind"]),
+        field_values=None if arguments.get("field_values") is None else validate_field_values_input(arguments["field_values"]),
+    )
+    return build_request_body_for_add_label(annotation_specs, resolved_new_label_input=resolved_new_label_input, label_name_en=label_name_en, comment=None)
+
+
+def _apply_add_attribute(annotation_specs: dict[str, Any], arguments: Mapping[str, Any]) -> dict[str, Any]:
+    attribute_name_en = arguments["attribute_name_en"]
+    resolved_attribute_input = resolve_attribute_input(
+        annotation_specs,
+        attribute_type=arguments["attribute_type"],
+        attribute_name_en=attribute_name_en,
+        attribute_name_ja=arguments.get("attribute_name_ja"),
+        attribute_name_vi=arguments.get("attribute_name_vi"),
+        attribute_id=arguments.get("attribute_id"),
+        label_ids=_get_list(arguments, "label_id"),
+        label_name_ens=_get_list(arguments, "label_name_en"),
+        read_only=arguments.get("read_only", False),
+        default_value=arguments.get("default_value"),
+        keybind=None if arguments.get("keybind") is None else validate_keybind_input(arguments["keybind"]),
+    )
+    return build_request_body_for_add_attribute(annotation_specs, resolved_attribute_input=resolved_attribute_input, attribute_name_en=attribute_name_en, comment=None)
+
+
+def _apply_add_choices_to_attribute(annotation_specs: dict[str, Any], arguments: Mapping[str, Any]) -> dict[str, Any]:
+    choices = arguments["choices"]
+    if not isinstance(choices, list) or not all(isinstance(choice, dict) for choice in choices):
+        raise TypeError("`choices` には選択肢情報（オブジェクト）の配列を指定してください。")
+    resolved_added_choices_input = resolve_added_choices_input(
+        annotation_specs,
+        attribute_id=arguments.get("attribute_id"),
+        attribute_name_en=arguments.get("attribute_name_en"),
+        choice_inputs=[parse_choice_input_from_dict(choice, index=index) for index, choice in enumerate(choices, start=1)],
+    )
+    return build_request_body_for_add_choices_to_attribute(annotation_specs, resolved_added_choices_input=resolved_added_choices_input, comment=None)
+
+
+def _apply_update_labels(annotation_specs: dict[str, Any], arguments: Mapping[str, Any]) -> dict[str, Any]:
+    labels = arguments["labels"]
+    if not isinstance(labels, list) or not all(isinstance(label, dict) for label in labels):
+        raise TypeError("`labels` にはラベル更新情報（オブジェクト）の配列を指定してください。")
+    resolved_label_update_inputs = resolve_label_update_inputs(
+        annotation_specs,
+        label_update_inputs=[parse_label_update_input_from_dict(label, index=index) for index, label in enumerate(labels, start=1)],
+    )
+    return build_request_body_for_update_labels(annotation_specs, resolved_label_update_inputs=resolved_label_update_inputs, comment=None)
+
+
+def _apply_delete_labels(annotation_specs: dict[str, Any], arguments: Mapping[str, Any]) -> dict[str, Any]:
+    resolved_deletion = resolve_label_deletion(annotation_specs, label_ids=_get_list(arguments, "label_id"), label_name_ens=_get_list(arguments, "label_name_en"))
+    return build_request_body_for_delete_labels(annotation_specs, resolved_deletion=resolved_deletion, comment=None)
+
+
+def _apply_delete_choices(annotation_specs: dict[str, Any], arguments: Mapping[str, Any]) -> dict[str, Any]:
+    unsafe_defaults = arguments.get("unsafe_defaults", False)
+    resolved_deletion = resolve_choice_deletion(
+        annotation_specs,
+        attribute_id=arguments.get("attribute_id"),
+        attribute_name_en=arguments.get("attribute_name_en"),
+        choice_ids=_get_list(arguments, "choice_id"),
+        choice_name_ens=_get_list(arguments, "choice_name_en"),
+        unsafe_defaults=unsafe_defaults,
+    )
+    return build_request_body_for_delete_choices(annotation_specs, resolved_deletion=resolved_deletion, unsafe_defaults=unsafe_defaults, comment=None)
+
+
+def _apply_reorder_labels(annotation_specs: dict[str, Any], arguments: Mapping[str, Any]) -> dict[str, Any]:
+    resolved_reorder = resolve_label_reorder(annotation_specs, label_ids=_get_list(arguments, "label_id"), label_name_ens=_get_list(arguments, "label_name_en"))
+    return build_request_body_for_reorder_labels(annotation_specs, resolved_reorder=resolved_reorder, comment=None)
+
+
+def _apply_put_label_color(annotation_specs: dict[str, Any], arguments: Mapping[str, Any]) -> dict[str, Any]:
+    label_color = arguments["label_color"]
+    if not isinstance(label_color, dict):
+        raise TypeError("`label_color` にはkeyがラベル英語名, valueがRGB値の配列であるオブジェクトを指定してください。")
+    request_body, changed_labels = create_request_body_for_label_color(annotation_specs, label_color)
+    request_body["comment"] = create_comment_for_label_color(changed_labels) if len(changed_labels) > 0 else ""
+    return request_body
+
+
+PLAN_OPERATION_DEFINITIONS: dict[str, PlanOperationDefinition] = {
+    "add_label": PlanOperationDefinition(
+        _apply_add_label,
+        keys=frozenset({"label_name_en", "annotation_type", "label_id", "label_name_ja", "label_name_vi", "color", "keybind", "field_values"}),
+        required_keys=frozenset({"label_name_en", "annotation_type"}),
+    ),
+    "add_attribute": PlanOperationDefinition(
+        _apply_add_attribute,
+        keys=frozenset({"attribute_type", "attribute_name_en", "attribute_id", "attribute_name_ja", "attribute_name_vi", "read_only", "default_value", "keybind", "label_name_en", "label_id"}),
+        required_keys=frozenset({"attribute_type", "attribute_name_en"}),
+    ),
+    "add_choices_to_attribute": PlanOperationDefinition(
+        _apply_add_choices_to_attribute,
+        keys=frozenset({"attribute_id", "attribute_name_en", "choices"}),
+        required_keys=frozenset({"choices"}),
+    ),
+    "update_labels": PlanOperationDefinition(_apply_update_labels, keys=frozenset({"labels"}), required_keys=frozenset({"labels"})),
+    "delete_labels": PlanOperationDefinition(_apply_delete_labels, keys=frozenset({"label_id", "label_name_en"})),
+    "delete_choices": PlanOperationDefinition(
+        _apply_delete_choices,
+        keys=frozenset({"attribute_id", "attribute_name_en", "choice_id", "choice_name_en", "unsafe_defaults"}),
+    ),
+    "reorder_labels": PlanOperationDefinition(_apply_reorder_labels, keys=frozenset({"label_id", "label_name_en"})),
+    "put_label_color": PlanOperationDefinition(_apply_put_label_color, keys=frozenset({"label_color"}), required_keys=frozenset({"label_color"})),
+}
+"""プランファイルに指定できる操作。keyは操作の種類（サブコマンド名）です。"""
+
+
+def parse_plan(plan: object) -> AnnotationSpecsPlan:
+    """
+    プランファイルのJSONを解釈します。
+
+    Raises:
+        TypeError: JSONの構造が不正な場合
+        ValueError: 存在しない操作や、指定できない引数が指定されている場合
+    """
+    if not isinstance(plan, dict):
+        raise TypeError("プランには `operations` を持つJSONオブジェクトを指定してください。")
+    raw_operations = plan.get("operations")
+    if not isinstance(raw_operations, list) or len(raw_operations) == 0:
+        raise ValueError("プランの `operations` には操作を1件以上指定してください。")
+
+    operations = []
+    for index, raw_operation in enumerate(raw_operations, start=1):
+        if not isinstance(raw_operation, dict):
+            raise TypeError(f"{index}件目の操作がオブジェクト形式ではありません。")
+        arguments = dict(raw_operation)
+        operation_type = arguments.pop("operation", None)
+        definition = PLAN_OPERATION_DEFINITIONS.get(operation_type)
+        if definition is None:
+            raise ValueError(f"{index}件目の操作 `operation` には、{sorted(PLAN_OPERATION_DEFINITIONS)} のいずれかを指定してください。 :: operation='{operation_type}'")
+
+        unexpected_keys = set(arguments) - definition.keys
+        if unexpected_keys:
+            raise ValueError(f"{index}件目の操作 '{operation_type}' に指定できないキーがあります。 :: {sorted(unexpected_keys)}")
+        missing_keys = definition.required_keys - set(arguments)
+        if missing_keys:
+            raise ValueError(f"{index}件目の操作 '{operation_type}' に必須のキーがありません。 :: {sorted(missing_keys)}")
+        operations.append(PlanOperation(index=index, operation_type=operation_type, arguments=arguments))
+
+    comment = plan.get("comment")
+    if comment is not None and not isinstance(comment, str):
+        raise TypeError("プランの `comment` には文字列を指定してください。")
+    return AnnotationSpecsPlan(operations=operations, comment=comment)
+
+
+def validate_annotation_specs(annotation_specs: Mapping[str, Any]) -> None:
+    """
+    すべての操作を適用した後のアノテーション仕様が、整合性を保っているかを検証します。
+
+    Raises:
+        ValueError: ID・ラベル英語名の重複や、存在しない属性への参照がある場合
+    """
+    labels = annotation_specs["labels"]
+    attributes = annotation_specs["additionals"]
+
+    duplicated_label_ids = duplicated_set([label["label_id"] for label in labels])
+    if duplicated_label_ids:
+        raise ValueError(f"label_idに重複があります。 :: {', '.join(sorted(duplicated_label_ids))}")
+    validate_label_name_ens_not_duplicated(labels)
+
+    attribute_ids = [attribute["additional_data_definition_id"] for attribute in attributes]
+    duplicated_attribute_ids = duplicated_set(attribute_ids)
+    if duplicated_attribute_ids:
+        raise ValueError(f"属性IDに重複があります。 :: {', '.join(sorted(duplicated_attribute_ids))}")
+
+    attribute_id_set = set(attribute_ids)
+    for label in labels:
+        unknown_attribute_ids = set(label["additional_data_definitions"]) - attribute_id_set
+        if unknown_attribute_ids:
+            raise ValueError(f"label_name_en='{get_label_name_en(label)}' のラベルが、存在しない属性を参照しています。 :: {sorted(unknown_attribute_ids)}")
+
+    for restriction in annotation_specs["restrictions"]:
+        if restriction["additional_data_definition_id"] not in attribute_id_set:
+            raise ValueError(f"属性制約が、存在しない属性を参照しています。 :: attribute_id='{restriction['additional_data_definition_id']}'")
+
+
+def apply_plan(annotation_specs: dict[str, Any], plan: AnnotationSpecsPlan) -> dict[str, Any]:
+    """
+    プランの操作を順番に適用して、 ``put_annotation_specs`` に渡すリクエストボディを生成します。
+    引数のアノテーション仕様は変更しません。
+
+    Args:
+        annotation_specs: 操作を適用する前のアノテーション仕様
+        plan: 適用するプラン
+
+    Returns:
+        すべての操作を適用したアノテーション仕様のリクエストボディ
+
+    Raises:
+        ValueError: 操作を適用できない場合、または適用後のアノテーション仕様が整合性を保っていない場合
+    """
+    current_specs = annotation_specs
+    comments = []
+    for operation in plan.operations:
+        definition = PLAN_OPERATION_DEFINITIONS[operation.operation_type]
+        try:
+            current_specs = definition.apply(current_specs, operation.arguments)
+        except (ValueError, TypeError) as e:
+            raise ValueError(f"{operation.index}件目の操作 '{operation.operation_type}' を適用できませんでした。 :: {e}") from e
+        logger.debug(f"{operation.index}件目の操作 '{operation.operation_type}' を適用しました。")
+        if current_specs["comment"] != "":
+            comments.append(current_specs["comment"])
+
+    validate_annotation_specs(current_specs)
+
+    request_body = current_specs
+    request_body["comment"] = plan.comment if plan.comment is not None else "\n\n".join(comments)
+    request_body["last_updated_datetime"] = annotation_specs["updated_datetime"]
+    return request_body
+
+
+def get_removed_labels(old_annotation_specs: Mapping[str, Any], new_annotation_specs: Mapping[str, Any]) -> list[Mapping[str, Any]]:
+    """操作前のアノテーション仕様に存在して、操作後に存在しないラベルの一覧を返します。"""
+    new_label_ids = {label["label_id"] for label in new_annotation_specs["labels"]}
+    return [label for label in old_annotation_specs["labels"] if label["label_id"] not in new_label_ids]
+
+
+def get_removed_choices(old_annotation_specs: Mapping[str, Any], new_annotation_specs: Mapping[str, Any]) -> list[tuple[Mapping[str, Any], Mapping[str, Any]]]:
+    """操作後も存在する属性から削除された選択肢を、(属性, 選択肢)のlistで返します。"""
+    new_attributes = {attribute["additional_data_definition_id"]: attribute for attribute in new_annotation_specs["additionals"]}
+    result: list[tuple[Mapping[str, Any], Mapping[str, Any]]] = []
+    for old_attribute in old_annotation_specs["additionals"]:
+        new_attribute = new_attributes.get(old_attribute["additional_data_definition_id"])
+        if new_attribute is None:
+            continue
+        new_choice_ids = {choice["choice_id"] for choice in new_attribute["choices"]}
+        result.extend((old_attribute, choice) for choice in old_attribute["choices"] if choice["choice_id"] not in new_choice_ids)
+    return result
+
+
+class ApplyAnnotationSpecsPlanMain(CommandLineWithConfirm):
+    """
+    プランの操作をまとめてアノテーション仕様に適用する本体処理。
+    """
+
+    def __init__(
+        self,
+        service: annofabapi.Resource,
+        *,
+        project_id: str,
+        all_yes: bool,
+        allow_affecting_annotations: bool = False,
+    ) -> None:
+        self.service = service
+        self.project_id = project_id
+        self.allow_affecting_annotations = allow_affecting_annotations
+        CommandLineWithConfirm.__init__(self, all_yes)
+
+    def validate_deletion(self, old_annotation_specs: Mapping[str, Any], new_annotation_specs: Mapping[str, Any]) -> bool:
+        """
+        削除されるラベルと選択肢が、既存のアノテーションで使われていないかを確認します。
+        判定方法は ``delete_labels`` , ``delete_choices`` コマンドと同じです。
+
+        Returns:
+            削除してよい場合はTrue
+        """
+        delete_labels_obj = DeleteLabelsMain(self.service, project_id=self.project_id, all_yes=True, allow_affecting_annotations=self.allow_affecting_annotations)
+        affecting_label_annotations: list[AffectingLabelAnnotation] = []
+        for label in get_removed_labels(old_annotation_specs, new_annotation_specs):
+            annotation_count = delete_labels_obj.count_annotations_by_label(label["label_id"])
+            if annotation_count > 0:
+                affecting_label_annotations.append(AffectingLabelAnnotation(label_name_en=get_label_name_en(label), annotation_count=annotation_count))
+        if not delete_labels_obj.validate_deletion(affecting_label_annotations):
+            return False
+
+        delete_choices_obj = DeleteChoicesMain(self.service, project_id=self.project_id, all_yes=True, allow_affecting_annotations=self.allow_affecting_annotations)
+        affecting_choice_annotations: list[AffectingChoiceAnnotation] = []
+        for attribute, choice in get_removed_choices(old_annotation_specs, new_annotation_specs):
+            annotation_count = delete_choices_obj.count_annotations_by_choice(attribute["additional_data_definition_id"], choice["choice_id"])
+            if annotation_count > 0:
+                affecting_choice_annotations.append(
+                    AffectingChoiceAnnotation(attribute_name_en=get_attribute_name_en(attribute), choice_name_en=get_choice_name_en(choice), annotation_count=annotation_count)
+                )
+        return delete_choices_obj.validate_deletion(affecting_choice_annotations)
+
+    def apply(self, plan: AnnotationSpecsPlan) -> bool:
+        """
+        アノテーション仕様を1回だけ取得して、プランの操作をすべて適用したアノテーション仕様を1回で更新します。
+
+        Returns:
+            更新を実行した場合はTrue、確認で中断した場合はFalse
+        """
+        old_annotation_specs, _ = self.service.api.get_annotation_specs(self.project_id, query_params={"v": "3"})
+        request_body = apply_plan(old_annotation_specs, plan)
+
+        diff = create_annotation_specs_diff(old_annotation_specs, request_body)
+        diff_text = format_annotation_specs_diff_as_text(diff, left_specs=old_annotation_specs, right_specs=request_body, detail=False)
+        if diff_text == "":
+            logger.info("プランを適用してもアノテーション仕様は変わらないので、終了します。")
+            return False
+
+        if not self.validate_deletion(old_annotation_specs, request_body):
+            return False
+
+        confirm_message = f"{len(plan.operations)} 件の操作を適用して、アノテーション仕様を以下のように変更します。よろしいですか？\n{diff_text}"
+        if not self.confirm_processing(confirm_message):
+            return False
+
+        self.service.api.put_annotation_specs(self.project_id, query_params={"v": "3"}, request_body=request_body)
+        logger.info(f"{len(plan.operations)} 件の操作を適用して、アノテーション仕様を更新しました。")
+        return True
+
+
+class ApplyAnnotationSpecsPlan(CommandLine):
+    COMMON_MESSAGE = "annofabcli annotation_specs apply: error:"
+
+    def main(self) -> None:
+        args = self.args
+        plan = parse_plan(get_json_from_args(args.plan))
+        if args.comment is not None:
+            plan = replace(plan, comment=args.comment)
+
+        obj = ApplyAnnotationSpecsPlanMain(self.service, project_id=args.project_id, all_yes=args.yes, allow_affecting_annotations=args.allow_affecting_annotations)
+        obj.apply(plan)
+
+
+def create_plan_help(operation_types: Collection[str], sample_operations: Sequence[dict[str, Any]]) -> str:
+    sample = {"comment": "...", "operations": list(sample_operations)}
+    return (
+        "アノテーション仕様に適用する操作をJSON形式で指定します。 ``file://`` を先頭に付けるとJSONファイルを指定できます。\n"
+        f"``operation`` には {', '.join(operation_types)} のいずれかを指定します。その他のキーは、同名のサブコマンドのコマンドライン引数と同じです。\n"
+        f"(例) ``{json.dumps(sample, ensure_ascii=False)}``"
+    )
+
+
+def parse_args(parser: argparse.ArgumentParser) -> None:
+    argument_parser = ArgumentParser(parser)
+    argument_parser.add_project_id()
+
+    parser.add_argument(
+        "--plan",
+        type=str,
+        required=True,
+        help=create_plan_help(
+            PLAN_OPERATION_DEFINITIONS.keys(),
+            [
+                {"operation": "add_label", "label_name_en": "car", "annotation_type": "bounding_box"},
+                {"operation": "add_attribute", "attribute_type": "flag", "attribute_name_en": "occluded", "label_name_en": ["car"]},
+            ],
+        ),
+    )
+    parser.add_argument(
+        "--allow_affecting_annotations",
+        action="store_true",
+        help="削除するラベルや選択肢が既存のアノテーションで使われていても、アノテーション仕様を更新します。",
+    )
+    parser.add_argument("--comment", type=str, help="アノテーション仕様の変更内容を説明するコメント。未指定の場合、各操作のコメントを連結したコメントになります。")
+
+    parser.set_defaults(subcommand_func=main)
+
+
+def main(args: argparse.Namespace) -> None:
+    service = build_annofabapi_resource_and_login(args)
+    facade = AnnofabApiFacade(service)
+    ApplyAnnotationSpecsPlan(service, facade, args).main()
+
+
+def add_parser(subparsers: argparse._SubParsersAction | None = None) -> argparse.ArgumentParser:
+    subcommand_name = "apply"
+    subcommand_help = "複数の操作を記載したプランを、アノテーション仕様にまとめて適用します。"
+    description = (
+        "複数の操作を記載したプランを、アノテーション仕様にまとめて適用します。"
+        "アノテーション仕様の取得と更新はそれぞれ1回だけなので、サブコマンドを複数回実行するより速く、アノテーション仕様の変更履歴も1件になります。"
+    )
+    epilog = "チェッカーロール、オーナーロールを持つユーザで実行してください。"
+
+    parser = annofabcli.common.cli.add_parser(subparsers, subcommand_name, subcommand_help, description=description, epilog=epilog)
+    parse_args(parser)
+    return parser
@@ -0,0 +1,286 @@
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import sys
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, cast
+
+import annofabapi
+
+import annofabcli.common.cli
+from annofabcli.annotation_specs.diff_annotation_specs import TargetName
+from annofabcli.annotation_specs.diff_compare import create_annotation_specs_diff
+from annofabcli.annotation_specs.diff_index import AnnotationSpecsIndex
+from annofabcli.annotation_specs.diff_models import AnnotationSpecsDiff, AnnotationSpecsDiffOutputFormat
+from annofabcli.annotation_specs.diff_text_formatter import format_annotation_specs_diff_as_text
+from annofabcli.common.cli import COMMAND_LINE_ERROR_STATUS_CODE, ArgumentParser, CommandLine, build_annofabapi_resource_and_login
+from annofabcli.common.facade import AnnofabApiFacade
+from annofabcli.common.utils import get_cache_dir, output_string, print_json
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class AnnotationSpecsHistoryDiff:
+    """
+    連続する2つのアノテーション仕様の履歴の差分
+    """
+
+    left_history: dict[str, Any]
+    """比較元のアノテーション仕様の履歴"""
+    right_history: dict[str, Any]
+    """比較先のアノテーション仕様の履歴"""
+    left_index: AnnotationSpecsIndex
+    right_index: AnnotationSpecsIndex
+    diff: AnnotationSpecsDiff
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "left_history_id": self.left_history["history_id"],
+            "left_updated_datetime": self.left_history["updated_datetime"],
+            "right_history_id": self.right_history["history_id"],
+            "right_updated_datetime": self.right_history["updated_datetime"],
+            "diff": self.diff.model_dump(exclude_none=True),
+        }
+
+    def to_text(self, *, detail: bool) -> str:
+        body = format_annotation_specs_diff_as_text(
+            self.diff,
+            left_specs=self.left_index.annotation_specs,
+            right_specs=self.right_index.annotation_specs,
+            detail=detail,
+        )
+        header = (
+            f"=== {self.left_history['updated_datetime']} (history_id='{self.left_history['history_id']}') -> "
+            f"{self.right_history['updated_datetime']} (history_id='{self.right_history['history_id']}') ==="
+        )
+        return f"{header}\n{body}"
+
+
+def create_annotation_specs_history_diffs(
+    histories_with_specs: Iterable[tuple[dict[str, Any], dict[str, Any]]],
+    *,
+    targets: Iterable[TargetName] | None = None,
+) -> Iterator[AnnotationSpecsHistoryDiff]:
+    """
+    アノテーション仕様の履歴を古い順に1回だけ走査して、連続する履歴の差分を生成します。
+    各履歴の索引は前後2回の比較で再利用します。差分がない組み合わせは生成しません。
+
+    Args:
+        histories_with_specs: アノテーション仕様の履歴と、その時点のアノテーション仕様のtupleのiterable。古い順に並んでいる必要があります。
+        targets: 差分生成の対象一覧。 ``None`` の場合は全対象を比較します。
+
+    Yields:
+        連続する2つの履歴の差分
+    """
+    target_list = list(targets) if targets is not None else None
+    previous: tuple[dict[str, Any], AnnotationSpecsIndex] | None = None
+    for history, annotation_specs in histories_with_specs:
+        current_index = AnnotationSpecsIndex(annotation_specs)
+        if previous is not None:
+            previous_history, previous_index = previous
+            diff = create_annotation_specs_diff(previous_index, current_index, targets=target_list)
+            if diff.has_changes():
+                yield AnnotationSpecsHistoryDiff(
+                    left_history=previous_history,
+                    right_history=history,
+                    left_index=previous_index,
+                    right_index=current_index,
+                    diff=diff,
+                )
+        previous = (history, current_index)
+
+
+def select_histories(histories: list[dict[str, Any]], *, from_history_id: str | None, to_history_id: str | None) -> list[dict[str, Any]]:
+    """
+    アノテーション仕様の履歴を古い順に並べて、指定した範囲の履歴を返します。
+
+    Args:
+        histories: アノテーション仕様の履歴一覧
+        from_history_id: 範囲の先頭のhistory_id。Noneなら最も古い履歴から。
+        to_history_id: 範囲の末尾のhistory_id。Noneなら最新の履歴まで。
+
+    Returns:
+        指定した範囲の履歴。履歴が1件もなく、history_idを指定していない場合は空のlist
+
+    Raises:
+        ValueError: 指定したhistory_idが存在しない場合、または範囲の先頭が末尾より新しい場合
+    """
+    if len(histories) == 0 and from_history_id is None and to_history_id is None:
+        return []
+
+    sorted_histories = sorted(histories, key=lambda e: e["updated_datetime"])
+    history_ids = [e["history_id"] for e in sorted_histories]
+
+    def get_position(history_id: str) -> int:
+        try:
+            return history_ids.index(history_id)
+        except ValueError as e:
+            raise ValueError(f"history_id='{history_id}' であるアノテーション仕様の履歴は存在しません。") from e
+
+    start = get_position(from_history_id) if from_history_id is not None else 0
+    end = get_position(to_history_id) if to_history_id is not None else len(sorted_histories) - 1
+    if start > end:
+        raise ValueError(f"from_history_id='{from_history_id}' の履歴が、to_history_id='{to_history_id}' の履歴より新しいです。")
+    return sorted_histories[start : end + 1]
+
+
+class AnnotationSpecsHistoryCache:
+    """
+    履歴ごとのアノテーション仕様を保存するキャッシュ。
+    ある履歴のアノテーション仕様は後から変わらないので、history_idをキーにして保存します。
+
+    Args:
+        cache_dir: キャッシュを保存するディレクトリ
+    """
+
+    def __init__(self, cache_dir: Path) -> None:
+        self.cache_dir = cache_dir
+
+    def _get_path(self, project_id: str, history_id: str) -> Path:
+        return self.cache_dir / project_id / f"{history_id}.json"
+
+    def get(self, project_id: str, history_id: str) -> dict[str, Any] | None:
+        path = self._get_path(project_id, history_id)
+        if not path.exists():
+            return None
+        with path.open(encoding="utf-8") as f:
+            return json.load(f)
+
+    def put(self, project_id: str, history_id: str, annotation_specs: dict[str, Any]) -> None:
+        path = self._get_path(project_id, history_id)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # 書き込み途中のファイルを読み込まないように、一時ファイルに書き込んでからrenameする
+        tmp_path = path.with_suffix(".json.tmp")
+        with tmp_path.open(mode="w", encoding="utf-8") as f:
+            json.dump(annotation_specs, f, ensure_ascii=False)
+        tmp_path.replace(path)
+
+
+def get_default_cache_dir() -> Path:
+    return get_cache_dir() / "annotation_specs_history"
+
+
+class AnnotationSpecsHistoryDiffMain:
+    def __init__(self, service: annofabapi.Resource, *, project_id: str, cache: AnnotationSpecsHistoryCache | None = None) -> None:
+        self.service = service
+        self.project_id = project_id
+        self.cache = cache
+
+    def get_annotation_specs(self, history_id: str) -> dict[str, Any]:
+        if self.cache is not None:
+            annotation_specs = self.cache.get(self.project_id, history_id)
+            if annotation_specs is not None:
+                logger.debug(f"history_id='{history_id}' のアノテーション仕様をキャッシュから読み込みました。")
+                return annotation_specs
+
+        annotation_specs, _ = self.service.api.get_annotation_specs(self.project_id, query_params={"v": "3", "history_id": history_id})
+        if self.cache is not None:
+            self.cache.put(self.project_id, history_id, annotation_specs)
+        return annotation_specs
+
+    def iter_histories_with_specs(self, histories: list[dict[str, Any]]) -> Iterator[tuple[dict[str, Any], dict[str, Any]]]:
+        for index, history in enumerate(histories, start=1):
+            logger.debug(f"{index}/{len(histories)} 件目 :: history_id='{history['history_id']}' のアノテーション仕様を取得します。")
+            yield history, self.get_annotation_specs(history["history_id"])
+
+    def create_diffs(self, *, from_history_id: str | None, to_history_id: str | None, targets: Iterable[TargetName] | None) -> Iterator[AnnotationSpecsHistoryDiff]:
+        all_histories, _ = self.service.api.get_annotation_specs_histories(self.project_id)
+        histories = select_histories(all_histories, from_history_id=from_history_id, to_history_id=to_history_id)
+        logger.info(f"{len(histories)} 件のアノテーション仕様の履歴を比較します。")
+        return create_annotation_specs_history_diffs(self.iter_histories_with_specs(histories), targets=targets)
+
+
+class AnnotationSpecsHistoryDiffCommand(CommandLine):
+    """アノテーション仕様の履歴の差分を出力する。"""
+
+    COMMON_MESSAGE = "annofabcli annotation_specs diff_history: error:"
+
+    def main(self) -> None:
+        args = self.args
+        cache = AnnotationSpecsHistoryCache(get_default_cache_dir()) if args.history_cache else None
+        main_obj = AnnotationSpecsHistoryDiffMain(self.service, project_id=args.project_id, cache=cache)
+        targets = cast(list[TargetName], args.target) if args.target is not None else None
+        try:
+            diffs = main_obj.create_diffs(from_history_id=args.from_history_id, to_history_id=args.to_history_id, targets=targets)
+        except ValueError as e:
+            print(f"{self.COMMON_MESSAGE} {e}", file=sys.stderr)  # noqa: T201
+            sys.exit(COMMAND_LINE_ERROR_STATUS_CODE)
+
+        output_format = AnnotationSpecsDiffOutputFormat(args.format)
+        if output_format in {AnnotationSpecsDiffOutputFormat.TEXT, AnnotationSpecsDiffOutputFormat.DETAIL_TEXT}:
+            detail = output_format == AnnotationSpecsDiffOutputFormat.DETAIL_TEXT
+            text = "\n".join(diff.to_text(detail=detail) for diff in diffs)
+            if text == "":
+                logger.info("差分はありません。")
+                if args.output is None:
+                    return
+            output_string(text, args.output)
+            return
+
+        diff_list = [diff.to_dict() for diff in diffs]
+        print_json(diff_list, is_pretty=output_format == AnnotationSpecsDiffOutputFormat.PRETTY_JSON, output=args.output)
+
+
+def parse_args(parser: argparse.ArgumentParser) -> None:
+    argument_parser = ArgumentParser(parser)
+    argument_parser.add_project_id()
+
+    parser.add_argument(
+        "--from_history_id",
+        type=str,
+        help="比較する範囲の先頭（最も古い）アノテーション仕様のhistory_idを指定します。指定しない場合は、最も古い履歴から比較します。",
+    )
+    parser.add_argument(
+        "--to_history_id",
+        type=str,
+        help="比較する範囲の末尾（最も新しい）アノテーション仕様のhistory_idを指定します。指定しない場合は、最新の履歴まで比較します。",
+    )
+    parser.add_argument(
+        "--target",
+        nargs="+",
+        choices=["labels", "attributes", "attribute_restrictions", "inspection_phrases", "metadata", "option"],
+        help="出力対象の差分を指定します。指定しない場合はすべて出力します。",
+    )
+    parser.add_argument(
+        "-f",
+        "--format",
+        type=str,
+        choices=[e.value for e in AnnotationSpecsDiffOutputFormat],
+        default=AnnotationSpecsDiffOutputFormat.TEXT.value,
+        help=(
+            "出力フォーマット\n\n"
+            "* text: 差分項目のみをセクション見出し付きの階層形式で表示する\n"
+            "* detail_text: 差分項目と比較元・比較先の値をchanges配下のleft/right形式で表示する\n"
+            "* json: 差分情報の配列をJSONで出力する\n"
+            "* pretty_json: 差分情報の配列を整形JSONで出力する\n"
+        ),
+    )
+    parser.add_argument("--output", type=str, help="出力先のファイルパス")
+    parser.add_argument(
+        "--history_cache",
+        action="store_true",
+        help="取得したアノテーション仕様を、キャッシュディレクトリ（ ``$XDG_CACHE_HOME/annofabcli`` ）に保存して再利用します。ある履歴のアノテーション仕様は変わらないので、2回目以降は取得しません。",
+    )
+
+    parser.set_defaults(subcommand_func=main)
+
+
+def main(args: argparse.Namespace) -> None:
+    service = build_annofabapi_resource_and_login(args)
+    facade = AnnofabApiFacade(service)
+    AnnotationSpecsHistoryDiffCommand(service, facade, args).main()
+
+
+def add_parser(subparsers: argparse._SubParsersAction | None = None) -> argparse.ArgumentParser:
+    subcommand_name = "diff_history"
+    subcommand_help = "アノテーション仕様の履歴を順番に比較して、差分を出力します。"
+    description = "アノテーション仕様の履歴を古い順に比較して、連続する2つの履歴の差分を出力します。差分がない履歴の組み合わせは出力しません。"
+
+    parser = annofabcli.common.cli.add_parser(subparsers, subcommand_name, subcommand_help, description)
+    parse_args(parser)
+    return parser
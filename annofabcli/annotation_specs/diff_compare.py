@@ -1,12 +1,12 @@
 from __future__ import annotations
 
-import json
 from collections import Counter
 from collections.abc import Iterable, Sequence
 from typing import Any, Literal
 
 from annofabapi.util.annotation_specs import get_message_with_lang
 
+from annofabcli.annotation_specs.diff_index import AnnotationSpecsIndex, to_annotation_specs_index
 from annofabcli.annotation_specs.diff_models import (
     AnnotationSpecsDiff,
     AttributeRestrictionDiffItem,
@@ -18,7 +18,6 @@ from annofabcli.annotation_specs.diff_models import (
     ChangedInspectionPhrase,
     ChangedLabel,
     InspectionPhrasesDiff,
-    JsonValue,
     LabelsDiff,
     MetadataDiff,
     OptionDiff,
@@ -66,18 +65,6 @@ def _is_order_changed(left_ids: Sequence[str], right_ids: Sequence[str]) -> bool
     return set(left_ids) == set(right_ids) and list(left_ids) != list(right_ids)
 
 
-def _to_json_text(value: JsonValue) -> str:
-    """JSON値を安定した文字列に変換する。
-
-    Args:
-        value: 文字列化するJSON値。
-
-    Returns:
-        キー順を固定したJSON文字列。
-    """
-    return json.dumps(value, ensure_ascii=False, sort_keys=True)
-
-
 def _create_attribute_restriction_diff_item(restriction: dict[str, Any]) -> AttributeRestrictionDiffItem:
     """属性制約の差分項目を生成する。
 
@@ -90,90 +77,31 @@ def _create_attribute_restriction_diff_item(restriction: dict[str, Any]) -> Attr
     return AttributeRestrictionDiffItem(condition=restriction["condition"])
 
 
-def _to_attribute_restriction_key(restriction: dict[str, Any]) -> str:
-    """属性制約を比較用のキー文字列に変換する。
-
-    Args:
-        restriction: 属性制約情報。
-
-    Returns:
-        属性制約の識別に使う文字列。
-    """
-
-    def _normalize_condition_value(value: JsonValue, *, key: str | None = None) -> JsonValue:
-        """属性制約の条件値を比較用に正規化する。
-
-        Args:
-            value: 正規化する属性制約の条件値。
-            key: 親要素のキー名。
-
-        Returns:
-            比較しやすい形に正規化した条件値。
-        """
-        if isinstance(value, dict):
-            return {k: _normalize_condition_value(v, key=k) for k, v in sorted(value.items())}
-        if isinstance(value, list):
-            normalized_list = [_normalize_condition_value(e) for e in value]
-            if key == "labels":
-                # HasLabel.labels は集合として扱うため、ラベルIDの順序差は無視する。
-                return sorted(normalized_list, key=_to_json_text)
-            return normalized_list
-        return value
-
-    return _to_json_text(
-        {
-            "additional_data_definition_id": restriction["additional_data_definition_id"],
-            "condition": _normalize_condition_value(restriction["condition"]),
-        }
-    )
-
-
-def _get_added_restrictions(
-    left_restrictions: Sequence[dict[str, Any]],
-    right_restrictions: Sequence[dict[str, Any]],
+def _get_unmatched_restrictions(
+    base_keys: Sequence[str],
+    target_keys: Sequence[str],
+    target_restrictions: Sequence[dict[str, Any]],
 ) -> list[AttributeRestrictionDiffItem]:
-    """追加された属性制約一覧を取得する。
-
-    Args:
-        left_restrictions: 比較元の属性制約一覧。
-        right_restrictions: 比較先の属性制約一覧。
+    """比較先にだけ存在する属性制約一覧を取得する。
 
-    Returns:
-        比較先にのみ存在する属性制約差分項目一覧。
-    """
-    left_counter = Counter(_to_attribute_restriction_key(e) for e in left_restrictions)
-    added_restrictions = []
-    for restriction in right_restrictions:
-        key = _to_attribute_restriction_key(restriction)
-        if left_counter[key] > 0:
-            left_counter[key] -= 1
-            continue
-        added_restrictions.append(_create_attribute_restriction_diff_item(restriction))
-    return added_restrictions
-
-
-def _get_removed_restrictions(
-    left_restrictions: Sequence[dict[str, Any]],
-    right_restrictions: Sequence[dict[str, Any]],
-) -> list[AttributeRestrictionDiffItem]:
-    """削除された属性制約一覧を取得する。
+    同じ属性制約が複数ある場合は、個数の差分だけを返す。
 
     Args:
-        left_restrictions: 比較元の属性制約一覧。
-        right_restrictions: 比較先の属性制約一覧。
+        base_keys: 比較の基準にする属性制約の比較用キー一覧。
+        target_keys: ``target_restrictions`` の比較用キー一覧。
+        target_restrictions: 比較先の属性制約一覧。
 
     Returns:
-        比較元にのみ存在する属性制約差分項目一覧。
+        ``base_keys`` に対応する属性制約がない属性制約差分項目一覧。
     """
-    right_counter = Counter(_to_attribute_restriction_key(e) for e in right_restrictions)
-    removed_restrictions = []
-    for restriction in left_restrictions:
-        key = _to_attribute_restriction_key(restriction)
-        if right_counter[key] > 0:
-            right_counter[key] -= 1
+    base_counter = Counter(base_keys)
+    unmatched_restrictions = []
+    for key, restriction in zip(target_keys, target_restrictions, strict=True):
+        if base_counter[key] > 0:
+            base_counter[key] -= 1
             continue
-        removed_restrictions.append(_create_attribute_restriction_diff_item(restriction))
-    return removed_restrictions
+        unmatched_restrictions.append(_create_attribute_restriction_diff_item(restriction))
+    return unmatched_restrictions
 
 
 def compare_choice(left_choice: dict[str, Any], right_choice: dict[str, Any]) -> ChangedChoice | None:
@@ -246,34 +174,37 @@ def compare_attribute(left_attribute: dict[str, Any], right_attribute: dict[str,
     return diff
 
 
-def compare_attributes(left_specs: dict[str, Any], right_specs: dict[str, Any]) -> AttributesDiff:
+def compare_attributes(left_specs: dict[str, Any] | AnnotationSpecsIndex, right_specs: dict[str, Any] | AnnotationSpecsIndex) -> AttributesDiff:
     """属性一覧の差分を比較する。
 
+    内容のハッシュ値が同じ属性は比較しない。
+
     Args:
-        left_specs: 比較元のアノテーション仕様。
-        right_specs: 比較先のアノテーション仕様。
+        left_specs: 比較元のアノテーション仕様、またはその索引。
+        right_specs: 比較先のアノテーション仕様、またはその索引。
 
     Returns:
         属性一覧の差分。
     """
-    left_attribute_list = left_specs["additionals"]
-    right_attribute_list = right_specs["additionals"]
-    left_attribute_ids = [e["additional_data_definition_id"] for e in left_attribute_list]
-    right_attribute_ids = [e["additional_data_definition_id"] for e in right_attribute_list]
-    left_attribute_dict = {e["additional_data_definition_id"]: e for e in left_attribute_list}
-    right_attribute_dict = {e["additional_data_definition_id"]: e for e in right_attribute_list}
+    left_index = to_annotation_specs_index(left_specs)
+    right_index = to_annotation_specs_index(right_specs)
+    if left_index.attributes_hash == right_index.attributes_hash:
+        return AttributesDiff()
 
+    left_attribute_hashes = left_index.attribute_hashes
+    right_attribute_hashes = right_index.attribute_hashes
     changed_attributes = []
-    for attribute_id in right_attribute_ids:
-        if attribute_id not in left_attribute_dict:
+    for attribute_id in right_index.attribute_ids:
+        left_attribute_hash = left_attribute_hashes.get(attribute_id)
+        if left_attribute_hash is None or left_attribute_hash == right_attribute_hashes[attribute_id]:
             continue
-        changed_attribute = compare_attribute(left_attribute_dict[attribute_id], right_attribute_dict[attribute_id])
+        changed_attribute = compare_attribute(left_index.attributes_by_id[attribute_id], right_index.attributes_by_id[attribute_id])
         if changed_attribute is not None:
             changed_attributes.append(changed_attribute)
 
     return AttributesDiff(
-        added_attribute_ids=_get_added_ids(left_attribute_ids, right_attribute_ids),
-        removed_attribute_ids=_get_removed_ids(left_attribute_ids, right_attribute_ids),
+        added_attribute_ids=_get_added_ids(left_index.attribute_ids, right_index.attribute_ids),
+        removed_attribute_ids=_get_removed_ids(left_index.attribute_ids, right_index.attribute_ids),
         changed_attributes=changed_attributes,
     )
 
@@ -313,31 +244,36 @@ def compare_label(left_label: dict[str, Any], right_label: dict[str, Any]) -> Ch
     return diff
 
 
-def compare_labels(left_specs: dict[str, Any], right_specs: dict[str, Any]) -> LabelsDiff:
+def compare_labels(left_specs: dict[str, Any] | AnnotationSpecsIndex, right_specs: dict[str, Any] | AnnotationSpecsIndex) -> LabelsDiff:
     """ラベル一覧の差分を比較する。
 
+    内容のハッシュ値が同じラベルは比較しない。
+
     Args:
-        left_specs: 比較元のアノテーション仕様。
-        right_specs: 比較先のアノテーション仕様。
+        left_specs: 比較元のアノテーション仕様、またはその索引。
+        right_specs: 比較先のアノテーション仕様、またはその索引。
 
     Returns:
         ラベル一覧の差分。
     """
-    left_label_list = left_specs["labels"]
-    right_label_list = right_specs["labels"]
-    left_label_ids = [e["label_id"] for e in left_label_list]
-    right_label_ids = [e["label_id"] for e in right_label_list]
-    left_label_dict = {e["label_id"]: e for e in left_label_list}
-    right_label_dict = {e["label_id"]: e for e in right_label_list}
+    left_index = to_annotation_specs_index(left_specs)
+    right_index = to_annotation_specs_index(right_specs)
+    if left_index.labels_hash == right_index.labels_hash:
+        return LabelsDiff()
 
+    left_label_hashes = left_index.label_hashes
+    right_label_hashes = right_index.label_hashes
     changed_labels = []
-    for label_id in right_label_ids:
-        if label_id not in left_label_dict:
+    for label_id in right_index.label_ids:
+        left_label_hash = left_label_hashes.get(label_id)
+        if left_label_hash is None or left_label_hash == right_label_hashes[label_id]:
             continue
-        changed_label = compare_label(left_label_dict[label_id], right_label_dict[label_id])
+        changed_label = compare_label(left_index.labels_by_id[label_id], right_index.labels_by_id[label_id])
         if changed_label is not None:
             changed_labels.append(changed_label)
 
+    left_label_ids = left_index.label_ids
+    right_label_ids = right_index.label_ids
     return LabelsDiff(
         label_order_changed=_is_order_changed(left_label_ids, right_label_ids),
         added_label_ids=_get_added_ids(left_label_ids, right_label_ids),
@@ -346,30 +282,37 @@ def compare_labels(left_specs: dict[str, Any], right_specs: dict[str, Any]) -> L
     )
 
 
-def compare_attribute_restrictions(left_specs: dict[str, Any], right_specs: dict[str, Any]) -> AttributeRestrictionsDiff:
+def compare_attribute_restrictions(left_specs: dict[str, Any] | AnnotationSpecsIndex, right_specs: dict[str, Any] | AnnotationSpecsIndex) -> AttributeRestrictionsDiff:
     """属性制約一覧の差分を比較する。
 
+    属性制約は属性IDごとにまとめて比較し、ハッシュ値が同じ属性の属性制約は比較しない。
+
     Args:
-        left_specs: 比較元のアノテーション仕様。
-        right_specs: 比較先のアノテーション仕様。
+        left_specs: 比較元のアノテーション仕様、またはその索引。
+        right_specs: 比較先のアノテーション仕様、またはその索引。
 
     Returns:
         属性制約一覧の差分。
     """
-    left_restrictions = left_specs["restrictions"]
-    right_restrictions = right_specs["restrictions"]
-    left_attribute_ids = [e["additional_data_definition_id"] for e in left_restrictions]
-    right_attribute_ids = [e["additional_data_definition_id"] for e in right_restrictions]
-    attribute_ids = list(dict.fromkeys([*right_attribute_ids, *left_attribute_ids]))
+    left_index = to_annotation_specs_index(left_specs)
+    right_index = to_annotation_specs_index(right_specs)
+    if left_index.restrictions_hash == right_index.restrictions_hash:
+        return AttributeRestrictionsDiff()
+
+    left_keys_by_attribute_id = left_index.restriction_keys_by_attribute_id
+    right_keys_by_attribute_id = right_index.restriction_keys_by_attribute_id
+    attribute_ids = list(dict.fromkeys([*right_keys_by_attribute_id, *left_keys_by_attribute_id]))
     changed_attribute_restrictions = []
 
     for attribute_id in attribute_ids:
-        left_target_restrictions = [e for e in left_restrictions if e["additional_data_definition_id"] == attribute_id]
-        right_target_restrictions = [e for e in right_restrictions if e["additional_data_definition_id"] == attribute_id]
+        if left_index.restriction_hashes.get(attribute_id) == right_index.restriction_hashes.get(attribute_id):
+            continue
+        left_keys = left_keys_by_attribute_id.get(attribute_id, [])
+        right_keys = right_keys_by_attribute_id.get(attribute_id, [])
         changed_attribute_restriction = ChangedAttributeRestriction(
             attribute_id=attribute_id,
-            added_restrictions=_get_added_restrictions(left_target_restrictions, right_target_restrictions),
-            removed_restrictions=_get_removed_restrictions(left_target_restrictions, right_target_restrictions),
+            added_restrictions=_get_unmatched_restrictions(left_keys, right_keys, right_index.restrictions_by_attribute_id.get(attribute_id, [])),
+            removed_restrictions=_get_unmatched_restrictions(right_keys, left_keys, left_index.restrictions_by_attribute_id.get(attribute_id, [])),
         )
         if changed_attribute_restriction.has_changes():
             changed_attribute_restrictions.append(changed_attribute_restriction)
@@ -466,28 +409,35 @@ def compare_option(left_specs: dict[str, Any], right_specs: dict[str, Any]) -> O
 
 
 def create_annotation_specs_diff(
-    left_specs: dict[str, Any],
-    right_specs: dict[str, Any],
+    left_specs: dict[str, Any] | AnnotationSpecsIndex,
+    right_specs: dict[str, Any] | AnnotationSpecsIndex,
     *,
     targets: Iterable[Literal["labels", "attributes", "attribute_restrictions", "inspection_phrases", "metadata", "option"]] | None = None,
 ) -> AnnotationSpecsDiff:
     """アノテーション仕様の差分を生成する。
 
+    同じアノテーション仕様を何度も比較する場合（履歴を順に比較する場合など）は、
+    :class:`AnnotationSpecsIndex` を渡すと、ハッシュ値の計算結果を再利用できる。
+
     Args:
-        left_specs: 比較元のアノテーション仕様。
-        right_specs: 比較先のアノテーション仕様。
+        left_specs: 比較元のアノテーション仕様、またはその索引。
+        right_specs: 比較先のアノテーション仕様、またはその索引。
         targets: 差分生成の対象一覧。 ``None`` の場合は全対象を比較する。
 
     Returns:
         アノテーション仕様全体の差分。
     """
     target_set = set(targets) if targets is not None else {"labels", "attributes", "attribute_restrictions", "inspection_phrases", "metadata", "option"}
+    left_index = to_annotation_specs_index(left_specs)
+    right_index = to_annotation_specs_index(right_specs)
+    left_annotation_specs = left_index.annotation_specs
+    right_annotation_specs = right_index.annotation_specs
 
     return AnnotationSpecsDiff(
-        labels=compare_labels(left_specs, right_specs) if "labels" in target_set else None,
-        attributes=compare_attributes(left_specs, right_specs) if "attributes" in target_set else None,
-        attribute_restrictions=compare_attribute_restrictions(left_specs, right_specs) if "attribute_restrictions" in target_set else None,
-        inspection_phrases=compare_inspection_phrases(left_specs, right_specs) if "inspection_phrases" in target_set else None,
-        metadata=compare_metadata(left_specs, right_specs) if "metadata" in target_set else None,
-        option=compare_option(left_specs, right_specs) if "option" in target_set else None,
+        labels=compare_labels(left_index, right_index) if "labels" in target_set else None,
+        attributes=compare_attributes(left_index, right_index) if "attributes" in target_set else None,
+        attribute_restrictions=compare_attribute_restrictions(left_index, right_index) if "attribute_restrictions" in target_set else None,
+        inspection_phrases=compare_inspection_phrases(left_annotation_specs, right_annotation_specs) if "inspection_phrases" in target_set else None,
+        metadata=compare_metadata(left_annotation_specs, right_annotation_specs) if "metadata" in target_set else None,
+        option=compare_option(left_annotation_specs, right_annotation_specs) if "option" in target_set else None,
     )
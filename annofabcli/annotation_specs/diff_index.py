@@ -0,0 +1,170 @@
+"""
+アノテーション仕様の差分を高速に求めるための索引
+
+ラベル、属性、属性制約ごとに内容のハッシュ値を事前に計算しておき、ハッシュ値が同じ要素の比較を省略します。
+アノテーション仕様の履歴を連続して比較する場合は、同じ索引を前後の比較で再利用できます。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from collections import defaultdict
+from functools import cached_property
+from typing import Any
+
+from annofabcli.annotation_specs.diff_models import JsonValue
+
+
+def to_json_text(value: JsonValue) -> str:
+    """JSON値を安定した文字列に変換する。
+
+    Args:
+        value: 文字列化するJSON値。
+
+    Returns:
+        キー順を固定したJSON文字列。
+    """
+    return json.dumps(value, ensure_ascii=False, sort_keys=True)
+
+
+def compute_content_hash(value: JsonValue) -> str:
+    """JSON値の内容から、比較用のハッシュ値を計算する。
+
+    Args:
+        value: ハッシュ値を計算するJSON値。
+
+    Returns:
+        キー順に依存しないハッシュ値。
+    """
+    return hashlib.blake2b(to_json_text(value).encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _combine_hashes(hashes: list[str]) -> str:
+    return hashlib.blake2b("\n".join(hashes).encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _normalize_condition_value(value: JsonValue, *, key: str | None = None) -> JsonValue:
+    """属性制約の条件値を比較用に正規化する。
+
+    Args:
+        value: 正規化する属性制約の条件値。
+        key: 親要素のキー名。
+
+    Returns:
+        比較しやすい形に正規化した条件値。
+    """
+    if isinstance(value, dict):
+        return {k: _normalize_condition_value(v, key=k) for k, v in sorted(value.items())}
+    if isinstance(value, list):
+        normalized_list = [_normalize_condition_value(e) for e in value]
+        if key == "labels":
+            # HasLabel.labels は集合として扱うため、ラベルIDの順序差は無視する。
+            return sorted(normalized_list, key=to_json_text)
+        return normalized_list
+    return value
+
+
+def to_attribute_restriction_key(restriction: dict[str, Any]) -> str:
+    """属性制約を比較用のキー文字列に変換する。
+
+    Args:
+        restriction: 属性制約情報。
+
+    Returns:
+        属性制約の識別に使う文字列。
+    """
+    return to_json_text(
+        {
+            "additional_data_definition_id": restriction["additional_data_definition_id"],
+            "condition": _normalize_condition_value(restriction["condition"]),
+        }
+    )
+
+
+class AnnotationSpecsIndex:
+    """
+    アノテーション仕様の差分比較用の索引。
+
+    各プロパティは最初に参照したときに計算して保持します。
+    元のアノテーション仕様を変更した場合は、索引を作り直してください。
+
+    Args:
+        annotation_specs: アノテーション仕様（v3）
+    """
+
+    def __init__(self, annotation_specs: dict[str, Any]) -> None:
+        self.annotation_specs = annotation_specs
+
+    @cached_property
+    def label_ids(self) -> list[str]:
+        """ラベルIDの一覧（アノテーション仕様での順序）"""
+        return [e["label_id"] for e in self.annotation_specs["labels"]]
+
+    @cached_property
+    def labels_by_id(self) -> dict[str, dict[str, Any]]:
+        """keyがlabel_idのラベル情報"""
+        return {e["label_id"]: e for e in self.annotation_specs["labels"]}
+
+    @cached_property
+    def label_hashes(self) -> dict[str, str]:
+        """keyがlabel_id、valueがラベル内容のハッシュ値"""
+        return {label_id: compute_content_hash(label) for label_id, label in self.labels_by_id.items()}
+
+    @cached_property
+    def labels_hash(self) -> str:
+        """ラベル一覧全体（順序を含む）のハッシュ値"""
+        return _combine_hashes([f"{label_id}:{self.label_hashes[label_id]}" for label_id in self.label_ids])
+
+    @cached_property
+    def attribute_ids(self) -> list[str]:
+        """属性IDの一覧（アノテーション仕様での順序）"""
+        return [e["additional_data_definition_id"] for e in self.annotation_specs["additionals"]]
+
+    @cached_property
+    def attributes_by_id(self) -> dict[str, dict[str, Any]]:
+        """keyが属性IDの属性情報"""
+        return {e["additional_data_definition_id"]: e for e in self.annotation_specs["additionals"]}
+
+    @cached_property
+    def attribute_hashes(self) -> dict[str, str]:
+        """keyが属性ID、valueが属性内容（選択肢を含む）のハッシュ値"""
+        return {attribute_id: compute_content_hash(attribute) for attribute_id, attribute in self.attributes_by_id.items()}
+
+    @cached_property
+    def attributes_hash(self) -> str:
+        """属性一覧全体（順序を含む）のハッシュ値"""
+        return _combine_hashes([f"{attribute_id}:{self.attribute_hashes[attribute_id]}" for attribute_id in self.attribute_ids])
+
+    @cached_property
+    def restriction_keys_by_attribute_id(self) -> dict[str, list[str]]:
+        """keyが属性ID、valueがその属性に対する属性制約の比較用キーの一覧。属性IDは属性制約の登場順です。"""
+        result: dict[str, list[str]] = defaultdict(list)
+        for restriction in self.annotation_specs["restrictions"]:
+            result[restriction["additional_data_definition_id"]].append(to_attribute_restriction_key(restriction))
+        return dict(result)
+
+    @cached_property
+    def restrictions_by_attribute_id(self) -> dict[str, list[dict[str, Any]]]:
+        """keyが属性ID、valueがその属性に対する属性制約の一覧"""
+        result: dict[str, list[dict[str, Any]]] = defaultdict(list)
+        for restriction in self.annotation_specs["restrictions"]:
+            result[restriction["additional_data_definition_id"]].append(restriction)
+        return dict(result)
+
+    @cached_property
+    def restriction_hashes(self) -> dict[str, str]:
+        """keyが属性ID、valueがその属性に対する属性制約の集合のハッシュ値。属性制約の順序は無視します。"""
+        return {attribute_id: _combine_hashes(sorted(keys)) for attribute_id, keys in self.restriction_keys_by_attribute_id.items()}
+
+    @cached_property
+    def restrictions_hash(self) -> str:
+        """属性制約全体のハッシュ値。属性制約の順序は無視します。"""
+        return _combine_hashes(sorted(f"{attribute_id}:{value}" for attribute_id, value in self.restriction_hashes.items()))
+
+
+def to_annotation_specs_index(annotation_specs: dict[str, Any] | AnnotationSpecsIndex) -> AnnotationSpecsIndex:
+    """アノテーション仕様から索引を生成する。索引が渡された場合はそのまま返す。"""
+    if isinstance(annotation_specs, AnnotationSpecsIndex):
+        return annotation_specs
+    return AnnotationSpecsIndex(annotation_specs)
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import argparse
+import copy
 import logging
 import sys
 from dataclasses import dataclass
@@ -33,6 +34,46 @@ class Label:
     label_id: str
 
 
+def create_request_body_for_label_color(annotation_specs: dict[str, Any], label_color_dict: LabelColorDict) -> tuple[dict[str, Any], list[Label]]:
+    """
+    ラベルの色を変更したアノテーション仕様のリクエストボディと、変更対象のラベルの一覧を生成します。
+
+    Args:
+        annotation_specs: 既存のアノテーション仕様
+        label_color_dict: keyがラベル英語名, valueがRGB値のdict
+    """
+    request_body = copy.deepcopy(annotation_specs)
+    request_body["last_updated_datetime"] = request_body["updated_datetime"]
+
+    changed_labels: list[Label] = []
+    labels = request_body["labels"]
+    for label_name_en, color in label_color_dict.items():
+        target_labels = [e for e in labels if get_label_name_en(e) == label_name_en]
+        if len(target_labels) == 0:
+            logger.warning(f"label_name_en='{label_name_en}'であるラベルは存在しません。")
+            continue
+        if len(target_labels) == 2:
+            logger.warning(f"label_name_en='{label_name_en}'であるラベルは複数存在します。")
+
+        for target_label in target_labels:
+            new_color = {"red": color[0], "green": color[1], "blue": color[2]}
+            if target_label["color"] != new_color:
+                target_label["color"] = new_color
+                changed_labels.append(
+                    Label(
+                        label_id=target_label["label_id"],
+                        label_name_en=get_label_name_en(target_label),
+                    )
+                )
+
+    return request_body, changed_labels
+
+
+def create_comment_for_label_color(changed_labels: list[Label]) -> str:
+    tmp_str_labels = ", ".join([e.label_name_en for e in changed_labels])
+    return f"以下のラベルの色を変更しました。\n{tmp_str_labels}"
+
+
 class PuttingLabelColorMain(CommandLineWithConfirm):
     def __init__(self, service: annofabapi.Resource, project_id: str, *, all_yes: bool) -> None:
         self.service = service
@@ -44,32 +85,8 @@ class PuttingLabelColorMain(CommandLineWithConfirm):
         """
         アノテーション仕様のリクエストボディと、変更対象のラベルの一覧を取得します。
         """
-        request_body, _ = self.service.api.get_annotation_specs(self.project_id, query_params={"v": 3})
-
-        request_body["last_updated_datetime"] = request_body["updated_datetime"]
-
-        changed_labels: list[Label] = []
-        labels = request_body["labels"]
-        for label_name_en, color in label_color_dict.items():
-            target_labels = [e for e in labels if get_label_name_en(e) == label_name_en]
-            if len(target_labels) == 0:
-                logger.warning(f"label_name_en='{label_name_en}'であるラベルは存在しません。")
-                continue
-            if len(target_labels) == 2:
-                logger.warning(f"label_name_en='{label_name_en}'であるラベルは複数存在します。")
-
-            for target_label in target_labels:
-                new_color = {"red": color[0], "green": color[1], "blue": color[2]}
-                if target_label["color"] != new_color:
-                    target_label["color"] = new_color
-                    changed_labels.append(
-                        Label(
-                            label_id=target_label["label_id"],
-                            label_name_en=get_label_name_en(target_label),
-                        )
-                    )
-
-        return request_body, changed_labels
+        annotation_specs, _ = self.service.api.get_annotation_specs(self.project_id, query_params={"v": 3})
+        return create_request_body_for_label_color(annotation_specs, label_color_dict)
 
     def confirm_to_change_label_color(self, changed_labels: list[Label]) -> bool:
         confirm_message = f"以下のラベル({len(changed_labels)})件を変更しますか？"
@@ -86,8 +103,7 @@ class PuttingLabelColorMain(CommandLineWithConfirm):
             return
 
         if comment is None:
-            tmp_str_labels = ", ".join([e.label_name_en for e in changed_labels])
-            comment = f"以下のラベルの色を変更しました。\n{tmp_str_labels}"
+            comment = create_comment_for_label_color(changed_labels)
 
         request_body["comment"] = comment
         if not self.confirm_to_change_label_color(changed_labels):
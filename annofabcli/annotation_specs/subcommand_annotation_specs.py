@@ -9,12 +9,14 @@ import annofabcli.annotation_specs.add_choices_to_attributes
 import annofabcli.annotation_specs.add_existing_attribute_to_labels
 import annofabcli.annotation_specs.add_label
 import annofabcli.annotation_specs.add_labels
+import annofabcli.annotation_specs.apply_annotation_specs
 import annofabcli.annotation_specs.change_attribute_type
 import annofabcli.annotation_specs.delete_attribute_restriction
 import annofabcli.annotation_specs.delete_attributes
 import annofabcli.annotation_specs.delete_choices
 import annofabcli.annotation_specs.delete_labels
 import annofabcli.annotation_specs.diff_annotation_specs
+import annofabcli.annotation_specs.diff_annotation_specs_history
 import annofabcli.annotation_specs.export_annotation_specs
 import annofabcli.annotation_specs.import_annotation_specs
 import annofabcli.annotation_specs.list_annotation_import_info
@@ -52,12 +54,14 @@ def parse_args(parser: argparse.ArgumentParser) -> None:
     annofabcli.annotation_specs.add_existing_attribute_to_labels.add_parser(subparsers)
     annofabcli.annotation_specs.add_label.add_parser(subparsers)
     annofabcli.annotation_specs.add_labels.add_parser(subparsers)
+    annofabcli.annotation_specs.apply_annotation_specs.add_parser(subparsers)
     annofabcli.annotation_specs.change_attribute_type.add_parser(subparsers)
     annofabcli.annotation_specs.delete_attribute_restriction.add_parser(subparsers)
     annofabcli.annotation_specs.delete_attributes.add_parser(subparsers)
     annofabcli.annotation_specs.delete_choices.add_parser(subparsers)
     annofabcli.annotation_specs.delete_labels.add_parser(subparsers)
     annofabcli.annotation_specs.diff_annotation_specs.add_parser(subparsers)
+    annofabcli.annotation_specs.diff_annotation_specs_history.add_parser(subparsers)
     annofabcli.annotation_specs.export_annotation_specs.add_parser(subparsers)
     annofabcli.annotation_specs.import_annotation_specs.add_parser(subparsers)
     annofabcli.annotation_specs.list_annotation_import_info.add_parser(subparsers)
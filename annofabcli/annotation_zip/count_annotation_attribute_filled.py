@@ -6,9 +6,8 @@ import json
 import logging
 import sys
 import tempfile
-import zipfile
 from collections import defaultdict
-from collections.abc import Collection, Iterator
+from collections.abc import Collection
 from dataclasses import dataclass, field
 from enum import Enum
 from functools import partial
@@ -18,17 +17,13 @@ from typing import Any, Literal, Protocol, assert_never
 import annofabapi
 import pandas
 from annofabapi.models import ProjectMemberRole
-from annofabapi.parser import (
-    SimpleAnnotationParser,
-    lazy_parse_simple_annotation_dir,
-    lazy_parse_simple_annotation_zip,
-)
 from annofabapi.pydantic_models.additional_data_definition_type import AdditionalDataDefinitionType
 from annofabapi.pydantic_models.task_phase import TaskPhase
 from annofabapi.pydantic_models.task_status import TaskStatus
 from dataclasses_json import DataClassJsonMixin, config
 
 import annofabcli.common.cli
+from annofabcli.common.annofab.annotation_zip import lazy_parse_simple_annotation_by_input_data
 from annofabcli.common.cli import (
     COMMAND_LINE_ERROR_STATUS_CODE,
     ArgumentParser,
@@ -144,18 +139,6 @@ class AnnotationCountByTask(DataClassJsonMixin, HasAnnotationAttributeCounts):
     """
 
 
-def lazy_parse_simple_annotation_by_input_data(annotation_path: Path) -> Iterator[SimpleAnnotationParser]:
-    if not annotation_path.exists():
-        raise RuntimeError(f"'{annotation_path}' は存在しません。")
-
-    if annotation_path.is_dir():
-        return lazy_parse_simple_annotation_dir(annotation_path)
-    elif zipfile.is_zipfile(str(annotation_path)):
-        return lazy_parse_simple_annotation_zip(annotation_path)
-    else:
-        raise RuntimeError(f"'{annotation_path}'は、zipファイルまたはディレクトリではありません。")
-
-
 def convert_annotation_count_list_by_input_data_to_by_task(annotation_count_list: list[AnnotationCountByInputData]) -> list[AnnotationCountByTask]:
     """
     入力データ単位のアノテーション数情報をタスク単位のアノテーション数情報に変換する
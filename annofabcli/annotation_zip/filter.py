@@ -1,24 +1,31 @@
 from __future__ import annotations
 
 import argparse
+import json
 import logging
 import os
 import shutil
 import sys
 import zipfile
 from collections import defaultdict
+from collections.abc import Callable
 from dataclasses import dataclass
-from pathlib import Path
+from pathlib import Path, PurePosixPath
 from typing import Any
 
-from annofabapi.parser import lazy_parse_simple_annotation_dir, lazy_parse_simple_annotation_zip
+from annofabapi.parser import lazy_parse_simple_annotation_dir
 
 import annofabcli.common.cli
+from annofabcli.common.annofab.annotation_zip import is_input_data_json
 from annofabcli.common.cli import COMMAND_LINE_ERROR_STATUS_CODE
 from annofabcli.common.facade import TaskQuery, match_annotation_with_task_query
+from annofabcli.common.zip_reader import ZipReader
 
 logger = logging.getLogger(__name__)
 
+JSON_HEADER_CHUNK_SIZE = 4096
+"""アノテーションJSONの先頭部分を読み込むときに、1回に読み込むバイト数"""
+
 
 @dataclass
 class FilterQuery:
@@ -54,6 +61,54 @@ def match_query(  # pylint: disable=too-many-return-statements  # noqa: PLR0911
     return True
 
 
+def load_annotation_json_header(zip_reader: ZipReader, json_file_path: str) -> dict[str, Any] | None:
+    """
+    アノテーションJSONのうち、 ``details`` より前にあるタスクIDや入力データ名などの部分だけを読み込みます。
+    アノテーションの件数に依存せず、先頭の数KBだけを展開します。
+
+    Returns:
+        ``details`` より前の部分。 ``details`` が見つからない場合や、読み込めない場合はNone
+    """
+    buffer = b""
+    with zip_reader.open(json_file_path) as f:
+        while (index := buffer.find(b'"details"')) == -1:
+            chunk = f.read(JSON_HEADER_CHUNK_SIZE)
+            if len(chunk) == 0:
+                return None
+            buffer += chunk
+
+    header = buffer[:index].rstrip().rstrip(b",")
+    try:
+        return json.loads(header + b"}")
+    except ValueError:
+        return None
+
+
+def match_annotation_json_in_zip(zip_reader: ZipReader, json_file_path: str, filter_query: FilterQuery) -> bool:
+    """
+    アノテーションzip内のJSONファイルが、絞り込み条件に合致するかどうかを返します。
+    判定に必要な情報だけを、以下の順に少しずつ読み込みます。
+
+    1. JSONファイルのパス（task_id, input_data_id）
+    2. JSONの ``details`` より前の部分
+    3. JSON全体
+    """
+    path = PurePosixPath(json_file_path)
+    try:
+        return match_query({"task_id": path.parent.name, "input_data_id": path.stem}, filter_query)
+    except KeyError:
+        pass
+
+    header = load_annotation_json_header(zip_reader, json_file_path)
+    if header is not None:
+        try:
+            return match_query(header, filter_query)
+        except KeyError:
+            pass
+
+    return match_query(json.loads(zip_reader.read(json_file_path)), filter_query)
+
+
 def create_outer_filepath_dict(namelist: list[str]) -> dict[str, list[str]]:
     """
     外部アノテーションのファイルパス一覧
@@ -90,27 +145,44 @@ class FilterAnnotationZip:
         return source_json_file_path, relative_json_file_path
 
     @staticmethod
-    def filter_annotation_zip(annotation_zip: Path, filter_query: FilterQuery, output_dir: Path) -> None:
-        with zipfile.ZipFile(str(annotation_zip)) as zip_file:
-            zip_filepath_dict = create_outer_filepath_dict(zip_file.namelist())
+    def _filter_annotation_zip(annotation_zip: Path, filter_query: FilterQuery, copy_member: Callable[[ZipReader, str], object]) -> int:
+        """
+        絞り込み条件に合致するJSONファイルと、それに紐づく塗りつぶし画像を、 ``copy_member`` でコピーします。
+
+        Returns:
+            コピーしたJSONファイルの個数
+        """
+        with ZipReader(annotation_zip) as zip_reader:
+            zip_filepath_dict = create_outer_filepath_dict([info.filename for info in zip_reader.infolist()])
             count = 0
-            for parser in lazy_parse_simple_annotation_zip(annotation_zip):
-                if not match_query(parser.load_json(), filter_query):
+            for info in zip_reader.infolist():
+                if not is_input_data_json(info) or not match_annotation_json_in_zip(zip_reader, info.filename, filter_query):
                     continue
 
-                # JSONを展開
-                zip_file.extract(parser.json_file_path, str(output_dir))
-                # 塗りつぶしアノテーションが格納されているディレクトリを展開
-                outer_annotation_dir = os.path.splitext(parser.json_file_path)[0]  # noqa: PTH122
-                outer_annotation_file_list = zip_filepath_dict.get(outer_annotation_dir)
-                if outer_annotation_file_list is not None:
-                    for outer_annotation_file in outer_annotation_file_list:
-                        zip_file.extract(outer_annotation_file, str(output_dir))
+                copy_member(zip_reader, info.filename)
+                # 塗りつぶしアノテーションが格納されているディレクトリ
+                outer_annotation_dir = os.path.splitext(info.filename)[0]  # noqa: PTH122
+                for outer_annotation_file in zip_filepath_dict.get(outer_annotation_dir, []):
+                    copy_member(zip_reader, outer_annotation_file)
                 count += 1
                 if count % 10000 == 0:
-                    logger.debug(f"{count} 件のJSONファイルとそれに紐づく塗りつぶし画像を {output_dir} に展開しました。")
+                    logger.debug(f"{count} 件のJSONファイルとそれに紐づく塗りつぶし画像をコピーしました。")
+            return count
+
+    @staticmethod
+    def filter_annotation_zip(annotation_zip: Path, filter_query: FilterQuery, output_dir: Path) -> None:
+        count = FilterAnnotationZip._filter_annotation_zip(annotation_zip, filter_query, copy_member=lambda zip_reader, name: zip_reader.zip_file.extract(name, str(output_dir)))
+        logger.info(f"{count} 件のJSONファイルとそれに紐づく塗りつぶし画像を {output_dir} に展開しました。")
 
-            logger.info(f"{count} 件のJSONファイルとそれに紐づく塗りつぶし画像を {output_dir} に展開しました。")
+    @staticmethod
+    def filter_annotation_zip_to_zip(annotation_zip: Path, filter_query: FilterQuery, output_zip: Path) -> None:
+        """
+        絞り込んだ結果をzipファイルに出力します。メンバは展開せずに、圧縮されたままコピーします。
+        """
+        output_zip.parent.mkdir(exist_ok=True, parents=True)
+        with zipfile.ZipFile(output_zip, "w") as output_zip_file:
+            count = FilterAnnotationZip._filter_annotation_zip(annotation_zip, filter_query, copy_member=lambda zip_reader, name: zip_reader.copy_raw_to(name, output_zip_file))
+        logger.info(f"{count} 件のJSONファイルとそれに紐づく塗りつぶし画像を {output_zip} に出力しました。")
 
     @staticmethod
     def filter_annotation_dir(annotation_dir: Path, filter_query: FilterQuery, output_dir: Path) -> None:
@@ -159,10 +231,17 @@ class FilterAnnotationZip:
 
     def main(self, args: argparse.Namespace) -> None:
         annotation_path: Path = args.annotation
-        output_dir: Path = args.output_dir
-        output_dir.mkdir(exist_ok=True, parents=True)
         filter_query = self.create_filter_query(args)
 
+        if args.output_zip is not None:
+            if not zipfile.is_zipfile(annotation_path):
+                print(f"{self.COMMON_MESSAGE} argument --output_zip: '--annotation' にZIPファイルを指定したときのみ指定できます。", file=sys.stderr)  # noqa: T201
+                sys.exit(COMMAND_LINE_ERROR_STATUS_CODE)
+            self.filter_annotation_zip_to_zip(annotation_path, filter_query=filter_query, output_zip=args.output_zip)
+            return
+
+        output_dir: Path = args.output_dir
+        output_dir.mkdir(exist_ok=True, parents=True)
         if zipfile.is_zipfile(annotation_path):
             self.filter_annotation_zip(annotation_path, filter_query=filter_query, output_dir=output_dir)
         elif annotation_path.is_dir():
@@ -229,7 +308,13 @@ def parse_args(parser: argparse.ArgumentParser) -> None:
         help=("除外する入力データのinput_data_nameを指定してください。 ``file://`` を先頭に付けると、input_data_name の一覧が記載されたファイルを指定できます。"),
     )
 
-    parser.add_argument("-o", "--output_dir", type=Path, required=True, help="出力先ディレクトリのパス")
+    output_group = parser.add_mutually_exclusive_group(required=True)
+    output_group.add_argument("-o", "--output_dir", type=Path, help="出力先ディレクトリのパス")
+    output_group.add_argument(
+        "--output_zip",
+        type=Path,
+        help="出力先のzipファイルのパス。指定すると、絞り込んだファイルを展開せずに、圧縮されたままzipファイルにコピーします。``--annotation`` にzipファイルを指定したときのみ指定できます。",
+    )
 
     parser.set_defaults(subcommand_func=main)
 
@@ -5,22 +5,17 @@ import argparse
 import logging
 import sys
 import tempfile
-import zipfile
-from collections.abc import Collection, Iterator
+from collections.abc import Collection, Iterable, Iterator
 from pathlib import Path
 from typing import Any, Literal, assert_never
 
 import pandas
 import pydantic
 from annofabapi.models import ProjectMemberRole
-from annofabapi.parser import (
-    SimpleAnnotationParser,
-    lazy_parse_simple_annotation_dir,
-    lazy_parse_simple_annotation_zip,
-)
 
 import annofabcli.common.cli
 from annofabcli.common.annofab.annotation_editor_url import ANNOTATION_EDITOR_TYPE_CHOICES, AnnotationEditorType, create_annotation_editor_url
+from annofabcli.common.annofab.annotation_zip import ANNOTATION_CATEGORICAL_COLUMNS, lazy_parse_simple_annotation_by_input_data
 from annofabcli.common.cli import (
     COMMAND_LINE_ERROR_STATUS_CODE,
     ArgumentParser,
@@ -34,23 +29,18 @@ from annofabcli.common.facade import (
     TaskQuery,
     match_annotation_with_task_query,
 )
+from annofabcli.common.partitioned_output import (
+    PartitionedOutputOptions,
+    PartitionedRecordWriter,
+    add_partitioned_output_arguments,
+    create_partitioned_output_options,
+    validate_partitioned_output_arguments,
+)
 from annofabcli.common.utils import print_csv, print_json
 
 logger = logging.getLogger(__name__)
 
 
-def lazy_parse_simple_annotation_by_input_data(annotation_path: Path) -> Iterator[SimpleAnnotationParser]:
-    if not annotation_path.exists():
-        raise RuntimeError(f"'{annotation_path}' は存在しません。")
-
-    if annotation_path.is_dir():
-        return lazy_parse_simple_annotation_dir(annotation_path)
-    elif zipfile.is_zipfile(str(annotation_path)):
-        return lazy_parse_simple_annotation_zip(annotation_path)
-    else:
-        raise RuntimeError(f"'{annotation_path}'は、zipファイルまたはディレクトリではありません。")
-
-
 class AnnotationAttribute(pydantic.BaseModel):
     """
     入力データまたはタスク単位の区間アノテーションの長さ情報。
@@ -113,24 +103,21 @@ def get_annotation_attribute_list_from_annotation_json(
     return result
 
 
-def get_annotation_attribute_list_from_annotation_zipdir_path(
+def iter_annotation_attribute_from_annotation_zipdir_path(
     annotation_zipdir_path: Path,
     *,
     target_task_ids: Collection[str] | None = None,
     task_query: TaskQuery | None = None,
     target_labels: Collection[str] | None = None,
     annotation_editor_type: AnnotationEditorType | None = None,
-) -> list[AnnotationAttribute]:
+) -> Iterator[AnnotationAttribute]:
     """
-    アノテーションzipまたはそれを展開したディレクトリから、アノテーションの属性のlistを取得します。
-
-    Args:
+    アノテーションzipまたはそれを展開したディレクトリを読み込みながら、アノテーションの属性を1件ずつ返します。
     """
     target_task_ids = set(target_task_ids) if target_task_ids is not None else None
 
     iter_parser = lazy_parse_simple_annotation_by_input_data(annotation_zipdir_path)
 
-    result = []
     logger.debug("アノテーションzipまたはディレクトリを読み込み中")
     for index, parser in enumerate(iter_parser):
         if (index + 1) % 1000 == 0:
@@ -144,30 +131,53 @@ def get_annotation_attribute_list_from_annotation_zipdir_path(
             if not match_annotation_with_task_query(simple_annotation_dict, task_query):
                 continue
 
-        sub_result = get_annotation_attribute_list_from_annotation_json(
+        yield from get_annotation_attribute_list_from_annotation_json(
             simple_annotation_dict,
             target_labels=target_labels,
             annotation_editor_type=annotation_editor_type,
         )
-        result.extend(sub_result)
 
-    return result
+
+def get_annotation_attribute_list_from_annotation_zipdir_path(
+    annotation_zipdir_path: Path,
+    *,
+    target_task_ids: Collection[str] | None = None,
+    task_query: TaskQuery | None = None,
+    target_labels: Collection[str] | None = None,
+    annotation_editor_type: AnnotationEditorType | None = None,
+) -> list[AnnotationAttribute]:
+    """
+    アノテーションzipまたはそれを展開したディレクトリから、アノテーションの属性のlistを取得します。
+    """
+    return list(
+        iter_annotation_attribute_from_annotation_zipdir_path(
+            annotation_zipdir_path,
+            target_task_ids=target_task_ids,
+            task_query=task_query,
+            target_labels=target_labels,
+            annotation_editor_type=annotation_editor_type,
+        )
+    )
+
+
+ANNOTATION_ATTRIBUTE_BASE_COLUMNS = [
+    "project_id",
+    "task_id",
+    "task_status",
+    "task_phase",
+    "task_phase_stage",
+    "input_data_id",
+    "input_data_name",
+    "updated_datetime",
+    "annotation_id",
+    "annotation_editor_url",
+    "label",
+]
+"""CSVに出力する列のうち、属性以外の列"""
 
 
 def print_annotation_attribute_list_as_csv(annotation_attribute_list: list, output_file: Path | None) -> None:
-    base_columns = [
-        "project_id",
-        "task_id",
-        "task_status",
-        "task_phase",
-        "task_phase_stage",
-        "input_data_id",
-        "input_data_name",
-        "updated_datetime",
-        "annotation_id",
-        "annotation_editor_url",
-        "label",
-    ]
+    base_columns = ANNOTATION_ATTRIBUTE_BASE_COLUMNS
     if len(annotation_attribute_list) == 0:
         print_csv(pandas.DataFrame(columns=base_columns), output_file)
         return
@@ -179,6 +189,21 @@ def print_annotation_attribute_list_as_csv(annotation_attribute_list: list, outp
     print_csv(df[columns], output_file)
 
 
+def write_annotation_attribute_to_partitioned_files(annotation_attributes: Iterable[AnnotationAttribute], options: PartitionedOutputOptions) -> None:
+    """
+    アノテーションの属性を読み込みながら少しずつ書き込み、複数のファイルに分けて出力します。
+    属性の列は列名でソートして、属性以外の列の後ろに並べます。
+    """
+    with PartitionedRecordWriter(
+        options,
+        columns=ANNOTATION_ATTRIBUTE_BASE_COLUMNS,
+        categorical_columns=ANNOTATION_CATEGORICAL_COLUMNS,
+        dynamic_column_prefixes=["attributes."],
+    ) as writer:
+        for annotation_attribute in annotation_attributes:
+            writer.append(annotation_attribute.model_dump())
+
+
 def print_annotation_attribute_list(
     annotation_attribute_list: list[AnnotationAttribute],
     output_file: Path,
@@ -211,6 +236,10 @@ class ListAnnotationAttribute(CommandLine):
                 file=sys.stderr,
             )
             return False
+        error_message = validate_partitioned_output_arguments(args)
+        if error_message is not None:
+            print(f"{self.COMMON_MESSAGE} {error_message}", file=sys.stderr)  # noqa: T201
+            return False
 
         return True
 
@@ -233,6 +262,20 @@ class ListAnnotationAttribute(CommandLine):
 
         output_file: Path = args.output
         output_format = OutputFormat(args.format)
+        partitioned_output_options = create_partitioned_output_options(args)
+
+        def print_annotation_attribute(annotation_path: Path) -> None:
+            annotation_attributes = iter_annotation_attribute_from_annotation_zipdir_path(
+                annotation_zipdir_path=annotation_path,
+                target_task_ids=task_id_list,
+                task_query=task_query,
+                target_labels=label_name_list,
+                annotation_editor_type=annotation_editor_type,
+            )
+            if partitioned_output_options is not None:
+                write_annotation_attribute_to_partitioned_files(annotation_attributes, partitioned_output_options)
+            else:
+                print_annotation_attribute_list(list(annotation_attributes), output_file, output_format)  # type: ignore[arg-type]
 
         downloading_obj = DownloadingFile(self.service)
 
@@ -243,15 +286,7 @@ class ListAnnotationAttribute(CommandLine):
                     temp_dir,
                     is_latest=is_latest,
                 )
-
-            annotation_attribute_list = get_annotation_attribute_list_from_annotation_zipdir_path(
-                annotation_zipdir_path=annotation_path,
-                target_task_ids=task_id_list,
-                task_query=task_query,
-                target_labels=label_name_list,
-                annotation_editor_type=annotation_editor_type,
-            )
-            print_annotation_attribute_list(annotation_attribute_list, output_file, output_format)  # type: ignore[arg-type]
+            print_annotation_attribute(annotation_path)
 
         if project_id is not None:
             if args.temp_dir is not None:
@@ -263,14 +298,7 @@ class ListAnnotationAttribute(CommandLine):
                     download_and_print_annotation_attribute_list(project_id=project_id, temp_dir=Path(str_temp_dir), is_latest=args.latest, annotation_path=annotation_path)
         else:
             assert annotation_path is not None
-            annotation_attribute_list = get_annotation_attribute_list_from_annotation_zipdir_path(
-                annotation_zipdir_path=annotation_path,
-                target_task_ids=task_id_list,
-                task_query=task_query,
-                target_labels=label_name_list,
-                annotation_editor_type=annotation_editor_type,
-            )
-            print_annotation_attribute_list(annotation_attribute_list, output_file, output_format)  # type: ignore[arg-type]
+            print_annotation_attribute(annotation_path)
 
 
 def parse_args(parser: argparse.ArgumentParser) -> None:
@@ -294,11 +322,13 @@ def parse_args(parser: argparse.ArgumentParser) -> None:
     )
 
     argument_parser.add_format(
-        choices=[OutputFormat.CSV, OutputFormat.JSON, OutputFormat.PRETTY_JSON],
+        choices=[OutputFormat.CSV, OutputFormat.JSON, OutputFormat.PRETTY_JSON, OutputFormat.PARQUET],
         default=OutputFormat.CSV,
+        help_message="出力フォーマットを指定します。 ``parquet`` は ``--output_dir`` を指定したときのみ指定できます。",
     )
 
     argument_parser.add_output()
+    add_partitioned_output_arguments(parser, partition_by_choices=["task_phase", "label"])
 
     parser.add_argument(
         "-tq",
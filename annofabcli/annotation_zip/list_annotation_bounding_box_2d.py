@@ -4,7 +4,7 @@ import argparse
 import logging
 import sys
 import tempfile
-from collections.abc import Collection
+from collections.abc import Collection, Iterable, Iterator
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Any
@@ -15,7 +15,7 @@ from annofabapi.util.page import create_image_editor_url
 from dataclasses_json import DataClassJsonMixin
 
 import annofabcli.common.cli
-from annofabcli.common.annofab.annotation_zip import lazy_parse_simple_annotation_by_input_data
+from annofabcli.common.annofab.annotation_zip import create_annotation_record_builder, lazy_parse_simple_annotation_by_input_data
 from annofabcli.common.cli import COMMAND_LINE_ERROR_STATUS_CODE, ArgumentParser, CommandLine, build_annofabapi_resource_and_login, get_list_from_args
 from annofabcli.common.download import DownloadingFile
 from annofabcli.common.enums import OutputFormat
@@ -106,14 +106,13 @@ def get_annotation_bounding_box_info_list(simple_annotation: dict[str, Any], *,
     return result
 
 
-def get_annotation_bounding_box_info_list_from_annotation_path(
+def iter_annotation_bounding_box_info_from_annotation_path(
     annotation_path: Path,
     *,
     target_task_ids: Collection[str] | None = None,
     task_query: TaskQuery | None = None,
     target_label_names: Collection[str] | None = None,
-) -> list[AnnotationBoundingBoxInfo]:
-    annotation_bbox_list = []
+) -> Iterator[AnnotationBoundingBoxInfo]:
     target_task_ids = set(target_task_ids) if target_task_ids is not None else None
     iter_parser = lazy_parse_simple_annotation_by_input_data(annotation_path)
     logger.info(f"アノテーションZIPまたはディレクトリ'{annotation_path}'を読み込みます。")
@@ -125,13 +124,11 @@ def get_annotation_bounding_box_info_list_from_annotation_path(
         dict_simple_annotation = parser.load_json()
         if task_query is not None and not match_annotation_with_task_query(dict_simple_annotation, task_query):
             continue
-        sub_annotation_bbox_list = get_annotation_bounding_box_info_list(dict_simple_annotation, target_label_names=target_label_names)
-        annotation_bbox_list.extend(sub_annotation_bbox_list)
-    return annotation_bbox_list
+        yield from get_annotation_bounding_box_info_list(dict_simple_annotation, target_label_names=target_label_names)
 
 
 def create_df(
-    annotation_bbox_list: list[AnnotationBoundingBoxInfo],
+    annotation_bbox_list: Iterable[AnnotationBoundingBoxInfo],
 ) -> pandas.DataFrame:
     base_columns = [
         "project_id",
@@ -156,17 +153,10 @@ def create_df(
         "area",
     ]
 
-    if not annotation_bbox_list:
-        # 空のリストの場合は、base_columnsのみで空のDataFrameを返す
-        return pandas.DataFrame(columns=base_columns)
-
-    tmp_annotation_bbox_list = [e.to_dict(encode_json=True) for e in annotation_bbox_list]
-    df = pandas.json_normalize(tmp_annotation_bbox_list)
-
-    attribute_columns = sorted(col for col in df.columns if col.startswith("attributes."))
-    columns = base_columns + attribute_columns
-
-    return df[columns]
+    builder = create_annotation_record_builder(base_columns)
+    for e in annotation_bbox_list:
+        builder.append(e.to_dict(encode_json=True))
+    return builder.to_dataframe()
 
 
 def print_annotation_bounding_box(
@@ -178,20 +168,23 @@ def print_annotation_bounding_box(
     task_query: TaskQuery | None = None,
     target_label_names: Collection[str] | None = None,
 ) -> None:
-    annotation_bbox_list = get_annotation_bounding_box_info_list_from_annotation_path(
-        annotation_path,
-        target_task_ids=target_task_ids,
-        task_query=task_query,
-        target_label_names=target_label_names,
-    )
-
-    logger.info(f"{len(annotation_bbox_list)} 件のバウンディングボックスアノテーションの情報を出力します。 :: output='{output_file}'")
+    def iter_annotation_bbox() -> Iterator[AnnotationBoundingBoxInfo]:
+        return iter_annotation_bounding_box_info_from_annotation_path(
+            annotation_path,
+            target_task_ids=target_task_ids,
+            task_query=task_query,
+            target_label_names=target_label_names,
+        )
 
     if output_format == OutputFormat.CSV:
-        df = create_df(annotation_bbox_list)
+        # アノテーションごとのオブジェクトを保持し続けないように、読み込みながら列ごとに詰める
+        df = create_df(iter_annotation_bbox())
+        logger.info(f"{len(df)} 件のバウンディングボックスアノテーションの情報を出力します。 :: output='{output_file}'")
         print_csv(df, output_file)
 
     elif output_format in [OutputFormat.PRETTY_JSON, OutputFormat.JSON]:
+        annotation_bbox_list = list(iter_annotation_bbox())
+        logger.info(f"{len(annotation_bbox_list)} 件のバウンディングボックスアノテーションの情報を出力します。 :: output='{output_file}'")
         json_is_pretty = output_format == OutputFormat.PRETTY_JSON
         # DataClassJsonMixinを使用したtoJSON処理
         print_json(
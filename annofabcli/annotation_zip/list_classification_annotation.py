@@ -4,7 +4,7 @@ import argparse
 import logging
 import sys
 import tempfile
-from collections.abc import Collection
+from collections.abc import Collection, Iterable, Iterator
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Any
@@ -20,7 +20,7 @@ from annofabcli.common.annofab.annotation_editor_url import (
     create_annotation_editor_url,
     get_annotation_editor_type_from_input_data_type,
 )
-from annofabcli.common.annofab.annotation_zip import lazy_parse_simple_annotation_by_input_data
+from annofabcli.common.annofab.annotation_zip import create_annotation_record_builder, lazy_parse_simple_annotation_by_input_data
 from annofabcli.common.cli import COMMAND_LINE_ERROR_STATUS_CODE, ArgumentParser, CommandLine, build_annofabapi_resource_and_login, get_list_from_args
 from annofabcli.common.download import DownloadingFile
 from annofabcli.common.enums import OutputFormat
@@ -98,15 +98,14 @@ def get_classification_annotation_info_list(
     return result
 
 
-def get_classification_annotation_info_list_from_annotation_path(
+def iter_classification_annotation_info_from_annotation_path(
     annotation_path: Path,
     *,
     target_task_ids: Collection[str] | None = None,
     task_query: TaskQuery | None = None,
     target_label_names: Collection[str] | None = None,
     annotation_editor_type: AnnotationEditorType | None = None,
-) -> list[ClassificationAnnotationInfo]:
-    classification_annotation_list = []
+) -> Iterator[ClassificationAnnotationInfo]:
     target_task_ids = set(target_task_ids) if target_task_ids is not None else None
     iter_parser = lazy_parse_simple_annotation_by_input_data(annotation_path)
     logger.info(f"アノテーションZIPまたはディレクトリ'{annotation_path}'を読み込みます。")
@@ -118,17 +117,15 @@ def get_classification_annotation_info_list_from_annotation_path(
         dict_simple_annotation = parser.load_json()
         if task_query is not None and not match_annotation_with_task_query(dict_simple_annotation, task_query):
             continue
-        sub_classification_annotation_list = get_classification_annotation_info_list(
+        yield from get_classification_annotation_info_list(
             dict_simple_annotation,
             target_label_names=target_label_names,
             annotation_editor_type=annotation_editor_type,
         )
-        classification_annotation_list.extend(sub_classification_annotation_list)
-    return classification_annotation_list
 
 
 def create_df(
-    classification_annotation_list: list[ClassificationAnnotationInfo],
+    classification_annotation_list: Iterable[ClassificationAnnotationInfo],
 ) -> pandas.DataFrame:
     base_columns = [
         "project_id",
@@ -144,16 +141,10 @@ def create_df(
         "annotation_editor_url",
     ]
 
-    if not classification_annotation_list:
-        return pandas.DataFrame(columns=base_columns)
-
-    tmp_classification_annotation_list = [e.to_dict(encode_json=True) for e in classification_annotation_list]
-    df = pandas.json_normalize(tmp_classification_annotation_list)
-
-    attribute_columns = sorted(col for col in df.columns if col.startswith("attributes."))
-    columns = base_columns + attribute_columns
-
-    return df[columns]
+    builder = create_annotation_record_builder(base_columns)
+    for e in classification_annotation_list:
+        builder.append(e.to_dict(encode_json=True))
+    return builder.to_dataframe()
 
 
 def print_classification_annotation(
@@ -166,21 +157,24 @@ def print_classification_annotation(
     target_label_names: Collection[str] | None = None,
     annotation_editor_type: AnnotationEditorType | None = None,
 ) -> None:
-    classification_annotation_list = get_classification_annotation_info_list_from_annotation_path(
-        annotation_path,
-        target_task_ids=target_task_ids,
-        task_query=task_query,
-        target_label_names=target_label_names,
-        annotation_editor_type=annotation_editor_type,
-    )
-
-    logger.info(f"{len(classification_annotation_list)} 件の全体アノテーションの情報を出力します。 :: output='{output_file}'")
+    def iter_classification_annotation() -> Iterator[ClassificationAnnotationInfo]:
+        return iter_classification_annotation_info_from_annotation_path(
+            annotation_path,
+            target_task_ids=target_task_ids,
+            task_query=task_query,
+            target_label_names=target_label_names,
+            annotation_editor_type=annotation_editor_type,
+        )
 
     if output_format == OutputFormat.CSV:
-        df = create_df(classification_annotation_list)
+        # アノテーションごとのオブジェクトを保持し続けないように、読み込みながら列ごとに詰める
+        df = create_df(iter_classification_annotation())
+        logger.info(f"{len(df)} 件の全体アノテーションの情報を出力します。 :: output='{output_file}'")
         print_csv(df, output_file)
 
     elif output_format in [OutputFormat.PRETTY_JSON, OutputFormat.JSON]:
+        classification_annotation_list = list(iter_classification_annotation())
+        logger.info(f"{len(classification_annotation_list)} 件の全体アノテーションの情報を出力します。 :: output='{output_file}'")
         json_is_pretty = output_format == OutputFormat.PRETTY_JSON
         print_json(
             [e.to_dict(encode_json=True) for e in classification_annotation_list],
@@ -2,7 +2,7 @@ import argparse
 import logging
 import sys
 import tempfile
-from collections.abc import Collection
+from collections.abc import Collection, Iterable, Iterator
 from pathlib import Path
 from typing import Any
 
@@ -14,7 +14,7 @@ from shapely.errors import ShapelyError
 from shapely.geometry import Polygon
 
 import annofabcli.common.cli
-from annofabcli.common.annofab.annotation_zip import lazy_parse_simple_annotation_by_input_data
+from annofabcli.common.annofab.annotation_zip import ANNOTATION_CATEGORICAL_COLUMNS, create_annotation_record_builder, lazy_parse_simple_annotation_by_input_data
 from annofabcli.common.cli import COMMAND_LINE_ERROR_STATUS_CODE, ArgumentParser, CommandLine, build_annofabapi_resource_and_login, get_list_from_args
 from annofabcli.common.download import DownloadingFile
 from annofabcli.common.enums import OutputFormat
@@ -23,6 +23,13 @@ from annofabcli.common.facade import (
     TaskQuery,
     match_annotation_with_task_query,
 )
+from annofabcli.common.partitioned_output import (
+    PartitionedOutputOptions,
+    PartitionedRecordWriter,
+    add_partitioned_output_arguments,
+    create_partitioned_output_options,
+    validate_partitioned_output_arguments,
+)
 from annofabcli.common.utils import print_csv, print_json
 
 logger = logging.getLogger(__name__)
@@ -166,14 +173,13 @@ def get_annotation_polygon_info_list(simple_annotation: dict[str, Any], *, targe
     return result
 
 
-def get_annotation_polygon_info_list_from_annotation_path(
+def iter_annotation_polygon_info_from_annotation_path(
     annotation_path: Path,
     *,
     target_task_ids: Collection[str] | None = None,
     task_query: TaskQuery | None = None,
     target_label_names: Collection[str] | None = None,
-) -> list[AnnotationPolygonInfo]:
-    annotation_polygon_list = []
+) -> Iterator[AnnotationPolygonInfo]:
     target_task_ids = set(target_task_ids) if target_task_ids is not None else None
     iter_parser = lazy_parse_simple_annotation_by_input_data(annotation_path)
     logger.info(f"アノテーションZIPまたはディレクトリ'{annotation_path}'を読み込みます。")
@@ -185,13 +191,37 @@ def get_annotation_polygon_info_list_from_annotation_path(
         dict_simple_annotation = parser.load_json()
         if task_query is not None and not match_annotation_with_task_query(dict_simple_annotation, task_query):
             continue
-        sub_annotation_polygon_list = get_annotation_polygon_info_list(dict_simple_annotation, target_label_names=target_label_names)
-        annotation_polygon_list.extend(sub_annotation_polygon_list)
-    return annotation_polygon_list
+        yield from get_annotation_polygon_info_list(dict_simple_annotation, target_label_names=target_label_names)
+
+
+ANNOTATION_POLYGON_BASE_COLUMNS = [
+    "project_id",
+    "task_id",
+    "task_phase",
+    "task_phase_stage",
+    "task_status",
+    "input_data_id",
+    "input_data_name",
+    "updated_datetime",
+    "label",
+    "annotation_id",
+    "annotation_editor_url",
+    "point_count",
+    "area",
+    "centroid.x",
+    "centroid.y",
+    "bounding_box.left_top.x",
+    "bounding_box.left_top.y",
+    "bounding_box.right_bottom.x",
+    "bounding_box.right_bottom.y",
+    "bounding_box_width",
+    "bounding_box_height",
+]
+"""CSVに出力する列のうち、属性以外の列"""
 
 
 def create_df(
-    annotation_polygon_list: list[AnnotationPolygonInfo],
+    annotation_polygon_list: Iterable[AnnotationPolygonInfo],
 ) -> pandas.DataFrame:
     """
     CSV出力用のDataFrameを作成する。
@@ -199,52 +229,28 @@ def create_df(
     Notes:
         points列は含めない。CSVに含めると列の長さが非常に大きくなるため。
         attributes列は、キーごとに別々の列（attributes.<key>の形式）として出力する。
-        pandas.json_normalizeを使用してネストした辞書を自動的に展開する。
+        ネストした辞書は、pandas.json_normalizeと同じく ``.`` 区切りの列に展開する。
+
+    """
+    builder = create_annotation_record_builder(ANNOTATION_POLYGON_BASE_COLUMNS)
+    for e in annotation_polygon_list:
+        builder.append(e.model_dump())
+    return builder.to_dataframe()
 
+
+def write_annotation_polygon_to_partitioned_files(annotation_polygon_list: Iterable[AnnotationPolygonInfo], options: PartitionedOutputOptions) -> None:
+    """
+    ポリゴンアノテーションの情報を読み込みながら少しずつ書き込み、複数のファイルに分けて出力します。
+    列は :func:`create_df` と同じです。
     """
-    # 基本列の定義
-    base_columns = [
-        "project_id",
-        "task_id",
-        "task_phase",
-        "task_phase_stage",
-        "task_status",
-        "input_data_id",
-        "input_data_name",
-        "updated_datetime",
-        "label",
-        "annotation_id",
-        "annotation_editor_url",
-        "point_count",
-        "area",
-        "centroid.x",
-        "centroid.y",
-        "bounding_box.left_top.x",
-        "bounding_box.left_top.y",
-        "bounding_box.right_bottom.x",
-        "bounding_box.right_bottom.y",
-        "bounding_box_width",
-        "bounding_box_height",
-    ]
-
-    if len(annotation_polygon_list) == 0:
-        # 件数が0件のときも列ヘッダを出力する
-        return pandas.DataFrame(columns=base_columns)
-
-    # pandas.json_normalizeを使用してネストした辞書を展開
-    # centroid（辞書）とattributes（辞書）が自動的に展開される
-    df = pandas.json_normalize([e.model_dump() for e in annotation_polygon_list])
-
-    # attributes列を抽出してソート
-    attributes_columns = sorted([col for col in df.columns if col.startswith("attributes.")])
-    # 列の順序を設定
-    columns = base_columns + attributes_columns
-
-    for column in columns:
-        if column not in df.columns:
-            df[column] = pandas.NA
-
-    return df[columns]
+    with PartitionedRecordWriter(
+        options,
+        columns=ANNOTATION_POLYGON_BASE_COLUMNS,
+        categorical_columns=ANNOTATION_CATEGORICAL_COLUMNS,
+        dynamic_column_prefixes=["attributes."],
+    ) as writer:
+        for e in annotation_polygon_list:
+            writer.append(e.model_dump())
 
 
 def print_annotation_polygon(
@@ -255,21 +261,33 @@ def print_annotation_polygon(
     target_task_ids: Collection[str] | None = None,
     task_query: TaskQuery | None = None,
     target_label_names: Collection[str] | None = None,
+    partitioned_output_options: PartitionedOutputOptions | None = None,
 ) -> None:
-    annotation_polygon_list = get_annotation_polygon_info_list_from_annotation_path(
-        annotation_path,
-        target_task_ids=target_task_ids,
-        task_query=task_query,
-        target_label_names=target_label_names,
-    )
+    """
+    ポリゴンアノテーションの情報を出力します。
+    ``partitioned_output_options`` を指定した場合は、 ``output_file`` と ``output_format`` は参照せずに、複数のファイルに分けて出力します。
+    """
 
-    logger.info(f"{len(annotation_polygon_list)} 件のポリゴンアノテーションの情報を出力します。 :: output='{output_file}'")
+    def iter_annotation_polygon() -> Iterator[AnnotationPolygonInfo]:
+        return iter_annotation_polygon_info_from_annotation_path(
+            annotation_path,
+            target_task_ids=target_task_ids,
+            task_query=task_query,
+            target_label_names=target_label_names,
+        )
 
-    if output_format == OutputFormat.CSV:
-        df = create_df(annotation_polygon_list)
+    if partitioned_output_options is not None:
+        write_annotation_polygon_to_partitioned_files(iter_annotation_polygon(), partitioned_output_options)
+
+    elif output_format == OutputFormat.CSV:
+        # アノテーションごとのオブジェクトを保持し続けないように、読み込みながら列ごとに詰める
+        df = create_df(iter_annotation_polygon())
+        logger.info(f"{len(df)} 件のポリゴンアノテーションの情報を出力します。 :: output='{output_file}'")
         print_csv(df, output_file)
 
     elif output_format in [OutputFormat.PRETTY_JSON, OutputFormat.JSON]:
+        annotation_polygon_list = list(iter_annotation_polygon())
+        logger.info(f"{len(annotation_polygon_list)} 件のポリゴンアノテーションの情報を出力します。 :: output='{output_file}'")
         json_is_pretty = output_format == OutputFormat.PRETTY_JSON
         # Pydantic BaseModelを使用したJSON処理
         print_json(
@@ -292,6 +310,10 @@ class ListAnnotationPolygon(CommandLine):
                 file=sys.stderr,
             )
             return False
+        error_message = validate_partitioned_output_arguments(args)
+        if error_message is not None:
+            print(f"{self.COMMON_MESSAGE} {error_message}", file=sys.stderr)  # noqa: T201
+            return False
         return True
 
     def main(self) -> None:
@@ -316,6 +338,7 @@ class ListAnnotationPolygon(CommandLine):
 
         output_file: Path = args.output
         output_format = OutputFormat(args.format)
+        partitioned_output_options = create_partitioned_output_options(args)
 
         downloading_obj = DownloadingFile(self.service)
 
@@ -332,6 +355,7 @@ class ListAnnotationPolygon(CommandLine):
                 target_task_ids=task_id_list,
                 task_query=task_query,
                 target_label_names=label_name_list,
+                partitioned_output_options=partitioned_output_options,
             )
 
         if project_id is not None:
@@ -353,6 +377,7 @@ class ListAnnotationPolygon(CommandLine):
                 target_task_ids=task_id_list,
                 task_query=task_query,
                 target_label_names=label_name_list,
+                partitioned_output_options=partitioned_output_options,
             )
 
 
@@ -369,11 +394,13 @@ def parse_args(parser: argparse.ArgumentParser) -> None:
     group.add_argument("-p", "--project_id", type=str, help="project_id。アノテーションZIPをダウンロードします。")
 
     argument_parser.add_format(
-        choices=[OutputFormat.CSV, OutputFormat.JSON, OutputFormat.PRETTY_JSON],
+        choices=[OutputFormat.CSV, OutputFormat.JSON, OutputFormat.PRETTY_JSON, OutputFormat.PARQUET],
         default=OutputFormat.CSV,
+        help_message="出力フォーマットを指定します。 ``parquet`` は ``--output_dir`` を指定したときのみ指定できます。",
     )
 
     argument_parser.add_output()
+    add_partitioned_output_arguments(parser, partition_by_choices=["task_phase", "label"])
 
     parser.add_argument(
         "-tq",
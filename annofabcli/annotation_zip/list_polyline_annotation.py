@@ -3,7 +3,7 @@ import logging
 import math
 import sys
 import tempfile
-from collections.abc import Collection
+from collections.abc import Collection, Iterable, Iterator
 from pathlib import Path
 from typing import Any
 
@@ -13,7 +13,7 @@ from annofabapi.util.page import create_image_editor_url
 from pydantic import BaseModel, ConfigDict
 
 import annofabcli.common.cli
-from annofabcli.common.annofab.annotation_zip import lazy_parse_simple_annotation_by_input_data
+from annofabcli.common.annofab.annotation_zip import create_annotation_record_builder, lazy_parse_simple_annotation_by_input_data
 from annofabcli.common.cli import COMMAND_LINE_ERROR_STATUS_CODE, ArgumentParser, CommandLine, build_annofabapi_resource_and_login, get_list_from_args
 from annofabcli.common.download import DownloadingFile
 from annofabcli.common.enums import OutputFormat
@@ -159,14 +159,13 @@ def get_annotation_polyline_info_list(simple_annotation: dict[str, Any], *, targ
     return result
 
 
-def get_annotation_polyline_info_list_from_annotation_path(
+def iter_annotation_polyline_info_from_annotation_path(
     annotation_path: Path,
     *,
     target_task_ids: Collection[str] | None = None,
     task_query: TaskQuery | None = None,
     target_label_names: Collection[str] | None = None,
-) -> list[AnnotationPolylineInfo]:
-    annotation_polyline_list = []
+) -> Iterator[AnnotationPolylineInfo]:
     target_task_ids = set(target_task_ids) if target_task_ids is not None else None
     iter_parser = lazy_parse_simple_annotation_by_input_data(annotation_path)
     logger.info(f"アノテーションZIPまたはディレクトリ'{annotation_path}'を読み込みます。")
@@ -178,13 +177,11 @@ def get_annotation_polyline_info_list_from_annotation_path(
         dict_simple_annotation = parser.load_json()
         if task_query is not None and not match_annotation_with_task_query(dict_simple_annotation, task_query):
             continue
-        sub_annotation_polyline_list = get_annotation_polyline_info_list(dict_simple_annotation, target_label_names=target_label_names)
-        annotation_polyline_list.extend(sub_annotation_polyline_list)
-    return annotation_polyline_list
+        yield from get_annotation_polyline_info_list(dict_simple_annotation, target_label_names=target_label_names)
 
 
 def create_df(
-    annotation_polyline_list: list[AnnotationPolylineInfo],
+    annotation_polyline_list: Iterable[AnnotationPolylineInfo],
 ) -> pandas.DataFrame:
     """
     CSV出力用のDataFrameを作成する。
@@ -192,7 +189,7 @@ def create_df(
     Notes:
         points列は含めない。CSVに含めると列の長さが非常に大きくなるため。
         attributes列は、キーごとに別々の列（attributes.<key>の形式）として出力する。
-        pandas.json_normalizeを使用してネストした辞書を自動的に展開する。
+        ネストした辞書は、pandas.json_normalizeと同じく ``.`` 区切りの列に展開する。
 
     """
     # 基本列の定義
@@ -220,20 +217,10 @@ def create_df(
         "bounding_box_height",
     ]
 
-    if len(annotation_polyline_list) == 0:
-        # 件数が0件のときも列ヘッダを出力する
-        return pandas.DataFrame(columns=base_columns)
-
-    # pandas.json_normalizeを使用してネストした辞書を展開
-    # start_point, end_point, midpoint（辞書）とattributes（辞書）が自動的に展開される
-    df = pandas.json_normalize([e.model_dump() for e in annotation_polyline_list])
-
-    # attributes列を抽出してソート
-    attributes_columns = sorted([col for col in df.columns if col.startswith("attributes.")])
-    # 列の順序を設定
-    columns = base_columns + attributes_columns
-
-    return df[columns]
+    builder = create_annotation_record_builder(base_columns)
+    for e in annotation_polyline_list:
+        builder.append(e.model_dump())
+    return builder.to_dataframe()
 
 
 def print_annotation_polyline(
@@ -245,20 +232,23 @@ def print_annotation_polyline(
     task_query: TaskQuery | None = None,
     target_label_names: Collection[str] | None = None,
 ) -> None:
-    annotation_polyline_list = get_annotation_polyline_info_list_from_annotation_path(
-        annotation_path,
-        target_task_ids=target_task_ids,
-        task_query=task_query,
-        target_label_names=target_label_names,
-    )
-
-    logger.info(f"{len(annotation_polyline_list)} 件のポリラインアノテーションの情報を出力します。 :: output='{output_file}'")
+    def iter_annotation_polyline() -> Iterator[AnnotationPolylineInfo]:
+        return iter_annotation_polyline_info_from_annotation_path(
+            annotation_path,
+            target_task_ids=target_task_ids,
+            task_query=task_query,
+            target_label_names=target_label_names,
+        )
 
     if output_format == OutputFormat.CSV:
-        df = create_df(annotation_polyline_list)
+        # アノテーションごとのオブジェクトを保持し続けないように、読み込みながら列ごとに詰める
+        df = create_df(iter_annotation_polyline())
+        logger.info(f"{len(df)} 件のポリラインアノテーションの情報を出力します。 :: output='{output_file}'")
         print_csv(df, output_file)
 
     elif output_format in [OutputFormat.PRETTY_JSON, OutputFormat.JSON]:
+        annotation_polyline_list = list(iter_annotation_polyline())
+        logger.info(f"{len(annotation_polyline_list)} 件のポリラインアノテーションの情報を出力します。 :: output='{output_file}'")
         json_is_pretty = output_format == OutputFormat.PRETTY_JSON
         # Pydantic BaseModelを使用したJSON処理
         print_json(
@@ -1,13 +1,13 @@
 import argparse
+import functools
 import logging
 import sys
 import tempfile
-from collections.abc import Callable, Collection
+from collections.abc import Callable, Collection, Iterable, Iterator
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Any, BinaryIO
 
-import numpy
 import pandas
 from annofabapi.exceptions import AnnotationOuterFileNotFoundError
 from annofabapi.models import InputDataType, ProjectMemberRole
@@ -16,7 +16,8 @@ from annofabapi.util.page import create_image_editor_url
 from dataclasses_json import DataClassJsonMixin
 
 import annofabcli.common.cli
-from annofabcli.common.annofab.annotation_zip import lazy_parse_simple_annotation_by_input_data
+from annofabcli.common.annofab.annotation_zip import create_annotation_record_builder, lazy_parse_simple_annotation_by_input_data
+from annofabcli.common.annofab.segmentation_cache import SegmentationStats, SegmentationStatsCache, SegmentationStatsReader, open_segmentation_stats_cache
 from annofabcli.common.cli import COMMAND_LINE_ERROR_STATUS_CODE, ArgumentParser, CommandLine, build_annofabapi_resource_and_login, get_list_from_args
 from annofabcli.common.download import DownloadingFile
 from annofabcli.common.enums import OutputFormat
@@ -71,31 +72,38 @@ class AnnotationSegmentationInfo(DataClassJsonMixin):
     attributes: dict[str, Any]
 
 
+def _to_segmentation_properties(stats: SegmentationStats) -> tuple[int, dict[str, dict[str, int]] | None, int | None, int | None]:
+    if stats.bounding_box is None:
+        return stats.area, None, None, None
+    min_x, min_y, max_x, max_y = stats.bounding_box
+    return stats.area, stats.to_bounding_box_dict(), max_x - min_x + 1, max_y - min_y + 1
+
+
 def calculate_segmentation_properties(outer_file: Path | BinaryIO) -> tuple[int, dict[str, dict[str, int]] | None, int | None, int | None]:
-    binary_image_array = read_binary_image(outer_file)
-    area = int(numpy.count_nonzero(binary_image_array))
-    if area == 0:
-        return area, None, None, None
-
-    rows = numpy.any(binary_image_array, axis=1)
-    cols = numpy.any(binary_image_array, axis=0)
-    min_y = int(numpy.argmax(rows))
-    max_y = int(len(rows) - 1 - numpy.argmax(rows[::-1]))
-    min_x = int(numpy.argmax(cols))
-    max_x = int(len(cols) - 1 - numpy.argmax(cols[::-1]))
-    bounding_box = {
-        "left_top": {"x": min_x, "y": min_y},
-        "right_bottom": {"x": max_x, "y": max_y},
-    }
-    return area, bounding_box, max_x - min_x + 1, max_y - min_y + 1
+    return _to_segmentation_properties(SegmentationStats.from_binary_image(read_binary_image(outer_file)))
 
 
 def get_segmentation_properties(
     data_uri: str,
     *,
     open_outer_file: Callable[[str], Path | BinaryIO] | None = None,
+    read_segmentation_stats: Callable[[str], SegmentationStats] | None = None,
     annotation_id: str | None = None,
 ) -> tuple[int | None, dict[str, dict[str, int]] | None, int | None, int | None]:
+    """
+    塗りつぶし画像の面積、外接矩形、外接矩形の幅と高さを取得します。
+
+    Args:
+        open_outer_file: 塗りつぶし画像を開く関数
+        read_segmentation_stats: 塗りつぶし画像の統計情報を取得する関数。指定した場合は ``open_outer_file`` より優先します。
+    """
+    if read_segmentation_stats is not None:
+        try:
+            return _to_segmentation_properties(read_segmentation_stats(data_uri))
+        except (AnnotationOuterFileNotFoundError, OSError, ValueError) as e:
+            logger.warning(f"塗りつぶし画像を読み込めないため、面積と外接矩形をNoneにします。 annotation_id='{annotation_id}', data_uri='{data_uri}' :: {e}")
+            return None, None, None, None
+
     if open_outer_file is None:
         return None, None, None, None
 
@@ -117,6 +125,7 @@ def get_annotation_segmentation_info_list(
     *,
     target_label_names: Collection[str] | None = None,
     open_outer_file: Callable[[str], Path | BinaryIO] | None = None,
+    read_segmentation_stats: Callable[[str], SegmentationStats] | None = None,
 ) -> list[AnnotationSegmentationInfo]:
     result = []
     target_label_names_set = set(target_label_names) if target_label_names is not None else None
@@ -134,6 +143,7 @@ def get_annotation_segmentation_info_list(
         area, bounding_box, bounding_box_width, bounding_box_height = get_segmentation_properties(
             data_uri,
             open_outer_file=open_outer_file,
+            read_segmentation_stats=read_segmentation_stats,
             annotation_id=detail["annotation_id"],
         )
         result.append(
@@ -167,15 +177,16 @@ def get_annotation_segmentation_info_list(
     return result
 
 
-def get_annotation_segmentation_info_list_from_annotation_path(
+def iter_annotation_segmentation_info_from_annotation_path(
     annotation_path: Path,
     *,
     target_task_ids: Collection[str] | None = None,
     task_query: TaskQuery | None = None,
     target_label_names: Collection[str] | None = None,
-) -> list[AnnotationSegmentationInfo]:
-    annotation_segmentation_list = []
+    segmentation_cache: SegmentationStatsCache | None = None,
+) -> Iterator[AnnotationSegmentationInfo]:
     target_task_ids = set(target_task_ids) if target_task_ids is not None else None
+    segmentation_stats_reader = SegmentationStatsReader(annotation_path, cache=segmentation_cache) if segmentation_cache is not None else None
     iter_parser = lazy_parse_simple_annotation_by_input_data(annotation_path)
     logger.info(f"アノテーションZIPまたはディレクトリ'{annotation_path}'を読み込みます。")
     for index, parser in enumerate(iter_parser):
@@ -186,17 +197,22 @@ def get_annotation_segmentation_info_list_from_annotation_path(
         dict_simple_annotation = parser.load_json()
         if task_query is not None and not match_annotation_with_task_query(dict_simple_annotation, task_query):
             continue
-        sub_annotation_segmentation_list = get_annotation_segmentation_info_list(
+        read_segmentation_stats = functools.partial(segmentation_stats_reader.read, parser) if segmentation_stats_reader is not None else None
+        yield from get_annotation_segmentation_info_list(
             dict_simple_annotation,
             target_label_names=target_label_names,
             open_outer_file=parser.open_outer_file,
+            read_segmentation_stats=read_segmentation_stats,
+        )
+
+    if segmentation_stats_reader is not None:
+        logger.info(
+            f"塗りつぶし画像の面積と外接矩形を算出しました。 :: キャッシュから取得した件数={segmentation_stats_reader.cache_hit_count}, 画像を読み込んだ件数={segmentation_stats_reader.decoded_count}"
         )
-        annotation_segmentation_list.extend(sub_annotation_segmentation_list)
-    return annotation_segmentation_list
 
 
 def create_df(
-    annotation_segmentation_list: list[AnnotationSegmentationInfo],
+    annotation_segmentation_list: Iterable[AnnotationSegmentationInfo],
 ) -> pandas.DataFrame:
     base_columns = [
         "project_id",
@@ -221,21 +237,10 @@ def create_df(
         "bounding_box_height",
     ]
 
-    if not annotation_segmentation_list:
-        # 件数が0件のときも列ヘッダを出力する
-        return pandas.DataFrame(columns=base_columns)
-
-    tmp_annotation_segmentation_list = [e.to_dict(encode_json=True) for e in annotation_segmentation_list]
-    df = pandas.json_normalize(tmp_annotation_segmentation_list)
-
-    attribute_columns = sorted(col for col in df.columns if col.startswith("attributes."))
-    columns = base_columns + attribute_columns
-
-    for column in columns:
-        if column not in df.columns:
-            df[column] = pandas.NA
-
-    return df[columns]
+    builder = create_annotation_record_builder(base_columns)
+    for e in annotation_segmentation_list:
+        builder.append(e.to_dict(encode_json=True))
+    return builder.to_dataframe()
 
 
 def print_annotation_segmentation(
@@ -246,21 +251,26 @@ def print_annotation_segmentation(
     target_task_ids: Collection[str] | None = None,
     task_query: TaskQuery | None = None,
     target_label_names: Collection[str] | None = None,
+    segmentation_cache: SegmentationStatsCache | None = None,
 ) -> None:
-    annotation_segmentation_list = get_annotation_segmentation_info_list_from_annotation_path(
-        annotation_path,
-        target_task_ids=target_task_ids,
-        task_query=task_query,
-        target_label_names=target_label_names,
-    )
-
-    logger.info(f"{len(annotation_segmentation_list)} 件の塗りつぶしアノテーションの情報を出力します。 :: output='{output_file}'")
+    def iter_annotation_segmentation() -> Iterator[AnnotationSegmentationInfo]:
+        return iter_annotation_segmentation_info_from_annotation_path(
+            annotation_path,
+            target_task_ids=target_task_ids,
+            task_query=task_query,
+            target_label_names=target_label_names,
+            segmentation_cache=segmentation_cache,
+        )
 
     if output_format == OutputFormat.CSV:
-        df = create_df(annotation_segmentation_list)
+        # アノテーションごとのオブジェクトを保持し続けないように、読み込みながら列ごとに詰める
+        df = create_df(iter_annotation_segmentation())
+        logger.info(f"{len(df)} 件の塗りつぶしアノテーションの情報を出力します。 :: output='{output_file}'")
         print_csv(df, output_file)
 
     elif output_format in [OutputFormat.PRETTY_JSON, OutputFormat.JSON]:
+        annotation_segmentation_list = list(iter_annotation_segmentation())
+        logger.info(f"{len(annotation_segmentation_list)} 件の塗りつぶしアノテーションの情報を出力します。 :: output='{output_file}'")
         json_is_pretty = output_format == OutputFormat.PRETTY_JSON
         print_json(
             [e.to_dict(encode_json=True) for e in annotation_segmentation_list],
@@ -309,41 +319,45 @@ class ListAnnotationSegmentation(CommandLine):
 
         downloading_obj = DownloadingFile(self.service)
 
-        def download_and_print_annotation_segmentation(project_id: str, temp_dir: Path, *, is_latest: bool) -> None:
-            local_annotation_path = downloading_obj.download_annotation_zip_to_dir(
-                project_id,
-                temp_dir,
-                is_latest=is_latest,
-            )
-            print_annotation_segmentation(
-                local_annotation_path,
-                output_file,
-                output_format,
-                target_task_ids=task_id_list,
-                task_query=task_query,
-                target_label_names=label_name_list,
-            )
-
-        if project_id is not None:
-            if args.temp_dir is not None:
-                download_and_print_annotation_segmentation(project_id=project_id, temp_dir=args.temp_dir, is_latest=args.latest)
+        with open_segmentation_stats_cache(enabled=args.segmentation_cache) as segmentation_cache:
+
+            def download_and_print_annotation_segmentation(project_id: str, temp_dir: Path, *, is_latest: bool) -> None:
+                local_annotation_path = downloading_obj.download_annotation_zip_to_dir(
+                    project_id,
+                    temp_dir,
+                    is_latest=is_latest,
+                )
+                print_annotation_segmentation(
+                    local_annotation_path,
+                    output_file,
+                    output_format,
+                    target_task_ids=task_id_list,
+                    task_query=task_query,
+                    target_label_names=label_name_list,
+                    segmentation_cache=segmentation_cache,
+                )
+
+            if project_id is not None:
+                if args.temp_dir is not None:
+                    download_and_print_annotation_segmentation(project_id=project_id, temp_dir=args.temp_dir, is_latest=args.latest)
+                else:
+                    with tempfile.TemporaryDirectory() as str_temp_dir:
+                        download_and_print_annotation_segmentation(
+                            project_id=project_id,
+                            temp_dir=Path(str_temp_dir),
+                            is_latest=args.latest,
+                        )
             else:
-                with tempfile.TemporaryDirectory() as str_temp_dir:
-                    download_and_print_annotation_segmentation(
-                        project_id=project_id,
-                        temp_dir=Path(str_temp_dir),
-                        is_latest=args.latest,
-                    )
-        else:
-            assert annotation_path is not None
-            print_annotation_segmentation(
-                annotation_path,
-                output_file,
-                output_format,
-                target_task_ids=task_id_list,
-                task_query=task_query,
-                target_label_names=label_name_list,
-            )
+                assert annotation_path is not None
+                print_annotation_segmentation(
+                    annotation_path,
+                    output_file,
+                    output_format,
+                    target_task_ids=task_id_list,
+                    task_query=task_query,
+                    target_label_names=label_name_list,
+                    segmentation_cache=segmentation_cache,
+                )
 
 
 def parse_args(parser: argparse.ArgumentParser) -> None:
@@ -393,6 +407,13 @@ def parse_args(parser: argparse.ArgumentParser) -> None:
         help="指定したディレクトリに、アノテーションZIPなどの一時ファイルをダウンロードします。",
     )
 
+    parser.add_argument(
+        "--segmentation_cache",
+        action="store_true",
+        help="塗りつぶし画像の面積などを、キャッシュディレクトリ（ ``$XDG_CACHE_HOME/annofabcli`` ）に保存して再利用します。"
+        "アノテーションZIPに格納されているCRC32とファイルサイズが同じ塗りつぶし画像は、2回目以降は読み込みません。",
+    )
+
     parser.set_defaults(subcommand_func=main)
 
 
@@ -1,61 +1,184 @@
+from __future__ import annotations
+
+import abc
 import argparse
+import contextlib
+import io
 import json
 import logging
+import multiprocessing
+import shutil
 import sys
+import time
 import zipfile
-from collections.abc import Callable, Collection, Iterator
-from pathlib import Path
-from typing import Any
-
-from annofabapi.parser import (
-    SimpleAnnotationDirParser,
-    SimpleAnnotationParser,
-    SimpleAnnotationZipParser,
-    lazy_parse_simple_annotation_dir,
-    lazy_parse_simple_annotation_zip,
-)
+from collections.abc import Collection, Sequence
+from functools import partial
+from pathlib import Path, PurePosixPath
+from types import TracebackType
+from typing import IO, Any, Self
+
+from annofabapi.parser import SimpleAnnotationDirParser, SimpleAnnotationParser
 
 import annofabcli.common.cli
+from annofabcli.common.annofab.annotation_zip import SimpleAnnotationZipReaderParser, is_input_data_json
 from annofabcli.common.cli import (
     COMMAND_LINE_ERROR_STATUS_CODE,
+    PARALLELISM_CHOICES,
     ArgumentParser,
     CommandLineWithoutWebapi,
     get_list_from_args,
 )
+from annofabcli.common.zip_reader import ZipReader
+
+logger = logging.getLogger(__name__)
 
-IsParserFunc = Callable[[SimpleAnnotationParser], bool]
+MERGE_CHUNK_SIZE = 100
+"""並列に処理する場合に、1個のプロセスにまとめて渡すJSONファイルの個数"""
 
 
-logger = logging.getLogger(__name__)
+class AnnotationSource:
+    """
+    マージ元のアノテーションzip、またはzipを展開したディレクトリ。
+    zipファイルは1回だけ開くので、JSONファイルの存在確認はzipのメンバ数に依存しません。
 
+    Args:
+        annotation_path: アノテーションzip、またはzipを展開したディレクトリのパス
+    """
 
-class MergeAnnotationMain:
-    @staticmethod
-    def create_iter_parser(annotation_path: Path) -> Iterator[SimpleAnnotationParser]:
-        # Simpleアノテーションの読み込み
+    def __init__(self, annotation_path: Path) -> None:
+        self.annotation_path = annotation_path
+        self.zip_reader: ZipReader | None = None
         if annotation_path.is_file():
-            return lazy_parse_simple_annotation_zip(annotation_path)
-        elif annotation_path.is_dir():
-            return lazy_parse_simple_annotation_dir(annotation_path)
-        else:
+            self.zip_reader = ZipReader(annotation_path)
+        elif not annotation_path.is_dir():
             raise RuntimeError(f"{annotation_path} はサポート対象外です。")
 
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, exc_type: type[BaseException] | None, exc_value: BaseException | None, traceback: TracebackType | None) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self.zip_reader is not None:
+            self.zip_reader.close()
+
+    def list_json_file_paths(self) -> list[str]:
+        """
+        ``{task_id}/{input_data_id}.json`` という形式の、JSONファイルのパスの一覧を返します。
+        """
+        if self.zip_reader is not None:
+            return [info.filename for info in self.zip_reader.infolist() if is_input_data_json(info)]
+        return sorted(path.relative_to(self.annotation_path).as_posix() for path in self.annotation_path.glob("*/*.json") if path.is_file())
+
+    def get_parser(self, json_file_path: str) -> SimpleAnnotationParser | None:
+        """
+        JSONファイルのparserを返します。JSONファイルが存在しない場合はNoneを返します。
+        """
+        if self.zip_reader is not None:
+            if json_file_path in self.zip_reader:
+                return SimpleAnnotationZipReaderParser(self.zip_reader, json_file_path)
+            return None
+
+        path = self.annotation_path / json_file_path
+        if path.is_file():
+            return SimpleAnnotationDirParser(path)
+        return None
+
+
+class MergedAnnotationWriter(abc.ABC):
+    """
+    マージしたアノテーションの出力先
+    """
+
+    @abc.abstractmethod
+    def write_json(self, json_file_path: str, data: bytes) -> None:
+        pass
+
+    @abc.abstractmethod
+    def write_outer_file(self, outer_file_path: str, src: IO[bytes]) -> None:
+        pass
+
+
+class DirectoryWriter(MergedAnnotationWriter):
+    """
+    ディレクトリに出力します。
+    """
+
+    def __init__(self, output_dir: Path) -> None:
+        self.output_dir = output_dir
+
+    def write_json(self, json_file_path: str, data: bytes) -> None:
+        output_path = self.output_dir / json_file_path
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        output_path.write_bytes(data)
+
+    def write_outer_file(self, outer_file_path: str, src: IO[bytes]) -> None:
+        output_path = self.output_dir / outer_file_path
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        with output_path.open("wb") as dest:
+            shutil.copyfileobj(src, dest)
+
+
+class ZipWriter(MergedAnnotationWriter):
+    """
+    zipファイルに出力します。
+    塗りつぶし画像などの外部ファイルは圧縮済みの画像なので、再圧縮せずに無圧縮で格納します。
+    """
+
+    def __init__(self, zip_file: zipfile.ZipFile) -> None:
+        self.zip_file = zip_file
+
+    def write_json(self, json_file_path: str, data: bytes) -> None:
+        self.zip_file.writestr(json_file_path, data, compress_type=zipfile.ZIP_DEFLATED)
+
+    def write_outer_file(self, outer_file_path: str, src: IO[bytes]) -> None:
+        info = zipfile.ZipInfo(outer_file_path, date_time=time.localtime()[:6])
+        info.compress_type = zipfile.ZIP_STORED
+        with self.zip_file.open(info, "w") as dest:
+            shutil.copyfileobj(src, dest)
+
+
+class BufferedWriter(MergedAnnotationWriter):
+    """
+    出力する内容をメモリに保持します。
+    子プロセスでマージした結果を、親プロセスでzipファイルに書き込むときに使います。
+    """
+
+    def __init__(self) -> None:
+        self.entries: list[tuple[str, bytes, bool]] = []
+        """(パス, 内容, 外部ファイルかどうか)のlist"""
+
+    def write_json(self, json_file_path: str, data: bytes) -> None:
+        self.entries.append((json_file_path, data, False))
+
+    def write_outer_file(self, outer_file_path: str, src: IO[bytes]) -> None:
+        self.entries.append((outer_file_path, src.read(), True))
+
+    def write_to(self, writer: MergedAnnotationWriter) -> None:
+        for path, data, is_outer_file in self.entries:
+            if is_outer_file:
+                writer.write_outer_file(path, io.BytesIO(data))
+            else:
+                writer.write_json(path, data)
+
+
+class MergeAnnotationMain:
     @staticmethod
-    def _write_outer_file(parser: SimpleAnnotationParser, anno: dict[str, Any], output_json: Path) -> None:
+    def _write_outer_file(parser: SimpleAnnotationParser, anno: dict[str, Any], json_file_path: str, writer: MergedAnnotationWriter) -> None:
         data_uri = anno["data"]["data_uri"]
-
         with parser.open_outer_file(data_uri) as src_f:
-            data = src_f.read()
-            output_outer_file = output_json.parent / f"{output_json.stem}/{data_uri}"
-            output_outer_file.parent.mkdir(parents=True, exist_ok=True)
-            with output_outer_file.open("wb") as dest_f:
-                dest_f.write(data)
+            writer.write_outer_file(f"{PurePosixPath(json_file_path).with_suffix('')}/{data_uri}", src_f)
 
     @staticmethod
     def _is_segmentation(anno: dict[str, Any]) -> bool:
         return anno["data"]["_type"] in ["Segmentation", "SegmentationV2"]
 
-    def write_merged_annotation(self, parser1: SimpleAnnotationParser, parser2: SimpleAnnotationParser, output_json: Path) -> None:
+    @staticmethod
+    def _write_json(simple_annotation: dict[str, Any], json_file_path: str, writer: MergedAnnotationWriter) -> None:
+        writer.write_json(json_file_path, json.dumps(simple_annotation, ensure_ascii=False).encode("utf-8"))
+
+    def write_merged_annotation(self, parser1: SimpleAnnotationParser, parser2: SimpleAnnotationParser, json_file_path: str, writer: MergedAnnotationWriter) -> None:
         simple_annotation1 = parser1.load_json()
         simple_annotation2 = parser2.load_json()
         details1 = simple_annotation1["details"]
@@ -79,7 +202,7 @@ class MergeAnnotationMain:
             merged_details.append(new_anno)
             # 塗りつぶしアノテーションファイルをコピーする
             if self._is_segmentation(new_anno):
-                self._write_outer_file(parser=(parser2 if adopt_two else parser1), anno=new_anno, output_json=output_json)
+                self._write_outer_file(parser=(parser2 if adopt_two else parser1), anno=new_anno, json_file_path=json_file_path, writer=writer)
 
         merged_details.extend(list(details2_dict.values()))
 
@@ -91,107 +214,120 @@ class MergeAnnotationMain:
             "input_data_name": simple_annotation1["input_data_name"],
             "details": merged_details,
         }
+        self._write_json(new_simple_annotation, json_file_path, writer)
 
-        output_json.parent.mkdir(parents=True, exist_ok=True)
-        with output_json.open("w", encoding="utf-8") as f:
-            json.dump(new_simple_annotation, f, ensure_ascii=False)
-
-    def copy_annotation(self, parser: SimpleAnnotationParser, output_json: Path) -> None:
+    def copy_annotation(self, parser: SimpleAnnotationParser, json_file_path: str, writer: MergedAnnotationWriter) -> None:
         simple_annotation = parser.load_json()
         details = simple_annotation["details"]
 
         for anno in details:
             # 塗りつぶしアノテーションファイルをコピーする
             if self._is_segmentation(anno):
-                self._write_outer_file(parser, anno, output_json)
-
-        output_json.parent.mkdir(exist_ok=True, parents=True)
-        with output_json.open("w", encoding="utf-8") as f:
-            json.dump(simple_annotation, f, ensure_ascii=False)
+                self._write_outer_file(parser, anno, json_file_path, writer)
+
+        self._write_json(simple_annotation, json_file_path, writer)
+
+    def merge_json_file(self, source1: AnnotationSource, source2: AnnotationSource, json_file_path: str, writer: MergedAnnotationWriter) -> None:
+        """
+        1個のJSONファイルをマージして出力します。片方にしか存在しないJSONファイルは、そのまま出力します。
+        """
+        parser1 = source1.get_parser(json_file_path)
+        parser2 = source2.get_parser(json_file_path)
+        if parser1 is not None and parser2 is not None:
+            self.write_merged_annotation(parser1, parser2, json_file_path, writer)
+        elif parser1 is not None:
+            self.copy_annotation(parser1, json_file_path, writer)
+        elif parser2 is not None:
+            self.copy_annotation(parser2, json_file_path, writer)
+        logger.debug(f"'{json_file_path}' を出力しました。")
 
     @staticmethod
-    def _get_parser(annotation_path: Path, zip_file: zipfile.ZipFile | None, json_path: Path) -> SimpleAnnotationParser | None:
-        if annotation_path.is_dir():
-            if (annotation_path / json_path).exists():
-                return SimpleAnnotationDirParser(annotation_path / json_path)
-            else:
-                return None
-        elif annotation_path.is_file() and zip_file is not None:
-            # zipファイルであるという前提
-            if str(json_path) in zip_file.namelist():
-                return SimpleAnnotationZipParser(zip_file, str(json_path))
-            return None
-        else:
-            raise RuntimeError(f"{annotation_path} はサポート対象外です。")
-
-    @staticmethod
-    def create_is_target_parser_func(
-        task_ids: Collection[str] | None = None,
-    ) -> IsParserFunc | None:
-        if task_ids is None:
-            return None
+    def list_json_file_paths(source1: AnnotationSource, source2: AnnotationSource, target_task_ids: Collection[str] | None = None) -> list[str]:
+        """
+        出力するJSONファイルのパスの一覧を返します。1個目に存在するJSONファイルの後ろに、2個目にしか存在しないJSONファイルを並べます。
+        """
+        target_task_id_set = set(target_task_ids) if target_task_ids is not None and len(target_task_ids) > 0 else None
 
-        task_id_set = set(task_ids) if task_ids is not None else None
+        def is_target(json_file_path: str) -> bool:
+            return target_task_id_set is None or PurePosixPath(json_file_path).parent.name in target_task_id_set
 
-        def is_target_parser(parser: SimpleAnnotationParser) -> bool:
-            if task_id_set is not None and len(task_id_set) > 0:  # noqa: SIM102
-                if parser.task_id not in task_id_set:
-                    return False
-
-            return True
-
-        return is_target_parser
+        json_file_paths1 = [e for e in source1.list_json_file_paths() if is_target(e)]
+        json_file_path_set1 = set(json_file_paths1)
+        json_file_paths2 = [e for e in source2.list_json_file_paths() if is_target(e) and e not in json_file_path_set1]
+        return json_file_paths1 + json_file_paths2
 
     def main(
         self,
         annotation_path1: Path,
         annotation_path2: Path,
-        output_dir: Path,
+        output_dir: Path | None = None,
         target_task_ids: Collection[str] | None = None,
+        *,
+        output_zip: Path | None = None,
+        parallelism: int | None = None,
     ) -> None:
-        is_target_parser_func = self.create_is_target_parser_func(target_task_ids)
-
-        iter_parser1 = self.create_iter_parser(annotation_path1)
-
-        zip_file2: zipfile.ZipFile | None = None
-        if annotation_path2.is_file():
-            zip_file2 = zipfile.ZipFile(str(annotation_path2), "r")  # pylint: disable=consider-using-with
-
-        excluded_json_path2: set[str] = set()
-        for parser1 in iter_parser1:
-            if is_target_parser_func is not None and not is_target_parser_func(parser1):
-                continue
-
-            json_file1 = Path(parser1.json_file_path)
-            json_file_path1 = f"{json_file1.parent.name}/{json_file1.name}"
-            output_json = output_dir / json_file_path1
-
-            parser2 = self._get_parser(annotation_path2, zip_file=zip_file2, json_path=Path(json_file_path1))
-            if parser2 is not None:
-                # annotation_path1とannotation_path2両方に存在するJSONをマージして出力する
-                self.write_merged_annotation(parser1, parser2, output_json)
-                excluded_json_path2.add(json_file_path1)
+        """
+        Args:
+            output_dir: 出力先のディレクトリ。 ``output_zip`` と同時には指定できません。
+            output_zip: 出力先のzipファイル。 ``output_dir`` と同時には指定できません。
+            parallelism: 指定した場合、JSONファイルを指定したプロセス数で並列にマージします。
+        """
+        if (output_dir is None) == (output_zip is None):
+            raise ValueError("`output_dir`と`output_zip`のどちらか一方を指定してください。")
+
+        with AnnotationSource(annotation_path1) as source1, AnnotationSource(annotation_path2) as source2, contextlib.ExitStack() as stack:
+            json_file_paths = self.list_json_file_paths(source1, source2, target_task_ids)
+
+            writer: MergedAnnotationWriter
+            if output_zip is not None:
+                output_zip.parent.mkdir(parents=True, exist_ok=True)
+                writer = ZipWriter(stack.enter_context(zipfile.ZipFile(output_zip, "w", compression=zipfile.ZIP_DEFLATED)))
             else:
-                # annotation_path2に存在しないJSONを出力する
-                self.copy_annotation(parser1, output_json)
-            logger.debug(f"{output_json} を出力しました。")
+                assert output_dir is not None
+                writer = DirectoryWriter(output_dir)
 
-        if zip_file2 is not None:
-            zip_file2.close()
+            if parallelism is None:
+                for json_file_path in json_file_paths:
+                    self.merge_json_file(source1, source2, json_file_path, writer)
+            else:
+                self._merge_in_parallel(annotation_path1, annotation_path2, json_file_paths, writer, parallelism=parallelism)
 
-        # annotation_path1に存在しないJSONを出力する
-        iter_parser2 = self.create_iter_parser(annotation_path2)
-        for parser2 in iter_parser2:
-            if is_target_parser_func is not None and not is_target_parser_func(parser2):
-                continue
-            json_file2 = Path(parser2.json_file_path)
-            json_file_path2 = f"{json_file2.parent.name}/{json_file2.name}"
-            if json_file_path2 in excluded_json_path2:
-                continue
+        logger.info(f"{len(json_file_paths)} 件のJSONファイルを、'{output_zip or output_dir}' に出力しました。")
 
-            output_json = output_dir / json_file_path2
-            self.copy_annotation(parser2, output_json)
-            logger.debug(f"{output_json} を出力しました。")
+    @staticmethod
+    def _merge_in_parallel(annotation_path1: Path, annotation_path2: Path, json_file_paths: Sequence[str], writer: MergedAnnotationWriter, *, parallelism: int) -> None:
+        """
+        JSONファイルを ``MERGE_CHUNK_SIZE`` 個ずつに分けて、子プロセスでマージします。
+        出力先がディレクトリの場合は、子プロセスが直接書き込みます。
+        出力先がzipファイルの場合は、子プロセスがマージした結果を親プロセスが書き込みます。
+        """
+        output_dir = writer.output_dir if isinstance(writer, DirectoryWriter) else None
+        chunks = [json_file_paths[i : i + MERGE_CHUNK_SIZE] for i in range(0, len(json_file_paths), MERGE_CHUNK_SIZE)]
+        func = partial(merge_json_files, annotation_path1, annotation_path2, output_dir)
+        with multiprocessing.Pool(parallelism) as pool:
+            # zipファイル内の順番が実行のたびに変わらないように、 `imap` で元の順番のまま受け取る
+            for buffered_writer in pool.imap(func, chunks):
+                if buffered_writer is not None:
+                    buffered_writer.write_to(writer)
+
+
+def merge_json_files(annotation_path1: Path, annotation_path2: Path, output_dir: Path | None, json_file_paths: Sequence[str]) -> BufferedWriter | None:
+    """
+    子プロセスで、複数のJSONファイルをマージします。
+    zipファイルのハンドルは子プロセスに引き継げないので、子プロセスごとにアノテーションzipを開きます。
+
+    Args:
+        output_dir: 出力先のディレクトリ。Noneの場合は、マージした結果をメモリに保持して返します。
+
+    Returns:
+        ``output_dir`` がNoneの場合は、マージした結果を保持しているBufferedWriter
+    """
+    writer: MergedAnnotationWriter = DirectoryWriter(output_dir) if output_dir is not None else BufferedWriter()
+    main_obj = MergeAnnotationMain()
+    with AnnotationSource(annotation_path1) as source1, AnnotationSource(annotation_path2) as source2:
+        for json_file_path in json_file_paths:
+            main_obj.merge_json_file(source1, source2, json_file_path, writer)
+    return writer if isinstance(writer, BufferedWriter) else None
 
 
 class MergeAnnotation(CommandLineWithoutWebapi):
@@ -216,7 +352,14 @@ class MergeAnnotation(CommandLineWithoutWebapi):
 
         main_obj = MergeAnnotationMain()
         target_task_ids = get_list_from_args(args.task_id) if args.task_id is not None else None
-        main_obj.main(args.annotation[0], args.annotation[1], output_dir=args.output_dir, target_task_ids=target_task_ids)
+        main_obj.main(
+            args.annotation[0],
+            args.annotation[1],
+            output_dir=args.output_dir,
+            target_task_ids=target_task_ids,
+            output_zip=args.output_zip,
+            parallelism=args.parallelism,
+        )
 
 
 def main(args: argparse.Namespace) -> None:
@@ -234,13 +377,26 @@ def parse_args(parser: argparse.ArgumentParser) -> None:
         help="Annofabからダウンロードしたアノテーションzip、またはzipを展開したディレクトリを2つ指定してください。同じannotation_idが存在する場合は、2個目のアノテーションを優先します。",
     )
 
-    parser.add_argument("-o", "--output_dir", type=Path, required=True, help="出力先ディレクトリ")
+    output_group = parser.add_mutually_exclusive_group(required=True)
+    output_group.add_argument("-o", "--output_dir", type=Path, help="出力先ディレクトリ")
+    output_group.add_argument(
+        "--output_zip",
+        type=Path,
+        help="出力先のzipファイル。指定すると、マージした結果をディレクトリに展開せずにzipファイルに出力します。",
+    )
 
     argument_parser.add_task_id(
         required=False,
         help_message=("マージ対象であるタスクのtask_idを指定します。指定しない場合、すべてのタスクがマージ対象です。 ``file://`` を先頭に付けると、task_idの一覧が記載されたファイルを指定できます。"),
     )
 
+    parser.add_argument(
+        "--parallelism",
+        type=int,
+        choices=PARALLELISM_CHOICES,
+        help="JSONファイルのマージを並列に実行するプロセス数を指定します。指定しない場合は、逐次的に処理します。",
+    )
+
     parser.set_defaults(subcommand_func=main)
 
 
@@ -18,6 +18,7 @@ from annofabapi.models import CommentType
 
 import annofabcli.common.cli
 from annofabcli.comment.list_comment import create_empty_df_comment, create_reply_counter
+from annofabcli.common.annofab.project_mirror import ProjectMirror, open_project_mirror
 from annofabcli.common.cli import ArgumentParser, CommandLine, build_annofabapi_resource_and_login
 from annofabcli.common.download import DownloadingFile
 from annofabcli.common.enums import OutputFormat
@@ -32,7 +33,31 @@ class ListAllCommentMain:
     def __init__(self, service: annofabapi.Resource) -> None:
         self.service = service
 
-    def get_all_comment(
+    def _get_all_comment_from_mirror(
+        self,
+        mirror: ProjectMirror,
+        project_id: str,
+        *,
+        task_ids: Collection[str] | None,
+        comment_type: CommentType | None,
+        exclude_reply: bool,
+    ) -> list[dict[str, Any]]:
+        comment_list = mirror.get_comments(project_id, task_ids=task_ids, comment_type=comment_type.value if comment_type is not None else None)
+
+        # 返信回数を算出する
+        reply_counter = create_reply_counter(comment_list)
+        for c in comment_list:
+            key = (c["task_id"], c["input_data_id"], c["comment_id"])
+            c["reply_count"] = reply_counter.get(key, 0)
+
+        if exclude_reply:
+            # 返信コメントを除外する
+            comment_list = [e for e in comment_list if e["comment_node"]["_type"] != "Reply"]
+
+        visualize = AddProps(self.service, project_id)
+        return [visualize.add_properties_to_comment(e) for e in comment_list]
+
+    def get_all_comment(  # noqa: PLR0912
         self,
         project_id: str,
         comment_json: Path | None,
@@ -40,7 +65,16 @@ class ListAllCommentMain:
         comment_type: CommentType | None,
         exclude_reply: bool,  # noqa: FBT001
         temp_dir: Path | None,
+        *,
+        mirror: ProjectMirror | None = None,
     ) -> list[dict[str, Any]]:
+        """
+        Args:
+            mirror: 指定した場合、全件ファイルをダウンロードせずに、ミラーからコメントを取得します。
+        """
+        if mirror is not None:
+            return self._get_all_comment_from_mirror(mirror, project_id, task_ids=task_ids, comment_type=comment_type, exclude_reply=exclude_reply)
+
         if comment_json is None:
             downloading_obj = DownloadingFile(self.service)
             # `NamedTemporaryFile`を使わない理由: Windowsで`PermissionError`が発生するため
@@ -114,14 +148,16 @@ class ListAllComment(CommandLine):
         temp_dir = Path(args.temp_dir) if args.temp_dir is not None else None
 
         main_obj = ListAllCommentMain(self.service)
-        comment_list = main_obj.get_all_comment(
-            project_id=project_id,
-            comment_json=args.comment_json,
-            task_ids=task_id_list,
-            comment_type=comment_type,
-            exclude_reply=args.exclude_reply,
-            temp_dir=temp_dir,
-        )
+        with open_project_mirror(enabled=args.from_mirror) as mirror:
+            comment_list = main_obj.get_all_comment(
+                project_id=project_id,
+                comment_json=args.comment_json,
+                task_ids=task_id_list,
+                comment_type=comment_type,
+                exclude_reply=args.exclude_reply,
+                temp_dir=temp_dir,
+                mirror=mirror,
+            )
 
         logger.info(f"コメントの件数: {len(comment_list)}")
 
@@ -152,11 +188,17 @@ def parse_args(parser: argparse.ArgumentParser) -> None:
         help=(f"コメントの種類で絞り込みます。\n\n * {CommentType.INSPECTION.value}: 検査コメント\n * {CommentType.ONHOLD.value}: 保留コメント\n"),
     )
 
-    parser.add_argument(
+    source_group = parser.add_mutually_exclusive_group()
+    source_group.add_argument(
         "--comment_json",
         type=Path,
         help="コメント情報が記載されたJSONファイルのパスを指定すると、JSONに記載された情報を元にコメント一覧を出力します。\nJSONファイルは ``$ annofabcli comment download`` コマンドで取得できます。",
     )
+    source_group.add_argument(
+        "--from_mirror",
+        action="store_true",
+        help="全件ファイルをダウンロードせずに、 ``$ annofabcli mirror sync`` コマンドで同期したミラーからコメント一覧を出力します。",
+    )
 
     parser.add_argument("--exclude_reply", action="store_true", help="返信コメントを除外します。")
 
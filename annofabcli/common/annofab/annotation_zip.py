@@ -2,16 +2,121 @@
 AnnofabのアノテーションZIPまたはそれを展開したディレクトリに関するモジュール
 """
 
+import json
 import zipfile
-from collections.abc import Iterator
-from pathlib import Path
+from collections.abc import Iterator, Sequence
+from pathlib import Path, PurePosixPath
+from typing import IO, Any
 
+from annofabapi.exceptions import AnnotationOuterFileNotFoundError
 from annofabapi.parser import (
     SimpleAnnotationParser,
+    SimpleAnnotationParserByTask,
     lazy_parse_simple_annotation_dir,
-    lazy_parse_simple_annotation_zip,
+    lazy_parse_simple_annotation_dir_by_task,
 )
 
+from annofabcli.common.record_builder import ColumnarRecordBuilder
+from annofabcli.common.zip_reader import ZipReader
+
+ANNOTATION_CATEGORICAL_COLUMNS = (
+    "project_id",
+    "task_id",
+    "task_phase",
+    "task_status",
+    "input_data_id",
+    "input_data_name",
+    "updated_datetime",
+    "label",
+)
+"""アノテーションの一覧で、同じ値が繰り返し現れる列"""
+
+
+class SimpleAnnotationZipReaderParser(SimpleAnnotationParser):
+    """
+    :class:`ZipReader` で開いたアノテーションZIPのparser。
+    ``annofabapi.parser.SimpleAnnotationZipParser`` と異なり、JSONや外部ファイルの存在確認・読み込みはメンバ数に依存しません。
+
+    Args:
+        zip_reader: アノテーションZIPを開いたZipReader
+        json_file_path: パースするJSONファイルのパス
+    """
+
+    def __init__(self, zip_reader: ZipReader, json_file_path: str) -> None:
+        self.__zip_reader = zip_reader
+        super().__init__(json_file_path)
+
+    def load_json(self) -> Any:  # noqa: ANN401
+        return json.loads(self.__zip_reader.read(self.json_file_path))
+
+    def open_outer_file(self, data_uri: str) -> IO[bytes]:
+        outer_file_path = str(PurePosixPath(self.json_file_path).with_suffix("") / data_uri)
+        if outer_file_path not in self.__zip_reader:
+            raise AnnotationOuterFileNotFoundError(outer_file_path, str(self.__zip_reader.zip_path))
+        return self.__zip_reader.open(outer_file_path)
+
+
+class SimpleAnnotationZipReaderParserByTask(SimpleAnnotationParserByTask):
+    """
+    :class:`SimpleAnnotationZipReaderParser` をタスクごとにまとめたもの。
+
+    Args:
+        zip_reader: アノテーションZIPを開いたZipReader
+        task_id: タスクID
+        json_file_path_list: タスク配下のJSONファイルのパスのリスト
+    """
+
+    def __init__(self, zip_reader: ZipReader, task_id: str, json_file_path_list: list[str]) -> None:
+        self.__zip_reader = zip_reader
+        self.__json_file_path_list = json_file_path_list
+        super().__init__(task_id)
+
+    @property
+    def json_file_path_list(self) -> list[str]:
+        return self.__json_file_path_list
+
+    def get_parser(self, json_file_path: str) -> SimpleAnnotationParser:
+        if json_file_path not in self.__json_file_path_list:
+            raise ValueError(f"json_file_path '{json_file_path}' は `json_file_path_list` に含まれていません。")
+        return SimpleAnnotationZipReaderParser(self.__zip_reader, json_file_path)
+
+    def lazy_parse(self) -> Iterator[SimpleAnnotationParser]:
+        return (SimpleAnnotationZipReaderParser(self.__zip_reader, e) for e in self.__json_file_path_list)
+
+
+def is_input_data_json(info: zipfile.ZipInfo) -> bool:
+    """
+    アノテーションZIPのメンバが、 ``{task_id}/{input_data_id}.json`` という入力データのJSONかどうかを返します。
+    """
+    if info.is_dir():
+        return False
+    paths = [p for p in info.filename.split("/") if len(p) != 0]
+    return len(paths) == 2 and paths[1].endswith(".json")
+
+
+def lazy_parse_simple_annotation_zip_with_reader(zip_path: Path) -> Iterator[SimpleAnnotationParser]:
+    """
+    アノテーションZIPを1回だけ開いて、入力データごとに読み込むparserを、ZIPファイル内の順番で返します。
+    """
+    with ZipReader(zip_path) as zip_reader:
+        for info in zip_reader.infolist():
+            if is_input_data_json(info):
+                yield SimpleAnnotationZipReaderParser(zip_reader, info.filename)
+
+
+def lazy_parse_simple_annotation_zip_by_task_with_reader(zip_path: Path) -> Iterator[SimpleAnnotationParserByTask]:
+    """
+    アノテーションZIPを1回だけ開いて、タスクごとにまとめたparserを、タスクIDの昇順で返します。
+    """
+    with ZipReader(zip_path) as zip_reader:
+        json_file_paths_by_task_id: dict[str, list[str]] = {}
+        for json_file_path in sorted(info.filename for info in zip_reader.infolist() if is_input_data_json(info)):
+            task_id = json_file_path.split("/", maxsplit=1)[0]
+            json_file_paths_by_task_id.setdefault(task_id, []).append(json_file_path)
+
+        for task_id, json_file_path_list in json_file_paths_by_task_id.items():
+            yield SimpleAnnotationZipReaderParserByTask(zip_reader, task_id, json_file_path_list)
+
 
 def lazy_parse_simple_annotation_by_input_data(annotation_path: Path) -> Iterator[SimpleAnnotationParser]:
     """
@@ -32,6 +137,41 @@ def lazy_parse_simple_annotation_by_input_data(annotation_path: Path) -> Iterato
     if annotation_path.is_dir():
         return lazy_parse_simple_annotation_dir(annotation_path)
     elif zipfile.is_zipfile(str(annotation_path)):
-        return lazy_parse_simple_annotation_zip(annotation_path)
+        return lazy_parse_simple_annotation_zip_with_reader(annotation_path)
+    else:
+        raise ValueError(f"'{annotation_path}'は、zipファイルまたはディレクトリではありません。")
+
+
+def lazy_parse_simple_annotation_by_task(annotation_path: Path) -> Iterator[SimpleAnnotationParserByTask]:
+    """
+    アノテーションZIPをタスクごとに読み込むparserのイテレータを返します。
+
+    Args:
+        アノテーションZIPまたは、それを展開したディレクトリのパス
+
+    Returns:
+        SimpleAnnotationParserByTaskのイテレータ
+
+    Raises:
+        ValueError: 指定されたパスが存在しない、またはzipファイルやディレクトリではない場合
+    """
+    if not annotation_path.exists():
+        raise ValueError(f"'{annotation_path}' は存在しません。")
+
+    if annotation_path.is_dir():
+        return lazy_parse_simple_annotation_dir_by_task(annotation_path)
+    elif zipfile.is_zipfile(str(annotation_path)):
+        return lazy_parse_simple_annotation_zip_by_task_with_reader(annotation_path)
     else:
         raise ValueError(f"'{annotation_path}'は、zipファイルまたはディレクトリではありません。")
+
+
+def create_annotation_record_builder(base_columns: Sequence[str]) -> ColumnarRecordBuilder:
+    """
+    アノテーションの一覧をCSVに出力するための :class:`ColumnarRecordBuilder` を生成します。
+    ``base_columns`` の後ろに、 ``attributes.`` で始まる属性の列を属性名でソートして並べます。
+
+    Args:
+        base_columns: 属性以外の列
+    """
+    return ColumnarRecordBuilder(base_columns, categorical_columns=ANNOTATION_CATEGORICAL_COLUMNS, dynamic_column_prefixes=["attributes."])
@@ -0,0 +1,412 @@
+"""
+プロジェクトの全件ファイルの内容を、SQLiteのファイルに保存するモジュール
+
+タスク、入力データ、タスク履歴、タスク履歴イベント、コメント、ラベルごとのアノテーション数を、主要な列にインデックスを付けて保存します。
+全件ファイルをダウンロードせずに、タスクIDなどで絞り込んで取得できます。
+``sqlite3`` コマンドなどで、SQLを直接実行することもできます。
+"""
+
+from __future__ import annotations
+
+import contextlib
+import json
+import logging
+import sqlite3
+from collections import defaultdict
+from collections.abc import Collection, Iterable
+from contextlib import AbstractContextManager
+from enum import Enum
+from pathlib import Path
+from types import TracebackType
+from typing import Any, Self
+
+import annofabapi.utils
+
+from annofabcli.common.annofab.task_history_event_store import TaskHistoryEventStore
+from annofabcli.common.exceptions import AnnofabCliException
+from annofabcli.common.utils import get_cache_dir
+
+logger = logging.getLogger(__name__)
+
+
+def get_default_mirror_file() -> Path:
+    return get_cache_dir() / "project_mirror.sqlite3"
+
+
+class MirrorResource(Enum):
+    """
+    ミラーに保存する情報の種類
+    """
+
+    TASK = "task"
+    INPUT_DATA = "input_data"
+    TASK_HISTORY = "task_history"
+    TASK_HISTORY_EVENT = "task_history_event"
+    COMMENT = "comment"
+    ANNOTATION = "annotation"
+    """ラベルごとのアノテーション数"""
+
+
+class MirrorNotSyncedError(AnnofabCliException):
+    """
+    ミラーに情報が同期されていないときのエラー
+    """
+
+    def __init__(self, project_id: str, resource: MirrorResource) -> None:
+        msg = f"project_id='{project_id}'の'{resource.value}'は、ミラーに同期されていません。``annofabcli mirror sync --project_id {project_id} --resource {resource.value}`` を実行してください。"
+        super().__init__(msg)
+
+
+_CREATE_TABLES_SQL = """
+CREATE TABLE IF NOT EXISTS sync_state (
+    project_id TEXT NOT NULL,
+    resource TEXT NOT NULL,
+    dump_last_modified TEXT,
+    synced_datetime TEXT NOT NULL,
+    PRIMARY KEY (project_id, resource)
+);
+
+CREATE TABLE IF NOT EXISTS task (
+    project_id TEXT NOT NULL,
+    task_id TEXT NOT NULL,
+    phase TEXT NOT NULL,
+    phase_stage INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    account_id TEXT,
+    updated_datetime TEXT,
+    task_json TEXT NOT NULL,
+    PRIMARY KEY (project_id, task_id)
+);
+CREATE INDEX IF NOT EXISTS task_phase_status ON task (project_id, phase, status);
+CREATE INDEX IF NOT EXISTS task_account_id ON task (project_id, account_id);
+
+CREATE TABLE IF NOT EXISTS task_input_data (
+    project_id TEXT NOT NULL,
+    task_id TEXT NOT NULL,
+    input_data_id TEXT NOT NULL,
+    PRIMARY KEY (project_id, task_id, input_data_id)
+);
+CREATE INDEX IF NOT EXISTS task_input_data_input_data_id ON task_input_data (project_id, input_data_id);
+
+CREATE TABLE IF NOT EXISTS input_data (
+    project_id TEXT NOT NULL,
+    input_data_id TEXT NOT NULL,
+    input_data_name TEXT NOT NULL,
+    updated_datetime TEXT,
+    input_data_json TEXT NOT NULL,
+    PRIMARY KEY (project_id, input_data_id)
+);
+CREATE INDEX IF NOT EXISTS input_data_input_data_name ON input_data (project_id, input_data_name);
+
+CREATE TABLE IF NOT EXISTS task_history (
+    project_id TEXT NOT NULL,
+    task_id TEXT NOT NULL,
+    task_history_id TEXT NOT NULL,
+    history_index INTEGER NOT NULL,
+    phase TEXT NOT NULL,
+    phase_stage INTEGER NOT NULL,
+    account_id TEXT,
+    started_datetime TEXT,
+    ended_datetime TEXT,
+    task_history_json TEXT NOT NULL,
+    PRIMARY KEY (project_id, task_id, history_index)
+);
+CREATE INDEX IF NOT EXISTS task_history_account_id ON task_history (project_id, account_id);
+
+CREATE TABLE IF NOT EXISTS comment (
+    project_id TEXT NOT NULL,
+    task_id TEXT NOT NULL,
+    input_data_id TEXT NOT NULL,
+    comment_id TEXT NOT NULL,
+    comment_type TEXT NOT NULL,
+    phase TEXT,
+    account_id TEXT,
+    created_datetime TEXT,
+    comment_json TEXT NOT NULL,
+    PRIMARY KEY (project_id, task_id, input_data_id, comment_id)
+);
+CREATE INDEX IF NOT EXISTS comment_comment_type ON comment (project_id, comment_type);
+
+CREATE TABLE IF NOT EXISTS annotation_count (
+    project_id TEXT NOT NULL,
+    task_id TEXT NOT NULL,
+    input_data_id TEXT NOT NULL,
+    label TEXT NOT NULL,
+    annotation_count INTEGER NOT NULL,
+    PRIMARY KEY (project_id, task_id, input_data_id, label)
+);
+CREATE INDEX IF NOT EXISTS annotation_count_label ON annotation_count (project_id, label);
+"""
+
+
+def _json_array(values: Collection[str]) -> str:
+    """
+    ``IN (SELECT value FROM json_each(?))`` に渡す値を返します。件数が多くてもバインド変数の上限に達しません。
+    """
+    return json.dumps(list(values))
+
+
+class ProjectMirror:
+    """
+    プロジェクトの全件ファイルの内容を、SQLiteのファイルに保存するクラス。
+
+    情報の種類ごとに、取り込んだ全件ファイルの ``Last-Modified`` を記録します。
+    タスク履歴イベントは ``TaskHistoryEventStore`` と同じテーブルに保存するので、新しいタスク履歴イベントだけを追加します。
+    それ以外の情報は、取り込むたびにプロジェクト単位で置き換えます。
+
+    Args:
+        mirror_file: SQLiteのファイルのパス
+
+    Examples:
+        with ProjectMirror(get_default_mirror_file()) as mirror:
+            tasks = mirror.get_tasks(project_id, task_ids=["task1"])
+    """
+
+    def __init__(self, mirror_file: Path) -> None:
+        mirror_file.parent.mkdir(exist_ok=True, parents=True)
+        self.mirror_file = mirror_file
+        self._connection = sqlite3.connect(mirror_file, timeout=300)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.executescript(_CREATE_TABLES_SQL)
+        self._connection.commit()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, exc_type: type[BaseException] | None, exc_value: BaseException | None, traceback: TracebackType | None) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def open_task_history_event_store(self) -> TaskHistoryEventStore:
+        """
+        ミラーと同じファイルに保存する ``TaskHistoryEventStore`` を開きます。
+        """
+        return TaskHistoryEventStore(self.mirror_file)
+
+    def get_dump_last_modified(self, project_id: str, resource: MirrorResource) -> str | None:
+        """
+        最後に取り込んだ全件ファイルの ``Last-Modified`` を返します。
+        """
+        row = self._connection.execute("SELECT dump_last_modified FROM sync_state WHERE project_id = ? AND resource = ?", (project_id, resource.value)).fetchone()
+        return row[0] if row is not None else None
+
+    def is_synced(self, project_id: str, resource: MirrorResource) -> bool:
+        row = self._connection.execute("SELECT 1 FROM sync_state WHERE project_id = ? AND resource = ?", (project_id, resource.value)).fetchone()
+        return row is not None
+
+    def mark_synced(self, project_id: str, resource: MirrorResource, *, dump_last_modified: str | None) -> None:
+        """
+        全件ファイルを取り込んだことを記録します。
+        """
+        with self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO sync_state (project_id, resource, dump_last_modified, synced_datetime) VALUES (?, ?, ?, ?)",
+                (project_id, resource.value, dump_last_modified, annofabapi.utils.str_now()),
+            )
+
+    def _validate_synced(self, project_id: str, resource: MirrorResource) -> None:
+        if not self.is_synced(project_id, resource):
+            raise MirrorNotSyncedError(project_id, resource)
+
+    def _replace(self, project_id: str, resource: MirrorResource, rows_by_table: dict[str, list[tuple[Any, ...]]], *, dump_last_modified: str | None) -> None:
+        """
+        プロジェクトの行を、1個のトランザクションで置き換えます。
+        """
+        with self._connection:
+            for table, rows in rows_by_table.items():
+                self._connection.execute(f"DELETE FROM {table} WHERE project_id = ?", (project_id,))
+                if len(rows) > 0:
+                    placeholders = ", ".join(["?"] * len(rows[0]))
+                    self._connection.executemany(f"INSERT OR REPLACE INTO {table} VALUES ({placeholders})", rows)
+            self._connection.execute(
+                "INSERT OR REPLACE INTO sync_state (project_id, resource, dump_last_modified, synced_datetime) VALUES (?, ?, ?, ?)",
+                (project_id, resource.value, dump_last_modified, annofabapi.utils.str_now()),
+            )
+
+    def replace_tasks(self, project_id: str, tasks: Iterable[dict[str, Any]], *, dump_last_modified: str | None = None) -> None:
+        task_rows = []
+        task_input_data_rows: list[tuple[str, str, str]] = []
+        for task in tasks:
+            task_id = task["task_id"]
+            task_rows.append((project_id, task_id, task["phase"], task["phase_stage"], task["status"], task["account_id"], task["updated_datetime"], json.dumps(task, ensure_ascii=False)))
+            task_input_data_rows.extend((project_id, task_id, input_data_id) for input_data_id in task["input_data_id_list"])
+        self._replace(project_id, MirrorResource.TASK, {"task": task_rows, "task_input_data": task_input_data_rows}, dump_last_modified=dump_last_modified)
+
+    def replace_input_data(self, project_id: str, input_data_list: Iterable[dict[str, Any]], *, dump_last_modified: str | None = None) -> None:
+        rows = [(project_id, input_data["input_data_id"], input_data["input_data_name"], input_data["updated_datetime"], json.dumps(input_data, ensure_ascii=False)) for input_data in input_data_list]
+        self._replace(project_id, MirrorResource.INPUT_DATA, {"input_data": rows}, dump_last_modified=dump_last_modified)
+
+    def replace_task_histories(self, project_id: str, task_history_dict: dict[str, list[dict[str, Any]]], *, dump_last_modified: str | None = None) -> None:
+        """
+        Args:
+            task_history_dict: keyがtask_id, valueがタスク履歴のlistであるdict。タスク履歴全件ファイルの内容
+        """
+        rows = [
+            (
+                project_id,
+                task_id,
+                history["task_history_id"],
+                index,
+                history["phase"],
+                history["phase_stage"],
+                history["account_id"],
+                history["started_datetime"],
+                history["ended_datetime"],
+                json.dumps(history, ensure_ascii=False),
+            )
+            for task_id, histories in task_history_dict.items()
+            for index, history in enumerate(histories)
+        ]
+        self._replace(project_id, MirrorResource.TASK_HISTORY, {"task_history": rows}, dump_last_modified=dump_last_modified)
+
+    def replace_comments(self, project_id: str, comments: Iterable[dict[str, Any]], *, dump_last_modified: str | None = None) -> None:
+        rows = [
+            (
+                project_id,
+                comment["task_id"],
+                comment["input_data_id"],
+                comment["comment_id"],
+                comment["comment_type"],
+                comment.get("phase"),
+                comment.get("account_id"),
+                comment.get("created_datetime"),
+                json.dumps(comment, ensure_ascii=False),
+            )
+            for comment in comments
+        ]
+        self._replace(project_id, MirrorResource.COMMENT, {"comment": rows}, dump_last_modified=dump_last_modified)
+
+    def replace_annotation_counts(self, project_id: str, annotation_counts: Iterable[tuple[str, str, str, int]], *, dump_last_modified: str | None = None) -> None:
+        """
+        Args:
+            annotation_counts: ``(task_id, input_data_id, label, annotation_count)`` の一覧
+        """
+        rows = [(project_id, task_id, input_data_id, label, count) for task_id, input_data_id, label, count in annotation_counts]
+        self._replace(project_id, MirrorResource.ANNOTATION, {"annotation_count": rows}, dump_last_modified=dump_last_modified)
+
+    def get_tasks(self, project_id: str, *, task_ids: Collection[str] | None = None) -> list[dict[str, Any]]:
+        """
+        タスクの一覧を、task_idの昇順で取得します。
+
+        Raises:
+            MirrorNotSyncedError: タスクが同期されていない場合
+        """
+        self._validate_synced(project_id, MirrorResource.TASK)
+        sql = "SELECT task_json FROM task WHERE project_id = ?"
+        params: list[Any] = [project_id]
+        if task_ids is not None:
+            sql += " AND task_id IN (SELECT value FROM json_each(?))"
+            params.append(_json_array(task_ids))
+        sql += " ORDER BY task_id"
+        return [json.loads(task_json) for (task_json,) in self._connection.execute(sql, params)]
+
+    def get_input_data_list(self, project_id: str, *, input_data_ids: Collection[str] | None = None) -> list[dict[str, Any]]:
+        """
+        入力データの一覧を、input_data_idの昇順で取得します。
+
+        Raises:
+            MirrorNotSyncedError: 入力データが同期されていない場合
+        """
+        self._validate_synced(project_id, MirrorResource.INPUT_DATA)
+        sql = "SELECT input_data_json FROM input_data WHERE project_id = ?"
+        params: list[Any] = [project_id]
+        if input_data_ids is not None:
+            sql += " AND input_data_id IN (SELECT value FROM json_each(?))"
+            params.append(_json_array(input_data_ids))
+        sql += " ORDER BY input_data_id"
+        return [json.loads(input_data_json) for (input_data_json,) in self._connection.execute(sql, params)]
+
+    def get_task_ids_by_input_data_id(self, project_id: str, *, input_data_ids: Collection[str] | None = None) -> dict[str, list[str]]:
+        """
+        入力データを参照しているタスクのtask_idを返します。
+
+        Returns:
+            keyがinput_data_id, valueがtask_idのlistであるdict。どのタスクからも参照されていない入力データは含みません。
+
+        Raises:
+            MirrorNotSyncedError: タスクが同期されていない場合
+        """
+        self._validate_synced(project_id, MirrorResource.TASK)
+        sql = "SELECT input_data_id, task_id FROM task_input_data WHERE project_id = ?"
+        params: list[Any] = [project_id]
+        if input_data_ids is not None:
+            sql += " AND input_data_id IN (SELECT value FROM json_each(?))"
+            params.append(_json_array(input_data_ids))
+        sql += " ORDER BY input_data_id, task_id"
+        result: dict[str, list[str]] = defaultdict(list)
+        for input_data_id, task_id in self._connection.execute(sql, params):
+            result[input_data_id].append(task_id)
+        return result
+
+    def get_task_history_dict(self, project_id: str, *, task_ids: Collection[str] | None = None) -> dict[str, list[dict[str, Any]]]:
+        """
+        タスク履歴を、タスク履歴全件ファイルと同じ形式で取得します。
+
+        Returns:
+            keyがtask_id, valueがタスク履歴のlistであるdict
+
+        Raises:
+            MirrorNotSyncedError: タスク履歴が同期されていない場合
+        """
+        self._validate_synced(project_id, MirrorResource.TASK_HISTORY)
+        sql = "SELECT task_id, task_history_json FROM task_history WHERE project_id = ?"
+        params: list[Any] = [project_id]
+        if task_ids is not None:
+            sql += " AND task_id IN (SELECT value FROM json_each(?))"
+            params.append(_json_array(task_ids))
+        sql += " ORDER BY task_id, history_index"
+        result: dict[str, list[dict[str, Any]]] = defaultdict(list)
+        for task_id, task_history_json in self._connection.execute(sql, params):
+            result[task_id].append(json.loads(task_history_json))
+        return dict(result)
+
+    def get_comments(self, project_id: str, *, task_ids: Collection[str] | None = None, comment_type: str | None = None) -> list[dict[str, Any]]:
+        """
+        コメントの一覧を取得します。
+
+        Raises:
+            MirrorNotSyncedError: コメントが同期されていない場合
+        """
+        self._validate_synced(project_id, MirrorResource.COMMENT)
+        sql = "SELECT comment_json FROM comment WHERE project_id = ?"
+        params: list[Any] = [project_id]
+        if task_ids is not None:
+            sql += " AND task_id IN (SELECT value FROM json_each(?))"
+            params.append(_json_array(task_ids))
+        if comment_type is not None:
+            sql += " AND comment_type = ?"
+            params.append(comment_type)
+        sql += " ORDER BY task_id, input_data_id, created_datetime"
+        return [json.loads(comment_json) for (comment_json,) in self._connection.execute(sql, params)]
+
+    def get_annotation_counts(self, project_id: str, *, task_ids: Collection[str] | None = None) -> list[dict[str, Any]]:
+        """
+        タスク、入力データ、ラベルごとのアノテーション数を取得します。
+
+        Raises:
+            MirrorNotSyncedError: アノテーション数が同期されていない場合
+        """
+        self._validate_synced(project_id, MirrorResource.ANNOTATION)
+        sql = "SELECT task_id, input_data_id, label, annotation_count FROM annotation_count WHERE project_id = ?"
+        params: list[Any] = [project_id]
+        if task_ids is not None:
+            sql += " AND task_id IN (SELECT value FROM json_each(?))"
+            params.append(_json_array(task_ids))
+        sql += " ORDER BY task_id, input_data_id, label"
+        return [{"task_id": task_id, "input_data_id": input_data_id, "label": label, "annotation_count": count} for task_id, input_data_id, label, count in self._connection.execute(sql, params)]
+
+
+def open_project_mirror(*, enabled: bool) -> AbstractContextManager[ProjectMirror | None]:
+    """
+    コマンドライン引数 ``--from_mirror`` に対応するミラーを開きます。
+
+    Args:
+        enabled: Falseの場合はミラーを利用しないので、 ``None`` を返すcontext managerを返します。
+    """
+    if not enabled:
+        return contextlib.nullcontext()
+    mirror_file = get_default_mirror_file()
+    logger.debug(f"ミラー'{mirror_file}'を参照します。")
+    return ProjectMirror(mirror_file)
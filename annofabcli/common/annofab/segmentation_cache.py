@@ -0,0 +1,342 @@
+"""
+塗りつぶし画像の面積や外接矩形（統計情報）を、永続的にキャッシュするモジュール
+
+キャッシュのキーは、塗りつぶし画像ファイルのCRC32とファイルサイズです。
+アノテーションZIPの場合、CRC32とファイルサイズはZIPのセントラルディレクトリ（ ``ZipInfo`` ）に格納されているので、
+画像をデコードせずにキャッシュを参照できます。
+"""
+
+from __future__ import annotations
+
+import contextlib
+import io
+import logging
+import sqlite3
+import time
+import zipfile
+import zlib
+from contextlib import AbstractContextManager
+from dataclasses import dataclass
+from pathlib import Path, PurePosixPath
+from types import TracebackType
+from typing import IO, Self
+
+import numpy
+from annofabapi.exceptions import AnnotationOuterFileNotFoundError
+from annofabapi.parser import SimpleAnnotationParser
+from annofabapi.segmentation import read_binary_image
+
+from annofabcli.common.utils import get_cache_dir
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_MAX_SIZE = 1024**3
+"""キャッシュファイルの最大サイズ[byte]の目安"""
+
+SegmentationFileKey = tuple[int, int]
+"""塗りつぶし画像ファイルを識別するキー。(CRC32, ファイルサイズ)"""
+
+_ENTRY_OVERHEAD_SIZE = 64
+"""キャッシュの1エントリあたりの、run length以外のサイズ[byte]の概算値"""
+
+
+def get_default_cache_file() -> Path:
+    return get_cache_dir() / "segmentation_stats.sqlite3"
+
+
+def _encode_run_length(array: numpy.ndarray) -> numpy.ndarray:
+    """
+    bool配列を行優先で1次元にして、run lengthに変換します。最初の要素はFalseが連続する長さです。
+    """
+    flat = array.ravel()
+    change_indices = numpy.flatnonzero(flat[1:] != flat[:-1]) + 1
+    boundaries = numpy.concatenate(([0], change_indices, [len(flat)]))
+    run_length = numpy.diff(boundaries).astype(numpy.uint32)
+    if len(flat) > 0 and flat[0]:
+        run_length = numpy.concatenate(([0], run_length)).astype(numpy.uint32)
+    return run_length
+
+
+def _decode_run_length(run_length: numpy.ndarray, shape: tuple[int, int]) -> numpy.ndarray:
+    values = numpy.arange(len(run_length)) % 2 == 1
+    return numpy.repeat(values, run_length).reshape(shape)
+
+
+@dataclass(frozen=True)
+class SegmentationStats:
+    """
+    塗りつぶし画像の統計情報
+    """
+
+    width: int
+    """画像の幅"""
+    height: int
+    """画像の高さ"""
+    area: int
+    """塗りつぶし領域の面積"""
+    bounding_box: tuple[int, int, int, int] | None
+    """塗りつぶし領域の外接矩形 ``(min_x, min_y, max_x, max_y)`` 。面積が0の場合はNone"""
+    run_length: numpy.ndarray | None = None
+    """外接矩形内の塗りつぶし領域をrun lengthで表したもの。最初の要素は塗られていない部分の長さです。"""
+
+    @classmethod
+    def from_binary_image(cls, binary_image_array: numpy.ndarray, *, include_run_length: bool = False) -> SegmentationStats:
+        height, width = binary_image_array.shape
+        area = int(numpy.count_nonzero(binary_image_array))
+        if area == 0:
+            empty_run_length = numpy.array([], dtype=numpy.uint32) if include_run_length else None
+            return cls(width=width, height=height, area=area, bounding_box=None, run_length=empty_run_length)
+
+        rows = numpy.any(binary_image_array, axis=1)
+        cols = numpy.any(binary_image_array, axis=0)
+        min_y = int(numpy.argmax(rows))
+        max_y = int(len(rows) - 1 - numpy.argmax(rows[::-1]))
+        min_x = int(numpy.argmax(cols))
+        max_x = int(len(cols) - 1 - numpy.argmax(cols[::-1]))
+        run_length = _encode_run_length(binary_image_array[min_y : max_y + 1, min_x : max_x + 1]) if include_run_length else None
+        return cls(width=width, height=height, area=area, bounding_box=(min_x, min_y, max_x, max_y), run_length=run_length)
+
+    def to_bounding_box_dict(self) -> dict[str, dict[str, int]] | None:
+        if self.bounding_box is None:
+            return None
+        min_x, min_y, max_x, max_y = self.bounding_box
+        return {"left_top": {"x": min_x, "y": min_y}, "right_bottom": {"x": max_x, "y": max_y}}
+
+    def decode_cropped_mask(self) -> numpy.ndarray | None:
+        """
+        外接矩形内の塗りつぶし領域を、bool配列で返します。
+
+        Returns:
+            外接矩形内の塗りつぶし領域。面積が0の場合はNone
+
+        Raises:
+            ValueError: run lengthを保持していない場合
+        """
+        if self.run_length is None:
+            raise ValueError("run lengthを保持していません。")
+        if self.bounding_box is None:
+            return None
+        min_x, min_y, max_x, max_y = self.bounding_box
+        return _decode_run_length(self.run_length, (max_y - min_y + 1, max_x - min_x + 1))
+
+
+class SegmentationStatsCache:
+    """
+    塗りつぶし画像の統計情報を、SQLiteのファイルに保存するキャッシュ。
+
+    キャッシュのサイズが ``max_size`` を超えたら、最後に参照した日時が古いエントリから削除します。
+
+    Args:
+        cache_file: キャッシュファイルのパス
+        max_size: キャッシュの最大サイズ[byte]の目安
+
+    Examples:
+        with SegmentationStatsCache(get_default_cache_file()) as cache:
+            stats = cache.get(key)
+    """
+
+    _COMMIT_INTERVAL = 1000
+    """何件書き込むごとにコミットするか"""
+
+    def __init__(self, cache_file: Path, *, max_size: int = DEFAULT_CACHE_MAX_SIZE) -> None:
+        cache_file.parent.mkdir(exist_ok=True, parents=True)
+        self.cache_file = cache_file
+        self.max_size = max_size
+        self._connection = sqlite3.connect(cache_file, timeout=30)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS segmentation_stats (
+                crc32 INTEGER NOT NULL,
+                file_size INTEGER NOT NULL,
+                width INTEGER NOT NULL,
+                height INTEGER NOT NULL,
+                area INTEGER NOT NULL,
+                min_x INTEGER,
+                min_y INTEGER,
+                max_x INTEGER,
+                max_y INTEGER,
+                run_length BLOB,
+                entry_size INTEGER NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (crc32, file_size)
+            )
+            """
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS segmentation_stats_last_used ON segmentation_stats (last_used)")
+        self._total_size: int = self._connection.execute("SELECT COALESCE(SUM(entry_size), 0) FROM segmentation_stats").fetchone()[0]
+        self._used_keys: set[SegmentationFileKey] = set()
+        self._uncommitted_count = 0
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, exc_type: type[BaseException] | None, exc_value: BaseException | None, traceback: TracebackType | None) -> None:
+        self.close()
+
+    def get(self, key: SegmentationFileKey, *, require_run_length: bool = False) -> SegmentationStats | None:
+        """
+        キャッシュから統計情報を取得します。
+
+        Args:
+            key: 塗りつぶし画像ファイルのキー
+            require_run_length: Trueの場合、run lengthを保持していないエントリは存在しないものとみなします。
+        """
+        row = self._connection.execute(
+            "SELECT width, height, area, min_x, min_y, max_x, max_y, run_length FROM segmentation_stats WHERE crc32 = ? AND file_size = ?",
+            key,
+        ).fetchone()
+        if row is None:
+            return None
+
+        width, height, area, min_x, min_y, max_x, max_y, run_length = row
+        if require_run_length and run_length is None:
+            return None
+
+        self._used_keys.add(key)
+        return SegmentationStats(
+            width=width,
+            height=height,
+            area=area,
+            bounding_box=(min_x, min_y, max_x, max_y) if min_x is not None else None,
+            run_length=numpy.frombuffer(run_length, dtype=numpy.uint32) if run_length is not None else None,
+        )
+
+    def put(self, key: SegmentationFileKey, stats: SegmentationStats) -> None:
+        run_length = stats.run_length.astype(numpy.uint32).tobytes() if stats.run_length is not None else None
+        entry_size = _ENTRY_OVERHEAD_SIZE + (len(run_length) if run_length is not None else 0)
+        bounding_box = stats.bounding_box if stats.bounding_box is not None else (None, None, None, None)
+        old_row = self._connection.execute("SELECT entry_size FROM segmentation_stats WHERE crc32 = ? AND file_size = ?", key).fetchone()
+        self._connection.execute(
+            "INSERT OR REPLACE INTO segmentation_stats VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (*key, stats.width, stats.height, stats.area, *bounding_box, run_length, entry_size, time.time()),
+        )
+        self._total_size += entry_size - (old_row[0] if old_row is not None else 0)
+
+        self._uncommitted_count += 1
+        if self._uncommitted_count >= self._COMMIT_INTERVAL:
+            self._commit()
+
+    def _evict(self) -> None:
+        """
+        キャッシュのサイズが最大サイズの9割以下になるまで、最後に参照した日時が古いエントリから削除します。
+        """
+        if self._total_size <= self.max_size:
+            return
+
+        target_size = self.max_size * 0.9
+        deleted_count = 0
+        rows = self._connection.execute("SELECT crc32, file_size, entry_size FROM segmentation_stats ORDER BY last_used").fetchall()
+        deleted_keys = []
+        for crc32, file_size, entry_size in rows:
+            if self._total_size <= target_size:
+                break
+            deleted_keys.append((crc32, file_size))
+            self._total_size -= entry_size
+            deleted_count += 1
+
+        self._connection.executemany("DELETE FROM segmentation_stats WHERE crc32 = ? AND file_size = ?", deleted_keys)
+        logger.debug(f"塗りつぶし画像の統計情報のキャッシュから、{deleted_count}件を削除しました。 :: cache_file='{self.cache_file}'")
+
+    def _commit(self) -> None:
+        if len(self._used_keys) > 0:
+            now = time.time()
+            self._connection.executemany("UPDATE segmentation_stats SET last_used = ? WHERE crc32 = ? AND file_size = ?", [(now, *key) for key in self._used_keys])
+            self._used_keys.clear()
+        self._evict()
+        self._connection.commit()
+        self._uncommitted_count = 0
+
+    def close(self) -> None:
+        self._commit()
+        self._connection.close()
+
+
+class SegmentationStatsReader:
+    """
+    アノテーションZIPまたはそれを展開したディレクトリから、塗りつぶし画像の統計情報を読み込みます。
+    キャッシュを指定した場合は、キャッシュに存在する画像をデコードしません。
+
+    Args:
+        annotation_path: アノテーションZIPまたはそれを展開したディレクトリのパス
+        cache: 統計情報のキャッシュ。Noneならキャッシュを利用しません。
+    """
+
+    def __init__(self, annotation_path: Path, *, cache: SegmentationStatsCache | None = None) -> None:
+        self.annotation_path = annotation_path
+        self.cache = cache
+        self.cache_hit_count = 0
+        self.decoded_count = 0
+        self._zip_info_by_name: dict[str, zipfile.ZipInfo] | None = None
+
+    def _get_zip_info(self, outer_file_path: str) -> zipfile.ZipInfo | None:
+        if self._zip_info_by_name is None:
+            with zipfile.ZipFile(self.annotation_path) as zip_file:
+                self._zip_info_by_name = {info.filename: info for info in zip_file.infolist()}
+        return self._zip_info_by_name.get(outer_file_path)
+
+    def _get_cached_stats(self, key: SegmentationFileKey, *, include_run_length: bool) -> SegmentationStats | None:
+        if self.cache is None:
+            return None
+        stats = self.cache.get(key, require_run_length=include_run_length)
+        if stats is not None:
+            self.cache_hit_count += 1
+        return stats
+
+    def _decode(self, key: SegmentationFileKey, fp: IO[bytes], *, include_run_length: bool) -> SegmentationStats:
+        stats = SegmentationStats.from_binary_image(read_binary_image(fp), include_run_length=include_run_length)
+        self.decoded_count += 1
+        if self.cache is not None:
+            self.cache.put(key, stats)
+        return stats
+
+    def read(self, parser: SimpleAnnotationParser, data_uri: str, *, include_run_length: bool = False) -> SegmentationStats:
+        """
+        塗りつぶし画像の統計情報を読み込みます。
+
+        Args:
+            parser: 塗りつぶし画像を参照しているアノテーションJSONのparser
+            data_uri: 塗りつぶし画像を参照するURI
+            include_run_length: 外接矩形内の塗りつぶし領域のrun lengthも取得するかどうか
+
+        Raises:
+            AnnotationOuterFileNotFoundError: 塗りつぶし画像が存在しない場合
+        """
+        if self.annotation_path.is_dir():
+            outer_file = Path(parser.json_file_path).with_suffix("") / data_uri
+            if not outer_file.exists():
+                raise AnnotationOuterFileNotFoundError(str(outer_file))
+            # ディレクトリの場合はCRC32を計算する必要があるが、PNGをデコードするより十分に速い
+            content = outer_file.read_bytes()
+            key = (zlib.crc32(content), len(content))
+            stats = self._get_cached_stats(key, include_run_length=include_run_length)
+            if stats is not None:
+                return stats
+            return self._decode(key, io.BytesIO(content), include_run_length=include_run_length)
+
+        zip_info = self._get_zip_info(str(PurePosixPath(parser.json_file_path).with_suffix("") / data_uri))
+        if zip_info is None:
+            # 存在しないファイルなので、 `open_outer_file` で `AnnotationOuterFileNotFoundError` が発生する
+            with parser.open_outer_file(data_uri) as f:
+                return SegmentationStats.from_binary_image(read_binary_image(f), include_run_length=include_run_length)
+
+        key = (zip_info.CRC, zip_info.file_size)
+        stats = self._get_cached_stats(key, include_run_length=include_run_length)
+        if stats is not None:
+            return stats
+        with parser.open_outer_file(data_uri) as f:
+            return self._decode(key, f, include_run_length=include_run_length)
+
+
+def open_segmentation_stats_cache(*, enabled: bool) -> AbstractContextManager[SegmentationStatsCache | None]:
+    """
+    コマンドライン引数 ``--segmentation_cache`` に対応するキャッシュを開きます。
+
+    Args:
+        enabled: Falseの場合はキャッシュを利用しないので、 ``None`` を返すcontext managerを返します。
+    """
+    if not enabled:
+        return contextlib.nullcontext()
+    cache_file = get_default_cache_file()
+    logger.debug(f"塗りつぶし画像の統計情報のキャッシュ'{cache_file}'を利用します。")
+    return SegmentationStatsCache(cache_file)
@@ -0,0 +1,241 @@
+"""
+タスク履歴イベントを、SQLiteのファイルに蓄積するモジュール
+
+タスク履歴イベントは追加されるだけで、更新も削除もされません。
+そのため、前回取り込んだタスク履歴イベントより新しいものだけを追加すれば、タスク履歴イベント全件ファイルと同じ内容を保持できます。
+蓄積したタスク履歴イベントは、タスク、ユーザ、日時の範囲で絞り込んで取得できます。
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import datetime
+import json
+import logging
+import sqlite3
+import tempfile
+from collections.abc import Collection, Iterable
+from contextlib import AbstractContextManager
+from pathlib import Path
+from types import TracebackType
+from typing import Any, Self
+
+import annofabapi
+
+from annofabcli.common.download import DownloadingFile
+from annofabcli.common.exceptions import DownloadingFileNotFoundError
+from annofabcli.common.utils import get_cache_dir
+
+logger = logging.getLogger(__name__)
+
+
+def get_default_store_file() -> Path:
+    return get_cache_dir() / "task_history_event.sqlite3"
+
+
+class TaskHistoryEventStore:
+    """
+    タスク履歴イベントを、SQLiteのファイルに蓄積するクラス。
+
+    タスク履歴イベント全件ファイルの ``Last-Modified`` を記録しておき、全件ファイルが更新されていなければダウンロードしません。
+
+    Args:
+        store_file: SQLiteのファイルのパス
+
+    Examples:
+        with TaskHistoryEventStore(get_default_store_file()) as store:
+            store.update(service, project_id)
+            events = store.query(project_id, task_ids=["task1"])
+    """
+
+    def __init__(self, store_file: Path) -> None:
+        store_file.parent.mkdir(exist_ok=True, parents=True)
+        self.store_file = store_file
+        # 複数のプロジェクトを並列で取り込むと書き込みのロックを待つ時間が長くなるので、タイムアウトを長めにする
+        self._connection = sqlite3.connect(store_file, timeout=300)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS task_history_event (
+                project_id TEXT NOT NULL,
+                task_history_id TEXT NOT NULL,
+                task_id TEXT NOT NULL,
+                account_id TEXT,
+                created_datetime TEXT NOT NULL,
+                event_json TEXT NOT NULL,
+                PRIMARY KEY (project_id, task_history_id)
+            )
+            """
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS task_history_event_task_id ON task_history_event (project_id, task_id, created_datetime)")
+        self._connection.execute("CREATE INDEX IF NOT EXISTS task_history_event_account_id ON task_history_event (project_id, account_id, created_datetime)")
+        self._connection.execute("CREATE INDEX IF NOT EXISTS task_history_event_created_datetime ON task_history_event (project_id, created_datetime)")
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS ingestion_state (
+                project_id TEXT PRIMARY KEY,
+                last_created_datetime TEXT,
+                dump_last_modified TEXT
+            )
+            """
+        )
+        self._connection.commit()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, exc_type: type[BaseException] | None, exc_value: BaseException | None, traceback: TracebackType | None) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def get_dump_last_modified(self, project_id: str) -> str | None:
+        """
+        最後に取り込んだタスク履歴イベント全件ファイルの ``Last-Modified`` を返します。取り込んだことがなければNoneを返します。
+        """
+        row = self._connection.execute("SELECT dump_last_modified FROM ingestion_state WHERE project_id = ?", (project_id,)).fetchone()
+        return row[0] if row is not None else None
+
+    def ingest(self, project_id: str, task_history_events: Iterable[dict[str, Any]], *, dump_last_modified: str | None = None) -> int:
+        """
+        タスク履歴イベントを取り込みます。
+        前回取り込んだタスク履歴イベントより ``created_datetime`` が古いタスク履歴イベントは、取り込み済みとみなして読み飛ばします。
+
+        Args:
+            project_id: プロジェクトID
+            task_history_events: タスク履歴イベントの一覧。通常はタスク履歴イベント全件ファイルの内容
+            dump_last_modified: 取り込んだタスク履歴イベント全件ファイルの ``Last-Modified``
+
+        Returns:
+            新しく追加したタスク履歴イベントの件数
+        """
+        row = self._connection.execute("SELECT last_created_datetime FROM ingestion_state WHERE project_id = ?", (project_id,)).fetchone()
+        last_created_datetime: str | None = row[0] if row is not None else None
+
+        # 同じ日時のタスク履歴イベントが、前回の取り込み後に追加されている可能性があるので、同じ日時のものも取り込む（重複は主キーで除外する）
+        new_rows = [
+            (project_id, event["task_history_id"], event["task_id"], event["account_id"], event["created_datetime"], json.dumps(event, ensure_ascii=False))
+            for event in task_history_events
+            if last_created_datetime is None or event["created_datetime"] >= last_created_datetime
+        ]
+        with self._connection:
+            cursor = self._connection.executemany(
+                "INSERT OR IGNORE INTO task_history_event (project_id, task_history_id, task_id, account_id, created_datetime, event_json) VALUES (?, ?, ?, ?, ?, ?)",
+                new_rows,
+            )
+            added_count = cursor.rowcount
+            self._connection.execute(
+                """
+                INSERT INTO ingestion_state (project_id, last_created_datetime, dump_last_modified)
+                VALUES (?, (SELECT MAX(created_datetime) FROM task_history_event WHERE project_id = ?), ?)
+                ON CONFLICT (project_id) DO UPDATE SET
+                    last_created_datetime = excluded.last_created_datetime,
+                    dump_last_modified = COALESCE(excluded.dump_last_modified, dump_last_modified)
+                """,
+                (project_id, project_id, dump_last_modified),
+            )
+        return added_count
+
+    def query(
+        self,
+        project_id: str,
+        *,
+        task_ids: Collection[str] | None = None,
+        account_ids: Collection[str] | None = None,
+        start_date: str | None = None,
+        end_date: str | None = None,
+    ) -> list[dict[str, Any]]:
+        """
+        タスク履歴イベントを、 ``created_datetime`` の昇順で取得します。
+
+        Args:
+            project_id: プロジェクトID
+            task_ids: 指定した場合、これらのタスクのタスク履歴イベントだけを取得します。
+            account_ids: 指定した場合、これらのユーザのタスク履歴イベントだけを取得します。
+            start_date: 指定した場合、この日（YYYY-MM-DD）以降に作成されたタスク履歴イベントだけを取得します。
+            end_date: 指定した場合、この日（YYYY-MM-DD）以前に作成されたタスク履歴イベントだけを取得します。
+        """
+        conditions = ["project_id = ?"]
+        params: list[Any] = [project_id]
+        if task_ids is not None:
+            # 件数が多くてもバインド変数の上限に達しないように、JSON配列として1個のバインド変数で渡す
+            conditions.append("task_id IN (SELECT value FROM json_each(?))")
+            params.append(json.dumps(list(task_ids)))
+        if account_ids is not None:
+            conditions.append("account_id IN (SELECT value FROM json_each(?))")
+            params.append(json.dumps(list(account_ids)))
+        if start_date is not None:
+            conditions.append("created_datetime >= ?")
+            params.append(start_date)
+        if end_date is not None:
+            # created_datetimeはタイムゾーン付きのISO 8601形式の文字列なので、翌日の日付より小さいもので絞り込む
+            conditions.append("created_datetime < ?")
+            params.append((datetime.date.fromisoformat(end_date) + datetime.timedelta(days=1)).isoformat())
+
+        sql = f"SELECT event_json FROM task_history_event WHERE {' AND '.join(conditions)} ORDER BY created_datetime, task_history_id"
+        return [json.loads(event_json) for (event_json,) in self._connection.execute(sql, params)]
+
+    def update(self, service: annofabapi.Resource, project_id: str, *, force: bool = False) -> int | None:
+        """
+        タスク履歴イベント全件ファイルから、新しいタスク履歴イベントを取り込みます。
+        タスク履歴イベント全件ファイルが前回取り込んだときから更新されていなければ、ダウンロードしません。
+
+        Args:
+            force: Trueなら、タスク履歴イベント全件ファイルが更新されていなくてもダウンロードして取り込みます。
+
+        Returns:
+            新しく追加したタスク履歴イベントの件数。全件ファイルを取り込まなかった場合はNone
+        """
+        downloading_obj = DownloadingFile(service)
+        # `NamedTemporaryFile`を使わない理由: Windowsで`PermissionError`が発生するため
+        with tempfile.TemporaryDirectory() as str_temp_dir:
+            try:
+                # 全件ファイルが存在しない場合、更新日時はNoneになり、ダウンロード時に`DownloadingFileNotFoundError`が発生する
+                last_modified = downloading_obj.get_task_history_event_json_last_modified(project_id)
+                str_last_modified = last_modified.isoformat() if last_modified is not None else None
+                if not force and str_last_modified is not None and str_last_modified == self.get_dump_last_modified(project_id):
+                    logger.debug(f"project_id='{project_id}' :: タスク履歴イベント全件ファイル（Last-Modified='{str_last_modified}'）は取り込み済みなので、ダウンロードしません。")
+                    return None
+                json_path = downloading_obj.download_task_history_event_json_to_dir(project_id, Path(str_temp_dir))
+            except DownloadingFileNotFoundError:
+                # プロジェクトを作成した日だと、タスク履歴イベント全件ファイルが作成されていない
+                logger.warning(f"project_id='{project_id}' :: タスク履歴イベント全件ファイルが存在しないため、タスク履歴イベントを取り込みませんでした。")
+                return None
+            with json_path.open(encoding="utf-8") as f:
+                task_history_events = json.load(f)
+
+        added_count = self.ingest(project_id, task_history_events, dump_last_modified=str_last_modified)
+        logger.info(f"project_id='{project_id}' :: {added_count} 件のタスク履歴イベントを'{self.store_file}'に追加しました。")
+        return added_count
+
+
+def open_task_history_event_store(*, enabled: bool) -> AbstractContextManager[TaskHistoryEventStore | None]:
+    """
+    コマンドライン引数 ``--event_store`` に対応するストアを開きます。
+
+    Args:
+        enabled: Falseの場合はストアを利用しないので、 ``None`` を返すcontext managerを返します。
+    """
+    if not enabled:
+        return contextlib.nullcontext()
+    store_file = get_default_store_file()
+    logger.debug(f"タスク履歴イベントのストア'{store_file}'を利用します。")
+    return TaskHistoryEventStore(store_file)
+
+
+def add_event_store_argument(parser: argparse.ArgumentParser, *, has_task_history_event_json_argument: bool = True) -> None:
+    """
+    ``--event_store`` 引数を追加します。
+
+    Args:
+        has_task_history_event_json_argument: コマンドに ``--task_history_event_json`` 引数がある場合はTrue
+    """
+    help_message = (
+        "タスク履歴イベントを、キャッシュディレクトリ（ ``$XDG_CACHE_HOME/annofabcli`` ）のSQLiteファイルに蓄積して再利用します。"
+        "タスク履歴イベント全件ファイルが更新されていればダウンロードして、新しいタスク履歴イベントだけを追加します。"
+    )
+    if has_task_history_event_json_argument:
+        help_message += "``--task_history_event_json`` を指定した場合は利用しません。"
+    parser.add_argument("--event_store", action="store_true", help=help_message)
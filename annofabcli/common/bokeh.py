@@ -1,12 +1,50 @@
 from __future__ import annotations
 
+import base64
+import gzip
 import json
+import logging
 import math
 from collections.abc import Sequence
+from pathlib import Path
 from typing import Any
 
-from bokeh.models import LayoutDOM
+import bokeh.plotting
+import numpy
+from bokeh.core.json_encoder import serialize_json
+from bokeh.core.templates import FILE, MACROS
+from bokeh.models import ColumnDataSource, LayoutDOM
+from bokeh.models.ui import UIElement
 from bokeh.models.widgets.markups import PreText
+from bokeh.resources import CDN
+from bokeh.util.serialization import make_globally_unique_css_safe_id
+
+# 以下はbokehの非公開APIなので、bokehのバージョンによっては存在しない。bokeh 3.9で動作を確認している。
+# 存在しない場合は、グラフのデータを圧縮せずにHTMLファイルを出力する。
+try:
+    from bokeh.embed.bundle import bundle_for_objs_and_resources
+    from bokeh.embed.util import OutputDocumentFor, standalone_docs_json_and_render_items
+    from bokeh.embed.wrappers import wrap_in_script_tag
+
+    _CAN_COMPRESS_HTML = True
+except ImportError:
+    _CAN_COMPRESS_HTML = False
+
+logger = logging.getLogger(__name__)
+
+_DECOMPRESSING_SCRIPT = """
+(async () => {
+  const binary = atob(document.getElementById("%(payload_id)s").textContent.trim());
+  const bytes = new Uint8Array(binary.length);
+  for (let i = 0; i < binary.length; i++) {
+    bytes[i] = binary.charCodeAt(i);
+  }
+  const stream = new Blob([bytes]).stream().pipeThrough(new DecompressionStream("gzip"));
+  const docsJson = JSON.parse(await new Response(stream).text());
+  Bokeh.embed.embed_items(docsJson, %(render_items)s);
+})();
+"""
+"""gzip圧縮したBokehのドキュメントを展開して描画するJavaScript"""
 
 
 def create_pretext_from_metadata(metadata: dict[str, Any]) -> PreText:
@@ -31,3 +69,75 @@ def convert_1d_figure_list_to_2d(figure_list: Sequence[LayoutDOM], *, ncols: int
         row_list.append(row)
 
     return row_list
+
+
+def _downcast_column_data_source(source: ColumnDataSource) -> None:
+    """
+    HTMLファイルのサイズを小さくするため、ColumnDataSourceのデータを縮小します。
+
+    * DataFrameから生成したときに自動で追加される ``index`` 列を削除します。
+    * float64の列は、float32に変換しても値が変わらない場合に限り、float32に変換します。
+    """
+    data = dict(source.data)
+    data.pop("index", None)
+    for column, values in data.items():
+        if isinstance(values, numpy.ndarray) and values.dtype == numpy.float64:
+            float32_values = values.astype(numpy.float32)
+            if numpy.array_equal(float32_values, values, equal_nan=True):
+                data[column] = float32_values
+    source.data = data
+
+
+def _write_compressed_bokeh_html(bokeh_obj: UIElement, output_file: Path, *, title: str) -> None:
+    """
+    グラフのデータ（Bokehのドキュメント）をgzip圧縮してbase64で埋め込んだHTMLファイルを出力します。
+    ブラウザで開くと、 ``DecompressionStream`` で展開してから描画します。
+    """
+    for source in bokeh_obj.select({"type": ColumnDataSource}):
+        if isinstance(source, ColumnDataSource):
+            _downcast_column_data_source(source)
+
+    with OutputDocumentFor([bokeh_obj]) as doc:
+        docs_json, render_items = standalone_docs_json_and_render_items([bokeh_obj])
+        bokeh_js, bokeh_css = bundle_for_objs_and_resources([doc], CDN)
+
+    payload_id = make_globally_unique_css_safe_id()
+    payload = base64.b64encode(gzip.compress(serialize_json(docs_json).encode("utf-8"), compresslevel=6)).decode("ascii")
+    script = _DECOMPRESSING_SCRIPT % {"payload_id": payload_id, "render_items": serialize_json([item.to_json() for item in render_items])}
+    html = FILE.render(
+        title=title,
+        bokeh_js=bokeh_js,
+        bokeh_css=bokeh_css,
+        plot_script=wrap_in_script_tag(payload, "application/octet-stream", payload_id) + wrap_in_script_tag(script),
+        docs=render_items,
+        base=FILE,
+        macros=MACROS,
+    )
+    output_file.write_text(html, encoding="utf-8")
+
+
+def write_bokeh_html(bokeh_obj: UIElement, output_file: Path, *, title: str | None = None, compress_html: bool = False) -> None:
+    """
+    BokehのオブジェクトをHTMLファイルに出力します。
+
+    Args:
+        bokeh_obj: 出力するBokehのオブジェクト
+        output_file: 出力先のHTMLファイル
+        title: HTMLのタイトル。指定しない場合は、ファイル名（拡張子を除く）です。
+        compress_html: Trueなら、グラフのデータを圧縮して埋め込みます。データ量が多い場合、ファイルサイズが数分の1になります。
+            インストールされているbokehが圧縮に対応していない場合は、圧縮せずに出力します。
+    """
+    if title is None:
+        title = output_file.stem
+
+    output_file.parent.mkdir(exist_ok=True, parents=True)
+    if compress_html and not _CAN_COMPRESS_HTML:
+        logger.warning(f"インストールされているbokeh（version='{bokeh.__version__}'）では、グラフのデータを圧縮できないため、圧縮せずに'{output_file}'を出力します。")
+        compress_html = False
+
+    if compress_html:
+        _write_compressed_bokeh_html(bokeh_obj, output_file, title=title)
+    else:
+        bokeh.plotting.reset_output()
+        bokeh.plotting.output_file(output_file, title=title)
+        bokeh.plotting.save(bokeh_obj)
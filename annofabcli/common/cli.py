@@ -24,6 +24,8 @@ from more_itertools import first_true
 from annofabcli.common.enums import OutputFormat
 from annofabcli.common.exceptions import AnnofabCliException, AuthenticationError
 from annofabcli.common.facade import AnnofabApiFacade
+from annofabcli.common.http_session import configure_session
+from annofabcli.common.profiling import instrument_session
 from annofabcli.common.typing import InputDataSize
 from annofabcli.common.utils import (
     get_file_scheme_path,
@@ -151,6 +153,14 @@ def add_parser(
 
         group.add_argument("--debug", action="store_true", help="HTTPリクエストの内容やレスポンスのステータスコードなど、デバッグ用のログが出力されます。")
 
+        group.add_argument(
+            "--timing_report",
+            type=Path,
+            help="HTTPリクエストの回数やレイテンシ、主要な処理の処理時間を計測して、指定したファイルに出力します。拡張子が ``.csv`` ならCSV形式、それ以外はJSON形式で出力します。",
+        )
+
+        group.add_argument("--profile", type=Path, help="cProfileで計測した結果を、指定したファイルにpstats形式で出力します。")
+
         return parent_parser
 
     if subparsers is None:
@@ -301,10 +311,19 @@ def build_annofabapi_resource(args: argparse.Namespace) -> annofabapi.Resource:
 
     認証情報を読み込めなかった場合は、標準入力からUser IDとパスワードを入力させる。
 
+    HTTPコネクションプールの大きさは、コマンドライン引数 ``--parallelism`` が存在すればそれに合わせる。
+
     Returns:
         annofabapi.Resourceインスタンス
 
     """
+    service = _build_annofabapi_resource_with_credentials(args)
+    configure_session(service.api.session, parallelism=getattr(args, "parallelism", None))
+    instrument_session(service.api.session)
+    return service
+
+
+def _build_annofabapi_resource_with_credentials(args: argparse.Namespace) -> annofabapi.Resource:
     endpoint_url = get_endpoint_url(args)
     if endpoint_url != DEFAULT_ENDPOINT_URL:
         logger.info(f"Annofab WebAPIのエンドポイントURL: {endpoint_url}")
@@ -1,15 +1,19 @@
 import asyncio
 import datetime
+import email.utils
 import logging.config
+import warnings
 from functools import partial
 from pathlib import Path
 
 import annofabapi
 import requests
-from annofabapi.models import ProjectJobType
+from annofabapi.models import JobStatus, ProjectJobType
 
 from annofabcli.common.dataclasses import WaitOptions
 from annofabcli.common.exceptions import DownloadingFileNotFoundError, UpdatedFileForDownloadingError
+from annofabcli.common.job_poller import DEFAULT_WAIT_OPTIONS, JobPoller
+from annofabcli.common.profiling import timed
 
 logger = logging.getLogger(__name__)
 
@@ -19,8 +23,6 @@ DOWNLOADING_FILETYPE_DICT = {
     ProjectJobType.GEN_ANNOTATION: "アノテーションzip",
 }
 
-DEFAULT_WAIT_OPTIONS = WaitOptions(interval=60, max_tries=360)
-
 
 def _get_annofab_error_message(http_error: requests.HTTPError) -> str | None:
     obj = http_error.response.json()
@@ -36,13 +38,25 @@ def get_filename(project_id: str, file_type: str, extension: str) -> str:
 
 
 class DownloadingFile:
-    def __init__(self, service: annofabapi.Resource) -> None:
+    """
+    全件ファイルをダウンロードするクラス
+
+    Args:
+        service: annofabapi.Resourceインスタンス
+        job_poller: 全件ファイルの更新ジョブが完了するまで待つときに利用します。
+            複数のプロジェクトのファイルを並列でダウンロードする場合は、同じインスタンスを渡すとジョブの問い合わせをまとめられます。
+            未指定の場合は、ジョブを待つたびに生成して、待ち終えたら終了します。
+    """
+
+    def __init__(self, service: annofabapi.Resource, *, job_poller: JobPoller | None = None) -> None:
         self.service = service
+        self.job_poller = job_poller
 
     @staticmethod
     def get_max_wait_minutes(wait_options: WaitOptions) -> float:
         return wait_options.max_tries * wait_options.interval / 60
 
+    @timed()
     def _wait_for_completion(
         self,
         project_id: str,
@@ -56,13 +70,16 @@ class DownloadingFile:
         max_wait_minutes = self.get_max_wait_minutes(wait_options)
         filetype = DOWNLOADING_FILETYPE_DICT[job_type]
         logger.info(f"{filetype}の更新処理が完了するまで、最大{max_wait_minutes}分間待ちます。job_id='{job_id}'")
-        result = self.service.wrapper.wait_for_completion(
-            project_id,
-            job_type=job_type,
-            job_access_interval=wait_options.interval,
-            max_job_access=wait_options.max_tries,
-        )
-        if not result:
+        if self.job_poller is not None:
+            job_status = self.job_poller.wait(project_id, job_type, job_id=job_id, wait_options=wait_options)
+        else:
+            with JobPoller(self.service) as job_poller:
+                job_status = job_poller.wait(project_id, job_type, job_id=job_id, wait_options=wait_options)
+        if job_status is None and job_id is not None:
+            # 更新処理を開始したジョブが見つからない場合は、ファイルが更新されたかどうか判断できない
+            raise UpdatedFileForDownloadingError(f"{filetype}の更新処理のジョブ（job_id='{job_id}'）が見つかりませんでした。")
+        # job_statusがNoneならば、実行中のジョブが存在しないので、ファイルは更新済とみなす
+        if job_status is not None and job_status != JobStatus.SUCCEEDED:
             raise UpdatedFileForDownloadingError(f"{filetype}の更新処理が{max_wait_minutes}分以内に完了しない、または更新処理に失敗しました。")
 
     async def download_annotation_zip_with_async(
@@ -76,6 +93,7 @@ class DownloadingFile:
         partial_func = partial(self.download_annotation_zip, project_id, dest_path, is_latest, wait_options)
         await loop.run_in_executor(None, partial_func)
 
+    @timed()
     def download_annotation_zip(
         self,
         project_id: str,
@@ -132,6 +150,7 @@ class DownloadingFile:
         partial_func = partial(self.download_input_data_json, project_id, dest_path, is_latest, wait_options)
         await loop.run_in_executor(None, partial_func)
 
+    @timed()
     def download_input_data_json(
         self,
         project_id: str,
@@ -179,6 +198,7 @@ class DownloadingFile:
         partial_func = partial(self.download_task_json, project_id, dest_path, is_latest=is_latest, wait_options=wait_options)
         await loop.run_in_executor(None, partial_func)
 
+    @timed()
     def download_task_json(self, project_id: str, dest_path: str | Path, *, is_latest: bool = False, wait_options: WaitOptions | None = None) -> None:
         if is_latest:
             self.wait_until_updated_task_json(project_id, wait_options)
@@ -218,6 +238,7 @@ class DownloadingFile:
         """
         return self.download_task_history_json(project_id, dest_path=dest_path)
 
+    @timed()
     def download_task_history_json(self, project_id: str, dest_path: str | Path) -> None:
         """
         タスク履歴全件ファイルをダウンロードする。
@@ -236,6 +257,7 @@ class DownloadingFile:
                 raise DownloadingFileNotFoundError(f"project_id='{project_id}'のプロジェクトに、タスク履歴全件ファイルが存在しないため、ダウンロードできませんでした。") from e
             raise e  # noqa: TRY201
 
+    @timed()
     def download_task_history_event_json(self, project_id: str, dest_path: str | Path) -> None:
         """
         タスク履歴イベント全件ファイルをダウンロードする。
@@ -274,6 +296,7 @@ class DownloadingFile:
 
         return self.download_inspection_comment_json(project_id, dest_path=dest_path)
 
+    @timed()
     def download_inspection_comment_json(self, project_id: str, dest_path: str | Path) -> None:
         """
         検査コメント全件ファイルをダウンロードする。
@@ -299,6 +322,7 @@ class DownloadingFile:
 
         return self.download_comment_json(project_id, dest_path=dest_path)
 
+    @timed()
     def download_comment_json(self, project_id: str, dest_path: str | Path) -> None:
         """
         コメント全件ファイルをダウンロードする。
@@ -314,6 +338,67 @@ class DownloadingFile:
                 raise DownloadingFileNotFoundError(f"project_id='{project_id}'のプロジェクトに、コメント全件ファイルが存在しないため、ダウンロードできませんでした。") from e
             raise e  # noqa: TRY201
 
+    def _get_last_modified(self, url: str) -> datetime.datetime | None:
+        # 署名付きURLはGETメソッドでしか使えないので、レスポンスヘッダだけを読み込んでレスポンスボディは読み込まない
+        with self.service.api.session.get(url, stream=True) as response:
+            if response.status_code == requests.codes.not_found:
+                # プロジェクトを作成した日だと、全件ファイルが作成されていない
+                return None
+            response.raise_for_status()
+            last_modified = response.headers.get("Last-Modified")
+        return email.utils.parsedate_to_datetime(last_modified) if last_modified is not None else None
+
+    def get_task_json_last_modified(self, project_id: str) -> datetime.datetime | None:
+        """
+        タスク全件ファイルの更新日時（ ``Last-Modified`` ）を取得します。取得できない場合はNoneを返します。
+        """
+        content, _ = self.service.api.get_project_tasks_url(project_id)
+        return self._get_last_modified(content["url"])
+
+    def get_comment_json_last_modified(self, project_id: str) -> datetime.datetime | None:
+        """
+        コメント全件ファイルの更新日時（ ``Last-Modified`` ）を取得します。取得できない場合はNoneを返します。
+        """
+        content, _ = self.service.api.get_project_comments_url(project_id)
+        return self._get_last_modified(content["url"])
+
+    def get_input_data_json_last_modified(self, project_id: str) -> datetime.datetime | None:
+        """
+        入力データ全件ファイルの更新日時（ ``Last-Modified`` ）を取得します。取得できない場合はNoneを返します。
+        """
+        content, _ = self.service.api.get_project_inputs_url(project_id)
+        return self._get_last_modified(content["url"])
+
+    def get_task_history_json_last_modified(self, project_id: str) -> datetime.datetime | None:
+        """
+        タスク履歴全件ファイルの更新日時（ ``Last-Modified`` ）を取得します。取得できない場合はNoneを返します。
+        """
+        content, _ = self.service.api.get_project_task_histories_url(project_id)
+        return self._get_last_modified(content["url"])
+
+    def get_annotation_zip_last_modified(self, project_id: str) -> datetime.datetime | None:
+        """
+        アノテーションZIPの更新日時（ ``Last-Modified`` ）を取得します。取得できない場合はNoneを返します。
+        """
+        # レスポンスのcontent-typeが"text/plain"なので、Locationヘッダからダウンロード先のURLを取得する
+        try:
+            _, response = self.service.api.get_annotation_archive(project_id)
+        except requests.HTTPError as e:
+            if e.response is not None and e.response.status_code == requests.codes.not_found:
+                return None
+            raise e  # noqa: TRY201
+        return self._get_last_modified(response.headers["Location"])
+
+    def get_task_history_event_json_last_modified(self, project_id: str) -> datetime.datetime | None:
+        """
+        タスク履歴イベント全件ファイルの更新日時（ ``Last-Modified`` ）を取得します。取得できない場合はNoneを返します。
+        """
+        with warnings.catch_warnings():
+            # `get_project_task_history_events_url`関数は非推奨だが、タスク履歴イベントでしか取得できない情報があるため利用する
+            warnings.simplefilter("ignore", category=FutureWarning)
+            content, _ = self.service.api.get_project_task_history_events_url(project_id)
+        return self._get_last_modified(content["url"])
+
     # 統一された命名規則でファイルをダウンロードする関数群
     def download_annotation_zip_to_dir(
         self,
@@ -42,6 +42,9 @@ class OutputFormat(Enum):
     #: project_idの一覧
     PROJECT_ID_LIST = "project_id_list"
 
+    #: Parquet形式。 ``--output_dir`` を指定して、複数のファイルに分けて出力する場合のみ指定できる
+    PARQUET = "parquet"
+
 
 class CustomProjectType(Enum):
     """カスタムプロジェクトの場合、検査コメントのフォーマットが分からないため、カスタムプロジェクトの種類をannofabcliで定義する。"""
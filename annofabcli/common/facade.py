@@ -221,14 +221,17 @@ def convert_annotation_specs_labels_v2_to_v1(labels_v2: list[dict[str, Any]], ad
         List[LabelV1]: V1版のラベル情報
     """
 
-    def get_additional(additional_data_definition_id: str) -> dict[str, Any] | None:
-        return more_itertools.first_true(additionals_v2, pred=lambda e: e["additional_data_definition_id"] == additional_data_definition_id)
+    # 属性の個数が多いアノテーション仕様でも線形時間で変換できるように、属性IDで引けるようにする
+    # 属性IDが重複している場合は、先頭の属性を使う
+    additionals_by_id: dict[str, dict[str, Any]] = {}
+    for additional in additionals_v2:
+        additionals_by_id.setdefault(additional["additional_data_definition_id"], additional)
 
     def to_label_v1(label_v2: dict[str, Any]) -> dict[str, Any]:
         additional_data_definition_id_list = label_v2["additional_data_definitions"]
         new_additional_data_definitions = []
         for additional_data_definition_id in additional_data_definition_id_list:
-            additional = get_additional(additional_data_definition_id)
+            additional = additionals_by_id.get(additional_data_definition_id)
             if additional is not None:
                 new_additional_data_definitions.append(additional)
             else:
@@ -0,0 +1,102 @@
+"""
+annofabapiが利用する ``requests.Session`` のコネクションプールを設定する機能
+
+Annofab WebAPIとAWS S3の署名付きURLへのアクセスは、同じ ``requests.Session`` を経由します。
+コネクションプールを十分な大きさにしてTCP/TLSコネクションを再利用することで、大量のリクエストを送る処理を高速化します。
+なお、レスポンスのgzip圧縮は ``requests`` のデフォルトで有効（ ``Accept-Encoding: gzip, deflate`` ）です。
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import weakref
+from typing import Any
+
+import requests
+import requests.adapters
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from annofabcli.common.profiling import get_timing_recorder
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POOL_CONNECTIONS = 16
+"""コネクションプールを保持するホストの個数。Annofab WebAPIと、署名付きURLでアクセスするAWS S3の複数のホストを想定しています。"""
+
+DEFAULT_POOL_MAXSIZE = 32
+"""
+1ホストあたりにプールするコネクションの最大数。
+スレッドで並列にダウンロードする処理（ ``statistics visualize`` など）でも、コネクションが破棄されない大きさにしています。
+"""
+
+
+def _record_new_connection(host: str) -> None:
+    recorder = get_timing_recorder()
+    if recorder is not None:
+        recorder.add_new_connection(host)
+
+
+class _CountingHTTPConnectionPool(HTTPConnectionPool):
+    """新しくコネクションを生成した回数を記録するコネクションプール"""
+
+    def _new_conn(self) -> Any:  # noqa: ANN401
+        _record_new_connection(str(self.host))
+        return super()._new_conn()
+
+
+class _CountingHTTPSConnectionPool(HTTPSConnectionPool):
+    """新しくコネクションを生成した回数を記録するコネクションプール"""
+
+    def _new_conn(self) -> Any:  # noqa: ANN401
+        _record_new_connection(str(self.host))
+        return super()._new_conn()
+
+
+_adapters: weakref.WeakSet[PooledHTTPAdapter] = weakref.WeakSet()
+"""fork後にコネクションプールを作り直す対象のadapter"""
+
+
+class PooledHTTPAdapter(requests.adapters.HTTPAdapter):
+    """
+    コネクションの再利用状況を計測できるHTTPAdapter。
+
+    ``multiprocessing`` でforkした子プロセスでは、親プロセスのコネクションを共有しないように、コネクションプールを作り直します。
+    """
+
+    def __init__(self, *, pool_connections: int = DEFAULT_POOL_CONNECTIONS, pool_maxsize: int = DEFAULT_POOL_MAXSIZE) -> None:
+        super().__init__(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        _adapters.add(self)
+
+    def init_poolmanager(self, connections: int, maxsize: int, block: bool = False, **pool_kwargs: Any) -> None:  # noqa: ANN401, FBT001, FBT002
+        super().init_poolmanager(connections, maxsize, block, **pool_kwargs)
+        self.poolmanager.pool_classes_by_scheme = {"http": _CountingHTTPConnectionPool, "https": _CountingHTTPSConnectionPool}
+
+    def reset_connection_pool(self) -> None:
+        """
+        コネクションプールを作り直します。既存のコネクションは閉じずに破棄します。
+        """
+        self.init_poolmanager(self._pool_connections, self._pool_maxsize, block=self._pool_block)
+
+
+def _reset_connection_pools_after_fork() -> None:
+    for adapter in list(_adapters):
+        adapter.reset_connection_pool()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_connection_pools_after_fork)
+
+
+def configure_session(session: requests.Session, *, parallelism: int | None = None) -> None:
+    """
+    sessionにコネクションプールを設定します。
+
+    Args:
+        session: 設定対象のsession
+        parallelism: コマンドの並列度。指定した場合、並列度以上のコネクションをプールします。
+    """
+    pool_maxsize = max(DEFAULT_POOL_MAXSIZE, parallelism) if parallelism is not None else DEFAULT_POOL_MAXSIZE
+    for prefix in ["https://", "http://"]:
+        session.mount(prefix, PooledHTTPAdapter(pool_maxsize=pool_maxsize))
+    logger.debug(f"HTTPコネクションプールを設定しました。 :: pool_connections={DEFAULT_POOL_CONNECTIONS}, pool_maxsize={pool_maxsize}")
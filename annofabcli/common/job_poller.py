@@ -0,0 +1,324 @@
+"""
+複数プロジェクト・複数ジョブ種別のジョブの完了を、まとめて待つための機能
+"""
+
+from __future__ import annotations
+
+import logging
+import random
+import threading
+import time
+from collections import defaultdict
+from collections.abc import Callable
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Self
+
+import annofabapi
+from annofabapi.models import JobStatus, ProjectJobType
+
+from annofabcli.common.dataclasses import WaitOptions
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WAIT_OPTIONS = WaitOptions(interval=60, max_tries=360)
+
+_CONTINUE = object()
+"""ジョブの監視を続けることを表す値"""
+
+
+@dataclass(frozen=True)
+class BackoffOptions:
+    """
+    ジョブの状態を問い合わせる間隔を調整するためのオプション
+    """
+
+    initial_interval: float = 5
+    """最初に問い合わせるまでの間隔[秒]。`WaitOptions.interval`より大きい場合は`WaitOptions.interval`が使われます。"""
+
+    multiplier: float = 1.5
+    """問い合わせるごとに、間隔を何倍にするか"""
+
+    jitter: float = 0.1
+    """間隔に加えるゆらぎの割合。0.1なら間隔を±10%の範囲でランダムにずらします。"""
+
+
+@dataclass
+class _TrackedJob:
+    project_id: str
+    job_type: ProjectJobType
+    job_id: str | None
+    future: Future[JobStatus | None]
+    deadline: float
+    """この時刻を過ぎてもジョブが終了しなければ、待つのをやめる"""
+    max_interval: float
+    interval: float
+    next_poll_time: float
+    poll_count: int = field(default=0)
+
+
+class JobPoller:
+    """
+    複数のプロジェクトのジョブが完了するまで、まとめて待ちます。
+
+    ジョブの状態はバックグラウンドのスレッドで問い合わせます。
+    同じプロジェクト・同じジョブ種別のジョブは1回の`get_project_job` APIでまとめて問い合わせます。
+    バックグラウンドのスレッドで想定外のエラーが発生した場合は、監視中のすべてのジョブのFutureにその例外を設定して、スレッドを終了します。
+    問い合わせる間隔は、`BackoffOptions.initial_interval`から指数関数的に伸ばし、`WaitOptions.interval`を上限にします。
+
+    Examples:
+        >>> with JobPoller(service) as poller:
+        ...     future1 = poller.submit("prj1", ProjectJobType.GEN_TASKS_LIST)
+        ...     future2 = poller.submit("prj2", ProjectJobType.GEN_ANNOTATION)
+        ...     status1 = future1.result()
+
+    Args:
+        service: annofabapi.Resourceインスタンス
+        backoff_options: 問い合わせる間隔に関するオプション
+        clock: 現在時刻[秒]を返す関数。テスト用です。
+    """
+
+    def __init__(
+        self,
+        service: annofabapi.Resource,
+        *,
+        backoff_options: BackoffOptions | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.service = service
+        self.backoff_options = backoff_options if backoff_options is not None else BackoffOptions()
+        self._clock = clock
+        self._random = random.Random()
+        self._jobs: list[_TrackedJob] = []
+        self._condition = threading.Condition()
+        self._thread: threading.Thread | None = None
+        self._closed = False
+        self._error: BaseException | None = None
+        """バックグラウンドのスレッドを終了させた例外"""
+
+        self.api_call_count = 0
+        """`get_project_job` APIを実行した回数"""
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.close()
+
+    def submit(
+        self,
+        project_id: str,
+        job_type: ProjectJobType,
+        job_id: str | None = None,
+        *,
+        wait_options: WaitOptions | None = None,
+    ) -> Future[JobStatus | None]:
+        """
+        ジョブを監視対象に追加します。
+
+        Args:
+            project_id: プロジェクトID
+            job_type: ジョブ種別
+            job_id: ジョブID。Noneの場合は、現在進行中の最新のジョブが終了するまで待ちます。
+            wait_options: 待つ時間に関するオプション。`interval * max_tries`秒経過してもジョブが終了しなければ、待つのをやめます。
+
+        Returns:
+            ジョブの終了を表すFuture。結果は`annofabapi.wrapper.Wrapper.wait_until_job_finished`の戻り値と同じです。
+
+            * `JobStatus.SUCCEEDED` : ジョブが成功した
+            * `JobStatus.FAILED` : ジョブが失敗した
+            * `JobStatus.PROGRESS` : 指定した時間待ってもジョブが終了しなかった
+            * None : 対象のジョブ（job_idがNoneの場合は進行中のジョブ）が存在しなかった
+
+            一度存在を確認したジョブが見つからなくなった場合は、Futureに例外が設定されます。
+        """
+        if wait_options is None:
+            wait_options = DEFAULT_WAIT_OPTIONS
+
+        future: Future[JobStatus | None] = Future()
+        now = self._clock()
+        max_interval = float(wait_options.interval)
+        interval = min(self.backoff_options.initial_interval, max_interval)
+        job = _TrackedJob(
+            project_id=project_id,
+            job_type=job_type,
+            job_id=job_id,
+            future=future,
+            deadline=now + wait_options.interval * wait_options.max_tries,
+            max_interval=max_interval,
+            interval=interval,
+            # 1回目は即座に問い合わせる
+            next_poll_time=now,
+        )
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("JobPollerはすでに終了しています。") from self._error
+            self._jobs.append(job)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="JobPoller", daemon=True)
+                self._thread.start()
+            self._condition.notify_all()
+        return future
+
+    def wait(
+        self,
+        project_id: str,
+        job_type: ProjectJobType,
+        job_id: str | None = None,
+        *,
+        wait_options: WaitOptions | None = None,
+    ) -> JobStatus | None:
+        """
+        ジョブが終了するまで待ちます。戻り値は`submit`メソッドが返すFutureの結果と同じです。
+        """
+        return self.submit(project_id, job_type, job_id, wait_options=wait_options).result()
+
+    def close(self) -> None:
+        """
+        監視中のジョブが終了するまで待ってから、バックグラウンドのスレッドを終了します。
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join()
+
+    def _next_interval(self, job: _TrackedJob) -> float:
+        interval = job.interval
+        job.interval = min(job.interval * self.backoff_options.multiplier, job.max_interval)
+        jitter = self.backoff_options.jitter
+        return interval * (1 + self._random.uniform(-jitter, jitter))
+
+    def _run(self) -> None:
+        try:
+            self._run_loop()
+        except BaseException as e:
+            logger.warning("ジョブの監視中に想定外のエラーが発生したため、ジョブの監視を終了します。", exc_info=True)
+            with self._condition:
+                self._closed = True
+                self._error = e
+                pending_jobs = self._jobs
+                self._jobs = []
+            for job in pending_jobs:
+                if not job.future.done():
+                    job.future.set_exception(e)
+
+    def _run_loop(self) -> None:
+        while True:
+            with self._condition:
+                while True:
+                    if len(self._jobs) == 0:
+                        if self._closed:
+                            return
+                        self._condition.wait()
+                        continue
+
+                    now = self._clock()
+                    due_project_ids = {job.project_id for job in self._jobs if job.next_poll_time <= now}
+                    if len(due_project_ids) > 0:
+                        break
+                    next_poll_time = min(job.next_poll_time for job in self._jobs)
+                    self._condition.wait(timeout=next_poll_time - now)
+
+                # 問い合わせるプロジェクトのジョブは、問い合わせる時刻になっていなくてもまとめて問い合わせる
+                due_jobs_by_project: dict[str, list[_TrackedJob]] = defaultdict(list)
+                for job in self._jobs:
+                    if job.project_id in due_project_ids:
+                        due_jobs_by_project[job.project_id].append(job)
+
+            finished_jobs: list[_TrackedJob] = []
+            for project_id, sub_jobs in due_jobs_by_project.items():
+                finished_jobs.extend(self._poll_project(project_id, sub_jobs))
+
+            with self._condition:
+                for job in finished_jobs:
+                    self._jobs.remove(job)
+
+    def _get_project_job_list(self, project_id: str, job_types: set[ProjectJobType]) -> list[dict[str, Any]]:
+        """
+        ジョブ種別ごとに`get_project_job` APIを実行して、ジョブの一覧を取得します。
+        ジョブ種別を指定しないと、他の種別のジョブが多い場合に、監視中のジョブが1ページ目に含まれないことがあるためです。
+        """
+        job_list: list[dict[str, Any]] = []
+        for job_type in sorted(job_types, key=lambda e: e.value):
+            self.api_call_count += 1
+            content, _ = self.service.api.get_project_job(project_id, query_params={"type": job_type.value, "limit": 200})
+            job_list.extend(content["list"])
+        return job_list
+
+    def _poll_project(self, project_id: str, jobs: list[_TrackedJob]) -> list[_TrackedJob]:
+        """
+        1プロジェクトのジョブの状態をまとめて問い合わせます。
+
+        Returns:
+            監視を終えたジョブのlist
+        """
+        try:
+            job_list = self._get_project_job_list(project_id, {job.job_type for job in jobs})
+        except Exception as e:
+            logger.warning(f"project_id='{project_id}' :: ジョブの取得に失敗しました。", exc_info=True)
+            for job in jobs:
+                job.future.set_exception(e)
+            return jobs
+
+        finished_jobs = []
+        now = self._clock()
+        for job in jobs:
+            try:
+                result = self._update_job(job, job_list, now)
+            except Exception as e:
+                logger.warning(f"project_id='{project_id}', job_type='{job.job_type.value}', job_id='{job.job_id}' :: ジョブの状態を確認できませんでした。", exc_info=True)
+                job.future.set_exception(e)
+                finished_jobs.append(job)
+                continue
+            if result is not _CONTINUE:
+                job.future.set_result(result)  # type: ignore[arg-type]
+                finished_jobs.append(job)
+        return finished_jobs
+
+    def _update_job(self, job: _TrackedJob, job_list: list[dict[str, Any]], now: float) -> JobStatus | object | None:
+        """
+        問い合わせた結果をジョブに反映します。
+
+        Returns:
+            監視を続ける場合は`_CONTINUE`。監視を終える場合はFutureに設定する値。
+        """
+        logging_prefix = f"project_id='{job.project_id}', job_type='{job.job_type.value}', job_id='{job.job_id}'"
+        if job.job_id is None:
+            # 初回のみ。進行中の最新のジョブを監視対象にする
+            latest_job = next((e for e in job_list if e["job_type"] == job.job_type.value), None)
+            if latest_job is None or latest_job["job_status"] != JobStatus.PROGRESS.value:
+                logger.info(f"{logging_prefix} :: 進行中のジョブは存在しません。")
+                return None
+            job.job_id = latest_job["job_id"]
+            logging_prefix = f"project_id='{job.project_id}', job_type='{job.job_type.value}', job_id='{job.job_id}'"
+            target_job: dict[str, Any] | None = latest_job
+        else:
+            target_job = next((e for e in job_list if e["job_id"] == job.job_id), None)
+
+        if target_job is None:
+            if job.poll_count > 0:
+                # 一度確認したジョブが見つからない場合は、ジョブが終了したかどうか判断できない
+                raise RuntimeError(f"{logging_prefix} :: 監視中のジョブが見つからなくなりました。")
+            logger.info(f"{logging_prefix} :: ジョブは存在しません。")
+            return None
+
+        job.poll_count += 1
+        job_status = JobStatus(target_job["job_status"])
+        if job_status == JobStatus.SUCCEEDED:
+            logger.info(f"{logging_prefix} :: ジョブが成功しました。")
+            return JobStatus.SUCCEEDED
+
+        if job_status == JobStatus.FAILED:
+            logger.info(f"{logging_prefix} :: ジョブが失敗しました。 :: errors='{target_job.get('errors')}'")
+            return JobStatus.FAILED
+
+        if now >= job.deadline:
+            logger.info(f"{logging_prefix} :: ジョブは {job.poll_count} 回問い合わせても終了しませんでした。")
+            return JobStatus.PROGRESS
+
+        interval = self._next_interval(job)
+        job.next_poll_time = min(now + interval, job.deadline)
+        logger.debug(f"{logging_prefix} :: ジョブは進行中です。{interval:.1f} 秒後に再度問い合わせます。")
+        return _CONTINUE
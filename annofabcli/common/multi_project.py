@@ -0,0 +1,134 @@
+"""
+複数のプロジェクトを対象にするコマンドで、プロジェクトごとの処理をパイプラインで実行する機能
+
+プロジェクトごとの処理を、以下の2つのステージに分けて実行します。
+
+* 準備ステージ: 全件ファイルのダウンロードなど、I/Oが中心の処理。スレッドで先読みします。
+* 集計ステージ: DataFrameの生成など、CPUが中心の処理。呼び出し元のスレッドでプロジェクトの指定順に実行します。
+
+あるプロジェクトを集計している間に、次のプロジェクトの準備を進めるので、
+全体の処理時間はおおむね「集計ステージの処理時間の合計」になります。
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from collections import deque
+from collections.abc import Callable, Iterator, Sequence
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Generic, TypeVar
+
+logger = logging.getLogger(__name__)
+
+PreparedT = TypeVar("PreparedT")
+ResultT = TypeVar("ResultT")
+
+DEFAULT_MAX_PREFETCH = 1
+"""
+集計ステージと並行して準備するプロジェクトの数。
+準備したデータは集計が終わるまでメモリに保持するので、メモリ使用量は「先読みするプロジェクト数 + 1」プロジェクト分に収まります。
+"""
+
+
+@dataclass(frozen=True)
+class ProjectResult(Generic[ResultT]):
+    """
+    プロジェクトごとの処理結果
+    """
+
+    project_id: str
+    result: ResultT | None
+    """集計ステージの戻り値。処理に失敗した場合はNone"""
+    error: Exception | None = None
+    """処理に失敗した場合に発生した例外"""
+
+    @property
+    def is_succeeded(self) -> bool:
+        return self.error is None
+
+
+def run_projects_in_pipeline(
+    project_ids: Sequence[str],
+    prepare: Callable[[str], PreparedT],
+    compute: Callable[[str, PreparedT], ResultT],
+    *,
+    max_prefetch: int = DEFAULT_MAX_PREFETCH,
+    log_traceback: bool = True,
+) -> Iterator[ProjectResult[ResultT]]:
+    """
+    プロジェクトごとの準備と集計を、パイプラインで実行します。
+
+    あるプロジェクトで例外が発生しても、残りのプロジェクトの処理は続けます。
+    失敗したプロジェクトは、 ``error`` を設定した :class:`ProjectResult` として返します。
+
+    Args:
+        project_ids: 対象のプロジェクトのproject_idのlist
+        prepare: 準備ステージの処理。引数はproject_id。スレッドで実行されます。
+        compute: 集計ステージの処理。引数はproject_idと ``prepare`` の戻り値。呼び出し元のスレッドで実行されます。
+        max_prefetch: 集計ステージと並行して準備するプロジェクトの最大数
+        log_traceback: Falseなら、失敗したプロジェクトのログにトレースバックを含めません。
+            呼び出し元で ``error`` を送出する場合に、トレースバックが二重に出力されないようにするためのものです。
+
+    Yields:
+        プロジェクトごとの処理結果。 ``project_ids`` の順番に返します。
+    """
+    if max_prefetch < 1:
+        raise ValueError(f"max_prefetch='{max_prefetch}' には1以上の値を指定してください。")
+
+    wall_start_time = time.perf_counter()
+    prepare_seconds_by_project_id: dict[str, float] = {}
+
+    def prepare_with_timing(project_id: str) -> PreparedT:
+        start_time = time.perf_counter()
+        try:
+            return prepare(project_id)
+        finally:
+            prepare_seconds_by_project_id[project_id] = time.perf_counter() - start_time
+
+    compute_seconds = 0.0
+    failed_count = 0
+    remaining_project_ids = deque(project_ids)
+    pending: deque[tuple[str, Future[PreparedT]]] = deque()
+    with ThreadPoolExecutor(max_workers=max_prefetch) as executor:
+
+        def submit_next() -> None:
+            if len(remaining_project_ids) > 0:
+                project_id = remaining_project_ids.popleft()
+                pending.append((project_id, executor.submit(prepare_with_timing, project_id)))
+
+        for _ in range(max_prefetch):
+            submit_next()
+
+        while len(pending) > 0:
+            project_id, future = pending.popleft()
+            try:
+                prepared = future.result()
+            except Exception as e:
+                logger.warning(f"project_id='{project_id}' :: 集計に必要なデータの準備に失敗しました。 :: {e!r}", exc_info=log_traceback)
+                failed_count += 1
+                submit_next()
+                yield ProjectResult(project_id=project_id, result=None, error=e)
+                continue
+
+            # 集計している間に、次のプロジェクトの準備を進める
+            submit_next()
+            start_time = time.perf_counter()
+            try:
+                project_result = ProjectResult(project_id=project_id, result=compute(project_id, prepared))
+            except Exception as e:
+                logger.warning(f"project_id='{project_id}' :: 集計に失敗しました。 :: {e!r}", exc_info=log_traceback)
+                failed_count += 1
+                project_result = ProjectResult(project_id=project_id, result=None, error=e)
+            compute_seconds += time.perf_counter() - start_time
+            # 集計が終わったデータは、次のプロジェクトの集計を始める前に解放する
+            del prepared
+            yield project_result
+
+    logger.debug(
+        f"{len(project_ids)} 件のプロジェクトを処理しました（失敗: {failed_count} 件）。 :: "
+        f"経過時間={time.perf_counter() - wall_start_time:.1f}秒, "
+        f"準備ステージの処理時間の合計={sum(prepare_seconds_by_project_id.values()):.1f}秒, "
+        f"集計ステージの処理時間の合計={compute_seconds:.1f}秒"
+    )
@@ -1,3 +1,6 @@
+from collections.abc import Mapping
+from typing import Any
+
 import pandas
 
 
@@ -16,3 +19,39 @@ def get_frequency_of_monthend() -> str:
     if major >= 3 or (major == 2 and minor >= 2):
         return "ME"
     return "M"
+
+
+def replace_values(series: pandas.Series, replacement_dict: Mapping[Any, Any]) -> pandas.Series:
+    """
+    `replacement_dict`のkeyに一致する値を、valueに置換したSeriesを返します。
+    `Series.replace(dict)`と同じ結果ですが、置換表を使って一括で置換するので、行数やdictの要素数が多くても高速です。
+
+    Args:
+        series: 置換対象のSeries
+        replacement_dict: keyが置換前の値、valueが置換後の値であるdict
+    """
+    if len(replacement_dict) == 0:
+        return series
+    is_replaced = series.isin(list(replacement_dict.keys()))
+    if not is_replaced.any():
+        return series
+    # `Series.where`は置換しない要素のNoneもNaNに変換してしまうので、置換する要素だけに代入する
+    result = series.copy()
+    result[is_replaced] = series[is_replaced].map(replacement_dict)
+    return result
+
+
+def replace_values_by_column(df: pandas.DataFrame, replacement_dict_by_column: Mapping[str, Mapping[Any, Any] | None]) -> pandas.DataFrame:
+    """
+    列ごとに値を置換したDataFrameを返します。 `DataFrame.replace({列名: dict})` と同じ結果です。
+    存在しない列や、置換表がNoneの列は無視します。
+
+    Args:
+        df: 置換対象のDataFrame。引数は変更しません。
+        replacement_dict_by_column: keyが列名、valueが置換表であるdict
+    """
+    df = df.copy()
+    for column, replacement_dict in replacement_dict_by_column.items():
+        if replacement_dict is not None and column in df.columns:
+            df[column] = replace_values(df[column], replacement_dict)
+    return df
@@ -0,0 +1,305 @@
+"""
+大量のレコードを、複数のファイルに分割しながら少しずつ出力するモジュール
+
+レコードを一定件数ずつDataFrameに変換してファイルに追記するので、
+全件をDataFrameにしてから出力する場合と異なり、メモリ使用量はレコードの件数に依存しません。
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import urllib.parse
+from collections.abc import Collection, Mapping, Sequence
+from dataclasses import dataclass
+from pathlib import Path
+from types import TracebackType
+from typing import Any, Self
+
+import pandas
+
+from annofabcli.common.enums import OutputFormat
+from annofabcli.common.record_builder import ColumnarRecordBuilder
+
+logger = logging.getLogger(__name__)
+
+PARTITIONED_OUTPUT_FORMATS = (OutputFormat.CSV, OutputFormat.PARQUET)
+"""分割して出力できるファイルの形式"""
+
+DEFAULT_CHUNK_SIZE = 100_000
+"""1回にファイルへ書き込むレコードの件数"""
+
+
+@dataclass(frozen=True)
+class PartitionedOutputOptions:
+    """
+    分割して出力する際のオプション
+    """
+
+    output_dir: Path
+    """出力先のディレクトリ"""
+    file_format: OutputFormat
+    """ファイルの形式。CSVまたはParquet"""
+    partition_by: str | None = None
+    """この列の値ごとに、 ``{列名}={値}`` という名前のサブディレクトリに分けて出力する"""
+    max_rows_per_file: int | None = None
+    """1ファイルあたりの最大行数。超えたら次のファイルに出力する"""
+
+
+class _Partition:
+    """
+    1個のパーティション（出力先のサブディレクトリ）に出力しているファイルの状態
+    """
+
+    def __init__(self, directory: Path, file_format: OutputFormat) -> None:
+        self.directory = directory
+        self.file_format = file_format
+        self.file_count = 0
+        self.current_file: Path | None = None
+        self.current_columns: list[str] = []
+        self.current_row_count = 0
+        self.parquet_writer: Any = None
+
+    def close_file(self) -> None:
+        if self.parquet_writer is not None:
+            self.parquet_writer.close()
+            self.parquet_writer = None
+        self.current_file = None
+        self.current_columns = []
+        self.current_row_count = 0
+
+    def open_file(self, columns: list[str]) -> Path:
+        self.close_file()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.current_file = self.directory / f"part-{self.file_count:05d}.{self.file_format.value}"
+        self.current_columns = columns
+        self.file_count += 1
+        return self.current_file
+
+
+def _import_pyarrow() -> Any:  # noqa: ANN401
+    try:
+        import pyarrow  # noqa: PLC0415
+        import pyarrow.parquet  # noqa: PLC0415, F401
+    except ImportError as e:
+        raise RuntimeError("Parquet形式で出力するには、pyarrowをインストールしてください。 :: `pip install annofabcli[parquet]`") from e
+    return pyarrow
+
+
+class PartitionedRecordWriter:
+    """
+    レコード（dict）を1件ずつ受け取って、CSVまたはParquetのファイルに分割しながら出力します。
+
+    * ``chunk_size`` 件ごとにファイルへ書き込むので、保持するレコードは最大 ``chunk_size`` 件です。
+    * ``partition_by`` を指定すると、列の値ごとに ``{列名}={値}`` という名前のサブディレクトリに分けて出力します。
+    * ``max_rows_per_file`` を指定すると、1ファイルの行数が超えたら次のファイルに出力します。
+    * 後から属性の列が増えた場合など、ファイルの列（スキーマ）が変わる場合も、次のファイルに出力します。
+      各ファイルは先頭行（Parquetの場合はスキーマ）を持つので、ファイルごとに独立して読み込めます。
+
+    Args:
+        options: 出力のオプション
+        columns: 出力する列
+        categorical_columns: 同じ値が繰り返し現れる列
+        dynamic_column_prefixes: ``columns`` 以外に出力する列のprefix
+        chunk_size: 1回にファイルへ書き込むレコードの件数
+    """
+
+    def __init__(
+        self,
+        options: PartitionedOutputOptions,
+        *,
+        columns: Sequence[str],
+        categorical_columns: Collection[str] = (),
+        dynamic_column_prefixes: Sequence[str] = (),
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> None:
+        if options.file_format not in PARTITIONED_OUTPUT_FORMATS:
+            raise ValueError(f"file_format='{options.file_format.value}' は分割して出力できません。")
+        if options.max_rows_per_file is not None and options.max_rows_per_file < 1:
+            raise ValueError(f"max_rows_per_file='{options.max_rows_per_file}' には1以上の値を指定してください。")
+        if options.file_format == OutputFormat.PARQUET:
+            _import_pyarrow()
+
+        self.options = options
+        self.columns = list(columns)
+        self.categorical_columns = categorical_columns
+        self.dynamic_column_prefixes = dynamic_column_prefixes
+        self.chunk_size = chunk_size
+
+        self._builders: dict[Any, ColumnarRecordBuilder] = {}
+        self._partitions: dict[Any, _Partition] = {}
+        self._buffered_count = 0
+        self.written_count = 0
+        """ファイルに書き込んだレコードの件数"""
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, exc_type: type[BaseException] | None, exc_value: BaseException | None, traceback: TracebackType | None) -> None:
+        self.close()
+
+    def _create_builder(self) -> ColumnarRecordBuilder:
+        return ColumnarRecordBuilder(self.columns, categorical_columns=self.categorical_columns, dynamic_column_prefixes=self.dynamic_column_prefixes)
+
+    def _get_partition(self, partition_value: Any) -> _Partition:  # noqa: ANN401
+        partition = self._partitions.get(partition_value)
+        if partition is None:
+            directory = self.options.output_dir
+            if self.options.partition_by is not None:
+                # ラベル名などにファイル名として使えない文字が含まれていても問題ないように、URLエンコードする
+                value = "__NULL__" if partition_value is None else urllib.parse.quote(str(partition_value), safe="")
+                directory = directory / f"{self.options.partition_by}={value}"
+            partition = _Partition(directory, self.options.file_format)
+            self._partitions[partition_value] = partition
+        return partition
+
+    def append(self, record: Mapping[str, Any]) -> None:
+        partition_value = record.get(self.options.partition_by) if self.options.partition_by is not None else None
+        builder = self._builders.get(partition_value)
+        if builder is None:
+            builder = self._create_builder()
+            self._builders[partition_value] = builder
+        builder.append(record)
+        self._buffered_count += 1
+        # パーティションが多くても保持するレコードの件数が増えないように、全パーティションの合計件数で判定する
+        if self._buffered_count >= self.chunk_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        保持しているレコードをファイルに書き込みます。
+        """
+        for partition_value, builder in self._builders.items():
+            if len(builder) > 0:
+                self._write_df(self._get_partition(partition_value), builder.to_dataframe())
+        self._builders = {}
+        self._buffered_count = 0
+
+    def close(self) -> None:
+        """
+        保持しているレコードを書き込んで、ファイルを閉じます。
+        1件も出力していない場合は、列名だけを持つファイルを出力します。
+        """
+        self.flush()
+        if len(self._partitions) == 0:
+            self._write_df(self._get_partition(None), self._create_builder().to_dataframe(), allow_empty=True)
+        for partition in self._partitions.values():
+            partition.close_file()
+        file_count = sum(partition.file_count for partition in self._partitions.values())
+        logger.info(f"{self.written_count} 件のレコードを、{file_count} 個のファイルに分けて'{self.options.output_dir}'に出力しました。")
+
+    def _write_df(self, partition: _Partition, df: pandas.DataFrame, *, allow_empty: bool = False) -> None:
+        columns = list(df.columns)
+        start = 0
+        while start < len(df) or (allow_empty and partition.current_file is None):
+            if partition.current_file is None or not set(columns).issubset(partition.current_columns) or self._is_full(partition):
+                partition.open_file(columns)
+
+            stop = len(df)
+            if self.options.max_rows_per_file is not None:
+                stop = min(stop, start + self.options.max_rows_per_file - partition.current_row_count)
+            sub_df = df.iloc[start:stop].reindex(columns=partition.current_columns)
+            if not self._write_to_current_file(partition, sub_df):
+                # 列の型が異なるなどの理由で追記できない場合は、次のファイルに出力する
+                partition.open_file(columns)
+                continue
+
+            partition.current_row_count += len(sub_df)
+            self.written_count += len(sub_df)
+            start = stop
+
+    def _is_full(self, partition: _Partition) -> bool:
+        return self.options.max_rows_per_file is not None and partition.current_row_count >= self.options.max_rows_per_file
+
+    def _write_to_current_file(self, partition: _Partition, df: pandas.DataFrame) -> bool:
+        """
+        今のファイルにDataFrameを追記します。
+
+        Returns:
+            追記できなかった場合はFalse
+        """
+        assert partition.current_file is not None
+        if self.options.file_format == OutputFormat.CSV:
+            is_new_file = partition.current_row_count == 0
+            # `print_csv` と同じく、Excelで開けるようにBOM付きで出力する
+            df.to_csv(
+                partition.current_file,
+                mode="w" if is_new_file else "a",
+                header=is_new_file,
+                index=False,
+                encoding="utf_8_sig" if is_new_file else "utf-8",
+            )
+            return True
+
+        pyarrow = _import_pyarrow()
+        # Categoricalの列はチャンクごとにカテゴリが異なり、スキーマが変わってしまうので、元の値に戻して書き込む
+        df = df.astype({column: object for column in df.columns if isinstance(df[column].dtype, pandas.CategoricalDtype)})
+        table = pyarrow.Table.from_pandas(df, preserve_index=False)
+        if partition.parquet_writer is None:
+            partition.parquet_writer = pyarrow.parquet.ParquetWriter(partition.current_file, table.schema)
+        elif not table.schema.equals(partition.parquet_writer.schema):
+            try:
+                table = table.cast(partition.parquet_writer.schema)
+            except (pyarrow.ArrowInvalid, pyarrow.ArrowNotImplementedError, ValueError):
+                return False
+        partition.parquet_writer.write_table(table)
+        return True
+
+
+def add_partitioned_output_arguments(parser: argparse.ArgumentParser, *, partition_by_choices: Sequence[str]) -> None:
+    """
+    分割して出力するためのコマンドライン引数を追加します。
+    """
+    parser.add_argument(
+        "--output_dir",
+        type=Path,
+        help="出力先のディレクトリを指定します。指定すると、読み込みながら少しずつファイルに書き込み、複数のファイルに分けて出力します。"
+        "件数が多くてもメモリ使用量は増えません。 ``--format`` には ``csv`` または ``parquet`` を指定してください。",
+    )
+    parser.add_argument(
+        "--partition_by",
+        type=str,
+        choices=partition_by_choices,
+        help="``--output_dir`` を指定したとき、指定した列の値ごとに ``{列名}={値}`` という名前のサブディレクトリに分けて出力します。",
+    )
+    parser.add_argument(
+        "--max_rows_per_file",
+        type=int,
+        help="``--output_dir`` を指定したとき、1ファイルあたりの最大行数を指定します。",
+    )
+
+
+def create_partitioned_output_options(args: argparse.Namespace) -> PartitionedOutputOptions | None:
+    """
+    コマンドライン引数から、分割して出力する際のオプションを生成します。 ``--output_dir`` が未指定ならNoneを返します。
+    """
+    if args.output_dir is None:
+        return None
+    return PartitionedOutputOptions(
+        output_dir=args.output_dir,
+        file_format=OutputFormat(args.format),
+        partition_by=args.partition_by,
+        max_rows_per_file=args.max_rows_per_file,
+    )
+
+
+def validate_partitioned_output_arguments(args: argparse.Namespace) -> str | None:
+    """
+    分割して出力するためのコマンドライン引数を検証します。
+
+    Returns:
+        エラーメッセージ。問題がなければNone
+    """
+    output_format = OutputFormat(args.format)
+    if args.output_dir is None:
+        if output_format == OutputFormat.PARQUET:
+            return "argument --format: 'parquet' は '--output_dir' を指定したときのみ指定できます。"
+        if args.partition_by is not None or args.max_rows_per_file is not None:
+            return "argument --partition_by, --max_rows_per_file: '--output_dir' を指定したときのみ指定できます。"
+    elif args.output is not None:
+        return "argument --output_dir: '--output' と同時に指定できません。"
+    elif output_format not in PARTITIONED_OUTPUT_FORMATS:
+        return f"argument --format: '--output_dir' を指定したときは、'csv' または 'parquet' を指定してください。 :: '{output_format.value}'"
+    elif args.max_rows_per_file is not None and args.max_rows_per_file < 1:
+        return f"argument --max_rows_per_file: 1以上の値を指定してください。 :: '{args.max_rows_per_file}'"
+    return None
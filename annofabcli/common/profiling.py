@@ -0,0 +1,280 @@
+"""
+コマンドの処理時間を計測するための機能
+
+``--timing_report`` が指定された場合は、以下の情報を計測してファイルに出力します。
+
+* HTTPリクエストの回数、レスポンスのバイト数、レイテンシのヒストグラム、HTTPステータスコード429や5XXの回数
+* ホストごとの新しく生成したHTTPコネクションの個数（コネクションの再利用状況）
+* ``span`` や ``timed`` で囲んだ処理の回数と処理時間
+
+計測が無効の場合、``span`` や ``timed`` はほとんどオーバーヘッドがありません。
+なお、``multiprocessing`` で生成した子プロセス内の処理は計測されません。
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import cProfile
+import functools
+import json
+import logging
+import threading
+import time
+import urllib.parse
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, ParamSpec, TypeVar
+
+import pandas
+import requests
+
+logger = logging.getLogger(__name__)
+
+P = ParamSpec("P")
+R = TypeVar("R")
+
+HTTP_LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+"""HTTPレスポンスのレイテンシのヒストグラムの境界値[秒]"""
+
+
+@dataclass
+class SpanStatistics:
+    """名前付きの処理区間（span）の統計情報"""
+
+    name: str
+    count: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+
+
+@dataclass
+class HttpStatistics:
+    """HTTPメソッドとホストごとのHTTPリクエストの統計情報"""
+
+    http_method: str
+    host: str
+    count: int = 0
+    response_bytes: int = 0
+    """Content-Lengthヘッダの合計値。Content-Lengthヘッダがないレスポンスは含みません。"""
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+    too_many_requests_count: int = 0
+    """HTTPステータスコードが429のレスポンスの個数。annofabapiはこのレスポンスを受け取るとリトライします。"""
+    server_error_count: int = 0
+    """HTTPステータスコードが5XXのレスポンスの個数"""
+    latency_histogram: list[int] = field(default_factory=lambda: [0] * (len(HTTP_LATENCY_BUCKETS) + 1))
+    """レイテンシのヒストグラム。i番目の要素は`HTTP_LATENCY_BUCKETS[i]`秒以下（前の境界値より大きい）のレスポンスの個数。最後の要素はそれ以外のレスポンスの個数。"""
+
+
+class TimingRecorder:
+    """
+    処理時間を記録するクラス。スレッドセーフです。
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._start_time = time.perf_counter()
+        self.spans: dict[str, SpanStatistics] = {}
+        self.http: dict[tuple[str, str], HttpStatistics] = {}
+        self.new_connection_count: dict[str, int] = {}
+        """key:ホスト, value:新しく生成したHTTPコネクションの個数"""
+
+    def add_span(self, name: str, seconds: float) -> None:
+        with self._lock:
+            stat = self.spans.get(name)
+            if stat is None:
+                stat = SpanStatistics(name)
+                self.spans[name] = stat
+            stat.count += 1
+            stat.total_seconds += seconds
+            stat.max_seconds = max(stat.max_seconds, seconds)
+
+    def add_new_connection(self, host: str) -> None:
+        with self._lock:
+            self.new_connection_count[host] = self.new_connection_count.get(host, 0) + 1
+
+    def _connection_statistics(self) -> list[dict[str, Any]]:
+        """
+        ホストごとに、リクエスト数と新しく生成したコネクションの個数から、コネクションの再利用率を算出します。
+        """
+        request_count_by_host: dict[str, int] = {}
+        for stat in self.http.values():
+            request_count_by_host[stat.host] = request_count_by_host.get(stat.host, 0) + stat.count
+
+        result = []
+        for host, request_count in request_count_by_host.items():
+            new_connection_count = self.new_connection_count.get(host, 0)
+            result.append(
+                {
+                    "host": host,
+                    "request_count": request_count,
+                    "new_connection_count": new_connection_count,
+                    "connection_reuse_ratio": max(request_count - new_connection_count, 0) / request_count if request_count > 0 else None,
+                }
+            )
+        return result
+
+    def add_response(self, response: requests.Response) -> None:
+        method = response.request.method if response.request.method is not None else ""
+        host = urllib.parse.urlsplit(response.url).hostname or ""
+        seconds = response.elapsed.total_seconds()
+        content_length = response.headers.get("Content-Length")
+
+        bucket_index = len(HTTP_LATENCY_BUCKETS)
+        for index, bucket in enumerate(HTTP_LATENCY_BUCKETS):
+            if seconds <= bucket:
+                bucket_index = index
+                break
+
+        with self._lock:
+            stat = self.http.get((method, host))
+            if stat is None:
+                stat = HttpStatistics(method, host)
+                self.http[(method, host)] = stat
+            stat.count += 1
+            stat.total_seconds += seconds
+            stat.max_seconds = max(stat.max_seconds, seconds)
+            if content_length is not None and content_length.isdigit():
+                stat.response_bytes += int(content_length)
+            if response.status_code == requests.codes.too_many_requests:
+                stat.too_many_requests_count += 1
+            elif response.status_code >= 500:
+                stat.server_error_count += 1
+            stat.latency_histogram[bucket_index] += 1
+
+    def to_dict(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "elapsed_seconds": time.perf_counter() - self._start_time,
+                "spans": [vars(e).copy() for e in sorted(self.spans.values(), key=lambda e: e.total_seconds, reverse=True)],
+                "http": [{**vars(e), "latency_histogram": list(e.latency_histogram)} for e in self.http.values()],
+                "connections": self._connection_statistics(),
+                "http_latency_buckets": list(HTTP_LATENCY_BUCKETS),
+            }
+
+    def write_report(self, output: Path) -> None:
+        """
+        計測結果を出力します。拡張子が ``.csv`` ならCSV形式、それ以外はJSON形式で出力します。
+        CSV形式には、レイテンシのヒストグラムは含まれません。
+        """
+        report = self.to_dict()
+        output.parent.mkdir(parents=True, exist_ok=True)
+        if output.suffix.lower() == ".csv":
+            rows = [{"category": "span", **e} for e in report["spans"]]
+            rows.extend({"category": "http", "name": f"{e['http_method']} {e['host']}", **e} for e in report["http"])
+            rows.extend({"category": "connection", "name": e["host"], "count": e["request_count"], **e} for e in report["connections"])
+            columns = [
+                "category",
+                "name",
+                "count",
+                "total_seconds",
+                "max_seconds",
+                "response_bytes",
+                "too_many_requests_count",
+                "server_error_count",
+                "new_connection_count",
+                "connection_reuse_ratio",
+            ]
+            df = pandas.DataFrame(rows, columns=columns)
+            df.to_csv(output, index=False, encoding="utf_8_sig")
+        else:
+            with output.open(mode="w", encoding="utf-8") as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+        logger.info(f"処理時間の計測結果を'{output}'に出力しました。")
+
+
+_recorder: TimingRecorder | None = None
+
+
+def get_timing_recorder() -> TimingRecorder | None:
+    """
+    処理時間の計測が有効な場合は、TimingRecorderインスタンスを返します。無効な場合はNoneを返します。
+    """
+    return _recorder
+
+
+@contextlib.contextmanager
+def span(name: str) -> Iterator[None]:
+    """
+    withブロック内の処理時間を、指定した名前で記録します。
+    """
+    recorder = _recorder
+    if recorder is None:
+        yield
+        return
+
+    start_time = time.perf_counter()
+    try:
+        yield
+    finally:
+        recorder.add_span(name, time.perf_counter() - start_time)
+
+
+def timed(name: str | None = None) -> Callable[[Callable[P, R]], Callable[P, R]]:
+    """
+    関数の処理時間を記録するデコレータ。
+
+    Args:
+        name: 記録する名前。未指定の場合は関数の ``__qualname__`` です。
+    """
+
+    def decorator(func: Callable[P, R]) -> Callable[P, R]:
+        span_name = name if name is not None else func.__qualname__
+
+        @functools.wraps(func)
+        def wrapped(*args: P.args, **kwargs: P.kwargs) -> R:
+            if _recorder is None:
+                return func(*args, **kwargs)
+            with span(span_name):
+                return func(*args, **kwargs)
+
+        return wrapped
+
+    return decorator
+
+
+def instrument_session(session: requests.Session) -> None:
+    """
+    処理時間の計測が有効な場合、sessionで実行したHTTPリクエストを記録するようにします。
+    """
+    recorder = _recorder
+    if recorder is None:
+        return
+
+    def hook(response: requests.Response, *args: Any, **kwargs: Any) -> None:  # noqa: ARG001, ANN401
+        recorder.add_response(response)
+
+    session.hooks["response"].append(hook)
+
+
+@contextlib.contextmanager
+def profile_from_args(args: argparse.Namespace) -> Iterator[None]:
+    """
+    コマンドライン引数 ``--timing_report`` , ``--profile`` に従って、withブロック内の処理を計測します。
+    """
+    global _recorder  # noqa: PLW0603
+
+    timing_report: Path | None = getattr(args, "timing_report", None)
+    profile: Path | None = getattr(args, "profile", None)
+
+    if timing_report is not None:
+        _recorder = TimingRecorder()
+
+    profiler = cProfile.Profile() if profile is not None else None
+    if profiler is not None:
+        profiler.enable()
+
+    try:
+        yield
+    finally:
+        if profiler is not None and profile is not None:
+            profiler.disable()
+            profile.parent.mkdir(parents=True, exist_ok=True)
+            profiler.dump_stats(profile)
+            logger.info(f"cProfileの計測結果を'{profile}'に出力しました。`python -m pstats {profile}` で確認できます。")
+
+        if _recorder is not None and timing_report is not None:
+            _recorder.write_report(timing_report)
+            _recorder = None
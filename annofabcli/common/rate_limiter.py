@@ -0,0 +1,37 @@
+"""
+複数のスレッドから実行するAPIの呼び出し頻度を制限する機能
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+
+
+class RateLimiter:
+    """
+    1秒あたりの呼び出し回数を制限します。複数のスレッドで共有できます。
+
+    ``acquire`` を呼び出すと、前回の呼び出しから ``1 / max_calls_per_second`` 秒以上経過するまで待ちます。
+
+    Args:
+        max_calls_per_second: 1秒あたりの最大呼び出し回数
+    """
+
+    def __init__(self, max_calls_per_second: float) -> None:
+        if max_calls_per_second <= 0:
+            raise ValueError(f"max_calls_per_second='{max_calls_per_second}' には0より大きい値を指定してください。")
+        self.interval = 1.0 / max_calls_per_second
+        self._lock = threading.Lock()
+        self._next_time = time.monotonic()
+
+    def acquire(self) -> None:
+        """
+        呼び出しが許可されるまで待ちます。
+        """
+        with self._lock:
+            now = time.monotonic()
+            wait_seconds = self._next_time - now
+            self._next_time = max(now, self._next_time) + self.interval
+        if wait_seconds > 0:
+            time.sleep(wait_seconds)
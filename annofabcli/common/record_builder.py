@@ -0,0 +1,205 @@
+"""
+レコード（dict）を1件ずつ受け取って、列ごとに詰めて保持するモジュール
+
+アノテーションZIPを読み込んでアノテーションの一覧を出力するコマンドで、
+アノテーションごとにdictやdataclassを保持し続けないようにするために利用します。
+"""
+
+from __future__ import annotations
+
+import math
+from array import array
+from collections.abc import Collection, Iterable, Mapping, Sequence
+from typing import Any
+
+import numpy
+import pandas
+
+
+def flatten_record(record: Mapping[str, Any], *, prefix: str = "") -> dict[str, Any]:
+    """
+    ネストしたdictを、 ``pandas.json_normalize`` と同じく ``.`` 区切りのキーで平坦化します。
+    listなどdict以外の値は、そのまま格納します。
+    """
+    result: dict[str, Any] = {}
+    for key, value in record.items():
+        column = f"{prefix}{key}"
+        if isinstance(value, Mapping) and len(value) > 0:
+            result.update(flatten_record(value, prefix=f"{column}."))
+        else:
+            result[column] = value
+    return result
+
+
+class _CategoricalColumn:
+    """
+    値の種類が少ない文字列の列。値はコードの配列で保持し、同じ値の文字列は1つだけ保持します。
+    """
+
+    def __init__(self, row_count: int) -> None:
+        self.codes = array("i", [-1]) * row_count
+        self.code_by_value: dict[Any, int] = {}
+
+    def append(self, value: Any) -> None:  # noqa: ANN401
+        if value is None:
+            self.codes.append(-1)
+            return
+        code = self.code_by_value.get(value)
+        if code is None:
+            code = len(self.code_by_value)
+            self.code_by_value[value] = code
+        self.codes.append(code)
+
+    def to_series(self) -> pandas.Series:
+        categories = list(self.code_by_value.keys())
+        return pandas.Series(pandas.Categorical.from_codes(numpy.frombuffer(self.codes, dtype=numpy.int32), categories=categories))
+
+
+class _DenseColumn:
+    """
+    すべてのレコードに存在する列。
+    int, floatの値だけが格納されている間は型付きの配列で保持し、それ以外の値が現れたらPythonオブジェクトのlistに切り替えます。
+    """
+
+    def __init__(self, row_count: int) -> None:
+        # 先頭から続くNoneの件数。最初の値が現れるまで、格納方法を決めない
+        self.leading_none_count = row_count
+        self.values: array | list[Any] | None = None
+
+    def append(self, value: Any) -> None:  # noqa: ANN401
+        if self.values is None:
+            if value is None:
+                self.leading_none_count += 1
+                return
+            if isinstance(value, float):
+                self.values = array("d", [math.nan]) * self.leading_none_count
+            elif isinstance(value, int) and not isinstance(value, bool) and self.leading_none_count == 0:
+                self.values = array("q")
+            else:
+                self.values = [None] * self.leading_none_count
+
+        if isinstance(self.values, array):
+            if self.values.typecode == "q":
+                if isinstance(value, int) and not isinstance(value, bool):
+                    self.values.append(value)
+                    return
+                if value is None or isinstance(value, float):
+                    # pandasと同じく、欠損値を含む整数の列は浮動小数点数の列にする
+                    self.values = array("d", self.values)
+            if self.values.typecode == "d":
+                if value is None:
+                    self.values.append(math.nan)
+                    return
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    self.values.append(value)
+                    return
+            self.values = list(self.values)
+
+        assert isinstance(self.values, list)
+        self.values.append(value)
+
+    def to_series(self) -> pandas.Series:
+        if self.values is None:
+            return pandas.Series([None] * self.leading_none_count, dtype=object)
+        if isinstance(self.values, array):
+            dtype = numpy.int64 if self.values.typecode == "q" else numpy.float64
+            return pandas.Series(numpy.frombuffer(self.values, dtype=dtype))
+        return pandas.Series(self.values)
+
+
+class _SparseColumn:
+    """
+    一部のレコードにしか存在しない列（属性の列など）。値が存在する行の番号と値だけを保持します。
+    """
+
+    def __init__(self) -> None:
+        self.row_indices = array("q")
+        self.values: list[Any] = []
+        # 同じ文字列を何度も保持しないようにするためのdict
+        self.string_pool: dict[str, str] = {}
+
+    def append(self, row_index: int, value: Any) -> None:  # noqa: ANN401
+        if isinstance(value, str):
+            value = self.string_pool.setdefault(value, value)
+        self.row_indices.append(row_index)
+        self.values.append(value)
+
+    def to_series(self, row_count: int) -> pandas.Series:
+        values = numpy.full(row_count, None, dtype=object)
+        values[numpy.frombuffer(self.row_indices, dtype=numpy.int64)] = self.values
+        # 値が存在しない行は、 `pandas.json_normalize` と同じく欠損値にする
+        return pandas.Series(values.tolist())
+
+
+class ColumnarRecordBuilder:
+    """
+    レコード（dict）を1件ずつ受け取って、列ごとに詰めて保持します。
+    最後に :meth:`to_dataframe` でDataFrameに変換します。
+
+    以下のように保持するので、レコードのlistを保持するよりメモリ使用量が少なくなります。
+
+    * ``categorical_columns`` に指定した列: 値の種類ごとに文字列を1つだけ保持して、各行はint32のコードで保持する
+    * 数値の列: 型付きの配列で保持する
+    * ``dynamic_column_prefixes`` で始まる列: 値が存在する行だけを保持する
+
+    Args:
+        columns: 出力する列。レコードに存在しない列は欠損値になります。
+        categorical_columns: project_idやラベル名など、同じ値が繰り返し現れる列
+        dynamic_column_prefixes: ``columns`` 以外に出力する列のprefix。該当する列は、列名でソートして ``columns`` の後ろに並べます。
+    """
+
+    def __init__(
+        self,
+        columns: Sequence[str],
+        *,
+        categorical_columns: Collection[str] = (),
+        dynamic_column_prefixes: Sequence[str] = (),
+    ) -> None:
+        self.columns = list(columns)
+        self.dynamic_column_prefixes = tuple(dynamic_column_prefixes)
+        self._row_count = 0
+        self._columns: dict[str, _CategoricalColumn | _DenseColumn] = {column: _CategoricalColumn(0) if column in categorical_columns else _DenseColumn(0) for column in self.columns}
+        self._dynamic_columns: dict[str, _SparseColumn] = {}
+
+    def __len__(self) -> int:
+        return self._row_count
+
+    def append(self, record: Mapping[str, Any]) -> None:
+        """
+        レコードを追加します。ネストしたdictは ``.`` 区切りの列名に平坦化します。
+        ``columns`` にも ``dynamic_column_prefixes`` にも該当しない列は、保持しません。
+        """
+        flat_record = flatten_record(record)
+        for column, stored_column in self._columns.items():
+            stored_column.append(flat_record.get(column))
+
+        if len(self.dynamic_column_prefixes) > 0:
+            for column, value in flat_record.items():
+                if not column.startswith(self.dynamic_column_prefixes):
+                    continue
+                dynamic_column = self._dynamic_columns.get(column)
+                if dynamic_column is None:
+                    dynamic_column = _SparseColumn()
+                    self._dynamic_columns[column] = dynamic_column
+                dynamic_column.append(self._row_count, value)
+
+        self._row_count += 1
+
+    def extend(self, records: Iterable[Mapping[str, Any]]) -> None:
+        for record in records:
+            self.append(record)
+
+    def to_dataframe(self) -> pandas.DataFrame:
+        """
+        保持しているレコードをDataFrameに変換します。
+        列は ``columns`` の順に並べ、その後ろに ``dynamic_column_prefixes`` で始まる列を列名でソートして並べます。
+        """
+        if self._row_count == 0:
+            return pandas.DataFrame(columns=self.columns)
+
+        data: dict[str, pandas.Series] = {column: stored_column.to_series() for column, stored_column in self._columns.items()}
+        for column in sorted(self._dynamic_columns.keys()):
+            if column in data:
+                continue
+            data[column] = self._dynamic_columns[column].to_series(self._row_count)
+        return pandas.DataFrame(data)
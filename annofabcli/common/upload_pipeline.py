@@ -0,0 +1,369 @@
+"""
+ローカルファイルをアップロードして、入力データや補助情報として登録する処理をパイプラインで実行する機能
+
+1件ごとに以下のステージを、ステージごとのスレッドプールで実行します。
+
+1. 確認ステージ: 登録済みかどうかの確認など、登録する内容を決める。その後、ファイルを読み込んでMD5ハッシュ値を算出する。
+2. アップロードステージ: 一時データ保存先（AWS S3）に、ファイルをディスクから読み込みながらアップロードする。
+3. 登録ステージ: アップロードしたS3パスを指定して、入力データや補助情報を登録する。
+
+アップロード後にファイルを読み直してMD5ハッシュ値を算出することはしません（確認ステージで算出した値とETagを比較します）。
+あるファイルをアップロードしている間に、他のファイルのハッシュ値の算出や登録を進めます。
+"""
+
+from __future__ import annotations
+
+import datetime
+import hashlib
+import json
+import logging
+import mimetypes
+import threading
+import time
+import urllib.parse
+from collections.abc import Callable, Iterable
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Generic, TypeVar
+
+import annofabapi
+from annofabapi.api import my_backoff
+from annofabapi.exceptions import CheckSumError
+
+from annofabcli.common.profiling import span
+
+logger = logging.getLogger(__name__)
+
+ItemT = TypeVar("ItemT")
+PayloadT = TypeVar("PayloadT")
+
+HASH_CHUNK_SIZE = 8 * 1024 * 1024
+"""MD5ハッシュ値を算出する際に、1回に読み込むバイト数"""
+
+
+def get_content_type(file_path: Path) -> str:
+    """
+    ファイルパスからMIME Typeを推測します。推測できない場合は ``application/octet-stream`` を返します。
+    """
+    content_type, _ = mimetypes.guess_type(str(file_path))
+    return content_type if content_type is not None else "application/octet-stream"
+
+
+@dataclass(frozen=True)
+class LocalFile:
+    """
+    アップロードするローカルファイル
+    """
+
+    path: Path
+    size: int
+    mtime_ns: int
+    md5: str
+    content_type: str
+
+    @classmethod
+    def from_path(cls, path: Path) -> LocalFile:
+        """
+        ファイルを読み込んで、MD5ハッシュ値を算出します。
+        """
+        stat = path.stat()
+        md5_obj = hashlib.md5(usedforsecurity=False)
+        with path.open("rb") as f:
+            while chunk := f.read(HASH_CHUNK_SIZE):
+                md5_obj.update(chunk)
+        return cls(path=path, size=stat.st_size, mtime_ns=stat.st_mtime_ns, md5=md5_obj.hexdigest(), content_type=get_content_type(path))
+
+
+@my_backoff
+def upload_local_file_to_s3(service: annofabapi.Resource, project_id: str, local_file: LocalFile) -> str:
+    """
+    一時データ保存先にファイルをアップロードします。
+
+    Returns:
+        一時データ保存先であるS3パス
+
+    Raises:
+        CheckSumError: ファイルのMD5ハッシュ値が、アップロードしたときのレスポンスのETagと一致しない
+    """
+    content, _ = service.api.create_temp_path(project_id)
+    url_parse_result = urllib.parse.urlparse(content["url"])
+    query_dict = urllib.parse.parse_qs(url_parse_result.query)
+    s3_url = content["url"].split("?")[0]
+
+    with local_file.path.open("rb") as f:
+        response = service.api.session.put(s3_url, params=query_dict, data=f, headers={"content-type": local_file.content_type})
+    response.raise_for_status()
+
+    # ETagにはダブルクォートが含まれている
+    response_etag = response.headers["ETag"]
+    if f'"{local_file.md5}"' != response_etag:
+        message = (
+            f"アップロードしたファイル'{local_file.path}'のMD5ハッシュ値('{local_file.md5}')が、"
+            f"AWS S3にアップロードしたときのレスポンスのETag('{response_etag}')に一致しませんでした。アップロード時にデータが破損した可能性があります。"
+        )
+        raise CheckSumError(message=message, uploaded_data_hash=local_file.md5, response_etag=response_etag)
+    return content["path"]
+
+
+class UploadManifest:
+    """
+    登録済みのファイルを記録するマニフェストファイル。JSON Lines形式で、登録するたびに1行追記します。
+
+    同じプロジェクト・同じキーで、サイズと更新日時が同じファイルを登録済みならば、再実行時にアップロードをスキップできます。
+    同じマニフェストファイルを別のプロジェクトで使った場合は、登録済みとみなしません。
+    一時データ保存先のS3パスには有効期限があるため、アップロードしただけで登録していないファイルは記録しません。
+
+    Args:
+        path: マニフェストファイルのパス
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        # key: (project_id, キー)
+        self._entries: dict[tuple[str, str], dict[str, Any]] = {}
+        if path.exists():
+            with path.open(encoding="utf-8") as f:
+                for line in f:
+                    if line.strip() == "":
+                        continue
+                    entry = json.loads(line)
+                    if "project_id" not in entry:
+                        # プロジェクトIDを記録していない古い形式の行は、どのプロジェクトに登録したか分からないので無視する
+                        continue
+                    self._entries[(entry["project_id"], entry["key"])] = entry
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def is_registered(self, project_id: str, key: str, file_path: Path) -> bool:
+        """
+        ``project_id`` のプロジェクトの ``key`` に対して、同じサイズと更新日時のファイルを登録済みかどうかを返します。
+        """
+        entry = self._entries.get((project_id, key))
+        if entry is None or entry["file_path"] != str(file_path):
+            return False
+        try:
+            stat = file_path.stat()
+        except FileNotFoundError:
+            return False
+        return entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns
+
+    def add(self, project_id: str, key: str, local_file: LocalFile) -> None:
+        entry = {
+            "project_id": project_id,
+            "key": key,
+            "file_path": str(local_file.path),
+            "size": local_file.size,
+            "mtime_ns": local_file.mtime_ns,
+            "md5": local_file.md5,
+            "registered_datetime": datetime.datetime.now().astimezone().isoformat(),
+        }
+        with self._lock:
+            self._entries[(project_id, key)] = entry
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.path.open("a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+
+@dataclass(frozen=True)
+class UploadRequest(Generic[PayloadT]):
+    """
+    確認ステージで決めた、1件の登録内容
+    """
+
+    key: str
+    """マニフェストに記録するキー。入力データIDなど"""
+    file_path: Path | None
+    """アップロードするローカルファイルのパス。ローカルファイルでない場合（S3パスなど）はNone"""
+    payload: PayloadT
+    """登録ステージに渡す値"""
+
+
+@dataclass
+class StageStatistics:
+    """ステージごとの処理件数と処理時間"""
+
+    name: str
+    count: int = 0
+    total_bytes: int = 0
+    total_seconds: float = 0.0
+    """各スレッドでの処理時間の合計"""
+
+    def to_message(self, wall_seconds: float) -> str:
+        message = f"{self.name}: {self.count}件, 処理時間の合計={self.total_seconds:.1f}秒"
+        if self.total_bytes > 0 and wall_seconds > 0:
+            message += f", {self.total_bytes / 1024**2:.1f}MB, スループット={self.total_bytes / 1024**2 / wall_seconds:.1f}MB/秒"
+        return message
+
+
+@dataclass
+class UploadPipelineResult:
+    """パイプラインの処理結果"""
+
+    succeeded_count: int = 0
+    """登録した件数"""
+    skipped_count: int = 0
+    """確認ステージで登録しないと判断した件数、またはマニフェストに登録済みと記録されていた件数"""
+    failed_count: int = 0
+    stages: dict[str, StageStatistics] = field(default_factory=dict)
+
+
+class UploadPipeline(Generic[ItemT, PayloadT]):
+    """
+    ローカルファイルのアップロードと登録を、ステージごとのスレッドプールで実行します。
+
+    Args:
+        service: annofabapiのインスタンス
+        project_id: 登録先のプロジェクトのproject_id
+        prepare: 確認ステージの処理。登録しない場合はNoneを返します。
+        register: 登録ステージの処理。引数は ``prepare`` が返した ``payload`` と、アップロードしたS3パス（ローカルファイルでない場合はNone）です。
+        describe: ログに出力する、要素の説明を返す関数
+        parallelism: 各ステージのスレッド数
+        manifest: 登録済みのファイルを記録するマニフェスト
+    """
+
+    def __init__(
+        self,
+        service: annofabapi.Resource,
+        project_id: str,
+        *,
+        prepare: Callable[[ItemT], UploadRequest[PayloadT] | None],
+        register: Callable[[PayloadT, str | None], None],
+        describe: Callable[[ItemT], str] = str,
+        parallelism: int,
+        manifest: UploadManifest | None = None,
+    ) -> None:
+        self.service = service
+        self.project_id = project_id
+        self.prepare = prepare
+        self.register = register
+        self.describe = describe
+        self.parallelism = parallelism
+        self.manifest = manifest
+
+        self._lock = threading.Lock()
+        self._result = UploadPipelineResult(stages={name: StageStatistics(name) for name in ["確認", "ハッシュ値の算出", "アップロード", "登録"]})
+        # 処理中の要素の個数を制限して、未処理の要素を大量に保持しないようにする
+        self._in_flight = threading.BoundedSemaphore(parallelism * 4)
+
+    def _record_stage(self, name: str, start_time: float, num_bytes: int = 0) -> None:
+        with self._lock:
+            stage = self._result.stages[name]
+            stage.count += 1
+            stage.total_bytes += num_bytes
+            stage.total_seconds += time.perf_counter() - start_time
+
+    def _finish(self, *, succeeded: bool = False, skipped: bool = False) -> None:
+        with self._lock:
+            if succeeded:
+                self._result.succeeded_count += 1
+            elif skipped:
+                self._result.skipped_count += 1
+            else:
+                self._result.failed_count += 1
+        self._in_flight.release()
+
+    def _run_prepare_stage(self, item: ItemT) -> tuple[UploadRequest[PayloadT], LocalFile | None] | None:
+        start_time = time.perf_counter()
+        with span("upload_pipeline.prepare"):
+            request = self.prepare(item)
+        self._record_stage("確認", start_time)
+        if request is None or request.file_path is None:
+            return (request, None) if request is not None else None
+
+        if self.manifest is not None and self.manifest.is_registered(self.project_id, request.key, request.file_path):
+            logger.debug(f"'{request.file_path}' は登録済みとマニフェストに記録されているので、スキップします。 :: key='{request.key}'")
+            return None
+
+        start_time = time.perf_counter()
+        with span("upload_pipeline.hash"):
+            local_file = LocalFile.from_path(request.file_path)
+        self._record_stage("ハッシュ値の算出", start_time, local_file.size)
+        return request, local_file
+
+    def _run_upload_stage(self, local_file: LocalFile) -> str:
+        start_time = time.perf_counter()
+        with span("upload_pipeline.upload"):
+            s3_path = upload_local_file_to_s3(self.service, self.project_id, local_file)
+        self._record_stage("アップロード", start_time, local_file.size)
+        return s3_path
+
+    def _run_register_stage(self, request: UploadRequest[PayloadT], local_file: LocalFile | None, s3_path: str | None) -> None:
+        start_time = time.perf_counter()
+        with span("upload_pipeline.register"):
+            self.register(request.payload, s3_path)
+        self._record_stage("登録", start_time)
+        if self.manifest is not None and local_file is not None:
+            self.manifest.add(self.project_id, request.key, local_file)
+
+    def _on_item_done(self, item: ItemT, future: Future[Any] | None, *, succeeded: bool = False, skipped: bool = False) -> None:
+        if future is not None:
+            e = future.exception()
+            if isinstance(e, CheckSumError):
+                logger.warning(f"{self.describe(item)} :: アップロードしたデータが破損している可能性があるため、登録しませんでした。", exc_info=e)
+            elif e is not None:
+                logger.warning(f"{self.describe(item)} :: 登録に失敗しました。", exc_info=e)
+        self._finish(succeeded=succeeded, skipped=skipped)
+        with self._lock:
+            self._pending_count -= 1
+            if self._is_submitted_all and self._pending_count == 0:
+                self._all_done.set()
+
+    def _submit_register(self, item: ItemT, request: UploadRequest[PayloadT], local_file: LocalFile | None, s3_path: str | None) -> None:
+        register_future = self._register_executor.submit(self._run_register_stage, request, local_file, s3_path)
+        register_future.add_done_callback(lambda f: self._on_item_done(item, f, succeeded=f.exception() is None))
+
+    def _on_uploaded(self, item: ItemT, request: UploadRequest[PayloadT], local_file: LocalFile, future: Future[str]) -> None:
+        if future.exception() is not None:
+            self._on_item_done(item, future)
+            return
+        self._submit_register(item, request, local_file, future.result())
+
+    def _on_prepared(self, item: ItemT, future: Future[tuple[UploadRequest[PayloadT], LocalFile | None] | None]) -> None:
+        if future.exception() is not None:
+            self._on_item_done(item, future)
+            return
+        prepared = future.result()
+        if prepared is None:
+            self._on_item_done(item, None, skipped=True)
+            return
+        request, local_file = prepared
+        if local_file is None:
+            self._submit_register(item, request, None, None)
+            return
+        upload_future = self._upload_executor.submit(self._run_upload_stage, local_file)
+        upload_future.add_done_callback(lambda f: self._on_uploaded(item, request, local_file, f))
+
+    def run(self, items: Iterable[ItemT]) -> UploadPipelineResult:
+        """
+        パイプラインを実行します。ある要素で例外が発生しても、残りの要素の処理は続けます。
+        """
+        wall_start_time = time.perf_counter()
+        self._all_done = threading.Event()
+        self._pending_count = 0
+        self._is_submitted_all = False
+
+        with (
+            ThreadPoolExecutor(max_workers=self.parallelism, thread_name_prefix="prepare") as prepare_executor,
+            ThreadPoolExecutor(max_workers=self.parallelism, thread_name_prefix="upload") as self._upload_executor,
+            ThreadPoolExecutor(max_workers=self.parallelism, thread_name_prefix="register") as self._register_executor,
+        ):
+            for item in items:
+                self._in_flight.acquire()
+                with self._lock:
+                    self._pending_count += 1
+                prepare_future = prepare_executor.submit(self._run_prepare_stage, item)
+                prepare_future.add_done_callback(lambda f, item=item: self._on_prepared(item, f))  # type: ignore[misc]
+
+            with self._lock:
+                self._is_submitted_all = True
+                if self._pending_count == 0:
+                    self._all_done.set()
+            self._all_done.wait()
+
+        wall_seconds = time.perf_counter() - wall_start_time
+        stage_message = ", ".join(stage.to_message(wall_seconds) for stage in self._result.stages.values())
+        logger.info(f"パイプラインの処理時間: {wall_seconds:.1f}秒 :: {stage_message}")
+        return self._result
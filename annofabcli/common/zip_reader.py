@@ -0,0 +1,235 @@
+"""
+ZIPファイルのメンバを読み込むモジュール
+
+``zipfile.ZipFile`` を1回だけ開き、セントラルディレクトリも1回だけ読み込んで、以降はメンバ名から ``ZipInfo`` を直接引きます。
+"""
+
+from __future__ import annotations
+
+import copy
+import io
+import mmap
+import struct
+import threading
+import zipfile
+import zlib
+from pathlib import Path
+from types import TracebackType
+from typing import IO, Self
+
+_LOCAL_FILE_HEADER_STRUCT = struct.Struct("<4s2B4HL2L2H")
+"""ローカルファイルヘッダの構造。最後の2個がファイル名と拡張フィールドの長さ"""
+_LOCAL_FILE_HEADER_SIGNATURE = b"PK\003\004"
+_FLAG_ENCRYPTED = 0x1
+_FLAG_DATA_DESCRIPTOR = 0x8
+_ZIP64_EXTRA_FIELD_ID = 0x0001
+_COPY_CHUNK_SIZE = 1024 * 1024
+
+
+def _strip_extra_field(extra: bytes, header_id: int) -> bytes:
+    """
+    拡張フィールドから、指定したIDのフィールドを取り除きます。
+    """
+    result = bytearray()
+    index = 0
+    while index + 4 <= len(extra):
+        field_id, field_size = struct.unpack("<HH", extra[index : index + 4])
+        end = index + 4 + field_size
+        if field_id != header_id:
+            result += extra[index:end]
+        index = end
+    return bytes(result)
+
+
+_ZIP_FILE_ATTRIBUTES_FOR_RAW_COPY = ("fp", "start_dir", "filelist", "NameToInfo", "_lock", "_writing", "_seekable", "_didModify", "_writecheck")
+"""``ZipReader.copy_raw_to`` が直接操作する ``zipfile.ZipFile`` の属性"""
+
+
+def _validate_zip_file_for_raw_copy(dest: zipfile.ZipFile) -> None:
+    """
+    ``ZipReader.copy_raw_to`` で、圧縮されたままのデータを書き込める ``ZipFile`` かどうかを検証します。
+    """
+    missing_attributes = [e for e in _ZIP_FILE_ATTRIBUTES_FOR_RAW_COPY if not hasattr(dest, e)]
+    if len(missing_attributes) > 0:
+        raise RuntimeError(f"このPythonの`zipfile.ZipFile`には、{missing_attributes} が存在しないため、メンバを圧縮されたままコピーできません。")
+    if dest.mode not in {"w", "x", "a"}:
+        raise ValueError(f"書き込み用に開いたZipFileを指定してください。 :: mode='{dest.mode}'")
+    if dest.fp is None:
+        raise ValueError("ZipFileはすでに閉じています。")
+    if dest._writing:  # type: ignore[attr-defined]  # noqa: SLF001
+        raise ValueError("ZipFileに書き込み中のメンバがあるため、コピーできません。")
+    if not dest._seekable:  # type: ignore[attr-defined]  # noqa: SLF001
+        raise ValueError("シークできないファイルオブジェクトに書き込むZipFileには、コピーできません。")
+
+
+class ZipReader:
+    """
+    ZIPファイルのメンバを読み込むクラス。
+
+    * ZIPファイルは1回だけ開き、セントラルディレクトリを読み込んで、メンバ名と ``ZipInfo`` のdictを作ります。
+      メンバの存在確認や取得に ``ZipFile.namelist()`` を使わないので、メンバ数に依存しません。
+    * 無圧縮（ ``ZIP_STORED`` ）のメンバは、ZIPファイルをメモリマップして、展開処理を通さずに読み込みます。
+
+    複数のスレッドから同時に読み込めます。
+
+    Args:
+        zip_path: ZIPファイルのパス
+    """
+
+    def __init__(self, zip_path: Path) -> None:
+        self.zip_path = zip_path
+        self._file = zip_path.open("rb")  # pylint: disable=consider-using-with
+        try:
+            self.zip_file = zipfile.ZipFile(self._file)  # pylint: disable=consider-using-with
+        except BaseException:
+            self._file.close()
+            raise
+        self._info_by_name = {info.filename: info for info in self.zip_file.infolist()}
+        self._data_offset_by_name: dict[str, int] = {}
+        self._mmap: mmap.mmap | None = None
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, exc_type: type[BaseException] | None, exc_value: BaseException | None, traceback: TracebackType | None) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        self.zip_file.close()
+        self._file.close()
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._info_by_name
+
+    def __len__(self) -> int:
+        return len(self._info_by_name)
+
+    def infolist(self) -> list[zipfile.ZipInfo]:
+        """
+        メンバの ``ZipInfo`` を、ZIPファイル内の順番で返します。
+        """
+        return list(self._info_by_name.values())
+
+    def getinfo(self, name: str) -> zipfile.ZipInfo:
+        """
+        メンバの ``ZipInfo`` を返します。
+
+        Raises:
+            KeyError: メンバが存在しない場合
+        """
+        info = self._info_by_name.get(name)
+        if info is None:
+            raise KeyError(f"'{name}' は'{self.zip_path}'に存在しません。")
+        return info
+
+    @staticmethod
+    def _can_map(info: zipfile.ZipInfo) -> bool:
+        return info.compress_type == zipfile.ZIP_STORED and not (info.flag_bits & _FLAG_ENCRYPTED)
+
+    def _get_mmap(self) -> mmap.mmap:
+        with self._lock:
+            if self._mmap is None:
+                self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            return self._mmap
+
+    def _get_data_offset(self, info: zipfile.ZipInfo, mapped: mmap.mmap) -> int:
+        """
+        メンバのデータの開始位置を返します。
+        ローカルファイルヘッダの長さはセントラルディレクトリの情報と異なる場合があるので、ローカルファイルヘッダから求めます。
+        """
+        offset = self._data_offset_by_name.get(info.filename)
+        if offset is not None:
+            return offset
+
+        header_end = info.header_offset + _LOCAL_FILE_HEADER_STRUCT.size
+        header = _LOCAL_FILE_HEADER_STRUCT.unpack(mapped[info.header_offset : header_end])
+        if header[0] != _LOCAL_FILE_HEADER_SIGNATURE:
+            raise zipfile.BadZipFile(f"'{info.filename}' のローカルファイルヘッダが不正です。 :: zip_path='{self.zip_path}'")
+        filename_length, extra_length = header[-2:]
+        offset = header_end + filename_length + extra_length
+        self._data_offset_by_name[info.filename] = offset
+        return offset
+
+    def read(self, name: str) -> bytes:
+        """
+        メンバの内容を読み込みます。無圧縮のメンバは、メモリマップから読み込みます。
+
+        Raises:
+            KeyError: メンバが存在しない場合
+            zipfile.BadZipFile: メンバが壊れている場合
+        """
+        info = self.getinfo(name)
+        if not self._can_map(info):
+            return self.zip_file.read(info)
+
+        mapped = self._get_mmap()
+        start = self._get_data_offset(info, mapped)
+        data = mapped[start : start + info.file_size]
+        if len(data) != info.file_size or zlib.crc32(data) != info.CRC:
+            raise zipfile.BadZipFile(f"'{info.filename}' のCRCが一致しません。 :: zip_path='{self.zip_path}'")
+        return data
+
+    def copy_raw_to(self, name: str, dest: zipfile.ZipFile) -> None:
+        """
+        メンバを展開せずに、圧縮されたままのデータを ``dest`` にコピーします。
+        展開と再圧縮をしないので、処理時間はほぼI/Oだけで決まります。
+
+        ``zipfile`` には圧縮済みのデータをメンバとして書き込む公開APIがないため、 ``ZipFile.mkdir`` と同じ手順で ``ZipFile`` の非公開の属性
+        （ ``fp`` , ``start_dir`` , ``filelist`` , ``NameToInfo`` , ``_lock`` , ``_writing`` , ``_seekable`` , ``_didModify`` , ``_writecheck`` ）を直接操作します。
+        CPython 3.11〜3.14の ``zipfile`` で動作を確認しています。これらの属性が存在しない場合は ``RuntimeError`` を送出します。
+
+        Args:
+            name: コピーするメンバの名前
+            dest: ファイルのパスを指定して、書き込み用（ ``mode`` が ``w`` , ``x`` , ``a`` ）に開いたZipFile。
+                ``ZipFile.open(..., "w")`` で書き込み中のメンバがあってはいけません。複数のスレッドから同時に書き込まないでください。
+
+        Raises:
+            KeyError: メンバが存在しない場合
+            ValueError: 暗号化されたメンバの場合、または ``dest`` に書き込めない状態の場合
+            RuntimeError: ``zipfile`` の実装が想定と異なる場合
+        """
+        info = self.getinfo(name)
+        if info.flag_bits & _FLAG_ENCRYPTED:
+            raise ValueError(f"'{name}' は暗号化されているので、コピーできません。 :: zip_path='{self.zip_path}'")
+        _validate_zip_file_for_raw_copy(dest)
+
+        mapped = self._get_mmap()
+        start = self._get_data_offset(info, mapped)
+        new_info = copy.copy(info)
+        # CRCとサイズは分かっているので、データディスクリプタは使わずにローカルファイルヘッダに書き込む
+        new_info.flag_bits &= ~_FLAG_DATA_DESCRIPTOR
+        # ZIP64の拡張フィールドは、必要であれば書き込み時に付け直される
+        new_info.extra = _strip_extra_field(info.extra, _ZIP64_EXTRA_FIELD_ID)
+
+        # `ZipFile.mkdir` と同じ手順で書き込む。セントラルディレクトリは `dest` を閉じるときに書き込まれる
+        end = start + info.compress_size
+        with dest._lock:  # type: ignore[attr-defined]  # noqa: SLF001
+            fp = dest.fp
+            assert fp is not None
+            fp.seek(dest.start_dir)
+            new_info.header_offset = fp.tell()
+            dest._writecheck(new_info)  # type: ignore[attr-defined]  # noqa: SLF001
+            # 追記モード（"a"）で開いた場合、これを設定しないと閉じるときにセントラルディレクトリが書き込まれない
+            dest._didModify = True  # type: ignore[attr-defined]  # noqa: SLF001
+            dest.filelist.append(new_info)
+            dest.NameToInfo[new_info.filename] = new_info
+            fp.write(new_info.FileHeader())
+            for offset in range(start, end, _COPY_CHUNK_SIZE):
+                fp.write(mapped[offset : min(offset + _COPY_CHUNK_SIZE, end)])
+            dest.start_dir = fp.tell()
+
+    def open(self, name: str) -> IO[bytes]:
+        """
+        メンバをファイルオブジェクトとして開きます。無圧縮のメンバは、メモリマップから読み込みます。
+
+        Raises:
+            KeyError: メンバが存在しない場合
+        """
+        info = self.getinfo(name)
+        if self._can_map(info):
+            return io.BytesIO(self.read(name))
+        return self.zip_file.open(info)
@@ -15,6 +15,7 @@ from dataclasses_json import DataClassJsonMixin
 from PIL import Image, ImageColor, ImageDraw
 
 import annofabcli.common.cli
+from annofabcli.common.annofab.segmentation_cache import SegmentationStatsReader, open_segmentation_stats_cache
 from annofabcli.common.cli import (
     COMMAND_LINE_ERROR_STATUS_CODE,
     ArgumentParser,
@@ -68,7 +69,13 @@ class DrawingAnnotationForOneImage:
         target_label_names: Collection[str] | None = None,
         polyline_labels: Collection[str] | None = None,
         drawing_options: DrawingOptions | None = None,
+        segmentation_stats_reader: SegmentationStatsReader | None = None,
     ) -> None:
+        """
+        Args:
+            segmentation_stats_reader: 指定した場合は、キャッシュに保存された塗りつぶし領域を描画します。
+        """
+        self.segmentation_stats_reader = segmentation_stats_reader
         self.label_color_dict = label_color_dict if label_color_dict is not None else {}
         self.target_label_names = set(target_label_names) if target_label_names is not None else None
         self.polyline_labels = set(polyline_labels) if polyline_labels is not None else None
@@ -103,6 +110,16 @@ class DrawingAnnotationForOneImage:
         """
 
         def draw_segmentation(data_uri: str, color: Color) -> None:
+            if self.segmentation_stats_reader is not None:
+                # 外接矩形内の塗りつぶし領域だけを描画する
+                stats = self.segmentation_stats_reader.read(parser, data_uri, include_run_length=True)
+                cropped_mask = stats.decode_cropped_mask()
+                if stats.bounding_box is None or cropped_mask is None:
+                    return
+                min_x, min_y, _, _ = stats.bounding_box
+                draw.bitmap((min_x, min_y), Image.fromarray(cropped_mask), fill=color)
+                return
+
             # 外部ファイルを描画する
             with parser.open_outer_file(data_uri) as f:  # noqa: SIM117
                 with Image.open(f) as outer_image:
@@ -231,12 +248,14 @@ def draw_annotation_all(  # noqa: PLR0913
     polyline_labels: Collection[str] | None = None,
     drawing_options: DrawingOptions | None = None,
     default_image_size: tuple[int, int] | None = None,
+    segmentation_stats_reader: SegmentationStatsReader | None = None,
 ) -> None:
     drawing = DrawingAnnotationForOneImage(
         label_color_dict=label_color_dict,
         target_label_names=target_label_names,
         polyline_labels=polyline_labels,
         drawing_options=drawing_options,
+        segmentation_stats_reader=segmentation_stats_reader,
     )
 
     is_target_parser_func = create_is_target_parser_func(target_task_ids, task_query)
@@ -339,19 +358,21 @@ class DrawAnnotation(CommandLineWithoutWebapi):
 
         task_query = TaskQuery.from_dict(annofabcli.common.cli.get_json_from_args(args.task_query)) if args.task_query is not None else None
 
-        draw_annotation_all(
-            iter_parser=iter_parser,
-            image_dir=args.image_dir,
-            input_data_id_relation_dict=input_data_id_relation_dict,
-            output_dir=args.output_dir,
-            target_task_ids=get_list_from_args(args.task_id) if args.task_id is not None else None,
-            task_query=task_query,
-            label_color_dict=self._create_label_color(args.label_color) if args.label_color is not None else None,
-            target_label_names=get_list_from_args(args.label_name) if args.label_name is not None else None,
-            polyline_labels=get_list_from_args(args.polyline_label) if args.polyline_label is not None else None,
-            drawing_options=DrawingOptions.from_dict(get_json_from_args(args.drawing_options)) if args.drawing_options is not None else None,
-            default_image_size=default_image_size,
-        )
+        with open_segmentation_stats_cache(enabled=args.segmentation_cache) as segmentation_cache:
+            draw_annotation_all(
+                iter_parser=iter_parser,
+                image_dir=args.image_dir,
+                input_data_id_relation_dict=input_data_id_relation_dict,
+                output_dir=args.output_dir,
+                target_task_ids=get_list_from_args(args.task_id) if args.task_id is not None else None,
+                task_query=task_query,
+                label_color_dict=self._create_label_color(args.label_color) if args.label_color is not None else None,
+                target_label_names=get_list_from_args(args.label_name) if args.label_name is not None else None,
+                polyline_labels=get_list_from_args(args.polyline_label) if args.polyline_label is not None else None,
+                drawing_options=DrawingOptions.from_dict(get_json_from_args(args.drawing_options)) if args.drawing_options is not None else None,
+                default_image_size=default_image_size,
+                segmentation_stats_reader=SegmentationStatsReader(annotation_path, cache=segmentation_cache) if segmentation_cache is not None else None,
+            )
 
 
 def main(args: argparse.Namespace) -> None:
@@ -442,6 +463,13 @@ def parse_args(parser: argparse.ArgumentParser) -> None:
         "``file://`` を先頭に付けると、JSON形式のファイルを指定できます。",
     )
 
+    parser.add_argument(
+        "--segmentation_cache",
+        action="store_true",
+        help="塗りつぶし領域を、キャッシュディレクトリ（ ``$XDG_CACHE_HOME/annofabcli`` ）に保存して再利用します。"
+        "アノテーションZIPに格納されているCRC32とファイルサイズが同じ塗りつぶし画像は、2回目以降は読み込みません。",
+    )
+
     parser.set_defaults(subcommand_func=main)
 
 
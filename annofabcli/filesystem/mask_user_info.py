@@ -1,6 +1,6 @@
 import argparse
+import functools
 import logging
-from functools import partial
 from pathlib import Path
 from typing import Any
 
@@ -9,6 +9,7 @@ from pandas.api.types import is_string_dtype
 
 import annofabcli.common.cli
 from annofabcli.common.cli import ArgumentParser, CommandLineWithoutWebapi, get_list_from_args
+from annofabcli.common.pandas import replace_values
 from annofabcli.common.utils import read_multiheader_csv
 
 logger = logging.getLogger(__name__)
@@ -69,6 +70,7 @@ def create_replaced_biography_dict(name_set: set[str]) -> dict[str, str]:
     return replaced_dict
 
 
+@functools.cache
 def create_masked_name(name: str) -> str:
     """
     マスクされた名前を返す。
@@ -133,6 +135,16 @@ def _get_tuple_column(df: pandas.DataFrame, column: str) -> str | tuple:
         return column
 
 
+def _get_masked_series(df: pandas.DataFrame, replacement_dict: dict[str, str], key_column: str | tuple, target_column: str | tuple) -> pandas.Series:
+    """
+    `key_column`列の値が`replacement_dict`のkeyに含まれる行は`target_column`列の値をマスク後の値に置き換え、それ以外の行は元の値のままのSeriesを返します。
+    """
+    is_masked = df[key_column].isin(list(replacement_dict.keys()))
+    result = df[target_column].copy()
+    result[is_masked] = df.loc[is_masked, key_column].map(replacement_dict)
+    return result
+
+
 def replace_by_columns(
     df: pandas.DataFrame,
     replacement_dict: dict[str, str],
@@ -147,54 +159,28 @@ def replace_by_columns(
         main_column: 置換対象の列名(ex: user_id)
         sub_column: main_columnと同じ値で置換する列(ex: username)
     """
-
-    def _get_username(row: pandas.Series, main_column: str | tuple, sub_column: str | tuple) -> str:
-        if row[main_column] in replacement_dict:
-            return replacement_dict[row[main_column]]
-        else:
-            return row[sub_column]
-
     if sub_columns is not None:
         for sub_column in sub_columns:
-            get_username_func = partial(_get_username, main_column=main_column, sub_column=sub_column)
-            df[sub_column] = df.apply(get_username_func, axis=1)
+            df[sub_column] = _get_masked_series(df, replacement_dict, key_column=main_column, target_column=sub_column)
 
     # 列の型を合わせないとreplaceに失敗するため, dtype を確認する
     # pandas 3.0対応: is_string_dtypeを使用してobject型と新しいstring型の両方に対応
     if is_string_dtype(df[main_column].dtype):
-        df[main_column] = df[main_column].replace(replacement_dict)
+        df[main_column] = replace_values(df[main_column], replacement_dict)
 
 
 def get_masked_username_series(df: pandas.DataFrame, replace_dict_by_user_id: dict[str, str]) -> pandas.Series:
     """
     マスク後のusernameのSeriesを返す
     """
-    user_id_column = _get_tuple_column(df, "user_id")
-    username_column = _get_tuple_column(df, "username")
-
-    def _get_username(row: pandas.Series) -> str:
-        if row[user_id_column] in replace_dict_by_user_id:
-            return replace_dict_by_user_id[row[user_id_column]]
-        else:
-            return row[username_column]
-
-    return df.apply(_get_username, axis=1)
+    return _get_masked_series(df, replace_dict_by_user_id, key_column=_get_tuple_column(df, "user_id"), target_column=_get_tuple_column(df, "username"))
 
 
 def get_masked_account_id(df: pandas.DataFrame, replace_dict_by_user_id: dict[str, str]) -> pandas.Series:
     """
     マスク後のaccount_idのSeriesを返す
     """
-    user_id_column = _get_tuple_column(df, "user_id")
-    account_id_column = _get_tuple_column(df, "account_id")
-
-    def _get_account_id(row: pandas.Series) -> str:
-        if row[user_id_column] in replace_dict_by_user_id:
-            return replace_dict_by_user_id[row[user_id_column]]
-        else:
-            return row[account_id_column]
-
-    return df.apply(_get_account_id, axis=1)
+    return _get_masked_series(df, replace_dict_by_user_id, key_column=_get_tuple_column(df, "user_id"), target_column=_get_tuple_column(df, "account_id"))
 
 
 def get_replaced_biography_set(df: pandas.DataFrame, not_masked_location_set: set[str] | None = None) -> set[str]:
@@ -271,19 +257,9 @@ def replace_biography(df: pandas.DataFrame, replacement_dict_by_user_id: dict[st
     user_id_column = _get_tuple_column(df, "user_id")
     biography_column = _get_tuple_column(df, "biography")
 
-    def _get_biography(row: pandas.Series, user_id_column: str | tuple, biography_column: str | tuple) -> str:
-        if row[user_id_column] in replacement_dict_by_user_id:
-            # マスク対象のユーザなら biographyをマスクする
-            biography = row[biography_column]
-            if biography in replacement_dict_by_biography:
-                return replacement_dict_by_biography[biography]
-            else:
-                return biography
-        else:
-            return row[biography_column]
-
-    get_biography_func = partial(_get_biography, user_id_column=user_id_column, biography_column=biography_column)
-    df[biography_column] = df.apply(get_biography_func, axis=1)
+    # マスク対象のユーザなら biographyをマスクする
+    is_masked_user = df[user_id_column].isin(list(replacement_dict_by_user_id.keys()))
+    df.loc[is_masked_user, biography_column] = replace_values(df.loc[is_masked_user, biography_column], replacement_dict_by_biography)
 
 
 def create_masked_user_info_df(
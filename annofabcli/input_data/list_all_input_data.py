@@ -13,6 +13,7 @@ from annofabapi.dataclass.input import InputData
 from annofabapi.models import ProjectMemberRole
 
 import annofabcli.common.cli
+from annofabcli.common.annofab.project_mirror import ProjectMirror, open_project_mirror
 from annofabcli.common.cli import ArgumentParser, CommandLine, build_annofabapi_resource_and_login
 from annofabcli.common.download import DownloadingFile
 from annofabcli.common.enums import OutputFormat
@@ -60,6 +61,32 @@ class ListInputDataWithJsonMain:
             for key in unnecessary_keys:
                 input_data.pop(key, None)
 
+    def _get_input_data_list_from_mirror(
+        self,
+        mirror: ProjectMirror,
+        project_id: str,
+        *,
+        input_data_id_list: list[str] | None,
+        input_data_query: InputDataQuery | None,
+        contain_parent_task_id_list: bool,
+        contain_supplementary_data_count: bool,
+    ) -> list[dict[str, Any]]:
+        input_data_list = mirror.get_input_data_list(project_id, input_data_ids=input_data_id_list)
+        filtered_input_data_list = [e for e in input_data_list if self.filter_input_data_list(e, input_data_query=input_data_query)]
+
+        if contain_parent_task_id_list:
+            # `getTasks` APIを実行せずに、ミラーに同期したタスクから求める
+            task_ids_by_input_data_id = mirror.get_task_ids_by_input_data_id(project_id, input_data_ids=input_data_id_list)
+            for input_data in filtered_input_data_list:
+                input_data["parent_task_id_list"] = task_ids_by_input_data_id.get(input_data["input_data_id"], [])
+
+        if contain_supplementary_data_count:
+            AddingDetailsToInputData(self.service, project_id).add_supplementary_data_count_to_input_data_list(filtered_input_data_list)
+
+        for input_data in filtered_input_data_list:
+            remove_unnecessary_keys_from_input_data(input_data)
+        return filtered_input_data_list
+
     def get_input_data_list(
         self,
         project_id: str,
@@ -71,7 +98,23 @@ class ListInputDataWithJsonMain:
         contain_supplementary_data_count: bool = False,
         is_latest: bool = False,
         temp_dir: Path | None = None,
+        mirror: ProjectMirror | None = None,
     ) -> list[dict[str, Any]]:
+        """
+        Args:
+            mirror: 指定した場合、全件ファイルをダウンロードせずに、ミラーから入力データを取得します。
+                ``contain_parent_task_id_list`` がTrueなら、入力データを参照しているタスクもミラーから取得します。
+        """
+        if mirror is not None:
+            return self._get_input_data_list_from_mirror(
+                mirror,
+                project_id,
+                input_data_id_list=input_data_id_list,
+                input_data_query=input_data_query,
+                contain_parent_task_id_list=contain_parent_task_id_list,
+                contain_supplementary_data_count=contain_supplementary_data_count,
+            )
+
         if input_data_json is None:
             downloading_obj = DownloadingFile(self.service)
             # `NamedTemporaryFile`を使わない理由: Windowsで`PermissionError`が発生するため
@@ -89,10 +132,10 @@ class ListInputDataWithJsonMain:
 
                         adding_obj = AddingDetailsToInputData(self.service, project_id)
                         if contain_parent_task_id_list:
-                            adding_obj.add_parent_task_id_list_to_input_data_list(input_data_list)
+                            adding_obj.add_parent_task_id_list_to_input_data_list(filtered_input_data_list)
 
                         if contain_supplementary_data_count:
-                            adding_obj.add_supplementary_data_count_to_input_data_list(input_data_list)
+                            adding_obj.add_supplementary_data_count_to_input_data_list(filtered_input_data_list)
 
                         # 入力データの不要なキーを削除する
                         for input_data in input_data_list:
@@ -109,10 +152,10 @@ class ListInputDataWithJsonMain:
 
         adding_obj = AddingDetailsToInputData(self.service, project_id)
         if contain_parent_task_id_list:
-            adding_obj.add_parent_task_id_list_to_input_data_list(input_data_list)
+            adding_obj.add_parent_task_id_list_to_input_data_list(filtered_input_data_list)
 
         if contain_supplementary_data_count:
-            adding_obj.add_supplementary_data_count_to_input_data_list(input_data_list)
+            adding_obj.add_supplementary_data_count_to_input_data_list(filtered_input_data_list)
 
         # 入力データの不要なキーを削除する
         for input_data in input_data_list:
@@ -132,16 +175,18 @@ class ListAllInputData(CommandLine):
 
         main_obj = ListInputDataWithJsonMain(self.service)
         temp_dir = Path(args.temp_dir) if args.temp_dir is not None else None
-        input_data_list = main_obj.get_input_data_list(
-            project_id=project_id,
-            input_data_json=args.input_data_json,
-            input_data_id_list=input_data_id_list,
-            input_data_query=input_data_query,
-            is_latest=args.latest,
-            contain_parent_task_id_list=args.with_parent_task_id_list,
-            contain_supplementary_data_count=args.with_supplementary_data_count,
-            temp_dir=temp_dir,
-        )
+        with open_project_mirror(enabled=args.from_mirror) as mirror:
+            input_data_list = main_obj.get_input_data_list(
+                project_id=project_id,
+                input_data_json=args.input_data_json,
+                input_data_id_list=input_data_id_list,
+                input_data_query=input_data_query,
+                is_latest=args.latest,
+                contain_parent_task_id_list=args.with_parent_task_id_list,
+                contain_supplementary_data_count=args.with_supplementary_data_count,
+                temp_dir=temp_dir,
+                mirror=mirror,
+            )
 
         logger.info(f"入力データ一覧の件数: {len(input_data_list)}")
 
@@ -182,14 +227,22 @@ def parse_args(parser: argparse.ArgumentParser) -> None:
         help="対象のinput_data_idを指定します。\n``file://`` を先頭に付けると、input_data_idの一覧が記載されたファイルを指定できます。",
     )
 
-    parser.add_argument(
+    source_group = parser.add_mutually_exclusive_group()
+    source_group.add_argument(
         "--input_data_json",
         type=Path,
         help="入力データ情報が記載されたJSONファイルのパスを指定すると、JSONに記載された情報を元に入力データ一覧を出力します。\n"
         "JSONファイルは ``$ annofabcli input_data download`` コマンドで取得できます。",
     )
+    source_group.add_argument(
+        "--from_mirror",
+        action="store_true",
+        help="全件ファイルをダウンロードせずに、 ``$ annofabcli mirror sync`` コマンドで同期したミラーから入力データ一覧を出力します。\n"
+        "``--with_parent_task_id_list`` を指定した場合は、入力データを参照しているタスクもミラーから取得します。",
+    )
 
-    parser.add_argument(
+    # `--latest`は全件ファイルをダウンロードするときだけ有効なので、JSONファイルやミラーを参照するオプションとは同時に指定できない
+    source_group.add_argument(
         "--latest",
         action="store_true",
         help="最新の入力データの情報を出力します。"
@@ -199,7 +252,11 @@ def parse_args(parser: argparse.ArgumentParser) -> None:
 
     parser.add_argument("--with_parent_task_id_list", action="store_true", help="入力データを参照しているタスクのIDのlist( ``parent_task_id_list`` )も出力します。")
 
-    parser.add_argument("--with_supplementary_data_count", action="store_true", help="入力データに紐づく補助情報の個数( ``supplementary_data_count`` )も出力します。")
+    parser.add_argument(
+        "--with_supplementary_data_count",
+        action="store_true",
+        help="入力データに紐づく補助情報の個数( ``supplementary_data_count`` )も出力します。補助情報を取得できなかった入力データの個数は空欄になります。",
+    )
 
     parser.add_argument(
         "--temp_dir",
@@ -1,6 +1,8 @@
 import argparse
 import logging
 import urllib.parse
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Any
 
@@ -14,6 +16,7 @@ from annofabcli.common.enums import OutputFormat
 from annofabcli.common.facade import AnnofabApiFacade
 from annofabcli.common.utils import get_columns_with_priority, print_csv, print_id_list, print_json
 from annofabcli.input_data.utils import remove_unnecessary_keys_from_input_data
+from annofabcli.supplementary.list_supplementary_data import SupplementaryDataFetcher
 
 logger = logging.getLogger(__name__)
 
@@ -74,6 +77,50 @@ def print_input_data_list(
         raise ValueError(f"{output_format}は対応していないフォーマットです。")
 
 
+# AWS CloudFrontのURLの上限が8,192byte
+# https://docs.aws.amazon.com/AmazonCloudFront/latest/DeveloperGuide/cloudfront-limits.html
+MAX_INPUT_DATA_IDS_QUERY_LENGTH = 8000
+"""`getTasks` APIのクエリパラメータ`input_data_ids`の、URLエンコード後の最大長"""
+
+DEFAULT_PARALLELISM_FOR_GETTING_TASKS = 4
+"""入力データを参照しているタスクを取得する際に、`getTasks` APIを並列に実行する個数"""
+
+DEFAULT_PARALLELISM_FOR_GETTING_SUPPLEMENTARY_DATA = 4
+"""入力データに紐づく補助情報を取得する際に、APIを並列に実行する個数"""
+
+
+def create_input_data_id_chunks(input_data_id_list: list[str], *, max_query_length: int = MAX_INPUT_DATA_IDS_QUERY_LENGTH) -> list[list[str]]:
+    """
+    カンマ区切りでURLエンコードした長さが`max_query_length`以下になるように、入力データIDのlistを分割します。
+
+    Args:
+        input_data_id_list: 入力データIDのlist
+        max_query_length: カンマ区切りでURLエンコードした文字列の最大長
+
+    Returns:
+        分割した入力データIDのlist
+    """
+    # カンマはURLエンコードすると"%2C"になる
+    separator_length = len(urllib.parse.quote(","))
+    chunks: list[list[str]] = []
+    current_chunk: list[str] = []
+    current_length = 0
+    for input_data_id in input_data_id_list:
+        encoded_length = len(urllib.parse.quote(input_data_id))
+        additional_length = encoded_length if len(current_chunk) == 0 else separator_length + encoded_length
+        if len(current_chunk) > 0 and current_length + additional_length > max_query_length:
+            chunks.append(current_chunk)
+            current_chunk = []
+            current_length = 0
+            additional_length = encoded_length
+        current_chunk.append(input_data_id)
+        current_length += additional_length
+
+    if len(current_chunk) > 0:
+        chunks.append(current_chunk)
+    return chunks
+
+
 class AddingDetailsToInputData:
     """
     入力データに詳細情報を追加するためのクラス
@@ -83,16 +130,30 @@ class AddingDetailsToInputData:
         self.service = service
         self.project_id = project_id
 
-    def add_parent_task_id_list_to_input_data_list(self, input_data_list: list[InputData], *, average_input_data_id_length: int = 36) -> list[InputData]:
+    def _get_task_id_list_by_input_data_id(self, input_data_id_list: list[str]) -> dict[str, list[str]]:
+        """
+        `input_data_id_list`を参照しているタスクを取得して、入力データIDからtask_idのlistを引けるdictを返します。
+        """
+        task_list = self.service.wrapper.get_all_tasks(self.project_id, query_params={"input_data_ids": ",".join(input_data_id_list)})
+        target_input_data_ids = set(input_data_id_list)
+        result: dict[str, list[str]] = defaultdict(list)
+        for task in task_list:
+            # 1個のタスクが同じ入力データを複数回参照することはないが、念のため重複しないようにする
+            for input_data_id in dict.fromkeys(task["input_data_id_list"]):
+                if input_data_id in target_input_data_ids:
+                    result[input_data_id].append(task["task_id"])
+        return result
+
+    def add_parent_task_id_list_to_input_data_list(self, input_data_list: list[InputData], *, parallelism: int = DEFAULT_PARALLELISM_FOR_GETTING_TASKS) -> list[InputData]:
         """
         `input_data_list`に"どのタスクに使われているか"という情報を付与します。
 
+        `getTasks` APIはクエリパラメータ`input_data_ids`で複数の入力データIDを指定できますが、URLの長さには上限があります。
+        したがって、URLエンコード後の長さが上限を超えないように入力データIDを分割して、`getTasks` APIを並列に実行します。
+
         Args:
             input_data_list: 入力データList(In/Out)
-            average_input_data_id_length: 入力データIDの平均長さ。この値を元にして、`getTasks` APIの実行回数を決めます。
-                `getTasks` APIはクエリパラメータに`input_data_ids`で複数の入力データIDを指定できます。
-                クエリパラメータのサイズには上限があるため、たとえば10,000個の入力データIDを指定することはできません。
-                したがって、入力データIDの平均サイズから、`getTasks` APIの実行回数を決めます。
+            parallelism: `getTasks` APIを並列に実行する個数
 
         Returns:
 
@@ -100,46 +161,28 @@ class AddingDetailsToInputData:
         if len(input_data_list) == 0:
             return input_data_list
 
-        # AWS CloudFrontのURLの上限が8,192byte
-        # https://docs.aws.amazon.com/AmazonCloudFront/latest/DeveloperGuide/cloudfront-limits.html
-        MAX_URL_QUERY_LENGTH = 8000  # input_dat_ids部分のURLクエリの最大値  # noqa: N806
-        average_input_data_id_length = average_input_data_id_length + 1  # カンマの分だけ長さを増やす
-        chunk_size = MAX_URL_QUERY_LENGTH // average_input_data_id_length
-        initial_index = 0
-        while True:
-            sub_input_data_list = input_data_list[initial_index : initial_index + chunk_size]
-            sub_input_data_id_list = [e["input_data_id"] for e in sub_input_data_list]
-            str_input_data_id_list = ",".join(sub_input_data_id_list)
-            encoded_input_data_id_list = urllib.parse.quote(str_input_data_id_list)
-            if len(encoded_input_data_id_list) > MAX_URL_QUERY_LENGTH:
-                differential_length = len(encoded_input_data_id_list) - MAX_URL_QUERY_LENGTH
-                decreasing_size = (differential_length // average_input_data_id_length) + 1
-                logger.debug(f"chunk_sizeを {chunk_size} から、{chunk_size - decreasing_size} に減らした. len(encoded_input_data_id_list) = {len(encoded_input_data_id_list)}")
-                chunk_size = chunk_size - decreasing_size
-                if chunk_size <= 0:
-                    chunk_size = 1
-
-                continue
-
-            logger.debug(f"入力データの{initial_index}件目から{initial_index + chunk_size - 1}件目を参照しているタスクのtask_idを取得します。")
-            task_list = self.service.wrapper.get_all_tasks(self.project_id, query_params={"input_data_ids": str_input_data_id_list})
-
-            for input_data in sub_input_data_list:
-                task_id_list = [t["task_id"] for t in task_list if input_data["input_data_id"] in t["input_data_id_list"]]
-                input_data["parent_task_id_list"] = task_id_list
-
-            initial_index = initial_index + chunk_size
-            if initial_index >= len(input_data_list):
-                break
+        chunks = create_input_data_id_chunks([e["input_data_id"] for e in input_data_list])
+        logger.debug(f"入力データ {len(input_data_list)} 件を参照しているタスクを、{len(chunks)} 回に分けて取得します。")
+
+        task_id_list_by_input_data_id: dict[str, list[str]] = {}
+        with ThreadPoolExecutor(max_workers=parallelism) as executor:
+            for index, sub_result in enumerate(executor.map(self._get_task_id_list_by_input_data_id, chunks)):
+                task_id_list_by_input_data_id.update(sub_result)
+                if (index + 1) % 10 == 0:
+                    logger.debug(f"{index + 1} / {len(chunks)} 回目の取得が完了しました。")
+
+        for input_data in input_data_list:
+            input_data["parent_task_id_list"] = task_id_list_by_input_data_id.get(input_data["input_data_id"], [])
 
         return input_data_list
 
-    def add_supplementary_data_count_to_input_data_list(self, input_data_list: list[InputData]) -> list[InputData]:
+    def add_supplementary_data_count_to_input_data_list(self, input_data_list: list[InputData], *, parallelism: int = DEFAULT_PARALLELISM_FOR_GETTING_SUPPLEMENTARY_DATA) -> list[InputData]:
         """
         `input_data_list`に補助情報の個数（`supplementary_data_count`）を付与します。
 
         Args:
             input_data_list: 入力データList(In/Out)
+            parallelism: 補助情報を取得するAPIを並列に実行する個数
 
         Returns:
 
@@ -148,11 +191,12 @@ class AddingDetailsToInputData:
             return input_data_list
 
         logger.info(f"入力データ {len(input_data_list)} 件に紐づく補助情報の個数を取得します。")
-        for index, input_data in enumerate(input_data_list):
-            supplementary_data_list, _ = self.service.api.get_supplementary_data_list(self.project_id, input_data["input_data_id"])
-            input_data["supplementary_data_count"] = len(supplementary_data_list)
-            if (index + 1) % 100 == 0:
-                logger.debug(f"{index + 1} 件の入力データに紐づく補助情報の個数を取得しました。")
+        fetcher = SupplementaryDataFetcher(self.service, self.project_id, parallelism=parallelism)
+        supplementary_data_list_by_input_data_id = fetcher.fetch_all([e["input_data_id"] for e in input_data_list])
+        for input_data in input_data_list:
+            supplementary_data_list = supplementary_data_list_by_input_data_id[input_data["input_data_id"]]
+            # 補助情報を取得できなかった場合は、誤った個数を出力しないようにNoneにする
+            input_data["supplementary_data_count"] = len(supplementary_data_list) if supplementary_data_list is not None else None
 
         return input_data_list
 
@@ -268,7 +312,11 @@ def parse_args(parser: argparse.ArgumentParser) -> None:
 
     parser.add_argument("--with_parent_task_id_list", action="store_true", help="入力データを参照しているタスクのIDのlist( ``parent_task_id_list`` )も出力します。")
 
-    parser.add_argument("--with_supplementary_data_count", action="store_true", help="入力データに紐づく補助情報の個数( ``supplementary_data_count`` )も出力します。")
+    parser.add_argument(
+        "--with_supplementary_data_count",
+        action="store_true",
+        help="入力データに紐づく補助情報の個数( ``supplementary_data_count`` )も出力します。補助情報を取得できなかった入力データの個数は空欄になります。",
+    )
 
     argument_parser.add_format(
         choices=[
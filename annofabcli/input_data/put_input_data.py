@@ -5,7 +5,6 @@ import sys
 from collections.abc import Sequence
 from dataclasses import dataclass
 from functools import partial
-from multiprocessing import Pool
 from pathlib import Path
 from typing import Any
 
@@ -27,6 +26,7 @@ from annofabcli.common.cli import (
     prompt_yesnoall,
 )
 from annofabcli.common.facade import AnnofabApiFacade
+from annofabcli.common.upload_pipeline import UploadManifest, UploadPipeline, UploadRequest
 from annofabcli.common.utils import get_file_scheme_path
 
 logger = logging.getLogger(__name__)
@@ -158,11 +158,19 @@ class SubPutInputData:
         self.facade = facade
         self.all_yes = all_yes
 
-    def put_input_data(self, project_id: str, csv_input_data: InputDataForPut, last_updated_datetime: str | None = None) -> None:
+    def put_input_data(self, project_id: str, csv_input_data: InputDataForPut, last_updated_datetime: str | None = None, *, uploaded_s3_path: str | None = None) -> None:
+        """
+        Args:
+            uploaded_s3_path: ローカルファイルを一時データ保存先にアップロード済みの場合、そのS3パス。指定した場合はアップロードしません。
+        """
         request_body: dict[str, Any] = {"last_updated_datetime": last_updated_datetime}
 
         file_path = get_file_scheme_path(csv_input_data.input_data_path)
-        if file_path is not None:
+        if uploaded_s3_path is not None:
+            request_body.update({"input_data_name": csv_input_data.input_data_name, "input_data_path": uploaded_s3_path})
+            self.service.api.put_input_data(project_id, csv_input_data.input_data_id, request_body=request_body)
+
+        elif file_path is not None:
             request_body.update({"input_data_name": csv_input_data.input_data_name})
             logger.debug(f"'{file_path}'を入力データとして登録します。input_data_name='{csv_input_data.input_data_name}'")
             self.service.wrapper.put_input_data_from_file(project_id, input_data_id=csv_input_data.input_data_id, file_path=file_path, request_body=request_body)
@@ -209,11 +217,13 @@ class SubPutInputData:
 
         return self.confirm_processing(message_for_confirm)
 
-    def put_input_data_main_wrapper(self, tpl: tuple[int, CsvInputData], *, project_id: str, overwrite: bool) -> bool:
-        input_data_index, csv_input_data = tpl
-        return self.put_input_data_main(project_id, csv_input_data, input_data_index=input_data_index, overwrite=overwrite)
+    def prepare_put_input_data(self, project_id: str, csv_input_data: CsvInputData, *, input_data_index: int, overwrite: bool = False) -> tuple[InputDataForPut, str | None] | None:
+        """
+        入力データを登録するかどうかを判断します。
 
-    def put_input_data_main(self, project_id: str, csv_input_data: CsvInputData, *, input_data_index: int, overwrite: bool = False) -> bool:
+        Returns:
+            登録する入力データと、上書きする場合は既存の入力データの更新日時のtuple。登録しない場合はNone
+        """
         input_data = InputDataForPut(
             input_data_name=csv_input_data.input_data_name,
             input_data_path=csv_input_data.input_data_path,
@@ -232,17 +242,38 @@ class SubPutInputData:
                     f"{log_message_prefix}input_data_id='{input_data.input_data_id}'の入力データがすでに存在するので入力データの登録をスキップします。"
                     "入力データを上書きして登録する場合は、引数に '--overwrite' を指定してください。"
                 )
-                return False
+                return None
 
         file_path = get_file_scheme_path(input_data.input_data_path)
         if file_path is not None:  # noqa: SIM102
             if not Path(file_path).exists():
                 logger.warning(f"input_data_path='{input_data.input_data_path}'にファイルは存在しません。入力データの登録をスキップします。")
-                return False
+                return None
 
         if not self.confirm_put_input_data(input_data, already_exists=last_updated_datetime is not None):
+            return None
+
+        return input_data, last_updated_datetime
+
+    def create_upload_request(self, tpl: tuple[int, CsvInputData], *, project_id: str, overwrite: bool) -> UploadRequest[tuple[InputDataForPut, str | None]] | None:
+        """
+        :class:`UploadPipeline` の確認ステージの処理
+        """
+        input_data_index, csv_input_data = tpl
+        prepared = self.prepare_put_input_data(project_id, csv_input_data, input_data_index=input_data_index, overwrite=overwrite)
+        if prepared is None:
+            return None
+        input_data, _ = prepared
+        file_path = get_file_scheme_path(input_data.input_data_path)
+        return UploadRequest(key=input_data.input_data_id, file_path=Path(file_path) if file_path is not None else None, payload=prepared)
+
+    def put_input_data_main(self, project_id: str, csv_input_data: CsvInputData, *, input_data_index: int, overwrite: bool = False) -> bool:
+        prepared = self.prepare_put_input_data(project_id, csv_input_data, input_data_index=input_data_index, overwrite=overwrite)
+        if prepared is None:
             return False
 
+        input_data, last_updated_datetime = prepared
+        log_message_prefix = f"{input_data_index + 1}件目 :: "
         # 入力データを登録
         try:
             self.put_input_data(project_id, input_data, last_updated_datetime=last_updated_datetime)
@@ -276,6 +307,7 @@ class PutInputData(CommandLine):
         input_data_list: list[CsvInputData],
         overwrite: bool = False,  # noqa: FBT001, FBT002
         parallelism: int | None = None,
+        upload_manifest: UploadManifest | None = None,
     ) -> None:
         """
         入力データを一括で登録する。
@@ -284,7 +316,8 @@ class PutInputData(CommandLine):
             project_id: 入力データの登録先プロジェクトのプロジェクトID
             input_data_list: 入力データList
             overwrite: Trueならば、input_data_idがすでに存在していたら上書きします。Falseならばスキップします。
-            parallelism: 並列度
+            parallelism: 並列度。指定した場合は、ファイルのハッシュ値の算出、アップロード、登録をパイプラインで実行します。
+            upload_manifest: 登録済みのファイルを記録するマニフェスト。 ``parallelism`` を指定した場合のみ参照します。
 
         """
 
@@ -295,10 +328,16 @@ class PutInputData(CommandLine):
 
         obj = SubPutInputData(service=self.service, facade=self.facade, all_yes=self.all_yes)
         if parallelism is not None:
-            partial_func = partial(obj.put_input_data_main_wrapper, project_id=project_id, overwrite=overwrite)
-            with Pool(parallelism) as pool:
-                result_bool_list = pool.map(partial_func, enumerate(input_data_list))
-                count_put_input_data = len([e for e in result_bool_list if e])
+            pipeline: UploadPipeline[tuple[int, CsvInputData], tuple[InputDataForPut, str | None]] = UploadPipeline(
+                self.service,
+                project_id,
+                prepare=partial(obj.create_upload_request, project_id=project_id, overwrite=overwrite),
+                register=lambda payload, s3_path: obj.put_input_data(project_id, payload[0], last_updated_datetime=payload[1], uploaded_s3_path=s3_path),
+                describe=lambda tpl: f"{tpl[0] + 1}件目 :: input_data_name='{tpl[1].input_data_name}'",
+                parallelism=parallelism,
+                manifest=upload_manifest,
+            )
+            count_put_input_data = pipeline.run(enumerate(input_data_list)).succeeded_count
 
         else:
             for input_data_index, csv_input_data in enumerate(input_data_list):
@@ -354,6 +393,13 @@ class PutInputData(CommandLine):
                 )
                 return False
 
+        if args.upload_manifest is not None and args.parallelism is None:
+            print(  # noqa: T201
+                f"{self.COMMON_MESSAGE} argument --upload_manifest: '--upload_manifest'を指定するときは、'--parallelism' を指定してください。",
+                file=sys.stderr,
+            )
+            return False
+
         return True
 
     def main(self) -> None:
@@ -363,6 +409,7 @@ class PutInputData(CommandLine):
 
         project_id = args.project_id
         super().validate_project(project_id, [ProjectMemberRole.OWNER])
+        upload_manifest = UploadManifest(args.upload_manifest) if args.upload_manifest is not None else None
 
         if args.csv is not None:
             df = read_input_data_csv(args.csv)
@@ -381,7 +428,7 @@ class PutInputData(CommandLine):
             except ValueError as e:
                 print(f"{self.COMMON_MESSAGE} argument --csv: {e}", file=sys.stderr)  # noqa: T201
                 sys.exit(COMMAND_LINE_ERROR_STATUS_CODE)
-            self.put_input_data_list(project_id, input_data_list=input_data_list, overwrite=args.overwrite, parallelism=args.parallelism)
+            self.put_input_data_list(project_id, input_data_list=input_data_list, overwrite=args.overwrite, parallelism=args.parallelism, upload_manifest=upload_manifest)
 
         elif args.json is not None:
             input_data_dict_list = get_json_from_args(args.json)
@@ -395,7 +442,7 @@ class PutInputData(CommandLine):
             except ValueError as e:
                 print(f"{self.COMMON_MESSAGE} argument --json: {e}", file=sys.stderr)  # noqa: T201
                 sys.exit(COMMAND_LINE_ERROR_STATUS_CODE)
-            self.put_input_data_list(project_id, input_data_list=input_data_list, overwrite=args.overwrite, parallelism=args.parallelism)
+            self.put_input_data_list(project_id, input_data_list=input_data_list, overwrite=args.overwrite, parallelism=args.parallelism, upload_manifest=upload_manifest)
 
         else:
             print("引数が不正です。", file=sys.stderr)  # noqa: T201
@@ -457,7 +504,15 @@ def parse_args(parser: argparse.ArgumentParser) -> None:
         "--parallelism",
         type=int,
         choices=PARALLELISM_CHOICES,
-        help="並列度。指定しない場合は、逐次的に処理します。指定する場合は、 ``--yes`` も指定してください。",
+        help="並列度。指定しない場合は、逐次的に処理します。指定する場合は、 ``--yes`` も指定してください。"
+        "指定した場合は、ファイルのハッシュ値の算出、アップロード、入力データの登録を、それぞれ指定した数のスレッドで並行して実行します。",
+    )
+
+    parser.add_argument(
+        "--upload_manifest",
+        type=Path,
+        help="登録したローカルファイルを記録するマニフェストファイル（JSON Lines形式）のパスを指定します。"
+        "同じプロジェクトに登録したとマニフェストに記録されていて、サイズと更新日時が変わっていないファイルは、アップロードせずにスキップします。 ``--parallelism`` を指定したときのみ指定できます。",
     )
 
     parser.set_defaults(subcommand_func=main)
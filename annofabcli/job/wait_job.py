@@ -15,6 +15,7 @@ from annofabcli.common.cli import (
 )
 from annofabcli.common.dataclasses import WaitOptions
 from annofabcli.common.facade import AnnofabApiFacade
+from annofabcli.common.job_poller import JobPoller
 
 logger = logging.getLogger(__name__)
 
@@ -47,13 +48,8 @@ class WaitJobMain:
     def wait_job(self, project_id: str, job_type: ProjectJobType, wait_options: WaitOptions, job_id: str | None = None) -> None:
         MAX_WAIT_MINUTE = wait_options.max_tries * wait_options.interval / 60  # noqa: N806
         logger.info(f"job_type='{job_type.value}', job_id='{job_id}' :: ジョブが完了するまで、最大{MAX_WAIT_MINUTE}分間待ちます。")
-        result = self.service.wrapper.wait_until_job_finished(
-            project_id,
-            job_type=job_type,
-            job_id=job_id,
-            job_access_interval=wait_options.interval,
-            max_job_access=wait_options.max_tries,
-        )
+        with JobPoller(self.service) as job_poller:
+            result = job_poller.wait(project_id, job_type, job_id=job_id, wait_options=wait_options)
         if result is None:
             logger.warning(f"job_type='{job_type.value}', job_id='{job_id}' :: ジョブは存在しませんでした。")
 
@@ -92,8 +88,9 @@ def parse_args(parser: argparse.ArgumentParser) -> None:
         help="ジョブの終了を待つときのオプションをJSON形式で指定してください。"
         "`file://`を先頭に付けるとjsonファイルを指定できます。"
         'デフォルとは`{"interval":60, "max_tries":360}` です。'
-        "`interval`:ジョブが完了したかを問い合わせる間隔[秒], "
-        "`max_tires`:ジョブが完了したかの問い合わせを最大何回行うか。",
+        "`interval`:ジョブが完了したかを問い合わせる間隔の最大値[秒], "
+        "`max_tires`:ジョブが完了するまで最大 ``interval * max_tries`` 秒間待ちます。"
+        "問い合わせる間隔は数秒から始めて、 ``interval`` まで徐々に長くします。",
     )
 
     parser.set_defaults(subcommand_func=main)
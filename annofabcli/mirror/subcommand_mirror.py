@@ -0,0 +1,21 @@
+import argparse
+
+import annofabcli.common.cli
+import annofabcli.mirror.sync_mirror
+
+
+def parse_args(parser: argparse.ArgumentParser) -> None:
+    subparsers = parser.add_subparsers(dest="subcommand_name")
+
+    # サブコマンドの定義
+    annofabcli.mirror.sync_mirror.add_parser(subparsers)
+
+
+def add_parser(subparsers: argparse._SubParsersAction | None = None) -> argparse.ArgumentParser:
+    subcommand_name = "mirror"
+    subcommand_help = "プロジェクトのミラー関係のサブコマンド"
+    description = "プロジェクトのミラー関係のサブコマンド。ミラーは、全件ファイルの内容をローカルのSQLiteファイルに保存したものです。"
+
+    parser = annofabcli.common.cli.add_parser(subparsers, subcommand_name, subcommand_help, description, is_subcommand=False)
+    parse_args(parser)
+    return parser
@@ -0,0 +1,211 @@
+from __future__ import annotations
+
+import argparse
+import datetime
+import json
+import logging
+import tempfile
+from collections import Counter
+from collections.abc import Callable, Collection, Iterator
+from pathlib import Path
+from typing import Any
+
+import annofabapi
+
+import annofabcli.common.cli
+from annofabcli.common.annofab.annotation_zip import lazy_parse_simple_annotation_zip_with_reader
+from annofabcli.common.annofab.project_mirror import MirrorResource, ProjectMirror, get_default_mirror_file
+from annofabcli.common.cli import ArgumentParser, CommandLine, build_annofabapi_resource_and_login
+from annofabcli.common.download import DownloadingFile
+from annofabcli.common.exceptions import DownloadingFileNotFoundError
+from annofabcli.common.facade import AnnofabApiFacade
+
+logger = logging.getLogger(__name__)
+
+
+def iter_annotation_counts(annotation_zip: Path) -> Iterator[tuple[str, str, str, int]]:
+    """
+    アノテーションZIPから、タスク、入力データ、ラベルごとのアノテーション数を返します。
+
+    Returns:
+        ``(task_id, input_data_id, label, annotation_count)`` のiterator
+    """
+    for parser in lazy_parse_simple_annotation_zip_with_reader(annotation_zip):
+        simple_annotation = parser.load_json()
+        counter = Counter(detail["label"] for detail in simple_annotation["details"])
+        for label, count in counter.items():
+            yield simple_annotation["task_id"], simple_annotation["input_data_id"], label, count
+
+
+class SyncProjectMirrorMain:
+    """
+    全件ファイルをダウンロードして、ミラーに取り込みます。
+    前回取り込んだときから全件ファイルが更新されていなければ、ダウンロードしません。
+
+    Args:
+        force: Trueなら、全件ファイルが更新されていなくてもダウンロードして取り込みます。
+    """
+
+    def __init__(self, service: annofabapi.Resource, mirror: ProjectMirror, *, force: bool = False) -> None:
+        self.service = service
+        self.mirror = mirror
+        self.force = force
+        self.downloading_obj = DownloadingFile(service)
+
+    def _sync_dump(
+        self,
+        project_id: str,
+        resource: MirrorResource,
+        *,
+        get_last_modified: Callable[[str], datetime.datetime | None],
+        download: Callable[[str, Path], Path],
+        replace: Callable[[Path, str | None], None],
+    ) -> None:
+        logging_prefix = f"project_id='{project_id}', resource='{resource.value}'"
+        last_modified = get_last_modified(project_id)
+        str_last_modified = last_modified.isoformat() if last_modified is not None else None
+        if not self.force and str_last_modified is not None and str_last_modified == self.mirror.get_dump_last_modified(project_id, resource):
+            logger.info(f"{logging_prefix} :: 全件ファイル（Last-Modified='{str_last_modified}'）は同期済みなので、ダウンロードしません。")
+            return
+
+        # `NamedTemporaryFile`を使わない理由: Windowsで`PermissionError`が発生するため
+        with tempfile.TemporaryDirectory() as str_temp_dir:
+            try:
+                dump_path = download(project_id, Path(str_temp_dir))
+            except DownloadingFileNotFoundError:
+                # プロジェクトを作成した日だと、全件ファイルが作成されていない
+                logger.warning(f"{logging_prefix} :: 全件ファイルが存在しないため、同期しませんでした。")
+                return
+            replace(dump_path, str_last_modified)
+        logger.info(f"{logging_prefix} :: ミラーに同期しました。")
+
+    @staticmethod
+    def _load_json(path: Path) -> Any:  # noqa: ANN401
+        with path.open(encoding="utf-8") as f:
+            return json.load(f)
+
+    def sync_task(self, project_id: str) -> None:
+        self._sync_dump(
+            project_id,
+            MirrorResource.TASK,
+            get_last_modified=self.downloading_obj.get_task_json_last_modified,
+            download=self.downloading_obj.download_task_json_to_dir,
+            replace=lambda path, last_modified: self.mirror.replace_tasks(project_id, self._load_json(path), dump_last_modified=last_modified),
+        )
+
+    def sync_input_data(self, project_id: str) -> None:
+        self._sync_dump(
+            project_id,
+            MirrorResource.INPUT_DATA,
+            get_last_modified=self.downloading_obj.get_input_data_json_last_modified,
+            download=self.downloading_obj.download_input_data_json_to_dir,
+            replace=lambda path, last_modified: self.mirror.replace_input_data(project_id, self._load_json(path), dump_last_modified=last_modified),
+        )
+
+    def sync_task_history(self, project_id: str) -> None:
+        self._sync_dump(
+            project_id,
+            MirrorResource.TASK_HISTORY,
+            get_last_modified=self.downloading_obj.get_task_history_json_last_modified,
+            download=self.downloading_obj.download_task_history_json_to_dir,
+            replace=lambda path, last_modified: self.mirror.replace_task_histories(project_id, self._load_json(path), dump_last_modified=last_modified),
+        )
+
+    def sync_comment(self, project_id: str) -> None:
+        self._sync_dump(
+            project_id,
+            MirrorResource.COMMENT,
+            get_last_modified=self.downloading_obj.get_comment_json_last_modified,
+            download=self.downloading_obj.download_comment_json_to_dir,
+            replace=lambda path, last_modified: self.mirror.replace_comments(project_id, self._load_json(path), dump_last_modified=last_modified),
+        )
+
+    def sync_annotation(self, project_id: str) -> None:
+        self._sync_dump(
+            project_id,
+            MirrorResource.ANNOTATION,
+            get_last_modified=self.downloading_obj.get_annotation_zip_last_modified,
+            download=self.downloading_obj.download_annotation_zip_to_dir,
+            replace=lambda path, last_modified: self.mirror.replace_annotation_counts(project_id, iter_annotation_counts(path), dump_last_modified=last_modified),
+        )
+
+    def sync_task_history_event(self, project_id: str) -> None:
+        """
+        タスク履歴イベントは追加されるだけなので、前回より新しいタスク履歴イベントだけを追加します。
+        全件ファイルを取り込んだときだけ、同期したことを記録します。
+        """
+        with self.mirror.open_task_history_event_store() as store:
+            added_count = store.update(self.service, project_id, force=self.force)
+            if added_count is None:
+                return
+            self.mirror.mark_synced(project_id, MirrorResource.TASK_HISTORY_EVENT, dump_last_modified=store.get_dump_last_modified(project_id))
+
+    def sync(self, project_id: str, resources: Collection[MirrorResource]) -> None:
+        sync_func_by_resource: dict[MirrorResource, Callable[[str], None]] = {
+            MirrorResource.TASK: self.sync_task,
+            MirrorResource.INPUT_DATA: self.sync_input_data,
+            MirrorResource.TASK_HISTORY: self.sync_task_history,
+            MirrorResource.TASK_HISTORY_EVENT: self.sync_task_history_event,
+            MirrorResource.COMMENT: self.sync_comment,
+            MirrorResource.ANNOTATION: self.sync_annotation,
+        }
+        for resource in MirrorResource:
+            if resource in resources:
+                sync_func_by_resource[resource](project_id)
+
+
+class SyncProjectMirror(CommandLine):
+    def main(self) -> None:
+        args = self.args
+        project_id = args.project_id
+        super().validate_project(project_id, project_member_roles=None)
+
+        resources = {MirrorResource(e) for e in args.resource} if args.resource is not None else set(MirrorResource)
+        mirror_file = get_default_mirror_file()
+        logger.info(f"project_id='{project_id}'の情報を、ミラー'{mirror_file}'に同期します。")
+        with ProjectMirror(mirror_file) as mirror:
+            SyncProjectMirrorMain(self.service, mirror, force=args.force).sync(project_id, resources)
+
+
+def main(args: argparse.Namespace) -> None:
+    service = build_annofabapi_resource_and_login(args)
+    facade = AnnofabApiFacade(service)
+    SyncProjectMirror(service, facade, args).main()
+
+
+def parse_args(parser: argparse.ArgumentParser) -> None:
+    argument_parser = ArgumentParser(parser)
+
+    argument_parser.add_project_id()
+
+    parser.add_argument(
+        "--resource",
+        type=str,
+        nargs="+",
+        choices=[e.value for e in MirrorResource],
+        help="同期する情報の種類を指定します。指定しない場合は、すべての種類を同期します。\n\n"
+        " * task: タスク\n"
+        " * input_data: 入力データ\n"
+        " * task_history: タスク履歴\n"
+        " * task_history_event: タスク履歴イベント\n"
+        " * comment: コメント\n"
+        " * annotation: タスク、入力データ、ラベルごとのアノテーション数\n",
+    )
+
+    parser.add_argument("--force", action="store_true", help="全件ファイルが前回の同期から更新されていなくても、ダウンロードして同期します。")
+
+    parser.set_defaults(subcommand_func=main)
+
+
+def add_parser(subparsers: argparse._SubParsersAction | None = None) -> argparse.ArgumentParser:
+    subcommand_name = "sync"
+    subcommand_help = "プロジェクトの全件ファイルを、ローカルのミラーに同期します。"
+    description = (
+        "プロジェクトの全件ファイルをダウンロードして、キャッシュディレクトリ（ ``$XDG_CACHE_HOME/annofabcli`` ）のSQLiteファイル ``project_mirror.sqlite3`` に同期します。\n"
+        "全件ファイルが前回の同期から更新されていなければ、ダウンロードしません。\n"
+        "同期した情報は、 ``task list_all`` などのコマンドに ``--from_mirror`` を指定すると参照できます。"
+    )
+
+    parser = annofabcli.common.cli.add_parser(subparsers, subcommand_name, subcommand_help, description)
+    parse_args(parser)
+    return parser
@@ -4,7 +4,6 @@
 
 import argparse
 import copy
-import functools
 import logging
 import pprint
 from enum import Enum
@@ -12,7 +11,6 @@ from typing import Any
 
 import annofabapi
 import dictdiffer
-import more_itertools
 from annofabapi.models import ProjectMemberRole
 from annofabapi.util.annotation_specs import get_label_name_en
 
@@ -189,15 +187,17 @@ class DiffProjects(CommandLine):
             is_different = False
             label_names = label_names1
 
-        for label_name in label_names:
-
-            def get_label_func(label_name: str, label: dict[str, Any]) -> bool:
-                return get_label_name_en(label) == label_name
+        # ラベル名(en)で引けるようにする。ラベル名(en)が重複している場合は、先頭のラベルを使う
+        labels1_by_name: dict[str, dict[str, Any]] = {}
+        for label, label_name in zip(labels1, label_names1, strict=True):
+            labels1_by_name.setdefault(label_name, label)
+        labels2_by_name: dict[str, dict[str, Any]] = {}
+        for label, label_name in zip(labels2, label_names2, strict=True):
+            labels2_by_name.setdefault(label_name, label)
 
-            label1 = more_itertools.first_true(labels1, pred=functools.partial(get_label_func, label_name))
-            label2 = more_itertools.first_true(labels2, pred=functools.partial(get_label_func, label_name))
-            assert label1 is not None
-            assert label2 is not None
+        for label_name in label_names:
+            label1 = labels1_by_name[label_name]
+            label2 = labels2_by_name[label_name]
 
             diff_result = list(dictdiffer.diff(create_ignored_label(label1), create_ignored_label(label2)))
             if len(diff_result) > 0:
@@ -3,7 +3,10 @@ from __future__ import annotations
 import argparse
 import json
 import logging
+import multiprocessing
+from collections.abc import Callable
 from dataclasses import dataclass
+from functools import partial
 from pathlib import Path
 
 import pandas
@@ -11,6 +14,7 @@ from annofabapi.models import TaskPhase
 
 import annofabcli
 from annofabcli.common.cli import (
+    PARALLELISM_CHOICES,
     get_json_from_args,
     get_list_from_args,
 )
@@ -145,6 +149,30 @@ def create_df_user(worktime_per_date_user: WorktimePerDate, task_worktime_by_pha
     return df_user.drop_duplicates()
 
 
+def _write_user_performance(
+    output_project_dir: ProjectDir,
+    masked_worktime_per_date: WorktimePerDate,
+    masked_task_worktime_by_phase_user: TaskWorktimeByPhaseUser,
+    task_completion_criteria: TaskCompletionCriteria,
+) -> None:
+    masked_user_performance = UserPerformance.from_df_wrapper(masked_worktime_per_date, masked_task_worktime_by_phase_user, task_completion_criteria=task_completion_criteria)
+    output_project_dir.write_user_performance(masked_user_performance)
+
+    # メンバのパフォーマンスを散布図で出力する
+    output_project_dir.write_user_performance_scatter_plot(masked_user_performance)
+
+
+def _write_worktime_per_date(project_dir: ProjectDir, output_project_dir: ProjectDir, masked_worktime_per_date: WorktimePerDate) -> None:
+    if not masked_worktime_per_date.is_empty():
+        output_project_dir.write_worktime_per_date_user(masked_worktime_per_date)
+        output_project_dir.write_worktime_line_graph(masked_worktime_per_date)
+    else:
+        logger.warning(
+            f"'{project_dir.project_dir / project_dir.FILENAME_WORKTIME_PER_DATE_USER}'が存在しないかデータがないため、"
+            f"'{project_dir.FILENAME_WORKTIME_PER_DATE_USER}'から生成できるファイルを出力しません。"
+        )
+
+
 def mask_visualization_dir(
     project_dir: ProjectDir,
     output_project_dir: ProjectDir,
@@ -152,7 +180,14 @@ def mask_visualization_dir(
     not_masked_biography_set: set[str] | None = None,
     not_masked_user_id_set: set[str] | None = None,
     minimal_output: bool = False,
+    parallelism: int | None = None,
 ) -> None:
+    """
+    `project_dir`のユーザー情報をマスクして、`output_project_dir`に出力します。
+
+    Args:
+        parallelism: 指定した場合、CSVやグラフの出力を指定したプロセス数で並列に実行します。
+    """
     worktime_per_date = project_dir.read_worktime_per_date_user()
     task_worktime_by_phase_user = project_dir.read_task_worktime_list()
     df_user = create_df_user(worktime_per_date, task_worktime_by_phase_user)
@@ -175,28 +210,24 @@ def mask_visualization_dir(
         to_replace_for_username=replacement_dict.username,
     )
 
-    # CSVのユーザ情報をマスクする
-    masked_user_performance = UserPerformance.from_df_wrapper(masked_worktime_per_date, masked_task_worktime_by_phase_user, task_completion_criteria=project_dir.task_completion_criteria)
-    output_project_dir.write_user_performance(masked_user_performance)
-
-    # メンバのパフォーマンスを散布図で出力する
-    output_project_dir.write_user_performance_scatter_plot(masked_user_performance)
-
     masked_task = project_dir.read_task_list().mask_user_info(to_replace_for_user_id=replacement_dict.user_id, to_replace_for_username=replacement_dict.username)
-    output_project_dir.write_task_list(masked_task)
-
-    write_line_graph(masked_task_worktime_by_phase_user, output_project_dir, minimal_output=minimal_output)
 
-    if not masked_worktime_per_date.is_empty():
-        output_project_dir.write_worktime_per_date_user(masked_worktime_per_date)
-        output_project_dir.write_worktime_line_graph(masked_worktime_per_date)
+    # 出力するファイルはそれぞれ独立しているので、並列に出力できる
+    writing_jobs: list[Callable[[], None]] = [
+        partial(_write_user_performance, output_project_dir, masked_worktime_per_date, masked_task_worktime_by_phase_user, project_dir.task_completion_criteria),
+        partial(output_project_dir.write_task_list, masked_task),
+        partial(write_line_graph, masked_task_worktime_by_phase_user, output_project_dir, minimal_output=minimal_output),
+        partial(_write_worktime_per_date, project_dir, output_project_dir, masked_worktime_per_date),
+        partial(output_project_dir.write_task_worktime_list, masked_task_worktime_by_phase_user),
+    ]
+    if parallelism is None:
+        for job in writing_jobs:
+            job()
     else:
-        logger.warning(
-            f"'{project_dir.project_dir / project_dir.FILENAME_WORKTIME_PER_DATE_USER}'が存在しないかデータがないため、"
-            f"'{project_dir.FILENAME_WORKTIME_PER_DATE_USER}'から生成できるファイルを出力しません。"
-        )
-
-    output_project_dir.write_task_worktime_list(masked_task_worktime_by_phase_user)
+        with multiprocessing.Pool(parallelism) as pool:
+            async_results = [pool.apply_async(job) for job in writing_jobs]
+            for async_result in async_results:
+                async_result.get()
 
     logger.debug(f"'{project_dir}'のマスクした結果を'{output_project_dir}'に出力しました。")
 
@@ -229,6 +260,7 @@ def main(args: argparse.Namespace) -> None:
         args.output_dir,
         task_completion_criteria,
         metadata=input_project_dir.read_metadata(),
+        compress_html=args.compress_html,
     )
     mask_visualization_dir(
         project_dir=input_project_dir,
@@ -236,6 +268,7 @@ def main(args: argparse.Namespace) -> None:
         not_masked_biography_set=not_masked_biography_set,
         not_masked_user_id_set=not_masked_user_id_set,
         minimal_output=args.minimal,
+        parallelism=args.parallelism,
     )
 
 
@@ -266,6 +299,13 @@ def parse_args(parser: argparse.ArgumentParser) -> None:
         action="store_true",
         help="必要最小限のファイルを出力します。",
     )
+
+    parser.add_argument(
+        "--compress_html",
+        action="store_true",
+        help="HTMLファイルに埋め込むグラフのデータを圧縮して、ファイルサイズを小さくします。圧縮したHTMLファイルは、 ``DecompressionStream`` に対応したブラウザで閲覧できます。",
+    )
+
     custom_production_volume_sample = {
         "column_list": [{"value": "video_duration_minute", "name": "動画長さ"}],
     }
@@ -288,6 +328,13 @@ def parse_args(parser: argparse.ArgumentParser) -> None:
 
     parser.add_argument("-o", "--output_dir", type=Path, required=True, help="出力先ディレクトリ。")
 
+    parser.add_argument(
+        "--parallelism",
+        type=int,
+        choices=PARALLELISM_CHOICES,
+        help="CSVやグラフの出力を並列に実行するプロセス数を指定します。指定しない場合は、逐次的に処理します。",
+    )
+
     parser.set_defaults(subcommand_func=main)
 
 
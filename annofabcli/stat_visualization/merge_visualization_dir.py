@@ -268,7 +268,7 @@ def main(args: argparse.Namespace) -> None:
         user_id_list=user_id_list,
         custom_production_volume_list=custom_production_volume_list,
         minimal_output=args.minimal,
-        output_project_dir=ProjectDir(args.output_dir, task_completion_criteria),
+        output_project_dir=ProjectDir(args.output_dir, task_completion_criteria, compress_html=args.compress_html),
     )
 
 
@@ -303,6 +303,12 @@ def parse_args(parser: argparse.ArgumentParser) -> None:
         help="必要最小限のファイルを出力します。",
     )
 
+    parser.add_argument(
+        "--compress_html",
+        action="store_true",
+        help="HTMLファイルに埋め込むグラフのデータを圧縮して、ファイルサイズを小さくします。圧縮したHTMLファイルは、 ``DecompressionStream`` に対応したブラウザで閲覧できます。",
+    )
+
     custom_production_volume_sample = {
         "column_list": [{"value": "video_duration_minute", "name": "動画長さ"}],
     }
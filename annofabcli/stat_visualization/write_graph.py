@@ -125,7 +125,7 @@ def main(args: argparse.Namespace) -> None:
 
     task_completion_criteria = TaskCompletionCriteria(args.task_completion_criteria)
     input_project_dir = ProjectDir(args.dir, task_completion_criteria, custom_production_volume_list=custom_production_volume_list)
-    output_project_dir = ProjectDir(args.output_dir, task_completion_criteria, metadata=input_project_dir.read_metadata())
+    output_project_dir = ProjectDir(args.output_dir, task_completion_criteria, metadata=input_project_dir.read_metadata(), compress_html=args.compress_html)
     main_obj = WritingGraph(
         project_dir=input_project_dir,
         output_project_dir=output_project_dir,
@@ -159,6 +159,12 @@ def parse_args(parser: argparse.ArgumentParser) -> None:
         help="必要最小限のファイルを出力します。",
     )
 
+    parser.add_argument(
+        "--compress_html",
+        action="store_true",
+        help="HTMLファイルに埋め込むグラフのデータを圧縮して、ファイルサイズを小さくします。圧縮したHTMLファイルは、 ``DecompressionStream`` に対応したブラウザで閲覧できます。",
+    )
+
     parser.add_argument(
         "--task_completion_criteria",
         type=str,
@@ -9,8 +9,8 @@ import logging
 from pathlib import Path
 from typing import Any
 
-import bokeh
 import bokeh.palettes
+import numpy
 import pandas
 from bokeh.models import CrosshairTool, CustomJS, DataRange1d, HoverTool, LinearAxis
 from bokeh.models.renderers.glyph_renderer import GlyphRenderer
@@ -19,6 +19,9 @@ from bokeh.models.widgets.groups import CheckboxGroup
 from bokeh.models.widgets.inputs import MultiChoice
 from bokeh.plotting import ColumnDataSource, figure
 
+from annofabcli.common.bokeh import write_bokeh_html
+from annofabcli.common.profiling import timed
+
 logger = logging.getLogger(__name__)
 
 MAX_USER_COUNT_FOR_LINE_GRAPH = 60
@@ -324,14 +327,12 @@ class LineGraph:
         return multi_choice
 
 
-def write_bokeh_graph(bokeh_obj: Any, output_file: Path) -> None:  # noqa: ANN401
+@timed()
+def write_bokeh_graph(bokeh_obj: Any, output_file: Path, *, compress_html: bool = False) -> None:  # noqa: ANN401
     """
     bokeh
     """
-    output_file.parent.mkdir(exist_ok=True, parents=True)
-    bokeh.plotting.reset_output()
-    bokeh.plotting.output_file(output_file, title=output_file.stem)
-    bokeh.plotting.save(bokeh_obj)
+    write_bokeh_html(bokeh_obj, output_file, compress_html=compress_html)
     logger.debug(f"'{output_file}'を出力しました。")
 
 
@@ -359,6 +360,86 @@ def get_color_from_small_palette(index: int) -> str:
     return my_palette[index % len(my_palette)]
 
 
+def split_dataframe_by_user(df: pandas.DataFrame, user_id_list: list[str]) -> dict[str, pandas.DataFrame]:
+    """
+    DataFrameを`user_id`列の値ごとに分割します。
+
+    ユーザーごとに``df[df["user_id"] == user_id]``で絞り込むと、計算量が「ユーザー数×行数」になります。
+    そのため、``groupby``で1回だけ分割します。
+
+    Args:
+        df: `user_id`列を持つDataFrame
+        user_id_list: 分割対象のユーザーのuser_id
+
+    Returns:
+        key:user_id, value:そのユーザーの行だけを含むDataFrame。行が存在しないユーザーは含まれません。
+    """
+    df_target = df[df["user_id"].isin(user_id_list)]
+    return {str(user_id): df_subset for user_id, df_subset in df_target.groupby("user_id", sort=False)}
+
+
+def get_lttb_indices(x: numpy.ndarray, y: numpy.ndarray, max_points: int) -> numpy.ndarray:
+    """
+    Largest-Triangle-Three-Buckets（LTTB）法で折れ線の点を間引いたときに、残す点のインデックスを返します。
+    折れ線の形状をできるだけ保ったまま、点の個数を`max_points`個に減らします。
+
+    Args:
+        x: X座標。昇順に並んでいること
+        y: Y座標
+        max_points: 間引いた後の点の個数。3未満の場合は間引きません。
+
+    Returns:
+        残す点のインデックス（昇順）
+    """
+    point_count = len(x)
+    if max_points < 3 or point_count <= max_points:
+        return numpy.arange(point_count)
+
+    x = numpy.nan_to_num(numpy.asarray(x, dtype=float))
+    y = numpy.nan_to_num(numpy.asarray(y, dtype=float))
+
+    # 先頭と末尾の点は必ず残し、残りの点を`max_points - 2`個のバケットに分ける
+    bucket_size = (point_count - 2) / (max_points - 2)
+    indices = numpy.empty(max_points, dtype=numpy.int64)
+    indices[0] = 0
+    indices[-1] = point_count - 1
+
+    selected_index = 0
+    for bucket_index in range(max_points - 2):
+        start = int(bucket_index * bucket_size) + 1
+        end = int((bucket_index + 1) * bucket_size) + 1
+        next_end = min(int((bucket_index + 2) * bucket_size) + 1, point_count)
+        next_x = x[end:next_end].mean()
+        next_y = y[end:next_end].mean()
+
+        # 前のバケットで選んだ点と、次のバケットの平均点と、三角形の面積が最大になる点を選ぶ
+        areas = numpy.abs((x[selected_index] - next_x) * (y[start:end] - y[selected_index]) - (x[selected_index] - x[start:end]) * (next_y - y[selected_index]))
+        selected_index = start + int(numpy.argmax(areas))
+        indices[bucket_index + 1] = selected_index
+
+    return indices
+
+
+def downsample_dataframe_by_lttb(df: pandas.DataFrame, columns_list: list[tuple[str, str]], max_points: int) -> pandas.DataFrame:
+    """
+    折れ線グラフにプロットするDataFrameの行を、LTTB法で間引きます。
+    同じDataFrameを複数の折れ線グラフで共有するので、X軸とY軸の組み合わせごとに残すと判定した行の和集合を返します。
+
+    Args:
+        df: 1本の折れ線に対応するDataFrame。X軸の列の昇順に並んでいること
+        columns_list: 折れ線グラフのX軸とY軸の列名(tuple)のlist
+        max_points: 1個のグラフあたりの点の最大個数
+    """
+    if len(df) <= max_points:
+        return df
+
+    index_set: set[int] = set()
+    for x_column, y_column in columns_list:
+        index_set.update(get_lttb_indices(df[x_column].to_numpy(), df[y_column].to_numpy(), max_points).tolist())
+
+    return df.iloc[sorted(index_set)]
+
+
 def get_plotted_user_id_list(
     user_id_list: list[str],
 ) -> list[str]:
@@ -4,8 +4,7 @@ import argparse
 import logging
 import sys
 import tempfile
-import zipfile
-from collections.abc import Collection, Iterator
+from collections.abc import Collection, Iterable, Iterator
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Any
@@ -15,14 +14,14 @@ import pandas
 from annofabapi.models import InputDataType, ProjectMemberRole
 from annofabapi.parser import (
     SimpleAnnotationParser,
-    lazy_parse_simple_annotation_dir,
-    lazy_parse_simple_annotation_zip,
 )
 from annofabapi.segmentation import read_binary_image
 from dataclasses_json import DataClassJsonMixin
 from shapely.geometry import Polygon
 
 import annofabcli.common.cli
+from annofabcli.common.annofab.annotation_zip import ANNOTATION_CATEGORICAL_COLUMNS, lazy_parse_simple_annotation_by_input_data
+from annofabcli.common.annofab.segmentation_cache import SegmentationStatsCache, SegmentationStatsReader, open_segmentation_stats_cache
 from annofabcli.common.cli import (
     COMMAND_LINE_ERROR_STATUS_CODE,
     ArgumentParser,
@@ -36,23 +35,19 @@ from annofabcli.common.facade import (
     TaskQuery,
     match_annotation_with_task_query,
 )
+from annofabcli.common.partitioned_output import (
+    PartitionedOutputOptions,
+    PartitionedRecordWriter,
+    add_partitioned_output_arguments,
+    create_partitioned_output_options,
+    validate_partitioned_output_arguments,
+)
+from annofabcli.common.record_builder import ColumnarRecordBuilder
 from annofabcli.common.utils import print_csv, print_json
 
 logger = logging.getLogger(__name__)
 
 
-def lazy_parse_simple_annotation_by_input_data(annotation_path: Path) -> Iterator[SimpleAnnotationParser]:
-    if not annotation_path.exists():
-        raise RuntimeError(f"'{annotation_path}' は存在しません。")
-
-    if annotation_path.is_dir():
-        return lazy_parse_simple_annotation_dir(annotation_path)
-    elif zipfile.is_zipfile(str(annotation_path)):
-        return lazy_parse_simple_annotation_zip(annotation_path)
-    else:
-        raise RuntimeError(f"'{annotation_path}'は、zipファイルまたはディレクトリではありません。")
-
-
 @dataclass(frozen=True)
 class AnnotationAreaInfo(DataClassJsonMixin):
     project_id: str
@@ -107,11 +102,23 @@ def calculate_polygon_area(points: list[dict[str, int]]) -> int:
     return round(area)
 
 
-def get_annotation_area_info_list(parser: SimpleAnnotationParser, simple_annotation: dict[str, Any]) -> list[AnnotationAreaInfo]:
+def get_annotation_area_info_list(
+    parser: SimpleAnnotationParser,
+    simple_annotation: dict[str, Any],
+    *,
+    segmentation_stats_reader: SegmentationStatsReader | None = None,
+) -> list[AnnotationAreaInfo]:
+    """
+    Args:
+        segmentation_stats_reader: 指定した場合は、塗りつぶし画像の面積をキャッシュから取得します。
+    """
     result = []
     for detail in simple_annotation["details"]:
         if detail["data"]["_type"] in {"Segmentation", "SegmentationV2"}:
-            annotation_area = calculate_segmentation_area(parser.open_outer_file(detail["data"]["data_uri"]))
+            if segmentation_stats_reader is not None:
+                annotation_area = segmentation_stats_reader.read(parser, detail["data"]["data_uri"]).area
+            else:
+                annotation_area = calculate_segmentation_area(parser.open_outer_file(detail["data"]["data_uri"]))
         elif detail["data"]["_type"] == "BoundingBox":
             annotation_area = calculate_bounding_box_area(detail["data"])
         elif detail["data"]["_type"] == "Points":
@@ -138,14 +145,15 @@ def get_annotation_area_info_list(parser: SimpleAnnotationParser, simple_annotat
     return result
 
 
-def get_annotation_area_info_list_from_annotation_path(
+def iter_annotation_area_info_from_annotation_path(
     annotation_path: Path,
     *,
     target_task_ids: Collection[str] | None = None,
     task_query: TaskQuery | None = None,
-) -> list[AnnotationAreaInfo]:
-    annotation_area_list = []
+    segmentation_cache: SegmentationStatsCache | None = None,
+) -> Iterator[AnnotationAreaInfo]:
     target_task_ids = set(target_task_ids) if target_task_ids is not None else None
+    segmentation_stats_reader = SegmentationStatsReader(annotation_path, cache=segmentation_cache) if segmentation_cache is not None else None
     iter_parser = lazy_parse_simple_annotation_by_input_data(annotation_path)
     logger.debug("アノテーションzip/ディレクトリを読み込み中")
     for index, parser in enumerate(iter_parser):
@@ -157,33 +165,63 @@ def get_annotation_area_info_list_from_annotation_path(
         if task_query is not None:  # noqa: SIM102
             if not match_annotation_with_task_query(simple_annotation_dict, task_query):
                 continue
-        sub_annotation_area_list = get_annotation_area_info_list(parser, simple_annotation_dict)
-        annotation_area_list.extend(sub_annotation_area_list)
-    return annotation_area_list
+        yield from get_annotation_area_info_list(parser, simple_annotation_dict, segmentation_stats_reader=segmentation_stats_reader)
+
+    if segmentation_stats_reader is not None:
+        logger.info(f"塗りつぶし画像の面積を算出しました。 :: キャッシュから取得した件数={segmentation_stats_reader.cache_hit_count}, 画像を読み込んだ件数={segmentation_stats_reader.decoded_count}")
+
+
+def get_annotation_area_info_list_from_annotation_path(
+    annotation_path: Path,
+    *,
+    target_task_ids: Collection[str] | None = None,
+    task_query: TaskQuery | None = None,
+    segmentation_cache: SegmentationStatsCache | None = None,
+) -> list[AnnotationAreaInfo]:
+    return list(
+        iter_annotation_area_info_from_annotation_path(
+            annotation_path,
+            target_task_ids=target_task_ids,
+            task_query=task_query,
+            segmentation_cache=segmentation_cache,
+        )
+    )
+
+
+ANNOTATION_AREA_COLUMNS = [
+    "project_id",
+    "task_id",
+    "task_status",
+    "task_phase",
+    "task_phase_stage",
+    "input_data_id",
+    "input_data_name",
+    "updated_datetime",
+    "label",
+    "annotation_id",
+    "annotation_area",
+]
+"""CSVに出力する列"""
 
 
 def create_df(
-    annotation_area_list: list[AnnotationAreaInfo],
+    annotation_area_list: Iterable[AnnotationAreaInfo],
 ) -> pandas.DataFrame:
-    columns = [
-        "project_id",
-        "task_id",
-        "task_status",
-        "task_phase",
-        "task_phase_stage",
-        "input_data_id",
-        "input_data_name",
-        "updated_datetime",
-        "label",
-        "annotation_id",
-        "annotation_area",
-    ]
-    df = pandas.DataFrame(e.to_dict() for e in annotation_area_list)
-    if len(df) == 0:
-        df = pandas.DataFrame(columns=columns)
-
+    builder = ColumnarRecordBuilder(ANNOTATION_AREA_COLUMNS, categorical_columns=ANNOTATION_CATEGORICAL_COLUMNS)
+    for e in annotation_area_list:
+        builder.append(e.to_dict())
+    df = builder.to_dataframe()
     df = df.fillna({"annotation_area": 0})
-    return df[columns]
+    return df
+
+
+def write_annotation_area_to_partitioned_files(annotation_area_list: Iterable[AnnotationAreaInfo], options: PartitionedOutputOptions) -> None:
+    """
+    アノテーションの面積情報を読み込みながら少しずつ書き込み、複数のファイルに分けて出力します。
+    """
+    with PartitionedRecordWriter(options, columns=ANNOTATION_AREA_COLUMNS, categorical_columns=ANNOTATION_CATEGORICAL_COLUMNS) as writer:
+        for e in annotation_area_list:
+            writer.append(e.to_dict())
 
 
 def print_annotation_area(
@@ -193,20 +231,34 @@ def print_annotation_area(
     *,
     target_task_ids: Collection[str] | None = None,
     task_query: TaskQuery | None = None,
+    segmentation_cache: SegmentationStatsCache | None = None,
+    partitioned_output_options: PartitionedOutputOptions | None = None,
 ) -> None:
-    annotation_area_list = get_annotation_area_info_list_from_annotation_path(
-        annotation_path,
-        target_task_ids=target_task_ids,
-        task_query=task_query,
-    )
+    """
+    アノテーションの面積情報を出力します。
+    ``partitioned_output_options`` を指定した場合は、 ``output_file`` と ``output_format`` は参照せずに、複数のファイルに分けて出力します。
+    """
 
-    logger.info(f"{len(annotation_area_list)} 件のタスクに含まれる塗りつぶし、矩形、ポリゴンアノテーションの面積情報を出力します。")
+    def iter_annotation_area() -> Iterator[AnnotationAreaInfo]:
+        return iter_annotation_area_info_from_annotation_path(
+            annotation_path,
+            target_task_ids=target_task_ids,
+            task_query=task_query,
+            segmentation_cache=segmentation_cache,
+        )
 
-    if output_format == OutputFormat.CSV:
-        df = create_df(annotation_area_list)
+    if partitioned_output_options is not None:
+        write_annotation_area_to_partitioned_files(iter_annotation_area(), partitioned_output_options)
+
+    elif output_format == OutputFormat.CSV:
+        # アノテーションごとのオブジェクトを保持し続けないように、読み込みながら列ごとに詰める
+        df = create_df(iter_annotation_area())
+        logger.info(f"{len(df)} 件の塗りつぶし、矩形、ポリゴンアノテーションの面積情報を出力します。")
         print_csv(df, output_file)
 
     elif output_format in [OutputFormat.PRETTY_JSON, OutputFormat.JSON]:
+        annotation_area_list = list(iter_annotation_area())
+        logger.info(f"{len(annotation_area_list)} 件の塗りつぶし、矩形、ポリゴンアノテーションの面積情報を出力します。")
         json_is_pretty = output_format == OutputFormat.PRETTY_JSON
         print_json(
             [e.to_dict(encode_json=True) for e in annotation_area_list],
@@ -228,6 +280,10 @@ class ListAnnotationArea(CommandLine):
                 file=sys.stderr,
             )
             return False
+        error_message = validate_partitioned_output_arguments(args)
+        if error_message is not None:
+            print(f"{self.COMMON_MESSAGE} {error_message}", file=sys.stderr)  # noqa: T201
+            return False
         return True
 
     def main(self) -> None:
@@ -250,39 +306,46 @@ class ListAnnotationArea(CommandLine):
 
         output_file: Path = args.output
         output_format = OutputFormat(args.format)
+        partitioned_output_options = create_partitioned_output_options(args)
 
         downloading_obj = DownloadingFile(self.service)
 
-        def download_and_print_annotation_area(project_id: str, temp_dir: Path, *, is_latest: bool, annotation_path: Path | None) -> None:
-            if annotation_path is None:
-                annotation_path = downloading_obj.download_annotation_zip_to_dir(
-                    project_id,
-                    temp_dir,
-                    is_latest=is_latest,
+        with open_segmentation_stats_cache(enabled=args.segmentation_cache) as segmentation_cache:
+
+            def download_and_print_annotation_area(project_id: str, temp_dir: Path, *, is_latest: bool, annotation_path: Path | None) -> None:
+                if annotation_path is None:
+                    annotation_path = downloading_obj.download_annotation_zip_to_dir(
+                        project_id,
+                        temp_dir,
+                        is_latest=is_latest,
+                    )
+                print_annotation_area(
+                    output_format=output_format,
+                    output_file=output_file,
+                    target_task_ids=task_id_list,
+                    task_query=task_query,
+                    annotation_path=annotation_path,
+                    segmentation_cache=segmentation_cache,
+                    partitioned_output_options=partitioned_output_options,
                 )
-            print_annotation_area(
-                output_format=output_format,
-                output_file=output_file,
-                target_task_ids=task_id_list,
-                task_query=task_query,
-                annotation_path=annotation_path,
-            )
 
-        if project_id is not None:
-            if args.temp_dir is not None:
-                download_and_print_annotation_area(project_id=project_id, temp_dir=args.temp_dir, is_latest=args.latest, annotation_path=annotation_path)
+            if project_id is not None:
+                if args.temp_dir is not None:
+                    download_and_print_annotation_area(project_id=project_id, temp_dir=args.temp_dir, is_latest=args.latest, annotation_path=annotation_path)
+                else:
+                    with tempfile.TemporaryDirectory() as str_temp_dir:
+                        download_and_print_annotation_area(project_id=project_id, temp_dir=Path(str_temp_dir), is_latest=args.latest, annotation_path=annotation_path)
             else:
-                with tempfile.TemporaryDirectory() as str_temp_dir:
-                    download_and_print_annotation_area(project_id=project_id, temp_dir=Path(str_temp_dir), is_latest=args.latest, annotation_path=annotation_path)
-        else:
-            assert annotation_path is not None
-            print_annotation_area(
-                output_format=output_format,
-                output_file=output_file,
-                target_task_ids=task_id_list,
-                task_query=task_query,
-                annotation_path=annotation_path,
-            )
+                assert annotation_path is not None
+                print_annotation_area(
+                    output_format=output_format,
+                    output_file=output_file,
+                    target_task_ids=task_id_list,
+                    task_query=task_query,
+                    annotation_path=annotation_path,
+                    segmentation_cache=segmentation_cache,
+                    partitioned_output_options=partitioned_output_options,
+                )
 
 
 def parse_args(parser: argparse.ArgumentParser) -> None:
@@ -298,11 +361,13 @@ def parse_args(parser: argparse.ArgumentParser) -> None:
     group.add_argument("-p", "--project_id", type=str, help="project_id。``--annotation`` が未指定のときは必須です。\n")
 
     argument_parser.add_format(
-        choices=[OutputFormat.CSV, OutputFormat.JSON, OutputFormat.PRETTY_JSON],
+        choices=[OutputFormat.CSV, OutputFormat.JSON, OutputFormat.PRETTY_JSON, OutputFormat.PARQUET],
         default=OutputFormat.CSV,
+        help_message="出力フォーマットを指定します。 ``parquet`` は ``--output_dir`` を指定したときのみ指定できます。",
     )
 
     argument_parser.add_output()
+    add_partitioned_output_arguments(parser, partition_by_choices=["task_phase", "label"])
 
     parser.add_argument(
         "-tq",
@@ -325,6 +390,13 @@ def parse_args(parser: argparse.ArgumentParser) -> None:
         help="指定したディレクトリに、アノテーションZIPなどの一時ファイルをダウンロードします。",
     )
 
+    parser.add_argument(
+        "--segmentation_cache",
+        action="store_true",
+        help="塗りつぶし画像の面積などを、キャッシュディレクトリ（ ``$XDG_CACHE_HOME/annofabcli`` ）に保存して再利用します。"
+        "アノテーションZIPに格納されているCRC32とファイルサイズが同じ塗りつぶし画像は、2回目以降は読み込みません。",
+    )
+
     parser.set_defaults(subcommand_func=main)
 
 
@@ -8,9 +8,8 @@ import copy
 import json
 import logging
 import tempfile
-import zipfile
 from collections import Counter, defaultdict
-from collections.abc import Collection, Iterator
+from collections.abc import Collection
 from dataclasses import dataclass, field
 from enum import Enum
 from functools import partial
@@ -21,17 +20,13 @@ import annofabapi
 import pandas
 from annofabapi.models import ProjectMemberRole, TaskPhase, TaskStatus
 from annofabapi.parser import (
-    SimpleAnnotationParser,
     SimpleAnnotationParserByTask,
-    lazy_parse_simple_annotation_dir,
-    lazy_parse_simple_annotation_dir_by_task,
-    lazy_parse_simple_annotation_zip,
-    lazy_parse_simple_annotation_zip_by_task,
 )
 from annofabapi.pydantic_models.additional_data_definition_type import AdditionalDataDefinitionType
 from dataclasses_json import DataClassJsonMixin, config
 
 import annofabcli.common.cli
+from annofabcli.common.annofab.annotation_zip import lazy_parse_simple_annotation_by_input_data, lazy_parse_simple_annotation_by_task
 from annofabcli.common.cli import (
     ArgumentParser,
     CommandLine,
@@ -45,6 +40,7 @@ from annofabcli.common.facade import (
     convert_annotation_specs_labels_v2_to_v1,
     match_annotation_with_task_query,
 )
+from annofabcli.common.profiling import timed
 from annofabcli.common.utils import print_csv, print_json
 from annofabcli.common.visualize import AddProps, MessageLocale
 
@@ -182,54 +178,6 @@ class AnnotationCounterByInputData(AnnotationCounter, DataClassJsonMixin):
     """アノテーションJSONには含まれていない情報なので、Optionalにする"""
 
 
-def lazy_parse_simple_annotation_by_input_data(annotation_path: Path) -> Iterator[SimpleAnnotationParser]:
-    """
-    アノテーションzipまたはディレクトリから、入力データ単位でアノテーションを遅延パースするイテレータを返します。
-
-    Args:
-        annotation_path: アノテーションzipまたはzipを展開したディレクトリのパス
-
-    Returns:
-        SimpleAnnotationParserのイテレータ
-
-    Raises:
-        RuntimeError: 指定されたパスが存在しない場合、またはzipファイルでもディレクトリでもない場合
-    """
-    if not annotation_path.exists():
-        raise RuntimeError(f"'{annotation_path}' は存在しません。")
-
-    if annotation_path.is_dir():
-        return lazy_parse_simple_annotation_dir(annotation_path)
-    elif zipfile.is_zipfile(str(annotation_path)):
-        return lazy_parse_simple_annotation_zip(annotation_path)
-    else:
-        raise RuntimeError(f"'{annotation_path}'は、zipファイルまたはディレクトリではありません。")
-
-
-def lazy_parse_simple_annotation_by_task(annotation_path: Path) -> Iterator[SimpleAnnotationParserByTask]:
-    """
-    アノテーションzipまたはディレクトリから、タスク単位でアノテーションを遅延パースするイテレータを返します。
-
-    Args:
-        annotation_path: アノテーションzipまたはzipを展開したディレクトリのパス
-
-    Returns:
-        SimpleAnnotationParserByTaskのイテレータ
-
-    Raises:
-        RuntimeError: 指定されたパスが存在しない場合、またはzipファイルでもディレクトリでもない場合
-    """
-    if not annotation_path.exists():
-        raise RuntimeError(f"'{annotation_path}' は存在しません。")
-
-    if annotation_path.is_dir():
-        return lazy_parse_simple_annotation_dir_by_task(annotation_path)
-    elif zipfile.is_zipfile(str(annotation_path)):
-        return lazy_parse_simple_annotation_zip_by_task(annotation_path)
-    else:
-        raise RuntimeError(f"'{annotation_path}'は、zipファイルまたはディレクトリではありません。")
-
-
 class ListAnnotationCounterByInputData:
     """入力データ単位で、ラベルごと/属性ごとのアノテーション数を集計情報を取得するメソッドの集まり。
 
@@ -359,6 +307,7 @@ class ListAnnotationCounterByInputData:
             frame_no=frame_no,
         )
 
+    @timed()
     def get_annotation_counter_list(
         self,
         annotation_path: Path,
@@ -475,6 +424,7 @@ class ListAnnotationCounterByTask:
             annotation_count_by_attribute=annotation_count_by_attribute,
         )
 
+    @timed()
     def get_annotation_counter_list(
         self,
         annotation_path: Path,
@@ -11,6 +11,7 @@ import pandas
 from dateutil.parser import parse
 
 import annofabcli.common.cli
+from annofabcli.common.annofab.task_history_event_store import TaskHistoryEventStore, add_event_store_argument, open_task_history_event_store
 from annofabcli.common.cli import ArgumentParser, CommandLine, build_annofabapi_resource_and_login
 from annofabcli.common.facade import AnnofabApiFacade
 from annofabcli.task_history_event.list_worktime import (
@@ -111,6 +112,8 @@ class ListWorktimeFromTaskHistoryEvent(CommandLine):
         self,
         project_id: str,
         task_history_event_json: Path | None,
+        *,
+        task_history_event_store: TaskHistoryEventStore | None = None,
     ) -> None:
         super().validate_project(project_id, project_member_roles=None)
 
@@ -118,6 +121,7 @@ class ListWorktimeFromTaskHistoryEvent(CommandLine):
         worktime_list = main_obj.get_worktime_list(
             project_id,
             task_history_event_json=task_history_event_json,
+            task_history_event_store=task_history_event_store,
         )
         project_member_list = self.service.wrapper.get_all_project_members(project_id, query_params={"include_inactive_member": ""})
         df = get_df_worktime(worktime_list, project_member_list)
@@ -130,10 +134,12 @@ class ListWorktimeFromTaskHistoryEvent(CommandLine):
     def main(self) -> None:
         args = self.args
 
-        self.print_worktime_list(
-            args.project_id,
-            task_history_event_json=args.task_history_event_json,
-        )
+        with open_task_history_event_store(enabled=args.event_store) as task_history_event_store:
+            self.print_worktime_list(
+                args.project_id,
+                task_history_event_json=args.task_history_event_json,
+                task_history_event_store=task_history_event_store,
+            )
 
 
 def main(args: argparse.Namespace) -> None:
@@ -155,6 +161,8 @@ def parse_args(parser: argparse.ArgumentParser) -> None:
         "JSONファイルは ``$ annofabcli task_history_event download`` コマンドで取得できます。",
     )
 
+    add_event_store_argument(parser)
+
     argument_parser.add_output()
 
     parser.set_defaults(subcommand_func=main)
@@ -15,14 +15,13 @@ from bokeh.models.renderers.glyph_renderer import GlyphRenderer
 from bokeh.models.widgets.inputs import MultiChoice
 from bokeh.plotting import ColumnDataSource, figure
 
+from annofabcli.common.bokeh import write_bokeh_html
+
 logger = logging.getLogger(__name__)
 
 
-def write_bokeh_graph(bokeh_obj: Any, output_file: Path) -> None:  # noqa: ANN401
-    output_file.parent.mkdir(exist_ok=True, parents=True)
-    bokeh.plotting.reset_output()
-    bokeh.plotting.output_file(output_file, title=output_file.stem)
-    bokeh.plotting.save(bokeh_obj)
+def write_bokeh_graph(bokeh_obj: Any, output_file: Path, *, compress_html: bool = False) -> None:  # noqa: ANN401
+    write_bokeh_html(bokeh_obj, output_file, compress_html=compress_html)
     logger.debug(f"'{output_file}'を出力しました。")
 
 
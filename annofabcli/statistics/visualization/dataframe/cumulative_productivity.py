@@ -24,8 +24,10 @@ from bokeh.plotting import ColumnDataSource
 from annofabcli.common.bokeh import create_pretext_from_metadata
 from annofabcli.statistics.linegraph import (
     LineGraph,
+    downsample_dataframe_by_lttb,
     get_color_from_palette,
     get_plotted_user_id_list,
+    split_dataframe_by_user,
     write_bokeh_graph,
 )
 from annofabcli.statistics.visualization.dataframe.task_worktime_by_phase_user import TaskWorktimeByPhaseUser
@@ -236,6 +238,7 @@ class AbstractPhaseCumulativeProductivity(abc.ABC):
         output_file: Path,
         *,
         metadata: dict[str, Any] | None,
+        compress_html: bool = False,
     ) -> None:
         """
         折れ線グラフを、HTMLファイルに出力します。
@@ -264,9 +267,10 @@ class AbstractPhaseCumulativeProductivity(abc.ABC):
         line_count = 0
         plotted_users: list[tuple[str, str]] = []
 
+        df_by_user = split_dataframe_by_user(df, user_id_list)
         for user_index, user_id in enumerate(user_id_list):
-            df_subset = df[df["user_id"] == user_id]
-            if df_subset.empty:
+            df_subset = df_by_user.get(user_id)
+            if df_subset is None:
                 logger.debug(f"dataframe is empty. user_id = {user_id}")
                 continue
 
@@ -300,7 +304,7 @@ class AbstractPhaseCumulativeProductivity(abc.ABC):
         if metadata is not None:
             graph_group_list.insert(0, create_pretext_from_metadata(metadata))
 
-        write_bokeh_graph(bokeh.layouts.layout(graph_group_list), output_file)
+        write_bokeh_graph(bokeh.layouts.layout(graph_group_list), output_file, compress_html=compress_html)
 
     def _plot_with_production_volume_selector(
         self,
@@ -310,6 +314,8 @@ class AbstractPhaseCumulativeProductivity(abc.ABC):
         output_file: Path,
         *,
         metadata: dict[str, Any] | None,
+        max_points_per_line: int | None = None,
+        compress_html: bool = False,
     ) -> None:
         """
         生産量種別を切り替えられる累積折れ線グラフを、HTMLファイルに出力します。
@@ -320,6 +326,8 @@ class AbstractPhaseCumulativeProductivity(abc.ABC):
             user_id_list: 折れ線グラフに表示するユーザーのIDリスト。
             output_file: 出力先HTMLファイル。
             metadata: HTMLファイルの上部に表示するメタデータです。
+            compress_html: Trueなら、グラフのデータを圧縮してHTMLファイルに埋め込みます。
+            max_points_per_line: 1本の折れ線あたりの点の最大個数。超える場合はLTTB法で間引きます。Noneなら間引きません。
         """
         if len(production_volume_list) == 0:
             logger.warning(f"生産量種別が0件のため、'{output_file}'は出力しません。")
@@ -340,14 +348,22 @@ class AbstractPhaseCumulativeProductivity(abc.ABC):
         tooltip_columns.update(production_volume.value for production_volume in production_volume_list)
         required_columns = list(xy_columns | tooltip_columns)
 
+        # 生産量種別を切り替えるとX軸の列が変わるので、すべてのX軸の列について形状が保たれるように間引く
+        downsampling_columns_list = [(f"cumulative_{production_volume.value}", graph_spec.y_column) for production_volume in production_volume_list for graph_spec in graph_spec_list]
+
         line_count = 0
         plotted_users: list[tuple[str, str]] = []
+        df_by_user = split_dataframe_by_user(self.df, user_id_list)
         for user_index, user_id in enumerate(user_id_list):
-            df_subset = self.df[self.df["user_id"] == user_id]
-            if df_subset.empty:
+            df_subset = df_by_user.get(user_id)
+            if df_subset is None:
                 logger.debug(f"dataframe is empty. user_id = {user_id}")
                 continue
 
+            if max_points_per_line is not None:
+                df_subset = downsample_dataframe_by_lttb(df_subset, downsampling_columns_list, max_points_per_line)
+
+            # 1ユーザーのColumnDataSourceをすべてのグラフで共有することで、HTMLファイルに同じデータを重複して出力しないようにする
             source = ColumnDataSource(df_subset[required_columns])
             color = get_color_from_palette(user_index)
             username = df_subset.iloc[0]["username"]
@@ -383,7 +399,7 @@ class AbstractPhaseCumulativeProductivity(abc.ABC):
         if metadata is not None:
             graph_group_list.insert(0, create_pretext_from_metadata(metadata))
 
-        write_bokeh_graph(bokeh.layouts.layout(graph_group_list), output_file)
+        write_bokeh_graph(bokeh.layouts.layout(graph_group_list), output_file, compress_html=compress_html)
 
     @abc.abstractmethod
     def plot_production_volume_metrics(
@@ -394,6 +410,7 @@ class AbstractPhaseCumulativeProductivity(abc.ABC):
         *,
         target_user_id_list: list[str] | None = None,
         metadata: dict[str, Any] | None = None,
+        compress_html: bool = False,
     ) -> None:
         raise NotImplementedError()
 
@@ -408,7 +425,9 @@ class AbstractPhaseCumulativeProductivity(abc.ABC):
         *,
         target_user_id_list: list[str] | None = None,
         metadata: dict[str, Any] | None = None,
+        compress_html: bool = False,
         include_input_data_count: bool = True,
+        max_points_per_line: int | None = None,
     ) -> None:
         """
         生産量種別を切り替えられる累積折れ線グラフを出力します。
@@ -417,7 +436,9 @@ class AbstractPhaseCumulativeProductivity(abc.ABC):
             output_file: 出力先HTMLファイル。
             target_user_id_list: 折れ線グラフに表示するユーザーのIDリスト。
             metadata: HTMLファイルの上部に表示するメタデータです。
+            compress_html: Trueなら、グラフのデータを圧縮してHTMLファイルに埋め込みます。
             include_input_data_count: 入力データ数を切り替え対象に含めるかどうか。
+            max_points_per_line: 1本の折れ線あたりの点の最大個数。超える場合はLTTB法で間引きます。Noneなら間引きません。
         """
         if not self._validate_df_for_output(output_file):
             return
@@ -429,6 +450,8 @@ class AbstractPhaseCumulativeProductivity(abc.ABC):
             self._get_user_id_list_for_plot(target_user_id_list),
             output_file,
             metadata=metadata,
+            max_points_per_line=max_points_per_line,
+            compress_html=compress_html,
         )
 
 
@@ -481,6 +504,7 @@ class AnnotatorCumulativeProductivity(AbstractPhaseCumulativeProductivity):
         *,
         target_user_id_list: list[str] | None = None,
         metadata: dict[str, Any] | None = None,
+        compress_html: bool = False,
     ) -> None:
         """
         生産性を教師付作業者ごとにプロットする。
@@ -500,7 +524,7 @@ class AnnotatorCumulativeProductivity(AbstractPhaseCumulativeProductivity):
         user_id_list = get_plotted_user_id_list(user_id_list)
 
         line_graph_list, columns_list = self._create_line_graph_list(production_volume_column, production_volume_name, self._get_graph_spec_list())
-        self._plot(line_graph_list, columns_list, user_id_list, output_file, metadata=metadata)
+        self._plot(line_graph_list, columns_list, user_id_list, output_file, metadata=metadata, compress_html=compress_html)
 
 
 class InspectorCumulativeProductivity(AbstractPhaseCumulativeProductivity):
@@ -539,6 +563,7 @@ class InspectorCumulativeProductivity(AbstractPhaseCumulativeProductivity):
         *,
         target_user_id_list: list[str] | None = None,
         metadata: dict[str, Any] | None = None,
+        compress_html: bool = False,
     ) -> None:
         """
         生産性を検査作業者ごとにプロットする。
@@ -559,7 +584,7 @@ class InspectorCumulativeProductivity(AbstractPhaseCumulativeProductivity):
 
         line_graph_list, columns_list = self._create_line_graph_list(production_volume_column, production_volume_name, self._get_graph_spec_list())
 
-        self._plot(line_graph_list, columns_list, user_id_list, output_file, metadata=metadata)
+        self._plot(line_graph_list, columns_list, user_id_list, output_file, metadata=metadata, compress_html=compress_html)
 
 
 class AcceptorCumulativeProductivity(AbstractPhaseCumulativeProductivity):
@@ -597,6 +622,7 @@ class AcceptorCumulativeProductivity(AbstractPhaseCumulativeProductivity):
         *,
         target_user_id_list: list[str] | None = None,
         metadata: dict[str, Any] | None = None,
+        compress_html: bool = False,
     ) -> None:
         """
         生産性を受入作業者ごとにプロットする。
@@ -617,4 +643,4 @@ class AcceptorCumulativeProductivity(AbstractPhaseCumulativeProductivity):
 
         line_graph_list, columns_list = self._create_line_graph_list(production_volume_column, production_volume_name, self._get_graph_spec_list())
 
-        self._plot(line_graph_list, columns_list, user_id_list, output_file, metadata=metadata)
+        self._plot(line_graph_list, columns_list, user_id_list, output_file, metadata=metadata, compress_html=compress_html)
@@ -28,6 +28,7 @@ from annofabcli.statistics.linegraph import (
     get_color_from_palette,
     get_plotted_user_id_list,
     get_weekly_sum,
+    split_dataframe_by_user,
     write_bokeh_graph,
 )
 from annofabcli.statistics.visualization.dataframe.task_worktime_by_phase_user import TaskWorktimeByPhaseUser
@@ -99,6 +100,8 @@ class AbstractPhaseProductivityPerDate(abc.ABC):
         plotted_users: list[tuple[str, str]],
         output_file: Path,
         metadata: dict[str, Any] | None,
+        *,
+        compress_html: bool = False,
     ) -> None:
         """
         折れ線グラフを、HTMLファイルに出力します。
@@ -127,7 +130,7 @@ class AbstractPhaseProductivityPerDate(abc.ABC):
         if metadata is not None:
             graph_group_list.insert(0, create_pretext_from_metadata(metadata))
 
-        write_bokeh_graph(bokeh.layouts.layout(graph_group_list), output_file)
+        write_bokeh_graph(bokeh.layouts.layout(graph_group_list), output_file, compress_html=compress_html)
 
     @abc.abstractmethod
     def to_csv(self, output_file: Path) -> None:
@@ -142,6 +145,7 @@ class AbstractPhaseProductivityPerDate(abc.ABC):
         *,
         target_user_id_list: list[str] | None = None,
         metadata: dict[str, Any] | None = None,
+        compress_html: bool = False,
     ) -> None:
         raise NotImplementedError()
 
@@ -151,6 +155,7 @@ class AbstractPhaseProductivityPerDate(abc.ABC):
         *,
         target_user_id_list: list[str] | None = None,
         metadata: dict[str, Any] | None = None,
+        compress_html: bool = False,
     ) -> None:
         """生産量種別を切り替えられる折れ線グラフを出力します。"""
         if not self._validate_df_for_output(output_file):
@@ -182,9 +187,10 @@ class AbstractPhaseProductivityPerDate(abc.ABC):
 
         line_count = 0
         plotted_users: list[tuple[str, str]] = []
+        df_by_user = split_dataframe_by_user(df, user_id_list)
         for user_index, user_id in enumerate(user_id_list):
-            df_subset = df[df["user_id"] == user_id]
-            if df_subset.empty:
+            df_subset = df_by_user.get(user_id)
+            if df_subset is None:
                 logger.debug(f"dataframe is empty. user_id = {user_id}")
                 continue
 
@@ -214,7 +220,7 @@ class AbstractPhaseProductivityPerDate(abc.ABC):
             production_volume_list=production_volume_list,
             metadata=metadata,
         )
-        write_bokeh_graph(layout, output_file)
+        write_bokeh_graph(layout, output_file, compress_html=compress_html)
 
     def _get_production_volume_list_for_plot(self) -> list[ProductionVolumeColumn]:
         """折れ線グラフで切り替えられる生産量種別を取得します。"""
@@ -782,6 +788,7 @@ class AnnotatorProductivityPerDate(AbstractPhaseProductivityPerDate):
         *,
         target_user_id_list: list[str] | None = None,
         metadata: dict[str, Any] | None = None,
+        compress_html: bool = False,
     ) -> None:
         """生産量種別を切り替えられる教師付者用の生産性折れ線グラフを出力します。"""
         if not self._validate_df_for_output(output_file):
@@ -830,9 +837,10 @@ class AnnotatorProductivityPerDate(AbstractPhaseProductivityPerDate):
 
         line_count = 0
         plotted_users: list[tuple[str, str]] = []
+        df_by_user = split_dataframe_by_user(df, user_id_list)
         for user_index, user_id in enumerate(user_id_list):
-            df_subset = df[df["user_id"] == user_id]
-            if df_subset.empty:
+            df_subset = df_by_user.get(user_id)
+            if df_subset is None:
                 logger.debug(f"dataframe is empty. user_id = {user_id}")
                 continue
 
@@ -862,7 +870,7 @@ class AnnotatorProductivityPerDate(AbstractPhaseProductivityPerDate):
             production_volume_list=production_volume_list,
             metadata=metadata,
         )
-        write_bokeh_graph(layout, output_file)
+        write_bokeh_graph(layout, output_file, compress_html=compress_html)
 
     def plot_production_volume_metrics(
         self,
@@ -872,6 +880,7 @@ class AnnotatorProductivityPerDate(AbstractPhaseProductivityPerDate):
         *,
         target_user_id_list: list[str] | None = None,
         metadata: dict[str, Any] | None = None,
+        compress_html: bool = False,
     ) -> None:
         """
         生産性を教師付作業者ごとにプロットする。
@@ -960,9 +969,10 @@ class AnnotatorProductivityPerDate(AbstractPhaseProductivityPerDate):
 
         line_count = 0
         plotted_users: list[tuple[str, str]] = []
+        df_by_user = split_dataframe_by_user(df, user_id_list)
         for user_index, user_id in enumerate(user_id_list):
-            df_subset = df[df["user_id"] == user_id]
-            if df_subset.empty:
+            df_subset = df_by_user.get(user_id)
+            if df_subset is None:
                 logger.debug(f"dataframe is empty. user_id = {user_id}")
                 continue
 
@@ -1004,7 +1014,7 @@ class AnnotatorProductivityPerDate(AbstractPhaseProductivityPerDate):
             logger.warning(f"プロットするデータがなかっため、'{output_file}'は出力しません。")
             return
 
-        self._plot(line_graph_list, plotted_users, output_file, metadata=metadata)
+        self._plot(line_graph_list, plotted_users, output_file, metadata=metadata, compress_html=compress_html)
 
     def to_csv(self, output_file: Path) -> None:
         if not self._validate_df_for_output(output_file):
@@ -1032,6 +1042,7 @@ class InspectorProductivityPerDate(AbstractPhaseProductivityPerDate):
         *,
         target_user_id_list: list[str] | None = None,
         metadata: dict[str, Any] | None = None,
+        compress_html: bool = False,
     ) -> None:
         """
         アノテーション単位の生産性を受入作業者ごとにプロットする。
@@ -1096,9 +1107,10 @@ class InspectorProductivityPerDate(AbstractPhaseProductivityPerDate):
 
         line_count = 0
         plotted_users: list[tuple[str, str]] = []
+        df_by_user = split_dataframe_by_user(df, user_id_list)
         for user_index, user_id in enumerate(user_id_list):
-            df_subset = df[df["user_id"] == user_id]
-            if df_subset.empty:
+            df_subset = df_by_user.get(user_id)
+            if df_subset is None:
                 logger.debug(f"dataframe is empty. user_id = {user_id}")
                 continue
 
@@ -1137,7 +1149,7 @@ class InspectorProductivityPerDate(AbstractPhaseProductivityPerDate):
             logger.warning(f"プロットするデータがなかっため、'{output_file}'は出力しません。")
             return
 
-        self._plot(line_graph_list, plotted_users, output_file, metadata=metadata)
+        self._plot(line_graph_list, plotted_users, output_file, metadata=metadata, compress_html=compress_html)
 
     def to_csv(self, output_file: Path) -> None:
         """
@@ -1169,6 +1181,7 @@ class AcceptorProductivityPerDate(AbstractPhaseProductivityPerDate):
         *,
         target_user_id_list: list[str] | None = None,
         metadata: dict[str, Any] | None = None,
+        compress_html: bool = False,
     ) -> None:
         """
         アノテーション単位の生産性を受入作業者ごとにプロットする。
@@ -1235,9 +1248,10 @@ class AcceptorProductivityPerDate(AbstractPhaseProductivityPerDate):
 
         line_count = 0
         plotted_users: list[tuple[str, str]] = []
+        df_by_user = split_dataframe_by_user(df, user_id_list)
         for user_index, user_id in enumerate(user_id_list):
-            df_subset = df[df["user_id"] == user_id]
-            if df_subset.empty:
+            df_subset = df_by_user.get(user_id)
+            if df_subset is None:
                 logger.debug(f"dataframe is empty. user_id = {user_id}")
                 continue
 
@@ -1277,7 +1291,7 @@ class AcceptorProductivityPerDate(AbstractPhaseProductivityPerDate):
             logger.warning(f"プロットするデータがなかっため、'{output_file}'は出力しません。")
             return
 
-        self._plot(line_graph_list, plotted_users, output_file, metadata=metadata)
+        self._plot(line_graph_list, plotted_users, output_file, metadata=metadata, compress_html=compress_html)
 
     def to_csv(self, output_file: Path) -> None:
         """
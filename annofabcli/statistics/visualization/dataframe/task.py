@@ -8,7 +8,6 @@ from pathlib import Path
 from typing import Any
 
 import annofabapi
-import bokeh
 import bokeh.layouts
 import numpy
 import pandas
@@ -16,7 +15,8 @@ from bokeh.models import CustomJS, HoverTool, LayoutDOM
 from bokeh.models.widgets.inputs import Select
 from bokeh.plotting import figure
 
-from annofabcli.common.bokeh import convert_1d_figure_list_to_2d, create_pretext_from_metadata
+from annofabcli.common.bokeh import convert_1d_figure_list_to_2d, create_pretext_from_metadata, write_bokeh_html
+from annofabcli.common.pandas import replace_values_by_column
 from annofabcli.common.utils import print_csv
 from annofabcli.statistics.histogram import HistogramFrequencyColumn, create_histogram_figure, get_sub_title_from_series
 from annofabcli.statistics.visualization.dataframe.annotation_count import AnnotationCount
@@ -346,7 +346,7 @@ class Task:
         df_merged = pandas.concat(df_list)
         return Task(df_merged, custom_production_volume_list=custom_production_volume_list)
 
-    def plot_histogram_of_worktime(self, output_file: Path, *, metadata: dict[str, Any] | None = None) -> None:  # noqa: PLR0915
+    def plot_histogram_of_worktime(self, output_file: Path, *, metadata: dict[str, Any] | None = None, compress_html: bool = False) -> None:  # noqa: PLR0915
         """作業時間に関する情報をヒストグラムでプロットする。
 
         Args:
@@ -562,13 +562,10 @@ class Task:
             nested_figure_list.insert(0, [create_pretext_from_metadata(metadata)])
 
         bokeh_obj = bokeh.layouts.gridplot(nested_figure_list)
-        output_file.parent.mkdir(exist_ok=True, parents=True)
-        bokeh.plotting.reset_output()
-        bokeh.plotting.output_file(output_file, title=output_file.stem)
-        bokeh.plotting.save(bokeh_obj)
+        write_bokeh_html(bokeh_obj, output_file, compress_html=compress_html)
         logger.debug(f"'{output_file}'を出力しました。")
 
-    def plot_histogram_of_others(self, output_file: Path, *, metadata: dict[str, Any] | None = None) -> None:
+    def plot_histogram_of_others(self, output_file: Path, *, metadata: dict[str, Any] | None = None, compress_html: bool = False) -> None:
         """アノテーション数や、検査コメント数など、作業時間以外の情報をヒストグラムで表示する。
 
         Args:
@@ -675,10 +672,7 @@ class Task:
             nested_figure_list.insert(0, [create_pretext_from_metadata(metadata)])
 
         bokeh_obj = bokeh.layouts.gridplot(nested_figure_list)
-        output_file.parent.mkdir(exist_ok=True, parents=True)
-        bokeh.plotting.reset_output()
-        bokeh.plotting.output_file(output_file, title=output_file.stem)
-        bokeh.plotting.save(bokeh_obj)
+        write_bokeh_html(bokeh_obj, output_file, compress_html=compress_html)
         logger.debug(f"'{output_file}'を出力しました。")
 
     def to_csv(self, output_file: Path) -> None:
@@ -732,5 +726,5 @@ class Task:
             "first_inspection_username": to_replace_for_username,
             "first_acceptance_username": to_replace_for_username,
         }
-        df = self.df.replace(to_replace_info)
+        df = replace_values_by_column(self.df, to_replace_info)
         return Task(df, custom_production_volume_list=self.custom_production_volume_list)
@@ -7,6 +7,7 @@ from pathlib import Path
 import pandas
 from annofabapi.models import TaskPhase
 
+from annofabcli.common.pandas import replace_values_by_column
 from annofabcli.common.utils import print_csv
 from annofabcli.statistics.visualization.dataframe.task import Task
 from annofabcli.statistics.visualization.dataframe.task_history import TaskHistory
@@ -243,7 +244,7 @@ class TaskWorktimeByPhaseUser:
             "account_id": to_replace_for_account_id,
             "biography": to_replace_for_biography,
         }
-        df = self.df.replace(to_replace_info)
+        df = replace_values_by_column(self.df, to_replace_info)
         return TaskWorktimeByPhaseUser(df, custom_production_volume_list=self.custom_production_volume_list)
 
     @staticmethod
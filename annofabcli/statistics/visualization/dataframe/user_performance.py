@@ -980,11 +980,13 @@ class UserPerformance:
         production_volume_column: str,
         *,
         metadata: dict[str, Any] | None = None,
+        compress_html: bool = False,
     ) -> None:
         """作業時間と生産性の関係をメンバごとにプロットする。
 
         Args:
             metadata: HTMLファイルの上部に表示するメタデータです。
+            compress_html: Trueなら、グラフのデータを圧縮してHTMLファイルに埋め込みます。
 
         """
 
@@ -996,7 +998,7 @@ class UserPerformance:
         if metadata is not None:
             element_list.insert(0, create_pretext_from_metadata(metadata))
 
-        write_bokeh_graph(bokeh.layouts.column(element_list), output_file)
+        write_bokeh_graph(bokeh.layouts.column(element_list), output_file, compress_html=compress_html)
 
     def plot_productivity_with_worktime_type_selector(
         self,
@@ -1004,6 +1006,7 @@ class UserPerformance:
         production_volume_column: str,
         *,
         metadata: dict[str, Any] | None = None,
+        compress_html: bool = False,
     ) -> None:
         """作業時間種別を切り替えられる生産性の散布図を出力します。
 
@@ -1011,6 +1014,7 @@ class UserPerformance:
             output_file: 出力先HTMLファイル
             production_volume_column: 生産量を表す列名
             metadata: HTMLファイルの上部に表示するメタデータです。
+            compress_html: Trueなら、グラフのデータを圧縮してHTMLファイルに埋め込みます。
         """
         if not self._validate_df_for_output(output_file):
             return
@@ -1021,19 +1025,21 @@ class UserPerformance:
         if metadata is not None:
             element_list.insert(0, create_pretext_from_metadata(metadata))
 
-        write_bokeh_graph(bokeh.layouts.column(element_list), output_file)
+        write_bokeh_graph(bokeh.layouts.column(element_list), output_file, compress_html=compress_html)
 
     def plot_productivity_with_selectors(
         self,
         output_file: Path,
         *,
         metadata: dict[str, Any] | None = None,
+        compress_html: bool = False,
     ) -> None:
         """作業時間種別と生産量種別を切り替えられる生産性の散布図を出力します。
 
         Args:
             output_file: 出力先HTMLファイル
             metadata: HTMLファイルの上部に表示するメタデータです。
+            compress_html: Trueなら、グラフのデータを圧縮してHTMLファイルに埋め込みます。
         """
         if not self._validate_df_for_output(output_file):
             return
@@ -1048,9 +1054,9 @@ class UserPerformance:
         if metadata is not None:
             element_list.insert(0, create_pretext_from_metadata(metadata))
 
-        write_bokeh_graph(bokeh.layouts.column(element_list), output_file)
+        write_bokeh_graph(bokeh.layouts.column(element_list), output_file, compress_html=compress_html)
 
-    def plot_quality(self, output_file: Path, *, metadata: dict[str, Any] | None = None) -> None:
+    def plot_quality(self, output_file: Path, *, metadata: dict[str, Any] | None = None, compress_html: bool = False) -> None:
         """
         メンバごとに品質を散布図でプロットする
 
@@ -1152,7 +1158,7 @@ class UserPerformance:
         if metadata is not None:
             element_list.insert(0, create_pretext_from_metadata(metadata))
 
-        write_bokeh_graph(bokeh.layouts.column(element_list), output_file)
+        write_bokeh_graph(bokeh.layouts.column(element_list), output_file, compress_html=compress_html)
 
     def _create_quality_and_productivity_element_list(self, worktime_type: WorktimeType, production_volume_column: str) -> list[UIElement]:
         """作業時間を元に算出した生産性と品質の関係を表す要素を生成します。"""
@@ -1288,7 +1294,9 @@ class UserPerformance:
 
         return [div_element, *[e.layout for e in scatter_obj_list]]
 
-    def plot_quality_and_productivity(self, output_file: Path, worktime_type: WorktimeType, production_volume_column: str, *, metadata: dict[str, Any] | None = None) -> None:
+    def plot_quality_and_productivity(
+        self, output_file: Path, worktime_type: WorktimeType, production_volume_column: str, *, metadata: dict[str, Any] | None = None, compress_html: bool = False
+    ) -> None:
         """
         作業時間を元に算出した生産性と品質の関係を、メンバごとにプロットする
         """
@@ -1301,7 +1309,7 @@ class UserPerformance:
         if metadata is not None:
             element_list.insert(0, create_pretext_from_metadata(metadata))
 
-        write_bokeh_graph(bokeh.layouts.column(element_list), output_file)
+        write_bokeh_graph(bokeh.layouts.column(element_list), output_file, compress_html=compress_html)
 
     def plot_quality_and_productivity_with_worktime_type_selector(
         self,
@@ -1309,6 +1317,7 @@ class UserPerformance:
         production_volume_column: str,
         *,
         metadata: dict[str, Any] | None = None,
+        compress_html: bool = False,
     ) -> None:
         """作業時間種別を切り替えられる生産性と品質の散布図を出力します。"""
         if not self._validate_df_for_output(output_file):
@@ -1322,13 +1331,14 @@ class UserPerformance:
         if metadata is not None:
             element_list.insert(0, create_pretext_from_metadata(metadata))
 
-        write_bokeh_graph(bokeh.layouts.column(element_list), output_file)
+        write_bokeh_graph(bokeh.layouts.column(element_list), output_file, compress_html=compress_html)
 
     def plot_quality_and_productivity_with_selectors(
         self,
         output_file: Path,
         *,
         metadata: dict[str, Any] | None = None,
+        compress_html: bool = False,
     ) -> None:
         """作業時間種別と生産量種別を切り替えられる生産性と品質の散布図を出力します。"""
         if not self._validate_df_for_output(output_file):
@@ -1346,4 +1356,4 @@ class UserPerformance:
         if metadata is not None:
             element_list.insert(0, create_pretext_from_metadata(metadata))
 
-        write_bokeh_graph(bokeh.layouts.column(element_list), output_file)
+        write_bokeh_graph(bokeh.layouts.column(element_list), output_file, compress_html=compress_html)
@@ -297,6 +297,7 @@ class WholeProductivityPerCompletedDate:
         output_file: Path,
         *,
         metadata: dict[str, Any] | None = None,
+        compress_html: bool = False,
     ) -> None:
         """
         全体の生産量や生産性をプロットする
@@ -602,9 +603,9 @@ class WholeProductivityPerCompletedDate:
         if metadata is not None:
             element_list.insert(0, create_pretext_from_metadata(metadata))
 
-        write_bokeh_graph(bokeh.layouts.column(element_list), output_file)
+        write_bokeh_graph(bokeh.layouts.column(element_list), output_file, compress_html=compress_html)
 
-    def plot_cumulatively(self, output_file: Path, *, metadata: dict[str, Any] | None = None) -> None:
+    def plot_cumulatively(self, output_file: Path, *, metadata: dict[str, Any] | None = None, compress_html: bool = False) -> None:
         """
         全体の生産量や作業時間の累積折れ線グラフを出力する
         """
@@ -806,7 +807,7 @@ class WholeProductivityPerCompletedDate:
         if metadata is not None:
             element_list.insert(0, create_pretext_from_metadata(metadata))
 
-        write_bokeh_graph(bokeh.layouts.column(element_list), output_file)
+        write_bokeh_graph(bokeh.layouts.column(element_list), output_file, compress_html=compress_html)
 
     @classmethod
     def empty(cls, *, task_completion_criteria: TaskCompletionCriteria, custom_production_volume_list: list[ProductionVolumeColumn] | None = None) -> WholeProductivityPerCompletedDate:
@@ -1042,7 +1043,7 @@ class WholeProductivityPerFirstAnnotationStartedDate:
 
         print_csv(self.df[self.columns], str(output_file))
 
-    def plot(self, output_file: Path, *, metadata: dict[str, Any] | None = None) -> None:  # noqa: PLR0915
+    def plot(self, output_file: Path, *, metadata: dict[str, Any] | None = None, compress_html: bool = False) -> None:  # noqa: PLR0915
         """
         全体の生産量や生産性をプロットする
         """
@@ -1345,4 +1346,4 @@ class WholeProductivityPerFirstAnnotationStartedDate:
         if metadata is not None:
             element_list.insert(0, create_pretext_from_metadata(metadata))
 
-        write_bokeh_graph(bokeh.layouts.column(element_list), output_file)
+        write_bokeh_graph(bokeh.layouts.column(element_list), output_file, compress_html=compress_html)
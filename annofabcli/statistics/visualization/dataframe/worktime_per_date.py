@@ -17,11 +17,13 @@ from bokeh.models.ui import UIElement
 from bokeh.plotting import ColumnDataSource
 
 from annofabcli.common.bokeh import create_pretext_from_metadata
+from annofabcli.common.pandas import replace_values_by_column
 from annofabcli.common.utils import print_csv
 from annofabcli.statistics.linegraph import (
     LineGraph,
     get_color_from_palette,
     get_plotted_user_id_list,
+    split_dataframe_by_user,
     write_bokeh_graph,
 )
 from annofabcli.statistics.list_worktime import get_worktime_dict_from_event_list
@@ -371,6 +373,7 @@ class WorktimePerDate:
         *,
         target_user_id_list: list[str] | None = None,
         metadata: dict[str, Any] | None = None,
+        compress_html: bool = False,
     ) -> None:
         """
         作業時間の累積値をプロットする。
@@ -455,9 +458,10 @@ class WorktimePerDate:
 
         line_count = 0
         plotted_users: list[tuple[str, str]] = []
+        df_by_user = split_dataframe_by_user(df_cumulative, user_id_list)
         for user_index, user_id in enumerate(user_id_list):
-            df_subset = df_cumulative[df_cumulative["user_id"] == user_id]
-            if df_subset.empty:
+            df_subset = df_by_user.get(user_id)
+            if df_subset is None:
                 logger.debug(f"dataframe is empty. user_id = {user_id}")
                 continue
 
@@ -496,7 +500,7 @@ class WorktimePerDate:
         if metadata is not None:
             graph_group_list.insert(0, create_pretext_from_metadata(metadata))
 
-        write_bokeh_graph(bokeh.layouts.layout(graph_group_list), output_file)
+        write_bokeh_graph(bokeh.layouts.layout(graph_group_list), output_file, compress_html=compress_html)
 
     def to_csv(self, output_file: Path) -> None:
         if not self._validate_df_for_output(output_file):
@@ -529,5 +533,5 @@ class WorktimePerDate:
             "account_id": to_replace_for_account_id,
             "biography": to_replace_for_biography,
         }
-        df = self.df.replace(to_replace_info)
+        df = replace_values_by_column(self.df, to_replace_info)
         return WorktimePerDate(df)
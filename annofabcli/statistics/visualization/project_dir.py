@@ -39,6 +39,7 @@ class ProjectDir(DataClassJsonMixin):
         task_completion_criteria: タスクの完了条件
         metadata: プロジェクトIDや絞り込み条件などの情報が含まれるメタデータ。この情報はグラフに埋め込まれます。
         custom_production_volume_list: 独自の生産量に関する列情報のリスト
+        compress_html: Trueなら、グラフのデータを圧縮してHTMLファイルに埋め込みます。
     """
 
     FILENAME_WHOLE_PERFORMANCE = "全体の生産性と品質.csv"
@@ -59,11 +60,13 @@ class ProjectDir(DataClassJsonMixin):
         *,
         metadata: dict[str, Any] | None = None,
         custom_production_volume_list: list[ProductionVolumeColumn] | None = None,
+        compress_html: bool = False,
     ) -> None:
         self.project_dir = project_dir
         self.task_completion_criteria = task_completion_criteria
         self.metadata = metadata
         self.custom_production_volume_list = custom_production_volume_list
+        self.compress_html = compress_html
 
     def __repr__(self) -> str:
         return f"ProjectDir(project_dir={self.project_dir!r})"
@@ -118,8 +121,8 @@ class ProjectDir(DataClassJsonMixin):
         """
         タスク単位のヒストグラムを出力します。
         """
-        obj.plot_histogram_of_worktime(self.project_dir / "histogram/ヒストグラム-作業時間.html", metadata=self.metadata)
-        obj.plot_histogram_of_others(self.project_dir / "histogram/ヒストグラム.html", metadata=self.metadata)
+        obj.plot_histogram_of_worktime(self.project_dir / "histogram/ヒストグラム-作業時間.html", metadata=self.metadata, compress_html=self.compress_html)
+        obj.plot_histogram_of_others(self.project_dir / "histogram/ヒストグラム.html", metadata=self.metadata, compress_html=self.compress_html)
 
     def write_cumulative_line_graph(
         self,
@@ -128,6 +131,7 @@ class ProjectDir(DataClassJsonMixin):
         *,
         user_id_list: list[str] | None = None,
         minimal_output: bool = False,
+        max_points_per_line: int | None = None,
     ) -> None:
         """
         ユーザごとにプロットした累積折れ線グラフを出力します。
@@ -136,6 +140,7 @@ class ProjectDir(DataClassJsonMixin):
         Args:
             user_id_list: 折れ線グラフに表示するユーザ
             minimal_output: 詳細なグラフを出力するかどうか。Trueなら
+            max_points_per_line: 1本の折れ線あたりの点の最大個数。Noneなら間引きません。
 
         """
         output_dir = self.project_dir / "line-graph"
@@ -146,7 +151,9 @@ class ProjectDir(DataClassJsonMixin):
             output_file=output_dir / f"{phase_name}者用/累積折れ線-横軸_生産量-{phase_name}者用.html",
             target_user_id_list=user_id_list,
             metadata=self.metadata,
+            compress_html=self.compress_html,
             include_input_data_count=not minimal_output,
+            max_points_per_line=max_points_per_line,
         )
 
     def write_performance_per_started_date_csv(self, obj: AbstractPhaseProductivityPerDate, phase: TaskPhase) -> None:
@@ -166,6 +173,7 @@ class ProjectDir(DataClassJsonMixin):
             output_file=output_dir / Path(f"{phase_name}者用/折れ線-横軸_{phase_name}開始日-縦軸_生産量単位の指標-{phase_name}者用.html"),
             target_user_id_list=user_id_list,
             metadata=self.metadata,
+            compress_html=self.compress_html,
         )
 
     def read_whole_performance(self) -> WholePerformance:
@@ -210,8 +218,8 @@ class ProjectDir(DataClassJsonMixin):
         """
         横軸が日付、縦軸が全体の生産性などをプロットした折れ線グラフを出力します。
         """
-        obj.plot(self.project_dir / "line-graph/折れ線-横軸_日-全体.html", metadata=self.metadata)
-        obj.plot_cumulatively(self.project_dir / "line-graph/累積折れ線-横軸_日-全体.html", metadata=self.metadata)
+        obj.plot(self.project_dir / "line-graph/折れ線-横軸_日-全体.html", metadata=self.metadata, compress_html=self.compress_html)
+        obj.plot_cumulatively(self.project_dir / "line-graph/累積折れ線-横軸_日-全体.html", metadata=self.metadata, compress_html=self.compress_html)
 
     def read_whole_productivity_per_first_annotation_started_date(self) -> WholeProductivityPerFirstAnnotationStartedDate:
         """
@@ -237,7 +245,7 @@ class ProjectDir(DataClassJsonMixin):
         """
         横軸が教師付開始日、縦軸が全体の生産性などをプロットした折れ線グラフを出力します。
         """
-        obj.plot(self.project_dir / "line-graph/折れ線-横軸_教師付開始日-全体.html", metadata=self.metadata)
+        obj.plot(self.project_dir / "line-graph/折れ線-横軸_教師付開始日-全体.html", metadata=self.metadata, compress_html=self.compress_html)
 
     def read_user_performance(self) -> UserPerformance:
         """
@@ -261,14 +269,16 @@ class ProjectDir(DataClassJsonMixin):
         メンバごとの生産性と品質に関する散布図を出力します。
         """
         output_dir = self.project_dir / "scatter"
-        obj.plot_quality(output_dir / "散布図-教師付者の品質と作業量の関係.html", metadata=self.metadata)
+        obj.plot_quality(output_dir / "散布図-教師付者の品質と作業量の関係.html", metadata=self.metadata, compress_html=self.compress_html)
         obj.plot_productivity_with_selectors(
             output_dir / "散布図-生産量あたり作業時間と累計作業時間の関係.html",
             metadata=self.metadata,
+            compress_html=self.compress_html,
         )
         obj.plot_quality_and_productivity_with_selectors(
             output_dir / "散布図-生産量あたり作業時間と品質の関係-教師付者用.html",
             metadata=self.metadata,
+            compress_html=self.compress_html,
         )
 
     def read_worktime_per_date_user(self) -> WorktimePerDate:
@@ -286,7 +296,7 @@ class ProjectDir(DataClassJsonMixin):
 
     def write_worktime_line_graph(self, obj: WorktimePerDate, user_id_list: list[str] | None = None) -> None:
         """横軸が日付、縦軸がユーザごとの作業時間である折れ線グラフを出力します。"""
-        obj.plot_cumulatively(self.project_dir / "line-graph/累積折れ線-横軸_日-縦軸_作業時間.html", target_user_id_list=user_id_list, metadata=self.metadata)
+        obj.plot_cumulatively(self.project_dir / "line-graph/累積折れ線-横軸_日-縦軸_作業時間.html", target_user_id_list=user_id_list, metadata=self.metadata, compress_html=self.compress_html)
 
     def read_project_info(self) -> ProjectInfo:
         """
@@ -1,19 +1,153 @@
 from __future__ import annotations
 
+import contextlib
 import json
 import logging
-from collections.abc import Collection
+import threading
+from collections.abc import Collection, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Any
+from typing import Any, BinaryIO
 
 import annofabapi.utils
 
+from annofabcli.common.annofab.task_history_event_store import TaskHistoryEventStore, get_default_store_file
 from annofabcli.common.dataclasses import WaitOptions
 from annofabcli.common.download import DownloadingFile
 from annofabcli.common.exceptions import DownloadingFileNotFoundError
+from annofabcli.common.job_poller import JobPoller
+from annofabcli.common.rate_limiter import RateLimiter
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_PARALLELISM_FOR_GETTING_TASK_HISTORIES = 4
+"""`get_task_histories` APIを並列に実行する個数"""
+
+DEFAULT_MAX_REQUESTS_PER_SECOND = 10
+"""全スレッドで、`get_task_histories` APIを1秒あたりに実行する最大回数"""
+
+
+class TaskHistoryStore:
+    """
+    タスクごとに取得したタスク履歴を、取得時のタスクの更新日時と一緒にJSON Lines形式で記録するファイル。
+    取得するたびに追記するので、中断しても取得済みのタスク履歴は失われません。
+
+    同じファイルを指定して再実行すると、タスクの更新日時が記録時から変わっていないタスクについては、記録済みのタスク履歴を利用できます。
+    メモリには、タスクごとに更新日時とファイル内の位置だけを保持して、タスク履歴は必要なときにファイルから読み込みます。
+
+    Args:
+        path: 記録するファイルのパス
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        # key: task_id, value: (タスクの更新日時, ファイル内で記録した行の先頭位置)
+        self._index: dict[str, tuple[str | None, int]] = {}
+        # 書き込み中に中断されて改行で終わっていない場合は、次の行と連結されないように改行を追記する
+        self._needs_newline = False
+        if path.exists():
+            self._load_index()
+            logger.info(f"'{path}' から、{len(self._index)} 件のタスクの履歴の位置を読み込みました。")
+
+    def _load_index(self) -> None:
+        offset = 0
+        with self.path.open(mode="rb") as f:
+            for line in f:
+                line_offset = offset
+                offset += len(line)
+                self._needs_newline = not line.endswith(b"\n")
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # 書き込み中に中断された行は無視する
+                    logger.debug(f"'{self.path}' に不正な行が含まれていたので、無視します。 :: offset={line_offset}")
+                    continue
+                # 同じタスクが複数回記録されている場合は、後から記録した方を優先する
+                self._index[record["task_id"]] = (record["updated_datetime"], line_offset)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def _get_offset(self, task_id: str, updated_datetime: str | None) -> int | None:
+        value = self._index.get(task_id)
+        if value is None or value[0] != updated_datetime:
+            return None
+        return value[1]
+
+    @staticmethod
+    def _read_task_histories(f: BinaryIO, offset: int) -> list[dict[str, Any]]:
+        f.seek(offset)
+        return json.loads(f.readline())["task_histories"]
+
+    def contains(self, task_id: str, updated_datetime: str | None) -> bool:
+        """
+        タスクの更新日時が記録時から変わっていないタスク履歴が記録されていれば、Trueを返します。
+        """
+        return self._get_offset(task_id, updated_datetime) is not None
+
+    def get(self, task_id: str, updated_datetime: str | None) -> list[dict[str, Any]] | None:
+        """
+        記録済みのタスク履歴をファイルから読み込んで返します。
+        記録されていない場合や、タスクの更新日時が記録時から変わっている場合はNoneを返します。
+        """
+        offset = self._get_offset(task_id, updated_datetime)
+        if offset is None:
+            return None
+        with self.path.open(mode="rb") as f:
+            return self._read_task_histories(f, offset)
+
+    def iter_task_histories(self, tasks: Iterable[tuple[str, str | None]]) -> Iterator[tuple[str, list[dict[str, Any]] | None]]:
+        """
+        記録済みのタスク履歴を、ファイルを1回だけ開いて順番に読み込みます。
+
+        Args:
+            tasks: ``(task_id, updated_datetime)`` のiterable
+
+        Returns:
+            ``(task_id, タスク履歴)`` のiterator。記録されていないタスクのタスク履歴はNoneです。
+        """
+        with contextlib.ExitStack() as stack:
+            f: BinaryIO | None = None
+            for task_id, updated_datetime in tasks:
+                offset = self._get_offset(task_id, updated_datetime)
+                if offset is None:
+                    yield task_id, None
+                    continue
+                if f is None:
+                    f = stack.enter_context(self.path.open(mode="rb"))
+                yield task_id, self._read_task_histories(f, offset)
+
+    def add(self, task_id: str, updated_datetime: str | None, task_histories: list[dict[str, Any]]) -> None:
+        line = json.dumps({"task_id": task_id, "updated_datetime": updated_datetime, "task_histories": task_histories}, ensure_ascii=False) + "\n"
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.path.open(mode="ab") as f:
+                if self._needs_newline:
+                    f.write(b"\n")
+                    self._needs_newline = False
+                self._index[task_id] = (updated_datetime, f.tell())
+                f.write(line.encode("utf-8"))
+
+    def compact(self) -> None:
+        """
+        タスクごとに最後に記録した行だけを残して、ファイルを書き直します。
+        更新されたタスクの履歴を追記するたびに古い行が残るので、ファイルが大きくなり続けないようにします。
+        """
+        with self._lock:
+            if not self.path.exists():
+                return
+            tmp_path = self.path.with_name(f"{self.path.name}.tmp")
+            new_index: dict[str, tuple[str | None, int]] = {}
+            with self.path.open(mode="rb") as src, tmp_path.open(mode="wb") as dest:
+                for task_id, (updated_datetime, offset) in self._index.items():
+                    src.seek(offset)
+                    new_index[task_id] = (updated_datetime, dest.tell())
+                    dest.write(src.readline())
+            tmp_path.replace(self.path)
+            self._index = new_index
+            self._needs_newline = False
+
 
 class VisualizationSourceFiles:
     """
@@ -21,6 +155,10 @@ class VisualizationSourceFiles:
 
     このクラスで、可視化に必要なファイルの作成や読み込みができます。
 
+    Args:
+        job_poller: 全件ファイルの更新ジョブを待つときに利用します。複数プロジェクトで共有すると、ジョブの問い合わせをまとめられます。
+        task_history_parallelism: タスク履歴全件ファイルの代わりに `get_task_histories` APIを実行するときの並列度
+        max_requests_per_second: `get_task_histories` APIを1秒あたりに実行する最大回数
     """
 
     def __init__(
@@ -28,16 +166,25 @@ class VisualizationSourceFiles:
         annofab_service: annofabapi.Resource,
         project_id: str,
         target_dir: Path,
+        *,
+        job_poller: JobPoller | None = None,
+        task_history_parallelism: int = DEFAULT_PARALLELISM_FOR_GETTING_TASK_HISTORIES,
+        max_requests_per_second: float = DEFAULT_MAX_REQUESTS_PER_SECOND,
     ) -> None:
         self.annofab_service = annofab_service
         self.project_id = project_id
         self.target_dir = target_dir
+        self.job_poller = job_poller
+        self.task_history_parallelism = task_history_parallelism
+        self.max_requests_per_second = max_requests_per_second
 
         # ダウンロードした一括情報
         self.task_json_path = self.target_dir / f"{self.project_id}__task.json"
         self.comment_json_path = target_dir / f"{self.project_id}__comment.json"
         self.task_history_json_path = target_dir / f"{self.project_id}__task-history.json"
         self.task_history_event_json_path = target_dir / f"{self.project_id}__task-history-event.json"
+        # `get_task_histories` APIで取得したタスク履歴を記録するファイル。再実行したときに、更新されていないタスクの履歴を再利用する
+        self.task_history_store_path = target_dir / f"{self.project_id}__task-history-store.jsonl"
         self.annotation_zip_path = target_dir / f"{self.project_id}__annotation.zip"
         self.input_data_json_path = target_dir / f"{self.project_id}__input_data.json"
 
@@ -146,7 +293,14 @@ class VisualizationSourceFiles:
 
         return result
 
-    def write_files(self, *, is_latest: bool = False, should_get_task_histories_one_of_each: bool = False, should_download_annotation_zip: bool = True) -> None:
+    def write_files(
+        self,
+        *,
+        is_latest: bool = False,
+        should_get_task_histories_one_of_each: bool = False,
+        should_download_annotation_zip: bool = True,
+        use_task_history_event_store: bool = False,
+    ) -> None:
         """
         可視化に必要なファイルを作成します。
         原則、全件ファイルをダウンロードしてファイルを作成します。必要に応じて個別にAPIを実行してファイルを作成します。
@@ -156,23 +310,32 @@ class VisualizationSourceFiles:
             should_get_task_histories_one_of_each: Trueなら `get_task_histories` APIをタスク数だけ実行する。
                 タスク全件ファイルは最新化できますが、タスク履歴全件ファイルは最新化できません。
                 最新の状態を取得したいときに、このオプションを利用することを推奨しています。
+            use_task_history_event_store: Trueならタスク履歴イベントをキャッシュディレクトリのSQLiteファイルに蓄積して、そこからタスク履歴イベントのファイルを作成する。
+                タスク履歴イベント全件ファイルが前回から更新されていなければ、ダウンロードしません。
         """
 
-        downloading_obj = DownloadingFile(self.annofab_service)
+        downloading_obj = DownloadingFile(self.annofab_service, job_poller=self.job_poller)
 
         wait_options = WaitOptions(interval=60, max_tries=360)
 
-        downloading_obj.download_task_json(self.project_id, dest_path=self.task_json_path, is_latest=is_latest, wait_options=wait_options)
-
-        downloading_obj.download_input_data_json(self.project_id, dest_path=self.input_data_json_path, is_latest=is_latest, wait_options=wait_options)
-
-        if should_download_annotation_zip:
-            downloading_obj.download_annotation_zip(
-                self.project_id,
-                dest_path=self.annotation_zip_path,
-                is_latest=is_latest,
-                wait_options=wait_options,
-            )
+        # 更新ジョブの完了を待つ時間が重なるように、更新が必要なファイルは並列でダウンロードする
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            futures = [
+                executor.submit(downloading_obj.download_task_json, self.project_id, dest_path=self.task_json_path, is_latest=is_latest, wait_options=wait_options),
+                executor.submit(downloading_obj.download_input_data_json, self.project_id, dest_path=self.input_data_json_path, is_latest=is_latest, wait_options=wait_options),
+            ]
+            if should_download_annotation_zip:
+                futures.append(
+                    executor.submit(
+                        downloading_obj.download_annotation_zip,
+                        self.project_id,
+                        dest_path=self.annotation_zip_path,
+                        is_latest=is_latest,
+                        wait_options=wait_options,
+                    )
+                )
+            for future in futures:
+                future.result()
 
         try:
             downloading_obj.download_comment_json(self.project_id, dest_path=self.comment_json_path)
@@ -181,18 +344,21 @@ class VisualizationSourceFiles:
             # その場合でも、処理は継続できるので、空listのJSONファイルを作成して、処理が継続できるようにする。
             self.comment_json_path.write_text("[]", encoding="utf-8")
 
-        try:
-            downloading_obj.download_task_history_event_json(self.project_id, dest_path=self.task_history_event_json_path)
-        except DownloadingFileNotFoundError:
-            # プロジェクトを作成した日だと、タスク履歴全件ファイルが作成されていないので、DownloadingFileNotFoundErrorが発生する
-            # その場合でも、処理は継続できるので、空listのJSONファイルを作成して、処理が継続できるようにする。
-            self.task_history_event_json_path.write_text("[]", encoding="utf-8")
+        if use_task_history_event_store:
+            self._write_task_history_events_json_from_store()
+        else:
+            try:
+                downloading_obj.download_task_history_event_json(self.project_id, dest_path=self.task_history_event_json_path)
+            except DownloadingFileNotFoundError:
+                # プロジェクトを作成した日だと、タスク履歴全件ファイルが作成されていないので、DownloadingFileNotFoundErrorが発生する
+                # その場合でも、処理は継続できるので、空listのJSONファイルを作成して、処理が継続できるようにする。
+                self.task_history_event_json_path.write_text("[]", encoding="utf-8")
 
         if should_get_task_histories_one_of_each:
             # タスク履歴APIを一つずつ実行して、JSONファイルを生成する
             # 先にタスク全件ファイルをダウンロードする必要がある
             tasks = self.read_tasks_json()
-            self._write_task_histories_json_with_executing_webapi([task["task_id"] for task in tasks])
+            self._write_task_histories_json_with_executing_webapi(tasks)
 
         else:
             try:
@@ -201,27 +367,60 @@ class VisualizationSourceFiles:
                 # プロジェクトを作成した日だと、タスク履歴全件ファイルが作成されていないので、DownloadingFileNotFoundErrorが発生する
                 # その場合でも、処理は継続できるので、タスク履歴APIを１個ずつ実行して、タスク履歴ファイルを作成する
                 tasks = self.read_tasks_json()
-                self._write_task_histories_json_with_executing_webapi([task["task_id"] for task in tasks])
+                self._write_task_histories_json_with_executing_webapi(tasks)
 
-    def _write_task_histories_json_with_executing_webapi(self, task_ids: Collection[str]) -> None:
+    def _write_task_history_events_json_from_store(self) -> None:
         """
-        `getTaskHistories` APIで取得したタスク履歴を取得して、ファイルに書き込みます。
+        タスク履歴イベントをストアに取り込んでから、ストアに蓄積したタスク履歴イベントをファイルに書き込みます。
+        SQLiteの接続はスレッド間で共有できないので、呼び出すたびにストアを開きます。
+        """
+        with TaskHistoryEventStore(get_default_store_file()) as store:
+            store.update(self.annofab_service, self.project_id)
+            task_history_event_list = store.query(self.project_id)
+        with self.task_history_event_json_path.open("w", encoding="utf-8") as f:
+            json.dump(task_history_event_list, f, ensure_ascii=False)
 
-        Args:
-            task_ids: 取得対象のタスク一覧
+    def _write_task_histories_json_with_executing_webapi(self, tasks: Collection[dict[str, Any]]) -> None:
         """
-        logger.debug(f"{self.logging_prefix}: {len(task_ids)} 回 `get_task_histories` WebAPIを実行します。")
+        `getTaskHistories` APIで取得したタスク履歴を取得して、ファイルに書き込みます。
 
-        task_index = 0
-        result = {}
-        for task_id in task_ids:
-            if task_index % 100 == 0:
-                logger.debug(f"{self.logging_prefix}: タスク履歴一覧取得中 {task_index} / {len(task_ids)} 件目")
-            sub_task_histories, _ = self.annofab_service.api.get_task_histories(self.project_id, task_id)
-            result[task_id] = sub_task_histories
-            task_index += 1  # noqa: SIM113
+        APIの呼び出し頻度を制限しながら、複数のスレッドでAPIを実行します。
+        取得したタスク履歴は ``task_history_store_path`` に逐次追記するので、中断しても再実行すれば続きから取得します。
+        出力時は、タスク履歴をストアから1タスクずつ読み込むので、全タスクの履歴をメモリに保持しません。
+        前回の実行時からタスクの更新日時が変わっていないタスクについては、APIを実行しません。
 
+        Args:
+            tasks: 取得対象のタスク一覧
+        """
+        store = TaskHistoryStore(self.task_history_store_path)
+        rate_limiter = RateLimiter(self.max_requests_per_second)
+        not_stored_tasks = [task for task in tasks if not store.contains(task["task_id"], task["updated_datetime"])]
+        logger.debug(
+            f"{self.logging_prefix}: {len(tasks)} 件中 {len(not_stored_tasks)} 件のタスクについて、`get_task_histories` WebAPIを実行します。 :: "
+            f"parallelism={self.task_history_parallelism}, max_requests_per_second={self.max_requests_per_second:g}"
+        )
+
+        def fetch(task: dict[str, Any]) -> None:
+            rate_limiter.acquire()
+            task_histories, _ = self.annofab_service.api.get_task_histories(self.project_id, task["task_id"])
+            store.add(task["task_id"], task["updated_datetime"], task_histories)
+
+        with ThreadPoolExecutor(max_workers=self.task_history_parallelism) as executor:
+            for index, _ in enumerate(executor.map(fetch, not_stored_tasks)):
+                if (index + 1) % 100 == 0:
+                    logger.debug(f"{self.logging_prefix}: タスク履歴一覧取得中 {index + 1} / {len(not_stored_tasks)} 件目")
+
+        # タスク履歴全件ファイルと同じ形式で出力する。全タスクの履歴を1個のdictにまとめずに、タスクごとに書き込む
         with self.task_history_json_path.open(mode="w", encoding="utf-8") as f:
-            json.dump(result, f)
-
-        logger.debug(f"{self.logging_prefix}: '{self.task_history_json_path}'に{len(result)}件のタスクの履歴情報を出力しました。")
+            f.write("{")
+            task_histories_iter = store.iter_task_histories((task["task_id"], task["updated_datetime"]) for task in tasks)
+            for index, (task_id, task_histories) in enumerate(task_histories_iter):
+                if index > 0:
+                    f.write(",")
+                f.write(f"{json.dumps(task_id)}:{json.dumps(task_histories, ensure_ascii=False)}")
+            f.write("}")
+
+        # 更新されたタスクの古い履歴が残らないように、出力に成功したらストアを書き直す
+        store.compact()
+
+        logger.debug(f"{self.logging_prefix}: '{self.task_history_json_path}'に{len(tasks)}件のタスクの履歴情報を出力しました。")
@@ -1,12 +1,15 @@
 from __future__ import annotations
 
 import argparse
-import functools
+import contextlib
 import json
 import logging.handlers
 import sys
 import tempfile
+import time
 from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
 from multiprocessing import Pool
 from pathlib import Path
 from typing import Any
@@ -16,6 +19,7 @@ import pandas
 from annofabapi.models import ProjectMemberRole, TaskPhase
 
 import annofabcli
+from annofabcli.common.annofab.task_history_event_store import add_event_store_argument
 from annofabcli.common.cli import (
     COMMAND_LINE_ERROR_STATUS_CODE,
     PARALLELISM_CHOICES,
@@ -25,6 +29,8 @@ from annofabcli.common.cli import (
     get_list_from_args,
 )
 from annofabcli.common.facade import AnnofabApiFacade, TaskQuery
+from annofabcli.common.job_poller import JobPoller
+from annofabcli.common.profiling import timed
 from annofabcli.statistics.visualization.dataframe.actual_worktime import ActualWorktime
 from annofabcli.statistics.visualization.dataframe.annotation_count import AnnotationCount
 from annofabcli.statistics.visualization.dataframe.annotation_duration import AnnotationDuration
@@ -64,6 +70,12 @@ from annofabcli.statistics.visualization.visualization_source_files import Visua
 
 logger = logging.getLogger(__name__)
 
+IO_STAGE_MAX_WORKERS = 8
+"""
+I/Oステージで並列に処理するプロジェクトの最大数。
+I/Oステージの大半はジョブの完了待ちで、WebAPIへのアクセスは多くないので、`--parallelism`より大きい値にしている。
+"""
+
 
 class WriteCsvGraph:
     def __init__(  # noqa: PLR0913
@@ -81,6 +93,7 @@ class WriteCsvGraph:
         custom_production_volume: CustomProductionVolume | None = None,
         minimal_output: bool = False,
         output_only_text: bool = False,
+        max_points_per_line: int | None = None,
         production_volume_include_labels: list[str] | None = None,
         production_volume_exclude_labels: list[str] | None = None,
         include_annotation_duration_seconds: bool = False,
@@ -96,6 +109,7 @@ class WriteCsvGraph:
         self.actual_worktime = actual_worktime
         self.minimal_output = minimal_output
         self.output_only_text = output_only_text
+        self.max_points_per_line = max_points_per_line
         self.annotation_count = annotation_count
         self.input_data_count = input_data_count
         self.custom_production_volume = custom_production_volume
@@ -262,6 +276,7 @@ class WriteCsvGraph:
             )
         return self.worktime_per_date
 
+    @timed()
     def write_task_info(self) -> None:
         """
         タスクに関するヒストグラムを出力する。
@@ -274,6 +289,7 @@ class WriteCsvGraph:
         if not self.output_only_text:
             self.project_dir.write_task_histogram(obj)
 
+    @timed()
     def write_user_performance(self) -> None:
         """
         ユーザごとの生産性と品質に関する情報を出力する。
@@ -303,6 +319,7 @@ class WriteCsvGraph:
         if not self.output_only_text:
             self.project_dir.write_user_performance_scatter_plot(user_performance)
 
+    @timed()
     def write_task_metadata_performance(self, whole_performance: WholePerformance) -> None:
         """タスクのメタデータ値ごとの生産性と品質に関する情報を出力する。"""
         if len(self.task_metadata_keys) == 0:
@@ -319,6 +336,7 @@ class WriteCsvGraph:
             )
             self.project_dir.write_task_metadata_performance(task_metadata_performance)
 
+    @timed()
     def write_cumulative_linegraph_by_user(self, user_id_list: list[str] | None = None) -> None:
         """ユーザごとの累積折れ線グラフをプロットする。"""
         task_worktime_obj = self._get_task_worktime_obj()
@@ -327,10 +345,17 @@ class WriteCsvGraph:
         acceptor_obj = AcceptorCumulativeProductivity.from_df_wrapper(task_worktime_obj)
 
         if not self.output_only_text:
-            self.project_dir.write_cumulative_line_graph(annotator_obj, phase=TaskPhase.ANNOTATION, user_id_list=user_id_list, minimal_output=self.minimal_output)
-            self.project_dir.write_cumulative_line_graph(inspector_obj, phase=TaskPhase.INSPECTION, user_id_list=user_id_list, minimal_output=self.minimal_output)
-            self.project_dir.write_cumulative_line_graph(acceptor_obj, phase=TaskPhase.ACCEPTANCE, user_id_list=user_id_list, minimal_output=self.minimal_output)
+            self.project_dir.write_cumulative_line_graph(
+                annotator_obj, phase=TaskPhase.ANNOTATION, user_id_list=user_id_list, minimal_output=self.minimal_output, max_points_per_line=self.max_points_per_line
+            )
+            self.project_dir.write_cumulative_line_graph(
+                inspector_obj, phase=TaskPhase.INSPECTION, user_id_list=user_id_list, minimal_output=self.minimal_output, max_points_per_line=self.max_points_per_line
+            )
+            self.project_dir.write_cumulative_line_graph(
+                acceptor_obj, phase=TaskPhase.ACCEPTANCE, user_id_list=user_id_list, minimal_output=self.minimal_output, max_points_per_line=self.max_points_per_line
+            )
 
+    @timed()
     def write_worktime_per_date(self, user_id_list: list[str] | None = None) -> None:
         """日ごとの作業時間情報を出力する。"""
         worktime_per_date_obj = self._get_worktime_per_date()
@@ -350,6 +375,7 @@ class WriteCsvGraph:
             self.project_dir.write_whole_productivity_line_graph_per_date(productivity_per_completed_date_obj)
             self.project_dir.write_whole_productivity_line_graph_per_annotation_started_date(productivity_per_started_date_obj)
 
+    @timed()
     def write_user_productivity_per_date(self, user_id_list: list[str] | None = None) -> None:
         """ユーザごとの日ごとの生産性情報を出力する。"""
         task_worktime_obj = self._get_task_worktime_obj()
@@ -369,6 +395,18 @@ class WriteCsvGraph:
             self.project_dir.write_performance_line_graph_per_date(acceptor_per_date_obj, phase=TaskPhase.ACCEPTANCE, user_id_list=user_id_list)
 
 
+@dataclass(frozen=True)
+class PreparedProject:
+    """
+    統計情報の出力に必要なファイルを準備したプロジェクト
+    """
+
+    project_info: ProjectInfo
+    output_project_dir: Path
+    annotation_count: AnnotationCount | None
+    """project_idで絞り込んだアノテーション数。Noneの場合は、アノテーションZIPからアノテーション数を算出します。"""
+
+
 class VisualizingStatisticsMain:
     def __init__(  # noqa: PLR0913
         self,
@@ -381,6 +419,8 @@ class VisualizingStatisticsMain:
         # 出力方法
         minimal_output: bool = False,
         output_only_text: bool = False,
+        max_points_per_line: int | None = None,
+        compress_html: bool = False,
         # その他
         download_latest: bool = False,
         is_get_task_histories_one_of_each: bool = False,
@@ -393,6 +433,7 @@ class VisualizingStatisticsMain:
         production_volume_include_labels: list[str] | None = None,
         production_volume_exclude_labels: list[str] | None = None,
         task_metadata_keys: list[str] | None = None,
+        use_task_history_event_store: bool = False,
     ) -> None:
         self.service = service
         self.facade = AnnofabApiFacade(service)
@@ -401,6 +442,8 @@ class VisualizingStatisticsMain:
         self.filtering_query = filtering_query
         self.minimal_output = minimal_output
         self.output_only_text = output_only_text
+        self.max_points_per_line = max_points_per_line
+        self.compress_html = compress_html
         self.download_latest = download_latest
         self.is_get_task_histories_one_of_each = is_get_task_histories_one_of_each
         self.actual_worktime = actual_worktime
@@ -412,6 +455,7 @@ class VisualizingStatisticsMain:
         self.production_volume_include_labels = production_volume_include_labels
         self.production_volume_exclude_labels = production_volume_exclude_labels
         self.task_metadata_keys = task_metadata_keys if task_metadata_keys is not None else []
+        self.use_task_history_event_store = use_task_history_event_store
 
     def get_project_info(self, project_id: str) -> ProjectInfo:
         project_info = self.service.api.get_project(project_id)[0]
@@ -429,20 +473,51 @@ class VisualizingStatisticsMain:
         )
         return project_summary
 
-    def visualize_statistics(self, project_id: str, output_project_dir: Path) -> None:
+    @timed()
+    def prepare_project(self, project_id: str, output_project_dir: Path, *, job_poller: JobPoller | None = None) -> PreparedProject:
         """
-        プロジェクトの統計情報を出力する。
+        統計情報の出力に必要なファイルを準備します。WebAPIへのアクセスやジョブの完了待ちなど、I/Oが中心の処理です。
 
         Args:
             project_id: 対象のproject_id
-            task_query: タスク検索クエリ
-
+            output_project_dir: 統計情報の出力先ディレクトリ
+            job_poller: 全件ファイルの更新ジョブを待つときに利用します。複数プロジェクトで共有すると、ジョブの問い合わせをまとめられます。
         """
-
         self.facade.validate_project(project_id, project_member_roles=[ProjectMemberRole.OWNER, ProjectMemberRole.TRAINING_DATA_USER])
         project_info = self.get_project_info(project_id)
         logger.info(f"project_title='{project_info.project_title}'")
 
+        if self.annotation_count is not None:
+            # project_idで絞り込む
+            df_annotation_count = self.annotation_count.df
+            df_annotation_count = df_annotation_count[df_annotation_count["project_id"] == project_id]
+            # `annotation_count = None`にする理由：後続の処理でアノテーションZIPからアノテーション数を算出するようにするため
+            if len(df_annotation_count) == 0:
+                annotation_count = None
+            else:
+                annotation_count = AnnotationCount(df_annotation_count)
+        else:
+            annotation_count = None
+
+        if not self.not_download_visualization_source_files:
+            visualization_source_files = VisualizationSourceFiles(self.service, project_id, self.temp_dir, job_poller=job_poller)
+            visualization_source_files.write_files(
+                is_latest=self.download_latest,
+                should_get_task_histories_one_of_each=self.is_get_task_histories_one_of_each,
+                should_download_annotation_zip=(annotation_count is None),
+                use_task_history_event_store=self.use_task_history_event_store,
+            )
+
+        return PreparedProject(project_info=project_info, output_project_dir=output_project_dir, annotation_count=annotation_count)
+
+    @timed()
+    def write_project(self, prepared_project: PreparedProject) -> None:
+        """
+        準備したファイルから統計情報を出力します。DataFrameの生成やグラフの描画など、CPUが中心の処理です。
+        """
+        project_info = prepared_project.project_info
+        project_id = project_info.project_id
+
         # 動画プロジェクトの場合、annotation_duration_secondを生産量に含める
         custom_production_volume = self.custom_production_volume
 
@@ -450,10 +525,11 @@ class VisualizingStatisticsMain:
         is_video_project = project_info.input_data_type == "movie"
 
         project_dir = ProjectDir(
-            output_project_dir,
+            prepared_project.output_project_dir,
             self.task_completion_criteria,
             metadata=project_info.to_dict(encode_json=True),
             custom_production_volume_list=custom_production_volume.custom_production_volume_list if custom_production_volume is not None else None,
+            compress_html=self.compress_html,
         )
         project_dir.write_project_info(project_info)
 
@@ -469,29 +545,11 @@ class VisualizingStatisticsMain:
         else:
             df_actual_worktime = ActualWorktime.empty()
 
-        if self.annotation_count is not None:
-            # project_idで絞り込む
-            df_annotation_count = self.annotation_count.df
-            df_annotation_count = df_annotation_count[df_annotation_count["project_id"] == project_id]
-            # `annotation_count = None`にする理由：後続の処理でアノテーションZIPからアノテーション数を算出するようにするため
-            if len(df_annotation_count) == 0:
-                annotation_count = None
-            else:
-                annotation_count = AnnotationCount(df_annotation_count)
-        else:
-            annotation_count = None
-
         visualization_source_files = VisualizationSourceFiles(
             self.service,
             project_id,
             self.temp_dir,
         )
-        if not self.not_download_visualization_source_files:
-            visualization_source_files.write_files(
-                is_latest=self.download_latest,
-                should_get_task_histories_one_of_each=self.is_get_task_histories_one_of_each,
-                should_download_annotation_zip=(annotation_count is None),
-            )
 
         write_obj = WriteCsvGraph(
             self.service,
@@ -501,11 +559,12 @@ class VisualizingStatisticsMain:
             visualization_source_files=visualization_source_files,
             project_dir=project_dir,
             actual_worktime=ActualWorktime(df_actual_worktime),
-            annotation_count=annotation_count,
+            annotation_count=prepared_project.annotation_count,
             input_data_count=self.input_data_count,
             custom_production_volume=custom_production_volume,
             minimal_output=self.minimal_output,
             output_only_text=self.output_only_text,
+            max_points_per_line=self.max_points_per_line,
             production_volume_include_labels=self.production_volume_include_labels,
             production_volume_exclude_labels=self.production_volume_exclude_labels,
             include_annotation_duration_seconds=is_video_project,
@@ -524,21 +583,51 @@ class VisualizingStatisticsMain:
         if not self.minimal_output:
             write_obj._catch_exception(write_obj.write_user_productivity_per_date)(self.user_ids)  # noqa: SLF001
 
-    def visualize_statistics_wrapper(
-        self,
-        project_id: str,
-        root_output_dir: Path,
-    ) -> Path | None:
+    def visualize_statistics(self, project_id: str, output_project_dir: Path) -> None:
+        """
+        プロジェクトの統計情報を出力する。
+
+        Args:
+            project_id: 対象のproject_id
+            output_project_dir: 統計情報の出力先ディレクトリ
+
+        """
+        prepared_project = self.prepare_project(project_id, output_project_dir)
+        self.write_project(prepared_project)
+
+    def _prepare_project_wrapper(self, project_id: str, root_output_dir: Path, job_poller: JobPoller) -> tuple[PreparedProject | None, float]:
+        """
+        Returns:
+            tuple[0]: 準備したプロジェクト。失敗した場合はNone
+            tuple[1]: 処理時間[秒]
+        """
+        start_time = time.perf_counter()
         try:
-            output_project_dir = root_output_dir / project_id
-            self.visualize_statistics(
-                project_id=project_id,
-                output_project_dir=output_project_dir,
-            )
-            return output_project_dir  # noqa: TRY300
+            prepared_project = self.prepare_project(project_id, root_output_dir / project_id, job_poller=job_poller)
+        except Exception:  # pylint: disable=broad-except
+            logger.warning(f"project_id='{project_id}'の可視化処理に失敗しました。", exc_info=True)
+            prepared_project = None
+        elapsed_seconds = time.perf_counter() - start_time
+        logger.debug(f"project_id='{project_id}' :: 可視化に必要なファイルの準備に{elapsed_seconds:.1f}秒かかりました。")
+        return prepared_project, elapsed_seconds
+
+    def _write_project_wrapper(self, prepared_project: PreparedProject) -> tuple[Path | None, float]:
+        """
+        Returns:
+            tuple[0]: 統計情報を出力したディレクトリ。失敗した場合はNone
+            tuple[1]: 処理時間[秒]
+        """
+        project_id = prepared_project.project_info.project_id
+        start_time = time.perf_counter()
+        try:
+            self.write_project(prepared_project)
+            output_project_dir: Path | None = prepared_project.output_project_dir
         except Exception:  # pylint: disable=broad-except
             logger.warning(f"project_id='{project_id}'の可視化処理に失敗しました。", exc_info=True)
-            return None
+            output_project_dir = None
+        elapsed_seconds = time.perf_counter() - start_time
+        logger.debug(f"project_id='{project_id}' :: 統計情報の出力に{elapsed_seconds:.1f}秒かかりました。")
+        return output_project_dir, elapsed_seconds
 
     def visualize_statistics_for_project_list(
         self,
@@ -547,20 +636,64 @@ class VisualizingStatisticsMain:
         *,
         parallelism: int | None = None,
     ) -> list[Path]:
-        output_project_dir_list: list[Path] = []
+        """
+        複数のプロジェクトの統計情報を出力します。
 
-        wrap = functools.partial(self.visualize_statistics_wrapper, root_output_dir=root_output_dir)
-        if parallelism is not None:
-            with Pool(parallelism) as pool:
-                result_list = pool.map(wrap, project_id_list)
-                output_project_dir_list = [e for e in result_list if e is not None]
-        else:
-            for project_id in project_id_list:
-                output_project_dir = wrap(project_id)
-                if output_project_dir is not None:
-                    output_project_dir_list.append(output_project_dir)
+        以下の2つのステージをパイプラインで処理します。
+
+        * I/Oステージ: 全件ファイルの更新・ダウンロード。すべてのプロジェクトをスレッドで並列に処理します。
+        * CPUステージ: DataFrameの生成やグラフの描画。I/Oステージが完了したプロジェクトから順に処理します。
+          ``parallelism`` を指定した場合はプロセスプールで並列に処理します。
+
+        ジョブの完了を待っているプロジェクトがCPUステージの処理を妨げないので、処理時間はおおむね実際の処理量で決まります。
+
+        Returns:
+            統計情報を出力したディレクトリのlist。project_id_listの順番に並んでいます。
+        """
+        if len(project_id_list) == 0:
+            return []
+
+        wall_start_time = time.perf_counter()
+        result_by_project_id: dict[str, Path] = {}
+        prepare_seconds_list: list[float] = []
+        write_seconds_list: list[float] = []
+
+        def on_written(result: tuple[Path | None, float]) -> None:
+            output_project_dir, elapsed_seconds = result
+            write_seconds_list.append(elapsed_seconds)
+            if output_project_dir is not None:
+                result_by_project_id[output_project_dir.name] = output_project_dir
+
+        # プロセスプールは、スレッドを起動する前に生成する。スレッドの実行中にforkするとデッドロックする恐れがあるため。
+        with (
+            Pool(parallelism) if parallelism is not None else contextlib.nullcontext() as pool,
+            JobPoller(self.service) as job_poller,
+            ThreadPoolExecutor(max_workers=min(len(project_id_list), IO_STAGE_MAX_WORKERS)) as executor,
+        ):
+            futures = [executor.submit(self._prepare_project_wrapper, project_id, root_output_dir, job_poller) for project_id in project_id_list]
+            async_results = []
+            for future in as_completed(futures):
+                prepared_project, prepare_seconds = future.result()
+                prepare_seconds_list.append(prepare_seconds)
+                if prepared_project is None:
+                    continue
+
+                if pool is not None:
+                    async_results.append(pool.apply_async(self._write_project_wrapper, (prepared_project,)))
+                else:
+                    on_written(self._write_project_wrapper(prepared_project))
+
+            # 子プロセスで発生した例外（pickleできない、子プロセスが異常終了したなど）を握りつぶさないように、`get`で結果を受け取る
+            for async_result in async_results:
+                on_written(async_result.get())
 
-        return output_project_dir_list
+        logger.info(
+            f"{len(project_id_list)}件のプロジェクトの可視化処理が完了しました。 :: "
+            f"経過時間={time.perf_counter() - wall_start_time:.1f}秒, "
+            f"I/Oステージの処理時間の合計={sum(prepare_seconds_list):.1f}秒, "
+            f"CPUステージの処理時間の合計={sum(write_seconds_list):.1f}秒"
+        )
+        return [result_by_project_id[project_id] for project_id in project_id_list if project_id in result_by_project_id]
 
 
 def create_custom_production_volume(cli_value: str) -> CustomProductionVolume:
@@ -601,6 +734,14 @@ class VisualizeStatistics(CommandLine):
                 )
                 return False
 
+        if args.max_points_per_line is not None and args.max_points_per_line < 3:
+            # 先頭と末尾の点に加えて、1個以上の点を残す必要がある
+            print(  # noqa: T201
+                f"{COMMON_MESSAGE} argument --max_points_per_line: 3以上の値を指定してください。",
+                file=sys.stderr,
+            )
+            return False
+
         return True
 
     def visualize_statistics(  # noqa: PLR0913,PLR0917
@@ -624,6 +765,9 @@ class VisualizeStatistics(CommandLine):
         production_volume_include_labels: list[str] | None = None,
         production_volume_exclude_labels: list[str] | None = None,
         task_metadata_keys: list[str] | None = None,
+        max_points_per_line: int | None = None,
+        compress_html: bool = False,  # noqa: FBT001, FBT002
+        use_task_history_event_store: bool = False,  # noqa: FBT001, FBT002
     ) -> None:
         main_obj = VisualizingStatisticsMain(
             service=self.service,
@@ -643,6 +787,9 @@ class VisualizeStatistics(CommandLine):
             production_volume_include_labels=production_volume_include_labels,
             production_volume_exclude_labels=production_volume_exclude_labels,
             task_metadata_keys=task_metadata_keys,
+            max_points_per_line=max_points_per_line,
+            compress_html=compress_html,
+            use_task_history_event_store=use_task_history_event_store,
         )
 
         if len(project_id_list) == 1:
@@ -745,6 +892,9 @@ class VisualizeStatistics(CommandLine):
                     production_volume_include_labels=get_list_from_args(args.production_volume_include_label) if args.production_volume_include_label is not None else None,
                     production_volume_exclude_labels=get_list_from_args(args.production_volume_exclude_label) if args.production_volume_exclude_label is not None else None,
                     task_metadata_keys=get_list_from_args(args.task_metadata_key) if args.task_metadata_key is not None else None,
+                    max_points_per_line=args.max_points_per_line,
+                    compress_html=args.compress_html,
+                    use_task_history_event_store=args.event_store,
                 )
         else:
             self.visualize_statistics(
@@ -767,6 +917,9 @@ class VisualizeStatistics(CommandLine):
                 production_volume_include_labels=get_list_from_args(args.production_volume_include_label) if args.production_volume_include_label is not None else None,
                 production_volume_exclude_labels=get_list_from_args(args.production_volume_exclude_label) if args.production_volume_exclude_label is not None else None,
                 task_metadata_keys=get_list_from_args(args.task_metadata_key) if args.task_metadata_key is not None else None,
+                max_points_per_line=args.max_points_per_line,
+                compress_html=args.compress_html,
+                use_task_history_event_store=args.event_store,
             )
 
 
@@ -838,9 +991,13 @@ def parse_args(parser: argparse.ArgumentParser) -> None:
     parser.add_argument(
         "--get_task_histories_one_of_each",
         action="store_true",
-        help="タスク履歴を1個ずつ取得して、タスク履歴の最新版を参照します。タスクの数だけWebAPIを実行するので、処理時間が長くなります。",
+        help="タスク履歴を1個ずつ取得して、タスク履歴の最新版を参照します。タスクの数だけWebAPIを実行するので、処理時間が長くなります。"
+        "取得したタスク履歴は ``--temp_dir`` に逐次記録されます。同じ ``--temp_dir`` を指定して再実行すると、中断したところから取得し、"
+        "前回から更新されていないタスクの履歴は再取得しません。",
     )
 
+    add_event_store_argument(parser, has_task_history_event_json_argument=False)
+
     parser.add_argument(
         "--labor_csv",
         type=Path,
@@ -902,6 +1059,19 @@ def parse_args(parser: argparse.ArgumentParser) -> None:
         help="必要最小限のファイルを出力します。",
     )
 
+    parser.add_argument(
+        "--compress_html",
+        action="store_true",
+        help="HTMLファイルに埋め込むグラフのデータを圧縮して、ファイルサイズを小さくします。圧縮したHTMLファイルは、 ``DecompressionStream`` に対応したブラウザで閲覧できます。",
+    )
+
+    parser.add_argument(
+        "--max_points_per_line",
+        type=int,
+        help="累積折れ線グラフ（横軸が生産量）の1本の折れ線あたりの点の最大個数です。"
+        "超える場合は、折れ線の形状を保つように点を間引いてHTMLファイルのサイズを小さくします。3以上の値を指定してください。指定しない場合は間引きません。",
+    )
+
     parser.add_argument(
         "--output_only_text",
         action="store_true",
@@ -924,7 +1094,8 @@ def parse_args(parser: argparse.ArgumentParser) -> None:
         "--parallelism",
         type=int,
         choices=PARALLELISM_CHOICES,
-        help="並列度。 ``--project_id`` に複数のproject_idを指定したときのみ有効なオプションです。指定しない場合は、逐次的に処理します。",
+        help="CSVやグラフを出力する処理の並列度。 ``--project_id`` に複数のproject_idを指定したときのみ有効なオプションです。"
+        "指定しない場合は、逐次的に処理します。なお、ファイルのダウンロードは常にプロジェクト間で並列に処理します。",
     )
 
     production_volume_label_group = parser.add_mutually_exclusive_group()
@@ -5,7 +5,6 @@ import re
 import sys
 from dataclasses import dataclass
 from functools import partial
-from multiprocessing import Pool
 from pathlib import Path
 from typing import Any
 
@@ -27,6 +26,7 @@ from annofabcli.common.cli import (
     prompt_yesnoall,
 )
 from annofabcli.common.facade import AnnofabApiFacade
+from annofabcli.common.upload_pipeline import UploadManifest, UploadPipeline, UploadRequest, get_content_type
 from annofabcli.common.utils import get_file_scheme_path
 
 logger = logging.getLogger(__name__)
@@ -69,6 +69,19 @@ class SupplementaryDataForCreate:
     last_updated_datetime: str | None
 
 
+def get_supplementary_data_type_from_file(file_path: Path) -> str:
+    """
+    ファイルのMIME Typeから、補助情報の種類（ ``image`` または ``text`` ）を推測します。
+    ``put_supplementary_data_from_file`` と同じ方法で推測します。
+    """
+    content_type = get_content_type(file_path)
+    if content_type.startswith("image"):
+        return "image"
+    if content_type.startswith("text"):
+        return "text"
+    raise ValueError(f"'{file_path}' のMIME Type '{content_type}' から、補助情報の種類を推測できません。")
+
+
 def read_supplementary_data_csv(csv_file: Path) -> pandas.DataFrame:
     """補助情報の情報が記載されているCSVを読み込み、pandas.DataFrameを返します。
 
@@ -129,9 +142,31 @@ class SubCreateSupplementaryData:
         self.all_yes = all_yes
         self.supplementary_data_cache: dict[tuple[str, str], list[SupplementaryData]] = {}
 
-    def create_supplementary_data(self, project_id: str, supplementary_data: SupplementaryDataForCreate) -> None:
+    def create_supplementary_data(self, project_id: str, supplementary_data: SupplementaryDataForCreate, *, uploaded_s3_path: str | None = None) -> None:
+        """
+        Args:
+            uploaded_s3_path: ローカルファイルを一時データ保存先にアップロード済みの場合、そのS3パス。指定した場合はアップロードしません。
+        """
         file_path = get_file_scheme_path(supplementary_data.supplementary_data_path)
-        if file_path is not None:
+        if uploaded_s3_path is not None:
+            assert file_path is not None
+            supplementary_data_type = supplementary_data.supplementary_data_type
+            if supplementary_data_type is None:
+                supplementary_data_type = get_supplementary_data_type_from_file(Path(file_path))
+            self.service.api.put_supplementary_data(
+                project_id,
+                supplementary_data.input_data_id,
+                supplementary_data.supplementary_data_id,
+                request_body={
+                    "supplementary_data_name": supplementary_data.supplementary_data_name,
+                    "supplementary_data_number": supplementary_data.supplementary_data_number,
+                    "supplementary_data_path": uploaded_s3_path,
+                    "supplementary_data_type": supplementary_data_type,
+                    "last_updated_datetime": supplementary_data.last_updated_datetime,
+                },
+            )
+
+        elif file_path is not None:
             request_body = {
                 "supplementary_data_name": supplementary_data.supplementary_data_name,
                 "supplementary_data_number": supplementary_data.supplementary_data_number,
@@ -204,7 +239,13 @@ class SubCreateSupplementaryData:
 
         return self.confirm_processing(message_for_confirm)
 
-    def create_supplementary_data_main(self, project_id: str, csv_data: CliSupplementaryData, *, overwrite: bool = False) -> bool:
+    def prepare_create_supplementary_data(self, project_id: str, csv_data: CliSupplementaryData, *, overwrite: bool = False) -> SupplementaryDataForCreate | None:
+        """
+        補助情報を作成するかどうかを判断します。
+
+        Returns:
+            作成する補助情報。作成しない場合はNone
+        """
         last_updated_datetime = None
         input_data_id = csv_data.input_data_id
         supplementary_data_id = (
@@ -215,7 +256,7 @@ class SubCreateSupplementaryData:
         if supplementary_data_list is None:
             # 入力データが存在しない場合は、`supplementary_data_list`はNoneになる
             logger.warning(f"input_data_id='{input_data_id}'である入力データは存在しないため、補助情報の作成をスキップします。")
-            return False
+            return None
 
         old_supplementary_data = first_true(supplementary_data_list, pred=lambda e: e["supplementary_data_id"] == supplementary_data_id)
 
@@ -240,17 +281,17 @@ class SubCreateSupplementaryData:
                     f"supplementary_data_id='{supplementary_data_id}'である補助情報がすでに存在するので、補助情報の作成をスキップします。 :: "
                     f"input_data_id='{input_data_id}', supplementary_data_name='{csv_data.supplementary_data_name}'"
                 )
-                return False
+                return None
 
         file_path = get_file_scheme_path(csv_data.supplementary_data_path)
         if file_path is not None and not Path(file_path).exists():
             logger.warning(f"'{csv_data.supplementary_data_path}' は存在しません。補助情報の作成をスキップします。")
-            return False
+            return None
 
         if not self.confirm_create_supplementary_data(csv_data, supplementary_data_id, already_exists=last_updated_datetime is not None):
-            return False
+            return None
 
-        supplementary_data_for_create = SupplementaryDataForCreate(
+        return SupplementaryDataForCreate(
             input_data_id=csv_data.input_data_id,
             supplementary_data_id=supplementary_data_id,
             supplementary_data_name=csv_data.supplementary_data_name,
@@ -259,6 +300,26 @@ class SubCreateSupplementaryData:
             supplementary_data_number=supplementary_data_number,
             last_updated_datetime=last_updated_datetime,
         )
+
+    def create_upload_request(self, csv_data: CliSupplementaryData, *, project_id: str, overwrite: bool) -> UploadRequest[SupplementaryDataForCreate] | None:
+        """
+        :class:`UploadPipeline` の確認ステージの処理
+        """
+        supplementary_data = self.prepare_create_supplementary_data(project_id, csv_data, overwrite=overwrite)
+        if supplementary_data is None:
+            return None
+        file_path = get_file_scheme_path(supplementary_data.supplementary_data_path)
+        return UploadRequest(
+            key=f"{supplementary_data.input_data_id}/{supplementary_data.supplementary_data_id}",
+            file_path=Path(file_path) if file_path is not None else None,
+            payload=supplementary_data,
+        )
+
+    def create_supplementary_data_main(self, project_id: str, csv_data: CliSupplementaryData, *, overwrite: bool = False) -> bool:
+        supplementary_data_for_create = self.prepare_create_supplementary_data(project_id, csv_data, overwrite=overwrite)
+        if supplementary_data_for_create is None:
+            return False
+
         try:
             self.create_supplementary_data(project_id, supplementary_data_for_create)
             logger.debug(
@@ -294,6 +355,7 @@ class CreateSupplementaryData(CommandLine):
         *,
         overwrite: bool = False,
         parallelism: int | None = None,
+        upload_manifest: UploadManifest | None = None,
     ) -> None:
         """補助情報を一括で作成する。"""
 
@@ -304,10 +366,16 @@ class CreateSupplementaryData(CommandLine):
 
         obj = SubCreateSupplementaryData(service=self.service, all_yes=self.all_yes)
         if parallelism is not None:
-            partial_func = partial(obj.create_supplementary_data_main, project_id, overwrite=overwrite)
-            with Pool(parallelism) as pool:
-                result_bool_list = pool.map(partial_func, supplementary_data_list)
-                count_create_supplementary_data = len([e for e in result_bool_list if e])
+            pipeline: UploadPipeline[CliSupplementaryData, SupplementaryDataForCreate] = UploadPipeline(
+                self.service,
+                project_id,
+                prepare=partial(obj.create_upload_request, project_id=project_id, overwrite=overwrite),
+                register=lambda supplementary_data, s3_path: obj.create_supplementary_data(project_id, supplementary_data, uploaded_s3_path=s3_path),
+                describe=lambda e: f"input_data_id='{e.input_data_id}', supplementary_data_name='{e.supplementary_data_name}'",
+                parallelism=parallelism,
+                manifest=upload_manifest,
+            )
+            count_create_supplementary_data = pipeline.run(supplementary_data_list).succeeded_count
 
         else:
             for csv_supplementary_data in supplementary_data_list:
@@ -339,6 +407,13 @@ class CreateSupplementaryData(CommandLine):
             )
             return False
 
+        if args.upload_manifest is not None and args.parallelism is None:
+            print(  # noqa: T201
+                f"{self.COMMON_MESSAGE} argument --upload_manifest: '--upload_manifest'を指定するときは、'--parallelism' を指定してください。",
+                file=sys.stderr,
+            )
+            return False
+
         return True
 
     def main(self) -> None:
@@ -369,6 +444,7 @@ class CreateSupplementaryData(CommandLine):
             supplementary_data_list=supplementary_data_list,
             overwrite=args.overwrite,
             parallelism=args.parallelism,
+            upload_manifest=UploadManifest(args.upload_manifest) if args.upload_manifest is not None else None,
         )
 
 
@@ -431,6 +507,13 @@ def parse_args(parser: argparse.ArgumentParser) -> None:
         help="並列度。指定しない場合は、逐次的に処理します。必ず ``--yes`` を指定してください。",
     )
 
+    parser.add_argument(
+        "--upload_manifest",
+        type=Path,
+        help="作成に使ったローカルファイルを記録するマニフェストファイル（JSON Lines形式）のパスを指定します。"
+        "同じプロジェクトに登録したとマニフェストに記録されていて、サイズと更新日時が変わっていないファイルは、アップロードせずにスキップします。 ``--parallelism`` を指定したときのみ指定できます。",
+    )
+
     parser.set_defaults(subcommand_func=main)
 
 
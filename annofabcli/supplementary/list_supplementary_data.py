@@ -4,8 +4,10 @@ import argparse
 import itertools
 import json
 import logging
-import multiprocessing
 import tempfile
+import threading
+from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Any
 
@@ -17,6 +19,7 @@ from annofabcli.common.cli import PARALLELISM_CHOICES, ArgumentParser, CommandLi
 from annofabcli.common.download import DownloadingFile
 from annofabcli.common.enums import OutputFormat
 from annofabcli.common.facade import AnnofabApiFacade
+from annofabcli.common.rate_limiter import RateLimiter
 
 logger = logging.getLogger(__name__)
 
@@ -37,68 +40,160 @@ def remove_unnecessary_keys_from_supplementary_data(supplementary_data: dict[str
         supplementary_data.pop(key, None)
 
 
-class ListSupplementaryDataMain:
-    def __init__(self, service: annofabapi.Resource, project_id: str) -> None:
+DEFAULT_MAX_REQUESTS_PER_SECOND = 10
+"""補助情報を取得するAPIを、1秒あたりに実行する最大回数"""
+
+
+class SupplementaryDataCache:
+    """
+    入力データごとに取得した補助情報を、JSON Lines形式で記録するファイル。
+    中断したコマンドを同じファイルを指定して再実行すると、取得済みの入力データについてはAPIを実行しません。
+
+    Args:
+        path: 記録するファイルのパス
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._supplementary_data_by_input_data_id: dict[str, list[SupplementaryData]] = {}
+        # 書き込み中に中断されて改行で終わっていない場合は、次の行と連結されないように改行を追記する
+        self._needs_newline = False
+        if path.exists():
+            with path.open(encoding="utf-8") as f:
+                for line in f:
+                    self._needs_newline = not line.endswith("\n")
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # 書き込み中に中断された行は無視する
+                        logger.debug(f"'{path}' に不正な行が含まれていたので、無視します。 :: line='{line.strip()}'")
+                        continue
+                    self._supplementary_data_by_input_data_id[record["input_data_id"]] = record["supplementary_data_list"]
+            logger.info(f"'{path}' から、{len(self._supplementary_data_by_input_data_id)} 件の入力データに紐づく補助情報を読み込みました。")
+
+    def __contains__(self, input_data_id: str) -> bool:
+        return input_data_id in self._supplementary_data_by_input_data_id
+
+    def __getitem__(self, input_data_id: str) -> list[SupplementaryData]:
+        return self._supplementary_data_by_input_data_id[input_data_id]
+
+    def add(self, input_data_id: str, supplementary_data_list: list[SupplementaryData]) -> None:
+        with self._lock:
+            self._supplementary_data_by_input_data_id[input_data_id] = supplementary_data_list
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.path.open(mode="a", encoding="utf-8") as f:
+                if self._needs_newline:
+                    f.write("\n")
+                    self._needs_newline = False
+                f.write(json.dumps({"input_data_id": input_data_id, "supplementary_data_list": supplementary_data_list}, ensure_ascii=False) + "\n")
+
+
+class SupplementaryDataFetcher:
+    """
+    入力データに紐づく補助情報を、入力データごとにAPIを実行して取得します。
+
+    Annofab WebAPIには複数の入力データの補助情報をまとめて取得するAPIがなく、入力データ全件ファイルにも補助情報は含まれていません。
+    したがって、APIの呼び出し頻度を制限しながら、複数のスレッドでAPIを実行します。
+
+    Args:
+        parallelism: APIを並列に実行する個数
+        max_requests_per_second: 全スレッドで、APIを1秒あたりに実行する最大回数
+        cache: 取得結果を記録するファイル。指定した場合、記録済みの入力データについてはAPIを実行しません。
+    """
+
+    def __init__(
+        self,
+        service: annofabapi.Resource,
+        project_id: str,
+        *,
+        parallelism: int = 1,
+        max_requests_per_second: float = DEFAULT_MAX_REQUESTS_PER_SECOND,
+        cache: SupplementaryDataCache | None = None,
+    ) -> None:
         self.service = service
         self.project_id = project_id
+        self.parallelism = parallelism
+        self.rate_limiter = RateLimiter(max_requests_per_second)
+        self.cache = cache
 
-    def get_supplementary_data_list(self, input_data_id: str, input_data_index: int) -> list[dict[str, Any]]:
+    def _fetch(self, input_data_id: str) -> list[SupplementaryData] | None:
         """
-        入力データに紐づく補助情報一覧を取得する。
-
-        Args:
-            input_data_id: 入力データID
-            input_data_index: 0始まりのインデックス
+        Returns:
+            補助情報のlist。取得に失敗した場合、または入力データが存在しない場合はNone
         """
-        if (input_data_index + 1) % 100 == 0:
-            logger.debug(f"{input_data_index + 1} 件目の入力データに紐づく補助情報を取得します。")
-
-        supplementary_data_list = self.service.wrapper.get_supplementary_data_list_or_none(self.project_id, input_data_id)
+        self.rate_limiter.acquire()
+        # 取得できなかった入力データはキャッシュに記録しないので、再実行すると再度取得する
+        try:
+            supplementary_data_list = self.service.wrapper.get_supplementary_data_list_or_none(self.project_id, input_data_id)
+        except Exception:
+            logger.warning(f"input_data_id='{input_data_id}': 補助情報の取得に失敗しました。", exc_info=True)
+            return None
 
-        if supplementary_data_list is not None:
-            # 補助情報から不要なキーを取り除く
-            for supplementary_data in supplementary_data_list:
-                remove_unnecessary_keys_from_supplementary_data(supplementary_data)
-            return supplementary_data_list
-        else:
+        if supplementary_data_list is None:
             logger.warning(f"input_data_id='{input_data_id}'である入力データは存在しません。")
-            return []
+            return None
 
-    def get_supplementary_data_list_wrapper(self, tpl: tuple[int, str]) -> list[dict[str, Any]]:
-        input_data_index, input_data_id = tpl
-        try:
-            return self.get_supplementary_data_list(input_data_id=input_data_id, input_data_index=input_data_index)
-        except Exception:
-            logger.warning(f"input_data_id='{input_data_index}': 補助情報の取得に失敗しました。", exc_info=True)
-            return []
+        # 補助情報から不要なキーを取り除く
+        for supplementary_data in supplementary_data_list:
+            remove_unnecessary_keys_from_supplementary_data(supplementary_data)
+        if self.cache is not None:
+            self.cache.add(input_data_id, supplementary_data_list)
+        return supplementary_data_list
 
-    def get_all_supplementary_data_list(self, input_data_id_list: list[str], *, parallelism: int | None = None) -> list[SupplementaryData]:
+    def fetch_all(self, input_data_id_list: Sequence[str]) -> dict[str, list[SupplementaryData] | None]:
         """
-        補助情報一覧を取得する。
+        入力データに紐づく補助情報を取得します。
+
+        Returns:
+            keyが入力データID、valueが補助情報のlistであるdict。keyの順番は`input_data_id_list`の順番と同じです。
+            補助情報の取得に失敗した入力データ、または存在しない入力データのvalueはNoneです。
         """
-        all_supplementary_data_list: list[SupplementaryData] = []
-        logger.info(f"{len(input_data_id_list)} 件の入力データに紐づく補助情報を取得します。")
+        result: dict[str, list[SupplementaryData] | None] = {}
+        not_cached_input_data_id_list = []
+        for input_data_id in dict.fromkeys(input_data_id_list):
+            if self.cache is not None and input_data_id in self.cache:
+                result[input_data_id] = self.cache[input_data_id]
+            else:
+                not_cached_input_data_id_list.append(input_data_id)
+
+        logger.debug(
+            f"{len(not_cached_input_data_id_list)} 件の入力データに紐づく補助情報をAPIで取得します。 :: parallelism={self.parallelism}, max_requests_per_second={1 / self.rate_limiter.interval:g}"
+        )
 
-        if parallelism is not None:
-            with multiprocessing.Pool(parallelism) as pool:
-                result = pool.map(self.get_supplementary_data_list_wrapper, enumerate(input_data_id_list))
-                return list(itertools.chain.from_iterable(result))
+        with ThreadPoolExecutor(max_workers=self.parallelism) as executor:
+            for index, (input_data_id, supplementary_data_list) in enumerate(zip(not_cached_input_data_id_list, executor.map(self._fetch, not_cached_input_data_id_list), strict=True)):
+                result[input_data_id] = supplementary_data_list
+                if (index + 1) % 100 == 0:
+                    logger.debug(f"{index + 1} 件の入力データに紐づく補助情報を取得しました。")
+
+        # 入力データIDの順番に並べ直す
+        return {input_data_id: result[input_data_id] for input_data_id in dict.fromkeys(input_data_id_list)}
+
+
+class ListSupplementaryDataMain:
+    def __init__(self, service: annofabapi.Resource, project_id: str) -> None:
+        self.service = service
+        self.project_id = project_id
 
-        else:
-            # 逐次処理
-            all_supplementary_data_list = []
-            for input_data_index, input_data_id in enumerate(input_data_id_list):
-                try:
-                    sub_supplementary_data_list = self.get_supplementary_data_list(
-                        input_data_id=input_data_id,
-                        input_data_index=input_data_index,
-                    )
-                    all_supplementary_data_list.extend(sub_supplementary_data_list)
-                except Exception:
-                    logger.warning(f"input_data_id='{input_data_index}': 補助情報の取得に失敗しました。", exc_info=True)
-                    continue
+    def get_all_supplementary_data_list(self, input_data_id_list: list[str], *, parallelism: int | None = None, cache_file: Path | None = None) -> list[SupplementaryData]:
+        """
+        補助情報一覧を取得する。
 
-        return all_supplementary_data_list
+        Args:
+            input_data_id_list: 入力データIDのlist
+            parallelism: APIを並列に実行する個数。指定しない場合は、逐次的に処理します。
+            cache_file: 取得結果を記録するファイル。指定した場合、記録済みの入力データについてはAPIを実行しません。
+        """
+        logger.info(f"{len(input_data_id_list)} 件の入力データに紐づく補助情報を取得します。")
+        fetcher = SupplementaryDataFetcher(
+            self.service,
+            self.project_id,
+            parallelism=parallelism if parallelism is not None else 1,
+            cache=SupplementaryDataCache(cache_file) if cache_file is not None else None,
+        )
+        result = fetcher.fetch_all(input_data_id_list)
+        return list(itertools.chain.from_iterable(e for e in result.values() if e is not None))
 
 
 class ListSupplementaryData(CommandLine):
@@ -127,7 +222,7 @@ class ListSupplementaryData(CommandLine):
             input_data_id_list = self.get_input_data_id_list_from_input_data_json(project_id)
 
         main_obj = ListSupplementaryDataMain(self.service, project_id=project_id)
-        all_supplementary_data_list = main_obj.get_all_supplementary_data_list(input_data_id_list, parallelism=args.parallelism)
+        all_supplementary_data_list = main_obj.get_all_supplementary_data_list(input_data_id_list, parallelism=args.parallelism, cache_file=args.cache_file)
         logger.info(f"補助情報一覧の件数: {len(all_supplementary_data_list)}")
         self.print_according_to_format(all_supplementary_data_list)
 
@@ -161,7 +256,13 @@ def parse_args(parser: argparse.ArgumentParser) -> None:
         "--parallelism",
         type=int,
         choices=PARALLELISM_CHOICES,
-        help="並列度。指定しない場合は、逐次的に処理します。",
+        help="補助情報を取得するAPIを並列に実行する個数。指定しない場合は、逐次的に処理します。",
+    )
+
+    parser.add_argument(
+        "--cache_file",
+        type=Path,
+        help="入力データごとに取得した補助情報を記録するJSON Linesファイルのパスを指定します。中断したコマンドを同じファイルを指定して再実行すると、記録済みの入力データについてはAPIを実行しません。",
     )
 
     parser.set_defaults(subcommand_func=main)
@@ -1,11 +1,17 @@
 from __future__ import annotations
 
 import argparse
+import datetime
+import json
 import logging
 import multiprocessing
 import sys
+import tempfile
 import uuid
+from collections import defaultdict
+from collections.abc import Collection
 from functools import partial
+from pathlib import Path
 from typing import Any
 
 import annofabapi.utils
@@ -23,6 +29,7 @@ from annofabcli.common.cli import (
     CommandLineWithConfirm,
     build_annofabapi_resource_and_login,
 )
+from annofabcli.common.download import DownloadingFile
 from annofabcli.common.facade import AnnofabApiFacade, TaskQuery, match_task_with_query
 
 logger = logging.getLogger(__name__)
@@ -32,6 +39,90 @@ InspectionJson = dict[str, dict[str, list[Inspection]]]
 Dict[task_id, Dict[input_data_id, List[Inspection]]] の検査コメント情報
 """
 
+DEFAULT_PREFETCH_MAX_AGE_HOURS = 24
+"""全件ファイルを利用する際に、許容する全件ファイルの古さ[時間]"""
+
+COMMENT_JSON_SAFETY_MARGIN = datetime.timedelta(hours=1)
+"""
+コメント全件ファイルの生成には時間がかかるため、更新日時（Last-Modified）の直前に更新されたタスクのコメントは、
+コメント全件ファイルに含まれていない可能性があります。そのようなタスクはWebAPIでコメントを取得します。
+"""
+
+
+class StalePrefetchedDataError(Exception):
+    """
+    全件ファイルから読み込んだタスクやコメントが、最新の情報と異なる可能性がある
+    """
+
+
+class PrefetchedTaskAndComment:
+    """
+    タスク全件ファイルとコメント全件ファイルから読み込んだ、タスクとコメント。
+
+    全件ファイルは最新の情報ではないため、以下のタスクは全件ファイルの情報を利用しません。
+
+    * タスクの更新日時が、コメント全件ファイルの更新日時に近いか、それより後のタスク
+    * タスクを操作する際に、最終更新日時が一致しないエラーになったタスク
+
+    Args:
+        task_list: タスク全件ファイルに記載されたタスク
+        comment_list: コメント全件ファイルに記載されたコメント
+        comment_json_last_modified: コメント全件ファイルの更新日時
+    """
+
+    def __init__(self, task_list: list[dict[str, Any]], comment_list: list[dict[str, Any]], comment_json_last_modified: datetime.datetime) -> None:
+        self.comment_json_last_modified = comment_json_last_modified
+        self._task_by_id = {task["task_id"]: task for task in task_list}
+        self._comment_list_by_key: dict[tuple[str, str], list[dict[str, Any]]] = defaultdict(list)
+        for comment in comment_list:
+            if comment["task_id"] in self._task_by_id:
+                self._comment_list_by_key[(comment["task_id"], comment["input_data_id"])].append(comment)
+
+    @classmethod
+    def download(cls, service: annofabapi.Resource, project_id: str, task_ids: Collection[str], *, max_age: datetime.timedelta) -> PrefetchedTaskAndComment | None:
+        """
+        タスク全件ファイルとコメント全件ファイルをダウンロードして、`task_ids`に含まれるタスクの情報を読み込みます。
+
+        Returns:
+            全件ファイルが`max_age`より古い、または更新日時が取得できない場合はNone
+        """
+        downloading_obj = DownloadingFile(service)
+        now = datetime.datetime.now(datetime.UTC)
+        for file_type, last_modified in [
+            ("タスク全件ファイル", downloading_obj.get_task_json_last_modified(project_id)),
+            ("コメント全件ファイル", comment_json_last_modified := downloading_obj.get_comment_json_last_modified(project_id)),
+        ]:
+            if last_modified is None or now - last_modified > max_age:
+                logger.warning(f"{file_type}の更新日時（{last_modified}）が {max_age} より前なので、全件ファイルを利用せずにWebAPIでタスクとコメントを取得します。")
+                return None
+        assert comment_json_last_modified is not None
+
+        target_task_ids = set(task_ids)
+        with tempfile.TemporaryDirectory() as str_temp_dir:
+            temp_dir = Path(str_temp_dir)
+            with downloading_obj.download_task_json_to_dir(project_id, temp_dir).open(encoding="utf-8") as f:
+                task_list = [task for task in json.load(f) if task["task_id"] in target_task_ids]
+            with downloading_obj.download_comment_json_to_dir(project_id, temp_dir).open(encoding="utf-8") as f:
+                comment_list = [comment for comment in json.load(f) if comment["task_id"] in target_task_ids]
+
+        logger.info(f"全件ファイルから、タスク {len(task_list)} 件とコメント {len(comment_list)} 件を読み込みました。 :: コメント全件ファイルの更新日時='{comment_json_last_modified}'")
+        return cls(task_list, comment_list, comment_json_last_modified)
+
+    def get_task(self, task_id: str) -> Task | None:
+        """
+        タスク全件ファイルから読み込んだタスクを返します。
+        タスク全件ファイルに存在しない場合や、コメント全件ファイルに最新のコメントが含まれていない可能性がある場合は、Noneを返します。
+        """
+        dict_task = self._task_by_id.get(task_id)
+        if dict_task is None:
+            return None
+        if dateutil.parser.parse(dict_task["updated_datetime"]) >= self.comment_json_last_modified - COMMENT_JSON_SAFETY_MARGIN:
+            return None
+        return Task.from_dict(dict_task)
+
+    def get_comment_list(self, task_id: str, input_data_id: str) -> list[dict[str, Any]]:
+        return self._comment_list_by_key.get((task_id, input_data_id), [])
+
 
 class CompleteTasksMain(CommandLineWithConfirm):
     def __init__(
@@ -46,6 +137,8 @@ class CompleteTasksMain(CommandLineWithConfirm):
         self.facade = AnnofabApiFacade(service)
         self.include_break_task = include_break_task
         self.include_on_hold_task = include_on_hold_task
+        self.prefetched: PrefetchedTaskAndComment | None = None
+        """全件ファイルから読み込んだタスクとコメント。`complete_task_list`で`prefetch_max_age`を指定すると設定されます。"""
         CommandLineWithConfirm.__init__(self, all_yes)
 
     def reply_inspection_comment(
@@ -111,7 +204,14 @@ class CompleteTasksMain(CommandLineWithConfirm):
 
         logger.debug(f"{task.task_id}, {input_data_id}, {len(comment_list)}件 検査コメントの状態を変更")
 
-    def get_unprocessed_inspection_list(self, task: Task, input_data_id: str) -> list[Inspection]:
+    def _get_comment_list(self, task: Task, input_data_id: str, *, is_prefetched: bool = False) -> list[dict[str, Any]]:
+        if is_prefetched:
+            assert self.prefetched is not None
+            return self.prefetched.get_comment_list(task.task_id, input_data_id)
+        comment_list, _ = self.service.api.get_comments(task.project_id, task.task_id, input_data_id, query_params={"v": "2"})
+        return comment_list
+
+    def get_unprocessed_inspection_list(self, task: Task, input_data_id: str, *, is_prefetched: bool = False) -> list[Inspection]:
         """
         未処置の検査コメントリストを取得する。
         ただし、現在のタスクフェーズで編集できる検査コメントのみである。
@@ -121,11 +221,12 @@ class CompleteTasksMain(CommandLineWithConfirm):
             input_data_id:
             target_phase:
             target_phase_stage:
+            is_prefetched: Trueならコメント全件ファイルから読み込んだコメントを利用する
 
         Returns:
 
         """
-        comment_list, _ = self.service.api.get_comments(task.project_id, task.task_id, input_data_id, query_params={"v": "2"})
+        comment_list = self._get_comment_list(task, input_data_id, is_prefetched=is_prefetched)
         return [
             e
             for e in comment_list
@@ -136,20 +237,25 @@ class CompleteTasksMain(CommandLineWithConfirm):
             and e["comment_node"]["status"] == "open"
         ]
 
-    def change_to_working_status(self, task: Task) -> Task:
+    def change_to_working_status(self, task: Task, *, is_prefetched: bool = False) -> Task:
         """
         必要なら担当者を変更して、作業中状態にします。
 
         Args:
             task:
+            is_prefetched: Trueなら`task`はタスク全件ファイルから読み込んだタスク
 
         Returns:
             作業中状態後のタスク
+
+        Raises:
+            StalePrefetchedDataError: タスク全件ファイルから読み込んだタスクが、最新のタスクと異なる
         """
         # 担当者変更
         my_account_id = self.service.api.account_id
         try:
-            last_updated_datetime = None
+            # 最終更新日時を指定して、タスク全件ファイルから読み込んだタスクが更新されていないことを確認する
+            last_updated_datetime = task.updated_datetime
             if task.account_id != my_account_id:
                 _task = self.service.wrapper.change_task_operator(task.project_id, task.task_id, my_account_id, last_updated_datetime=task.updated_datetime)
                 last_updated_datetime = _task["updated_datetime"]
@@ -158,11 +264,13 @@ class CompleteTasksMain(CommandLineWithConfirm):
             dict_task = self.service.wrapper.change_task_status_to_working(project_id=task.project_id, task_id=task.task_id, last_updated_datetime=last_updated_datetime)
             return Task.from_dict(dict_task)
 
-        except requests.HTTPError:
+        except requests.HTTPError as e:
+            if is_prefetched and e.response is not None and e.response.status_code == requests.codes.conflict:
+                raise StalePrefetchedDataError(f"task_id='{task.task_id}' :: タスク全件ファイルのタスクは更新されています。") from e
             logger.warning(f"task_id='{task.task_id}' :: 担当者の変更、または作業中状態への変更に失敗しました。", exc_info=True)
             raise
 
-    def get_unanswered_comment_list(self, task: Task, input_data_id: str) -> list[Inspection]:
+    def get_unanswered_comment_list(self, task: Task, input_data_id: str, *, is_prefetched: bool = False) -> list[Inspection]:
         """
         未回答の検査コメントのリストを取得する。
 
@@ -181,7 +289,7 @@ class CompleteTasksMain(CommandLineWithConfirm):
             )
             return latest_comment["phase"] == task.phase.value and latest_comment["phase_stage"] == task.phase_stage
 
-        comment_list, _ = self.service.api.get_comments(task.project_id, task.task_id, input_data_id, query_params={"v": "2"})
+        comment_list = self._get_comment_list(task, input_data_id, is_prefetched=is_prefetched)
         # 未処置の検査コメント
         unprocessed_inspection_list = [e for e in comment_list if e["comment_type"] == "inspection" and e["comment_node"]["_type"] == "Root" and e["comment_node"]["status"] == "open"]
 
@@ -192,6 +300,8 @@ class CompleteTasksMain(CommandLineWithConfirm):
         self,
         task: Task,
         reply_comment: str | None = None,
+        *,
+        is_prefetched: bool = False,
     ) -> bool:
         """
         annotation phaseのタスクを完了状態にする。
@@ -200,14 +310,18 @@ class CompleteTasksMain(CommandLineWithConfirm):
             project_id:
             task: 操作対象のタスク。annotation phase状態であること前提。
             reply_comment: 未処置の検査コメントに対する返信コメント。Noneの場合、スキップする。
+            is_prefetched: Trueなら`task`とコメントは全件ファイルから読み込んだ情報
 
         Returns:
             成功したかどうか
+
+        Raises:
+            StalePrefetchedDataError: 全件ファイルの情報が最新でない可能性がある
         """
 
         unanswered_comment_list_dict: dict[str, list[Inspection]] = {}
         for input_data_id in task.input_data_id_list:
-            unanswered_comment_list = self.get_unanswered_comment_list(task, input_data_id)
+            unanswered_comment_list = self.get_unanswered_comment_list(task, input_data_id, is_prefetched=is_prefetched)
             unanswered_comment_list_dict[input_data_id] = unanswered_comment_list
 
         unanswered_comment_count_for_task = sum(len(e) for e in unanswered_comment_list_dict.values())
@@ -215,13 +329,16 @@ class CompleteTasksMain(CommandLineWithConfirm):
         logger.debug(f"task_id='{task.task_id}' :: 未回答の検査コメントが {unanswered_comment_count_for_task} 件あります。")
         if unanswered_comment_count_for_task > 0:  # noqa: SIM102
             if reply_comment is None:
+                if is_prefetched:
+                    # スキップするかどうかは、最新のコメントで判断する
+                    raise StalePrefetchedDataError(f"task_id='{task.task_id}' :: 未回答の検査コメントがあります。")
                 logger.warning(f"task_id='{task.task_id}' :: 未回答の検査コメントに対する返信コメント（'--reply_comment'）が指定されていないので、スキップします。")
                 return False
 
         if not self.confirm_processing(f"タスク'{task.task_id}'の教師付フェーズを次のフェーズに進めますか？"):
             return False
 
-        task = self.change_to_working_status(task)
+        task = self.change_to_working_status(task, is_prefetched=is_prefetched)
         if unanswered_comment_count_for_task > 0:
             assert reply_comment is not None
             logger.debug(f"task_id='{task.task_id}' :: 未回答の検査コメント {unanswered_comment_count_for_task} 件に対して、返信コメントを付与します。")
@@ -243,11 +360,13 @@ class CompleteTasksMain(CommandLineWithConfirm):
         self,
         task: Task,
         inspection_status: CommentStatus | None = None,
+        *,
+        is_prefetched: bool = False,
     ) -> bool:
         phase_name = self._get_phase_name_for_display(task.phase)
         unprocessed_inspection_list_dict: dict[str, list[Inspection]] = {}
         for input_data_id in task.input_data_id_list:
-            unprocessed_inspection_list = self.get_unprocessed_inspection_list(task, input_data_id)
+            unprocessed_inspection_list = self.get_unprocessed_inspection_list(task, input_data_id, is_prefetched=is_prefetched)
             unprocessed_inspection_list_dict[input_data_id] = unprocessed_inspection_list
 
         unprocessed_inspection_count = sum(len(e) for e in unprocessed_inspection_list_dict.values())
@@ -255,13 +374,16 @@ class CompleteTasksMain(CommandLineWithConfirm):
         logger.debug(f"task_id='{task.task_id}' :: 未処置の検査コメントが {unprocessed_inspection_count} 件あります。")
         if unprocessed_inspection_count > 0:  # noqa: SIM102
             if inspection_status is None:
+                if is_prefetched:
+                    # スキップするかどうかは、最新のコメントで判断する
+                    raise StalePrefetchedDataError(f"task_id='{task.task_id}' :: 未処置の検査コメントがあります。")
                 logger.warning(f"task_id='{task.task_id}' :: 未処置の検査コメントに対する対応方法（'--inspection_status'）が指定されていないので、スキップします。")
                 return False
 
         if not self.confirm_processing(f"タスク'{task.task_id}'の{phase_name}を次のフェーズに進めますか？"):
             return False
 
-        task = self.change_to_working_status(task)
+        task = self.change_to_working_status(task, is_prefetched=is_prefetched)
 
         if unprocessed_inspection_count > 0:
             assert inspection_status is not None
@@ -289,28 +411,57 @@ class CompleteTasksMain(CommandLineWithConfirm):
             return "受入フェーズ"
         return f"{phase.value}フェーズ"
 
-    def _validate_task(self, task: Task, target_phase: TaskPhase, target_phase_stage: int, task_query: TaskQuery | None) -> bool:
+    def _validate_task(self, task: Task, target_phase: TaskPhase, target_phase_stage: int, task_query: TaskQuery | None, *, should_log: bool = True) -> bool:
         if not (task.phase == target_phase and task.phase_stage == target_phase_stage):
-            logger.warning(f"task_id='{task.task_id}'のタスクは操作対象のフェーズ、フェーズステージではないため、スキップします。")
+            if should_log:
+                logger.warning(f"task_id='{task.task_id}'のタスクは操作対象のフェーズ、フェーズステージではないため、スキップします。")
             return False
 
         if task.status in {TaskStatus.COMPLETE, TaskStatus.WORKING}:
-            logger.warning(f"task_id='{task.task_id}'のタスクは作業中または完了状態であるため、スキップします。")
+            if should_log:
+                logger.warning(f"task_id='{task.task_id}'のタスクは作業中または完了状態であるため、スキップします。")
             return False
 
         if task.status == TaskStatus.BREAK and not self.include_break_task:
-            logger.warning(f"task_id='{task.task_id}'のタスクは休憩中状態であるため、スキップします。休憩中状態のタスクも次のフェーズに進める場合は、'--include_break_task'を指定してください。")
+            if should_log:
+                logger.warning(f"task_id='{task.task_id}'のタスクは休憩中状態であるため、スキップします。休憩中状態のタスクも次のフェーズに進める場合は、'--include_break_task'を指定してください。")
             return False
 
         if task.status == TaskStatus.ON_HOLD and not self.include_on_hold_task:
-            logger.warning(f"task_id='{task.task_id}'のタスクは保留中状態であるため、スキップします。保留中状態のタスクも次のフェーズに進める場合は、'--include_on_hold_task'を指定してください。")
+            if should_log:
+                logger.warning(f"task_id='{task.task_id}'のタスクは保留中状態であるため、スキップします。保留中状態のタスクも次のフェーズに進める場合は、'--include_on_hold_task'を指定してください。")
             return False
 
         if not match_task_with_query(task, task_query):
-            logger.debug(f"task_id='{task.task_id}' は `--task_query` の条件にマッチしないため、スキップします。 :: task_query={task_query}")
+            if should_log:
+                logger.debug(f"task_id='{task.task_id}' は `--task_query` の条件にマッチしないため、スキップします。 :: task_query={task_query}")
             return False
         return True
 
+    def _complete_task_for_phase(
+        self,
+        task: Task,
+        reply_comment: str | None = None,
+        inspection_status: CommentStatus | None = None,
+        *,
+        is_prefetched: bool = False,
+    ) -> bool:
+        try:
+            if task.phase == TaskPhase.ANNOTATION:
+                return self.complete_task_for_annotation_phase(task, reply_comment=reply_comment, is_prefetched=is_prefetched)
+            else:
+                return self.complete_task_for_inspection_acceptance_phase(task, inspection_status=inspection_status, is_prefetched=is_prefetched)
+
+        except StalePrefetchedDataError:
+            raise
+
+        except Exception:  # pylint: disable=broad-except
+            logger.warning(f"task_id='{task.task_id}' :: '{task.phase}'フェーズを次のフェーズへ進めるのに失敗しました。", exc_info=True)
+            new_task: Task = Task.from_dict(self.service.wrapper.get_task_or_none(task.project_id, task.task_id))
+            if new_task.status == TaskStatus.WORKING and new_task.account_id == self.service.api.account_id:
+                self.service.wrapper.change_task_status_to_break(task.project_id, task.task_id)
+            return False
+
     def complete_task(
         self,
         project_id: str,
@@ -324,6 +475,18 @@ class CompleteTasksMain(CommandLineWithConfirm):
     ) -> bool:
         logging_prefix = f"{task_index + 1} 件目" if task_index is not None else ""
 
+        prefetched_task = self.prefetched.get_task(task_id) if self.prefetched is not None else None
+        # 全件ファイルのタスクが操作対象でない場合は、最新のタスクで判断する
+        if prefetched_task is not None and self._validate_task(prefetched_task, target_phase=target_phase, target_phase_stage=target_phase_stage, task_query=task_query, should_log=False):
+            logger.info(
+                f"{logging_prefix} :: タスク情報（タスク全件ファイル） task_id='{task_id}', phase={prefetched_task.phase.value}, "
+                f"phase_stage={prefetched_task.phase_stage}, status={prefetched_task.status.value}"
+            )
+            try:
+                return self._complete_task_for_phase(prefetched_task, reply_comment=reply_comment, inspection_status=inspection_status, is_prefetched=True)
+            except StalePrefetchedDataError as e:
+                logger.debug(f"{logging_prefix} :: {e} 最新のタスクとコメントを取得して、処理し直します。")
+
         dict_task = self.service.wrapper.get_task_or_none(project_id, task_id)
         if dict_task is None:
             logger.warning(f"{logging_prefix} :: task_id='{task_id}'のタスクは存在しないので、スキップします。")
@@ -334,18 +497,7 @@ class CompleteTasksMain(CommandLineWithConfirm):
         if not self._validate_task(task, target_phase=target_phase, target_phase_stage=target_phase_stage, task_query=task_query):
             return False
 
-        try:
-            if task.phase == TaskPhase.ANNOTATION:
-                return self.complete_task_for_annotation_phase(task, reply_comment=reply_comment)
-            else:
-                return self.complete_task_for_inspection_acceptance_phase(task, inspection_status=inspection_status)
-
-        except Exception:  # pylint: disable=broad-except
-            logger.warning(f"task_id='{task_id}' :: '{task.phase}'フェーズを次のフェーズへ進めるのに失敗しました。", exc_info=True)
-            new_task: Task = Task.from_dict(self.service.wrapper.get_task_or_none(project_id, task_id))
-            if new_task.status == TaskStatus.WORKING and new_task.account_id == self.service.api.account_id:
-                self.service.wrapper.change_task_status_to_break(project_id, task_id)
-            return False
+        return self._complete_task_for_phase(task, reply_comment=reply_comment, inspection_status=inspection_status)
 
     def complete_task_for_task_wrapper(
         self,
@@ -383,6 +535,7 @@ class CompleteTasksMain(CommandLineWithConfirm):
         inspection_status: CommentStatus | None = None,
         task_query: TaskQuery | None = None,
         parallelism: int | None = None,
+        prefetch_max_age: datetime.timedelta | None = None,
     ) -> None:
         """
         検査コメントのstatusを変更（対応完了 or 対応不要）にした上で、タスクを受け入れ完了状態にする
@@ -393,10 +546,15 @@ class CompleteTasksMain(CommandLineWithConfirm):
             target_phase_stage: 操作対象のタスクのフェーズステージ
             reply_comment: 未回答の検査コメントに対する指摘
             inspection_status: 未処置の検査コメントの状態
+            prefetch_max_age: 指定した場合、タスク全件ファイルとコメント全件ファイルを読み込んで、タスクとコメントを取得するWebAPIの実行回数を減らします。
+                全件ファイルがこの値より古い場合は、全件ファイルを利用しません。
         """
         if task_query is not None:
             task_query = self.facade.set_account_id_of_task_query(project_id, task_query)
 
+        if prefetch_max_age is not None:
+            self.prefetched = PrefetchedTaskAndComment.download(self.service, project_id, task_id_list, max_age=prefetch_max_age)
+
         project_title = self.facade.get_project_title(project_id)
         logger.info(f"{project_title} のタスク {len(task_id_list)} 件に対して、'{target_phase.value}'フェーズを次のフェーズに進めます。")
 
@@ -463,6 +621,13 @@ class CompleteTasks(CommandLine):
                 )
                 return False
 
+        if args.prefetch_max_age_hours <= 0:
+            print(  # noqa: T201
+                f"{COMMON_MESSAGE} argument --prefetch_max_age_hours: 0より大きい値を指定してください。",
+                file=sys.stderr,
+            )
+            return False
+
         if args.parallelism is not None and not args.yes:
             print(  # noqa: T201
                 f"{COMMON_MESSAGE} argument --parallelism: '--parallelism'を指定するときは、'--yes' を指定してください。",
@@ -501,6 +666,7 @@ class CompleteTasks(CommandLine):
             reply_comment=args.reply_comment,
             task_query=task_query,
             parallelism=args.parallelism,
+            prefetch_max_age=datetime.timedelta(hours=args.prefetch_max_age_hours) if args.prefetch else None,
         )
 
 
@@ -562,6 +728,21 @@ def parse_args(parser: argparse.ArgumentParser) -> None:
         help="指定した場合、保留中状態のタスクも次のフェーズに進めます。指定しない場合、保留中状態のタスクはスキップします。",
     )
 
+    parser.add_argument(
+        "--prefetch",
+        action="store_true",
+        help="指定した場合、タスク全件ファイルとコメント全件ファイルを読み込んで、タスクとコメントを取得するWebAPIの実行回数を減らします。"
+        "全件ファイルの作成後に更新されたタスクは、WebAPIで最新のタスクとコメントを取得します。"
+        "大量のタスクを次のフェーズに進める場合に指定してください。",
+    )
+
+    parser.add_argument(
+        "--prefetch_max_age_hours",
+        type=float,
+        default=DEFAULT_PREFETCH_MAX_AGE_HOURS,
+        help="``--prefetch`` を指定したとき、全件ファイルの更新日時がこの時間より前であれば、全件ファイルを利用せずにWebAPIでタスクとコメントを取得します。",
+    )
+
     parser.add_argument(
         "--parallelism",
         type=int,
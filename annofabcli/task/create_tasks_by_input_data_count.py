@@ -11,6 +11,7 @@ import annofabcli.common.cli
 from annofabcli.common.cli import ArgumentParser, CommandLine, build_annofabapi_resource_and_login
 from annofabcli.common.dataclasses import WaitOptions
 from annofabcli.common.facade import AnnofabApiFacade
+from annofabcli.common.job_poller import JobPoller
 
 logger = logging.getLogger(__name__)
 
@@ -72,13 +73,8 @@ class CreatingTasksByInputDataCountMain:
         max_wait_minute = wait_options.max_tries * wait_options.interval / 60
         logger.info(f"job_id='{job_id}' :: 最大{max_wait_minute}分間、タスク登録のジョブが終了するまで待ちます。")
 
-        result = self.service.wrapper.wait_until_job_finished(
-            self.project_id,
-            job_type=ProjectJobType.GEN_TASKS,
-            job_id=job_id,
-            job_access_interval=wait_options.interval,
-            max_job_access=wait_options.max_tries,
-        )
+        with JobPoller(self.service) as job_poller:
+            result = job_poller.wait(self.project_id, ProjectJobType.GEN_TASKS, job_id=job_id, wait_options=wait_options)
         if result is None:
             logger.error(f"job_id='{job_id}' :: タスク登録のジョブが存在しません。")
             return
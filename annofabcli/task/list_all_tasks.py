@@ -9,6 +9,7 @@ import annofabapi
 from annofabapi.dataclass.task import Task
 
 import annofabcli.common.cli
+from annofabcli.common.annofab.project_mirror import ProjectMirror, open_project_mirror
 from annofabcli.common.cli import ArgumentParser, CommandLine, build_annofabapi_resource_and_login
 from annofabcli.common.download import DownloadingFile
 from annofabcli.common.enums import OutputFormat
@@ -47,7 +48,20 @@ class ListTasksWithJsonMain:
         task_query: TaskQuery | None = None,
         is_latest: bool = False,
         temp_dir: Path | None = None,
+        mirror: ProjectMirror | None = None,
     ) -> list[dict[str, Any]]:
+        """
+        Args:
+            mirror: 指定した場合、全件ファイルをダウンロードせずに、ミラーからタスクを取得します。
+        """
+        if mirror is not None:
+            task_list = mirror.get_tasks(project_id, task_ids=task_id_list)
+            if task_query is not None:
+                task_query = self.facade.set_account_id_of_task_query(project_id, task_query)
+            filtered_task_list = [e for e in task_list if self.match_task_with_conditions(e, task_query=task_query)]
+            visualize_obj = AddProps(self.service, project_id)
+            return [visualize_obj.add_properties_to_task(e) for e in filtered_task_list]
+
         if task_json is None:
             downloading_obj = DownloadingFile(self.service)
             # `NamedTemporaryFile`を使わない理由: Windowsで`PermissionError`が発生するため
@@ -98,14 +112,16 @@ class ListTasksWithJson(CommandLine):
 
         main_obj = ListTasksWithJsonMain(self.service)
         temp_dir = Path(args.temp_dir) if args.temp_dir is not None else None
-        task_list = main_obj.get_task_list(
-            project_id=project_id,
-            task_json=args.task_json,
-            task_id_list=task_id_list,
-            task_query=task_query,
-            is_latest=args.latest,
-            temp_dir=temp_dir,
-        )
+        with open_project_mirror(enabled=args.from_mirror) as mirror:
+            task_list = main_obj.get_task_list(
+                project_id=project_id,
+                task_json=args.task_json,
+                task_id_list=task_id_list,
+                task_query=task_query,
+                is_latest=args.latest,
+                temp_dir=temp_dir,
+                mirror=mirror,
+            )
 
         logger.info(f"{len(task_list)}件のタスク情報を出力します。")
         print_task_list(task_list, OutputFormat(args.format), args.output)
@@ -124,13 +140,20 @@ def parse_args(parser: argparse.ArgumentParser) -> None:
     argument_parser.add_task_query()
     argument_parser.add_task_id(required=False)
 
-    parser.add_argument(
+    source_group = parser.add_mutually_exclusive_group()
+    source_group.add_argument(
         "--task_json",
         type=Path,
         help="タスク情報が記載されたJSONファイルのパスを指定すると、JSONに記載された情報を元にタスク一覧を出力します。\nJSONファイルは ``$ annofabcli task download`` コマンドで取得できます。",
     )
+    source_group.add_argument(
+        "--from_mirror",
+        action="store_true",
+        help="全件ファイルをダウンロードせずに、 ``$ annofabcli mirror sync`` コマンドで同期したミラーからタスク一覧を出力します。",
+    )
 
-    parser.add_argument(
+    # `--latest`は全件ファイルをダウンロードするときだけ有効なので、JSONファイルやミラーを参照するオプションとは同時に指定できない
+    source_group.add_argument(
         "--latest",
         action="store_true",
         help="最新のタスクの情報を出力します。"
@@ -3,11 +3,13 @@ import json
 import logging
 import sys
 import tempfile
+from dataclasses import dataclass
 from enum import Enum
 from pathlib import Path
 from typing import Any, assert_never
 
 import isodate
+import numpy
 import pandas
 from annofabapi.models import ProjectMemberRole, Task, TaskPhase, TaskStatus
 from annofabapi.resource import Resource as AnnofabResource
@@ -22,6 +24,7 @@ from annofabcli.common.cli import (
 )
 from annofabcli.common.download import DownloadingFile
 from annofabcli.common.facade import AnnofabApiFacade
+from annofabcli.common.multi_project import run_projects_in_pipeline
 
 logger = logging.getLogger(__name__)
 
@@ -175,6 +178,119 @@ def get_step_for_current_phase(task: Task, number_of_inspections: int) -> int:
             assert_never(unreachable)
 
 
+def count_rejections_by_task(task_list: list[dict[str, Any]]) -> tuple[numpy.ndarray, numpy.ndarray]:
+    """
+    タスクの ``histories_by_phase`` を1つの配列に平坦化して、タスクごとの差し戻し回数をまとめて数えます。
+    差し戻しの判定方法は ``annofabapi.utils.get_number_of_rejections`` と同じです。
+
+    Args:
+        task_list: タスク情報のlist
+
+    Returns:
+        以下の2つの配列のtuple。要素の順番は ``task_list`` と同じです。
+        * 1段目の検査フェーズで差し戻された回数
+        * 受入フェーズ（フェーズステージ1）で差し戻された回数
+    """
+    task_count = len(task_list)
+    history_counts = numpy.fromiter((len(task["histories_by_phase"]) for task in task_list), dtype=numpy.int64, count=task_count)
+    histories = [history for task in task_list for history in task["histories_by_phase"]]
+    task_indices = numpy.repeat(numpy.arange(task_count), history_counts)
+    phases = numpy.array([history["phase"] for history in histories], dtype=object)
+    phase_stages = numpy.fromiter((history["phase_stage"] for history in histories), dtype=numpy.int64, count=len(histories))
+    worked = numpy.fromiter((bool(history["worked"]) for history in histories), dtype=bool, count=len(histories))
+
+    # 同じタスクの次の履歴が教師付フェーズなら、差し戻されたとみなす
+    is_next_annotation = numpy.zeros(len(histories), dtype=bool)
+    is_next_annotation[:-1] = (task_indices[1:] == task_indices[:-1]) & (phases[1:] == TaskPhase.ANNOTATION.value)
+    is_rejected = worked & is_next_annotation
+
+    # `get_number_of_rejections` の引数 `phase_stage` のデフォルト値と同じく、フェーズステージ1の差し戻しだけを数える
+    is_rejected &= phase_stages == 1
+    rejections_by_inspection = numpy.bincount(task_indices[is_rejected & (phases == TaskPhase.INSPECTION.value)], minlength=task_count)
+    rejections_by_acceptance = numpy.bincount(task_indices[is_rejected & (phases == TaskPhase.ACCEPTANCE.value)], minlength=task_count)
+    return rejections_by_inspection, rejections_by_acceptance
+
+
+def sum_worktime_second_in_current_phase(task_list: list[dict[str, Any]], task_history_dict: dict[str, list[dict[str, Any]]], target_task_indices: numpy.ndarray) -> numpy.ndarray:
+    """
+    タスクの現在のフェーズでの作業時間（秒）の合計を、タスクごとに求めます。
+
+    Args:
+        task_list: タスク情報のlist
+        task_history_dict: タスクIDをキーとしたタスク履歴のdict
+        target_task_indices: 作業時間を求めるタスクの、 ``task_list`` でのindex
+
+    Returns:
+        作業時間（秒）の配列。要素の順番は ``task_list`` と同じです。対象外のタスクは0です。
+    """
+    history_task_indices: list[int] = []
+    history_seconds: list[float] = []
+    # 作業時間の文字列は同じ値が多いので、同じ値は1回だけパースする
+    second_by_duration: dict[str, float] = {}
+    for task_index in target_task_indices.tolist():
+        task = task_list[task_index]
+        phase = task["phase"]
+        for history in task_history_dict.get(task["task_id"], []):
+            if history["phase"] != phase:
+                continue
+            duration = history["accumulated_labor_time_milliseconds"]
+            second = second_by_duration.get(duration)
+            if second is None:
+                second = isoduration_to_second(duration)
+                second_by_duration[duration] = second
+            history_task_indices.append(task_index)
+            history_seconds.append(second)
+
+    return numpy.bincount(numpy.array(history_task_indices, dtype=numpy.int64), weights=numpy.array(history_seconds, dtype=numpy.float64), minlength=len(task_list))
+
+
+def classify_task_status_for_summary(task_list: list[dict[str, Any]], task_history_dict: dict[str, list[dict[str, Any]]], *, not_worked_threshold_second: float = 0) -> numpy.ndarray:
+    """
+    タスクの状態（ ``TaskStatusForSummary`` の値）を、すべてのタスクについてまとめて判定します。
+    判定結果は、タスクごとに ``TaskStatusForSummary.from_task`` を呼び出した結果と同じです。
+
+    Args:
+        task_list: タスク情報のlist
+        task_history_dict: タスクIDをキーとしたタスク履歴のdict
+        not_worked_threshold_second: 作業していないとみなす作業時間の閾値（秒）。この値以下なら作業していないとみなす。
+
+    Returns:
+        ``TaskStatusForSummary`` の値の配列。要素の順番は ``task_list`` と同じです。
+    """
+    task_count = len(task_list)
+    statuses = numpy.array([task["status"] for task in task_list], dtype=object)
+    phases = numpy.array([task["phase"] for task in task_list], dtype=object)
+    phase_stages = numpy.fromiter((task["phase_stage"] for task in task_list), dtype=numpy.int64, count=task_count)
+    is_unassigned = numpy.fromiter((task["account_id"] is None for task in task_list), dtype=bool, count=task_count)
+
+    # `get_step_for_current_phase(task, number_of_inspections=1) == 1` と同じ判定。多段検査を無視して、今のフェーズが1回目かどうかを判定する
+    rejections_by_inspection, rejections_by_acceptance = count_rejections_by_task(task_list)
+    is_inspection_counted = (phases == TaskPhase.ANNOTATION.value) | ((phases == TaskPhase.INSPECTION.value) & (phase_stages == 1))
+    is_first_step = (rejections_by_acceptance + numpy.where(is_inspection_counted, rejections_by_inspection, 0)) == 0
+
+    is_not_started = statuses == TaskStatus.NOT_STARTED.value
+    is_working_or_break = (statuses == TaskStatus.WORKING.value) | (statuses == TaskStatus.BREAK.value)
+
+    # 作業時間は、未着手かつ今のフェーズが1回目のタスクについてだけ求める
+    is_worktime_target = is_not_started & is_first_step
+    worktime_seconds = sum_worktime_second_in_current_phase(task_list, task_history_dict, numpy.flatnonzero(is_worktime_target))
+    is_never_worked = is_worktime_target & (worktime_seconds <= not_worked_threshold_second)
+
+    result = numpy.full(task_count, None, dtype=object)
+    result[statuses == TaskStatus.COMPLETE.value] = TaskStatusForSummary.COMPLETE.value
+    result[statuses == TaskStatus.ON_HOLD.value] = TaskStatusForSummary.ON_HOLD.value
+    result[is_not_started] = TaskStatusForSummary.WORKED_NOT_REJECTED.value
+    result[is_never_worked & is_unassigned] = TaskStatusForSummary.NEVER_WORKED_UNASSIGNED.value
+    result[is_never_worked & ~is_unassigned] = TaskStatusForSummary.NEVER_WORKED_ASSIGNED.value
+    result[is_working_or_break & is_first_step] = TaskStatusForSummary.WORKED_NOT_REJECTED.value
+    result[is_working_or_break & ~is_first_step] = TaskStatusForSummary.WORKED_REJECTED.value
+
+    unclassified_indices = numpy.flatnonzero(result == None)  # noqa: E711
+    if len(unclassified_indices) > 0:
+        raise RuntimeError(f"'{statuses[unclassified_indices[0]]}'は対象外です。")
+    return result
+
+
 def create_df_task(
     task_list: list[dict[str, Any]],
     task_history_dict: dict[str, list[dict[str, Any]]],
@@ -206,42 +322,37 @@ def create_df_task(
     """
     metadata_keys = metadata_keys or []
     input_data_dict = input_data_dict or {}
-
-    missing_task_history_task_id_list = []
-    for task in task_list:
-        task_id = task["task_id"]
-        task_history = task_history_dict.get(task_id, [])
-        if len(task_history) == 0 and task_id not in task_history_dict:
-            missing_task_history_task_id_list.append(task_id)
-
-        task["task_status_for_summary"] = TaskStatusForSummary.from_task(task, task_history, not_worked_threshold_second).value
-
-        # 入力データ数を計算
-        task["input_data_count"] = len(task["input_data_id_list"])
-
-        # 動画の長さを計算
-        video_duration_hour = 0
-        video_duration_minute = 0
-        for input_data_id in task["input_data_id_list"]:
-            if input_data_id in input_data_dict:
-                duration = input_data_dict[input_data_id]["system_metadata"]["input_duration"]
-                video_duration_hour += duration / 3600
-                video_duration_minute += duration / 60
-
-        task["video_duration_hour"] = video_duration_hour
-        task["video_duration_minute"] = video_duration_minute
-
-        # メタデータの値を抽出
-        metadata = task["metadata"]
-        for key in metadata_keys:
-            task[f"metadata.{key}"] = metadata.get(key)
-
-    if len(missing_task_history_task_id_list) > 0:
-        logger.info(f"{len(missing_task_history_task_id_list)} 件のタスクはタスク履歴が存在しないため、タスク履歴なしとして集計します。")
-
-    columns = ["task_id", "phase", "input_data_count", "video_duration_hour", "video_duration_minute"] + [f"metadata.{key}" for key in metadata_keys] + ["task_status_for_summary"]
-    df = pandas.DataFrame(task_list, columns=columns)
-    return df
+    task_count = len(task_list)
+
+    missing_task_history_count = sum(1 for task in task_list if task["task_id"] not in task_history_dict)
+    if missing_task_history_count > 0:
+        logger.info(f"{missing_task_history_count} 件のタスクはタスク履歴が存在しないため、タスク履歴なしとして集計します。")
+
+    input_data_counts = numpy.fromiter((len(task["input_data_id_list"]) for task in task_list), dtype=numpy.int64, count=task_count)
+
+    # 動画の長さを計算。入力データ情報が存在しない入力データは0秒とみなす
+    video_duration_hours: numpy.ndarray = numpy.zeros(task_count, dtype=numpy.int64)
+    video_duration_minutes: numpy.ndarray = numpy.zeros(task_count, dtype=numpy.int64)
+    if len(input_data_dict) > 0:
+        input_data_task_indices = numpy.repeat(numpy.arange(task_count), input_data_counts)
+        input_data_ids = [input_data_id for task in task_list for input_data_id in task["input_data_id_list"]]
+        is_found = numpy.fromiter((input_data_id in input_data_dict for input_data_id in input_data_ids), dtype=bool, count=len(input_data_ids))
+        if is_found.any():
+            durations = numpy.array([input_data_dict[input_data_id]["system_metadata"]["input_duration"] for input_data_id in input_data_ids if input_data_id in input_data_dict], dtype=numpy.float64)
+            video_duration_hours = numpy.bincount(input_data_task_indices[is_found], weights=durations / 3600, minlength=task_count)
+            video_duration_minutes = numpy.bincount(input_data_task_indices[is_found], weights=durations / 60, minlength=task_count)
+
+    columns: dict[str, Any] = {
+        "task_id": [task["task_id"] for task in task_list],
+        "phase": [task["phase"] for task in task_list],
+        "input_data_count": input_data_counts,
+        "video_duration_hour": video_duration_hours,
+        "video_duration_minute": video_duration_minutes,
+    }
+    for key in metadata_keys:
+        columns[f"metadata.{key}"] = [task["metadata"].get(key) for task in task_list]
+    columns["task_status_for_summary"] = classify_task_status_for_summary(task_list, task_history_dict, not_worked_threshold_second=not_worked_threshold_second)
+    return pandas.DataFrame(columns)
 
 
 def aggregate_df(df: pandas.DataFrame, metadata_keys: list[str] | None = None, unit: AggregationUnit = AggregationUnit.TASK) -> pandas.DataFrame:
@@ -326,6 +437,52 @@ def aggregate_df(df: pandas.DataFrame, metadata_keys: list[str] | None = None, u
     return df2
 
 
+def create_empty_summary_df(metadata_keys: list[str] | None = None) -> pandas.DataFrame:
+    """
+    `aggregate_df` 関数と同じ列構成の、空のDataFrameを生成します。
+    """
+    metadata_columns = [f"metadata.{key}" for key in (metadata_keys or [])]
+    result_columns = [
+        "phase",
+        *metadata_columns,
+        TaskStatusForSummary.NEVER_WORKED_UNASSIGNED.value,
+        TaskStatusForSummary.NEVER_WORKED_ASSIGNED.value,
+        TaskStatusForSummary.WORKED_NOT_REJECTED.value,
+        TaskStatusForSummary.WORKED_REJECTED.value,
+        TaskStatusForSummary.ON_HOLD.value,
+        TaskStatusForSummary.COMPLETE.value,
+    ]
+    return pandas.DataFrame(columns=result_columns)
+
+
+def concat_summary_df_by_project(df_by_project_id: dict[str, pandas.DataFrame], metadata_keys: list[str] | None = None) -> pandas.DataFrame:
+    """
+    プロジェクトごとの集計結果を、先頭に ``project_id`` 列を付けて1つのDataFrameに結合します。
+
+    Args:
+        df_by_project_id: project_idをキーにした、 `aggregate_df` 関数の戻り値のdict
+        metadata_keys: 集計対象のメタデータキーのリスト
+    """
+    df_list = [df.assign(project_id=project_id) for project_id, df in df_by_project_id.items() if len(df) > 0]
+    columns = ["project_id", *create_empty_summary_df(metadata_keys).columns]
+    if len(df_list) == 0:
+        return pandas.DataFrame(columns=columns)
+    return pandas.concat(df_list, ignore_index=True)[columns]
+
+
+@dataclass(frozen=True)
+class TaskCountSourceData:
+    """
+    タスク数の集計に必要な、Annofabから取得したデータ
+    """
+
+    task_list: list[dict[str, Any]]
+    task_history_dict: dict[str, list[dict[str, Any]]]
+    """タスクIDをキーとしたタスク履歴のdict"""
+    input_data_dict: dict[str, dict[str, Any]] | None = None
+    """入力データIDをキーとした入力データ情報のdict。動画時間で集計する場合のみ取得します。"""
+
+
 class GettingTaskCountSummary:
     """
     タスク数のサマリーを取得するクラス
@@ -350,16 +507,9 @@ class GettingTaskCountSummary:
         self.metadata_keys = metadata_keys or []
         self.unit = unit
 
-    def create_df_task(self) -> pandas.DataFrame:
+    def get_source_data(self) -> TaskCountSourceData:
         """
-        以下の列が含まれたタスクのDataFrameを生成します。
-        * task_id
-        * phase
-        * task_status_for_summary
-        * input_data_count
-        * video_duration_hour
-        * video_duration_minute
-        * metadata.{key} （metadata_keys で指定した各メタデータキーに対応する列）
+        タスク数の集計に必要なデータを、Annofabから取得します。
         """
         if self.should_execute_get_tasks_api:
             task_list = self.annofab_service.wrapper.get_all_tasks(self.project_id)
@@ -379,8 +529,32 @@ class GettingTaskCountSummary:
         if self.unit in (AggregationUnit.VIDEO_DURATION_HOUR, AggregationUnit.VIDEO_DURATION_MINUTE):
             input_data_dict = self.get_input_data_dict_with_downloading()
 
-        df = create_df_task(task_list, task_history_dict, not_worked_threshold_second=self.not_worked_threshold_second, metadata_keys=self.metadata_keys, input_data_dict=input_data_dict)
-        return df
+        return TaskCountSourceData(task_list=task_list, task_history_dict=task_history_dict, input_data_dict=input_data_dict)
+
+    def create_df_task(self, source_data: TaskCountSourceData | None = None) -> pandas.DataFrame:
+        """
+        以下の列が含まれたタスクのDataFrameを生成します。
+        * task_id
+        * phase
+        * task_status_for_summary
+        * input_data_count
+        * video_duration_hour
+        * video_duration_minute
+        * metadata.{key} （metadata_keys で指定した各メタデータキーに対応する列）
+
+        Args:
+            source_data: 集計に必要なデータ。Noneの場合はAnnofabから取得します。
+        """
+        if source_data is None:
+            source_data = self.get_source_data()
+
+        return create_df_task(
+            source_data.task_list,
+            source_data.task_history_dict,
+            not_worked_threshold_second=self.not_worked_threshold_second,
+            metadata_keys=self.metadata_keys,
+            input_data_dict=source_data.input_data_dict,
+        )
 
     def get_task_list_with_downloading(self) -> list[dict[str, Any]]:
         """
@@ -418,7 +592,7 @@ class ListTaskCountByPhase(CommandLine):
 
     def list_task_count_by_phase(
         self,
-        project_id: str,
+        project_id_list: list[str],
         *,
         temp_dir: Path | None = None,
         should_execute_get_tasks_api: bool = False,
@@ -428,20 +602,20 @@ class ListTaskCountByPhase(CommandLine):
     ) -> None:
         """
         フェーズごとにタスク数や入力データ数などを集計し、CSV形式で出力する。
+        複数のプロジェクトを指定した場合は、あるプロジェクトを集計している間に次のプロジェクトのデータを取得し、
+        先頭に ``project_id`` 列を付けた1つのCSVを出力する。
 
         Args:
-            project_id: プロジェクトID
-            temp_dir: 一時ファイルの保存先ディレクトリ
+            project_id_list: プロジェクトIDのリスト
+            temp_dir: 一時ファイルの保存先ディレクトリ。Noneの場合は、プロジェクトごとに一時ディレクトリを作成して、データを取得したら削除する。
             should_execute_get_tasks_api: getTasks APIを実行するかどうか
             not_worked_threshold_second: 作業していないとみなす作業時間の閾値（秒）
             metadata_keys: 集計対象のメタデータキーのリスト
             unit: 集計の単位
         """
 
-        logger.info(f"project_id='{project_id}' :: フェーズごとの'{unit.value}'を集計します。")
-
-        if temp_dir is not None:
-            getting_obj = GettingTaskCountSummary(
+        def create_getting_obj(project_id: str, temp_dir: Path) -> GettingTaskCountSummary:
+            return GettingTaskCountSummary(
                 self.service,
                 project_id,
                 temp_dir,
@@ -450,49 +624,56 @@ class ListTaskCountByPhase(CommandLine):
                 metadata_keys=metadata_keys,
                 unit=unit,
             )
-            df_task = getting_obj.create_df_task()
-        else:
+
+        def prepare(project_id: str) -> TaskCountSourceData:
+            logger.info(f"project_id='{project_id}' :: フェーズごとの'{unit.value}'を集計するためのデータを取得します。")
+            if temp_dir is not None:
+                return create_getting_obj(project_id, temp_dir).get_source_data()
             with tempfile.TemporaryDirectory() as str_temp_dir:
-                getting_obj = GettingTaskCountSummary(
-                    self.service,
-                    project_id,
-                    Path(str_temp_dir),
-                    should_execute_get_tasks_api=should_execute_get_tasks_api,
-                    not_worked_threshold_second=not_worked_threshold_second,
-                    metadata_keys=metadata_keys,
-                    unit=unit,
-                )
-                df_task = getting_obj.create_df_task()
-
-        if len(df_task) == 0:
-            logger.info("タスクが0件ですが、ヘッダ行を出力します。")
-            # aggregate_df関数と同じ列構成の空のDataFrameを作成
-            metadata_columns = [f"metadata.{key}" for key in (metadata_keys or [])]
-            result_columns = [
-                "phase",
-                *metadata_columns,
-                TaskStatusForSummary.NEVER_WORKED_UNASSIGNED.value,
-                TaskStatusForSummary.NEVER_WORKED_ASSIGNED.value,
-                TaskStatusForSummary.WORKED_NOT_REJECTED.value,
-                TaskStatusForSummary.WORKED_REJECTED.value,
-                TaskStatusForSummary.ON_HOLD.value,
-                TaskStatusForSummary.COMPLETE.value,
-            ]
-            df_summary = pandas.DataFrame(columns=result_columns)
-        else:
-            logger.info(f"{len(df_task)} 件のタスクを集計しました。")
-            df_summary = aggregate_df(df_task, metadata_keys, unit)
+                return create_getting_obj(project_id, Path(str_temp_dir)).get_source_data()
 
-        self.print_csv(df_summary)
-        logger.info(f"project_id='{project_id}' :: フェーズごとの'{unit.value}'をCSV形式で出力しました。")
+        def compute(project_id: str, source_data: TaskCountSourceData) -> pandas.DataFrame:
+            df_task = create_df_task(
+                source_data.task_list,
+                source_data.task_history_dict,
+                not_worked_threshold_second=not_worked_threshold_second,
+                metadata_keys=metadata_keys,
+                input_data_dict=source_data.input_data_dict,
+            )
+            if len(df_task) == 0:
+                logger.info(f"project_id='{project_id}' :: タスクが0件です。")
+                return create_empty_summary_df(metadata_keys)
+
+            logger.info(f"project_id='{project_id}' :: {len(df_task)} 件のタスクを集計しました。")
+            return aggregate_df(df_task, metadata_keys, unit)
+
+        df_by_project_id: dict[str, pandas.DataFrame] = {}
+        failed_project_id_list: list[str] = []
+        # 1個のプロジェクトしか指定していない場合は例外をそのまま送出するので、トレースバックはログに出力しない
+        for project_result in run_projects_in_pipeline(project_id_list, prepare, compute, log_traceback=len(project_id_list) > 1):
+            if project_result.error is not None:
+                if len(project_id_list) == 1:
+                    # 1個のプロジェクトしか指定していない場合は、従来どおり例外をそのまま送出する
+                    raise project_result.error
+                failed_project_id_list.append(project_result.project_id)
+                continue
+            assert project_result.result is not None
+            df_by_project_id[project_result.project_id] = project_result.result
+
+        if len(project_id_list) == 1:
+            df_summary = df_by_project_id[project_id_list[0]]
+        else:
+            df_summary = concat_summary_df_by_project(df_by_project_id, metadata_keys)
 
-    def main(self) -> None:
-        args = self.args
-        project_id = args.project_id
-        temp_dir = Path(args.temp_dir) if args.temp_dir is not None else None
+        if len(df_summary) == 0:
+            logger.info("集計結果が0件ですが、ヘッダ行を出力します。")
 
-        unit = AggregationUnit(args.unit)
+        self.print_csv(df_summary)
+        logger.info(f"{len(df_by_project_id)} 件のプロジェクトについて、フェーズごとの'{unit.value}'をCSV形式で出力しました。")
+        if len(failed_project_id_list) > 0:
+            logger.warning(f"以下の {len(failed_project_id_list)} 件のプロジェクトは、集計に失敗したため出力していません。 :: {failed_project_id_list}")
 
+    def validate(self, project_id: str, unit: AggregationUnit) -> bool:
         super().validate_project(project_id, project_member_roles=[ProjectMemberRole.OWNER, ProjectMemberRole.TRAINING_DATA_USER])
 
         # 動画時間で集計する場合は、プロジェクトが動画プロジェクトかどうかをチェック
@@ -500,12 +681,26 @@ class ListTaskCountByPhase(CommandLine):
             project, _ = self.service.api.get_project(project_id)
             input_data_type = project["input_data_type"]
             if input_data_type != "movie":
-                print(f"コマンドライン引数'--unit {unit.value}' は動画プロジェクトでのみ使用できます。現在のプロジェクトの入力データタイプは'{input_data_type}'です。", file=sys.stderr)  # noqa: T201
-                sys.exit(COMMAND_LINE_ERROR_STATUS_CODE)
+                print(  # noqa: T201
+                    f"コマンドライン引数'--unit {unit.value}' は動画プロジェクトでのみ使用できます。project_id='{project_id}' の入力データタイプは'{input_data_type}'です。",
+                    file=sys.stderr,
+                )
+                return False
+        return True
+
+    def main(self) -> None:
+        args = self.args
+        project_id_list = annofabcli.common.cli.get_list_from_args(args.project_id)
+        unit = AggregationUnit(args.unit)
+
+        # 途中のプロジェクトで処理が止まらないように、集計を始める前にすべてのプロジェクトを検証する
+        validation_results = [self.validate(project_id, unit) for project_id in project_id_list]
+        if not all(validation_results):
+            sys.exit(COMMAND_LINE_ERROR_STATUS_CODE)
 
         self.list_task_count_by_phase(
-            project_id,
-            temp_dir=temp_dir,
+            project_id_list,
+            temp_dir=Path(args.temp_dir) if args.temp_dir is not None else None,
             should_execute_get_tasks_api=args.execute_get_tasks_api,
             not_worked_threshold_second=args.not_worked_threshold_second,
             metadata_keys=args.metadata_key,
@@ -516,7 +711,18 @@ class ListTaskCountByPhase(CommandLine):
 def parse_args(parser: argparse.ArgumentParser) -> None:
     argument_parser = ArgumentParser(parser)
 
-    argument_parser.add_project_id()
+    parser.add_argument(
+        "-p",
+        "--project_id",
+        type=str,
+        required=True,
+        nargs="+",
+        help=(
+            "対象のプロジェクトのproject_idを指定してください。"
+            "複数指定した場合は、あるプロジェクトを集計している間に次のプロジェクトのデータを取得し、先頭に ``project_id`` 列を付けた1つのCSVを出力します。\n"
+            "``file://`` を先頭に付けると、project_idが記載されたファイルを指定できます。"
+        ),
+    )
 
     parser.add_argument(
         "--execute_get_tasks_api",
@@ -8,6 +8,7 @@ import annofabapi
 from annofabapi.models import TaskHistory
 
 import annofabcli.common.cli
+from annofabcli.common.annofab.project_mirror import ProjectMirror, open_project_mirror
 from annofabcli.common.cli import ArgumentParser, CommandLine, build_annofabapi_resource_and_login
 from annofabcli.common.download import DownloadingFile
 from annofabcli.common.enums import OutputFormat
@@ -39,8 +40,28 @@ class ListTaskHistoryWithJsonMain:
                 filtered_task_history_dict[task_id] = task_history_list
         return filtered_task_history_dict
 
-    def get_task_history_dict(self, project_id: str, task_history_json: Path | None = None, task_id_list: list[str] | None = None, temp_dir: Path | None = None) -> TaskHistoryDict:
-        """出力対象のタスク履歴情報を取得する"""
+    def get_task_history_dict(
+        self,
+        project_id: str,
+        task_history_json: Path | None = None,
+        task_id_list: list[str] | None = None,
+        temp_dir: Path | None = None,
+        *,
+        mirror: ProjectMirror | None = None,
+    ) -> TaskHistoryDict:
+        """出力対象のタスク履歴情報を取得する
+
+        Args:
+            mirror: 指定した場合、全件ファイルをダウンロードせずに、ミラーからタスク履歴を取得します。
+        """
+        if mirror is not None:
+            task_history_dict = self.filter_task_history_dict(mirror.get_task_history_dict(project_id, task_ids=task_id_list), task_id_list)
+            visualize = AddProps(self.service, project_id)
+            for task_history_list in task_history_dict.values():
+                for task_history in task_history_list:
+                    visualize.add_properties_to_task_history(task_history)
+            return task_history_dict
+
         if task_history_json is None:
             downloading_obj = DownloadingFile(self.service)
             # `NamedTemporaryFile`を使わない理由: Windowsで`PermissionError`が発生するため
@@ -94,6 +115,8 @@ class ListTaskHistoryWithJson(CommandLine):
         task_id_list: list[str] | None,
         arg_format: OutputFormat,
         temp_dir: Path | None,
+        *,
+        mirror: ProjectMirror | None = None,
     ) -> None:
         """
         タスク一覧を出力する
@@ -109,7 +132,7 @@ class ListTaskHistoryWithJson(CommandLine):
         super().validate_project(project_id, project_member_roles=None)
 
         main_obj = ListTaskHistoryWithJsonMain(self.service)
-        task_history_dict = main_obj.get_task_history_dict(project_id, task_history_json=task_history_json, task_id_list=task_id_list, temp_dir=temp_dir)
+        task_history_dict = main_obj.get_task_history_dict(project_id, task_history_json=task_history_json, task_id_list=task_id_list, temp_dir=temp_dir, mirror=mirror)
         logger.debug(f"{len(task_history_dict)} 件のタスクの履歴情報を出力します。")
         if arg_format == OutputFormat.CSV:
             all_task_history_list = main_obj.to_all_task_history_list_from_dict(task_history_dict)
@@ -123,13 +146,15 @@ class ListTaskHistoryWithJson(CommandLine):
         task_id_list = annofabcli.common.cli.get_list_from_args(args.task_id) if args.task_id is not None else None
         temp_dir = Path(args.temp_dir) if args.temp_dir is not None else None
 
-        self.print_task_history_list(
-            args.project_id,
-            task_history_json=args.task_history_json,
-            task_id_list=task_id_list,
-            arg_format=OutputFormat(args.format),
-            temp_dir=temp_dir,
-        )
+        with open_project_mirror(enabled=args.from_mirror) as mirror:
+            self.print_task_history_list(
+                args.project_id,
+                task_history_json=args.task_history_json,
+                task_id_list=task_id_list,
+                arg_format=OutputFormat(args.format),
+                temp_dir=temp_dir,
+                mirror=mirror,
+            )
 
 
 def main(args: argparse.Namespace) -> None:
@@ -150,12 +175,18 @@ def parse_args(parser: argparse.ArgumentParser) -> None:
         help="対象のタスクのtask_idを指定します。 ``file://`` を先頭に付けると、task_idの一覧が記載されたファイルを指定できます。",
     )
 
-    parser.add_argument(
+    source_group = parser.add_mutually_exclusive_group()
+    source_group.add_argument(
         "--task_history_json",
         type=Path,
         help="タスク履歴情報が記載されたJSONファイルのパスを指定すると、JSONに記載された情報を元にタスク履歴一覧を出力します。\n"
         "JSONファイルは ``$ annofabcli task_history download`` コマンドで取得できます。",
     )
+    source_group.add_argument(
+        "--from_mirror",
+        action="store_true",
+        help="全件ファイルをダウンロードせずに、 ``$ annofabcli mirror sync`` コマンドで同期したミラーからタスク履歴一覧を出力します。",
+    )
 
     parser.add_argument(
         "--temp_dir",
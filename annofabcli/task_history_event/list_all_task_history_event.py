@@ -12,6 +12,7 @@ import pandas
 from annofabapi.models import TaskHistoryEvent
 
 import annofabcli.common.cli
+from annofabcli.common.annofab.task_history_event_store import TaskHistoryEventStore, add_event_store_argument, open_task_history_event_store
 from annofabcli.common.cli import (
     ArgumentParser,
     CommandLine,
@@ -57,19 +58,53 @@ class ListTaskHistoryEventWithJsonMain:
             cls._add_user_info(visualize, task_history_event["request"])
 
     @staticmethod
-    def filter_task_history_event(task_history_event_list: list[TaskHistoryEvent], task_id_list: list[str] | None = None) -> list[TaskHistoryEvent]:
-        if task_id_list is not None:
-            result = []
-            task_id_set = set(task_id_list)
+    def filter_task_history_event(
+        task_history_event_list: list[TaskHistoryEvent],
+        task_id_list: list[str] | None = None,
+        *,
+        start_date: str | None = None,
+        end_date: str | None = None,
+    ) -> list[TaskHistoryEvent]:
+        if task_id_list is None and start_date is None and end_date is None:
+            return task_history_event_list
+
+        task_id_set = set(task_id_list) if task_id_list is not None else None
+        result = []
+        for event in task_history_event_list:
+            if task_id_set is not None and event["task_id"] not in task_id_set:
+                continue
+            created_date = event["created_datetime"][:10]
+            if start_date is not None and created_date < start_date:
+                continue
+            if end_date is not None and created_date > end_date:
+                continue
+            result.append(event)
+        return result
+
+    def get_task_history_event_list(
+        self,
+        project_id: str,
+        task_history_event_json: Path | None = None,
+        task_id_list: list[str] | None = None,
+        temp_dir: Path | None = None,
+        *,
+        start_date: str | None = None,
+        end_date: str | None = None,
+        task_history_event_store: TaskHistoryEventStore | None = None,
+    ) -> list[dict[str, Any]]:
+        """
+        Args:
+            task_history_event_store: 指定した場合、タスク履歴イベント全件ファイルから新しいタスク履歴イベントだけをストアに取り込んで、ストアから取得します。
+                ``task_history_event_json`` を指定した場合は利用しません。
+        """
+        if task_history_event_json is None and task_history_event_store is not None:
+            task_history_event_store.update(self.service, project_id)
+            task_history_event_list = task_history_event_store.query(project_id, task_ids=task_id_list, start_date=start_date, end_date=end_date)
+            visualize = AddProps(self.service, project_id)
             for event in task_history_event_list:
-                if event["task_id"] in task_id_set:
-                    result.append(event)  # noqa: PERF401
-
-            return result
+                self._add_properties_to_task_history_event(visualize, event)
+            return task_history_event_list
 
-        return task_history_event_list
-
-    def get_task_history_event_list(self, project_id: str, task_history_event_json: Path | None = None, task_id_list: list[str] | None = None, temp_dir: Path | None = None) -> list[dict[str, Any]]:
         if task_history_event_json is None:
             downloading_obj = DownloadingFile(self.service)
             # `NamedTemporaryFile`を使わない理由: Windowsで`PermissionError`が発生するため
@@ -82,7 +117,7 @@ class ListTaskHistoryEventWithJsonMain:
                     with tmp_json_file.open(encoding="utf-8") as f:
                         all_task_history_event_list = json.load(f)
                         # 一時ディレクトリの場合はここでフィルタリング処理まで行う
-                        filtered_task_history_event_list = self.filter_task_history_event(all_task_history_event_list, task_id_list)
+                        filtered_task_history_event_list = self.filter_task_history_event(all_task_history_event_list, task_id_list, start_date=start_date, end_date=end_date)
 
                         visualize = AddProps(self.service, project_id)
 
@@ -96,7 +131,7 @@ class ListTaskHistoryEventWithJsonMain:
         with tmp_json_file.open(encoding="utf-8") as f:
             all_task_history_event_list = json.load(f)
 
-        filtered_task_history_event_list = self.filter_task_history_event(all_task_history_event_list, task_id_list)
+        filtered_task_history_event_list = self.filter_task_history_event(all_task_history_event_list, task_id_list, start_date=start_date, end_date=end_date)
 
         visualize = AddProps(self.service, project_id)
 
@@ -114,11 +149,23 @@ class ListTaskHistoryEventWithJson(CommandLine):
         task_id_list: list[str] | None,
         arg_format: OutputFormat,
         temp_dir: Path | None,
+        *,
+        start_date: str | None = None,
+        end_date: str | None = None,
+        task_history_event_store: TaskHistoryEventStore | None = None,
     ) -> None:
         super().validate_project(project_id, project_member_roles=None)
 
         main_obj = ListTaskHistoryEventWithJsonMain(self.service)
-        task_history_event_list = main_obj.get_task_history_event_list(project_id, task_history_event_json=task_history_event_json, task_id_list=task_id_list, temp_dir=temp_dir)
+        task_history_event_list = main_obj.get_task_history_event_list(
+            project_id,
+            task_history_event_json=task_history_event_json,
+            task_id_list=task_id_list,
+            temp_dir=temp_dir,
+            start_date=start_date,
+            end_date=end_date,
+            task_history_event_store=task_history_event_store,
+        )
 
         logger.debug(f"{len(task_history_event_list)} 件のタスク履歴イベントの情報を出力します。")
 
@@ -155,13 +202,17 @@ class ListTaskHistoryEventWithJson(CommandLine):
         task_id_list = get_list_from_args(args.task_id) if args.task_id is not None else None
         temp_dir = Path(args.temp_dir) if args.temp_dir is not None else None
 
-        self.print_task_history_event_list(
-            args.project_id,
-            task_history_event_json=args.task_history_event_json,
-            task_id_list=task_id_list,
-            arg_format=OutputFormat(args.format),
-            temp_dir=temp_dir,
-        )
+        with open_task_history_event_store(enabled=args.event_store) as task_history_event_store:
+            self.print_task_history_event_list(
+                args.project_id,
+                task_history_event_json=args.task_history_event_json,
+                task_id_list=task_id_list,
+                arg_format=OutputFormat(args.format),
+                temp_dir=temp_dir,
+                start_date=args.start_date,
+                end_date=args.end_date,
+                task_history_event_store=task_history_event_store,
+            )
 
     @staticmethod
     def to_all_task_history_event_list_from_dict(task_history_event_dict: dict[str, list[dict[str, Any]]]) -> list[dict[str, Any]]:
@@ -203,6 +254,11 @@ def parse_args(parser: argparse.ArgumentParser) -> None:
         help="``--task_history_event_json`` を指定しなかった場合、ダウンロードしたJSONファイルの保存先ディレクトリを指定できます。指定しない場合は、一時ディレクトリに保存されます。",
     )
 
+    parser.add_argument("--start_date", type=str, help="指定した日付（ ``YYYY-MM-DD`` ）以降に作成されたタスク履歴イベントを出力します。")
+    parser.add_argument("--end_date", type=str, help="指定した日付（ ``YYYY-MM-DD`` ）以前に作成されたタスク履歴イベントを出力します。")
+
+    add_event_store_argument(parser)
+
     argument_parser.add_format(
         choices=[OutputFormat.CSV, OutputFormat.JSON, OutputFormat.PRETTY_JSON],
         default=OutputFormat.CSV,
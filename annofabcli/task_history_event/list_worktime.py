@@ -16,6 +16,7 @@ from dataclasses_json import DataClassJsonMixin
 from dateutil.parser import parse
 
 import annofabcli.common.cli
+from annofabcli.common.annofab.task_history_event_store import TaskHistoryEventStore, add_event_store_argument, open_task_history_event_store
 from annofabcli.common.cli import (
     ArgumentParser,
     CommandLine,
@@ -235,12 +236,23 @@ class ListWorktimeFromTaskHistoryEventMain:
         task_id_list: list[str] | None = None,
         user_id_list: list[str] | None = None,
         temp_dir: Path | None = None,
+        *,
+        task_history_event_store: TaskHistoryEventStore | None = None,
     ) -> list[WorktimeFromTaskHistoryEvent]:
-        all_task_history_event_list = self.get_task_history_event_list(project_id, task_history_event_json=task_history_event_json, temp_dir=temp_dir)
-
+        """
+        Args:
+            task_history_event_store: 指定した場合、タスク履歴イベント全件ファイルから新しいタスク履歴イベントだけをストアに取り込んで、
+                対象のタスクとユーザのタスク履歴イベントだけをストアから取得します。 ``task_history_event_json`` を指定した場合は利用しません。
+        """
         task_id_set = set(task_id_list) if task_id_list is not None else None
         account_id_set = self.get_account_ids_from_user_ids(project_id, set(user_id_list)) if user_id_list is not None else None
 
+        if task_history_event_json is None and task_history_event_store is not None:
+            task_history_event_store.update(self.service, project_id)
+            all_task_history_event_list = task_history_event_store.query(project_id, task_ids=task_id_set, account_ids=account_id_set)
+        else:
+            all_task_history_event_list = self.get_task_history_event_list(project_id, task_history_event_json=task_history_event_json, temp_dir=temp_dir)
+
         task_history_event_dict = self._create_task_history_event_dict(all_task_history_event_list, task_ids=task_id_set, account_ids=account_id_set)
 
         worktime_list = []
@@ -259,6 +271,8 @@ class ListWorktimeFromTaskHistoryEvent(CommandLine):
         user_id_list: list[str] | None,
         arg_format: OutputFormat,
         temp_dir: Path | None = None,
+        *,
+        task_history_event_store: TaskHistoryEventStore | None = None,
     ) -> None:
         super().validate_project(project_id, project_member_roles=None)
 
@@ -269,6 +283,7 @@ class ListWorktimeFromTaskHistoryEvent(CommandLine):
             task_id_list=task_id_list,
             user_id_list=user_id_list,
             temp_dir=temp_dir,
+            task_history_event_store=task_history_event_store,
         )
 
         logger.debug(f"作業時間一覧の件数: {len(worktime_list)}")
@@ -311,14 +326,16 @@ class ListWorktimeFromTaskHistoryEvent(CommandLine):
         task_id_list = get_list_from_args(args.task_id) if args.task_id is not None else None
         user_id_list = get_list_from_args(args.user_id) if args.user_id is not None else None
 
-        self.print_worktime_from_task_history_event(
-            args.project_id,
-            task_history_event_json=args.task_history_event_json,
-            task_id_list=task_id_list,
-            user_id_list=user_id_list,
-            arg_format=OutputFormat(args.format),
-            temp_dir=args.temp_dir,
-        )
+        with open_task_history_event_store(enabled=args.event_store) as task_history_event_store:
+            self.print_worktime_from_task_history_event(
+                args.project_id,
+                task_history_event_json=args.task_history_event_json,
+                task_id_list=task_id_list,
+                user_id_list=user_id_list,
+                arg_format=OutputFormat(args.format),
+                temp_dir=args.temp_dir,
+                task_history_event_store=task_history_event_store,
+            )
 
     @staticmethod
     def to_all_task_history_event_list_from_dict(task_history_event_dict: dict[str, list[dict[str, Any]]]) -> list[dict[str, Any]]:
@@ -375,6 +392,8 @@ def parse_args(parser: argparse.ArgumentParser) -> None:
         help="指定したディレクトリに、タスク履歴イベントJSONなどの一時ファイルをダウンロードします。",
     )
 
+    add_event_store_argument(parser)
+
     parser.set_defaults(subcommand_func=main)
 
 
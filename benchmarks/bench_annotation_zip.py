@@ -0,0 +1,19 @@
+from pathlib import Path
+
+from annofabcli.annotation_zip.list_annotation_bounding_box_2d import create_df, iter_annotation_bounding_box_info_from_annotation_path
+from annofabcli.statistics.list_annotation_count import ListAnnotationCounterByInputData
+from benchmarks.conftest import Benchmark
+from benchmarks.generators import SyntheticProject
+
+
+def bench_ListAnnotationCounterByInputData__get_annotation_counter_list(bench: Benchmark, annotation_zip: Path, synthetic_project: SyntheticProject) -> None:
+    counter_list = bench(ListAnnotationCounterByInputData().get_annotation_counter_list, annotation_zip)
+    assert len(counter_list) == len(synthetic_project.input_data_list)
+
+
+def bench_list_annotation_bounding_box_2d(bench: Benchmark, annotation_zip: Path, synthetic_project: SyntheticProject) -> None:
+    def list_annotation_bounding_box_2d():  # noqa: ANN202
+        return create_df(iter_annotation_bounding_box_info_from_annotation_path(annotation_zip))
+
+    df = bench(list_annotation_bounding_box_2d)
+    assert len(df) == len(synthetic_project.input_data_list) * synthetic_project.options.annotation_count_per_input_data
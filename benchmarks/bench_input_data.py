@@ -0,0 +1,12 @@
+import copy
+
+from annofabcli.input_data.list_all_input_data_merged_task import create_df_input_data_with_merged_task, create_input_data_list_with_merged_task
+from benchmarks.conftest import Benchmark
+from benchmarks.generators import SyntheticProject
+
+
+def bench_create_df_input_data_with_merged_task(bench: Benchmark, synthetic_project: SyntheticProject) -> None:
+    # `create_input_data_list_with_merged_task`は引数の入力データを書き換えるので、コピーを渡す
+    input_data_list = create_input_data_list_with_merged_task(copy.deepcopy(synthetic_project.input_data_list), synthetic_project.task_list)
+    df = bench(create_df_input_data_with_merged_task, input_data_list)
+    assert len(df) == len(synthetic_project.input_data_list)
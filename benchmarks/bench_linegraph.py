@@ -0,0 +1,39 @@
+from pathlib import Path
+
+import pytest
+
+from annofabcli.statistics.visualization.dataframe.cumulative_productivity import AnnotatorCumulativeProductivity
+from annofabcli.statistics.visualization.dataframe.task import Task
+from annofabcli.statistics.visualization.dataframe.task_history import TaskHistory
+from annofabcli.statistics.visualization.dataframe.task_worktime_by_phase_user import TaskWorktimeByPhaseUser
+from annofabcli.statistics.visualization.dataframe.user import User
+from benchmarks.conftest import Benchmark
+from benchmarks.generators import PROJECT_ID, SyntheticProject, create_task_df, create_user_df
+
+
+@pytest.fixture(scope="module")
+def annotator_cumulative_productivity(synthetic_project: SyntheticProject) -> AnnotatorCumulativeProductivity:
+    task_worktime_by_phase_user = TaskWorktimeByPhaseUser.from_df_wrapper(
+        TaskHistory.from_api_content(synthetic_project.task_histories),
+        User(create_user_df(synthetic_project)),
+        Task(create_task_df(synthetic_project)),
+        PROJECT_ID,
+    )
+    return AnnotatorCumulativeProductivity.from_df_wrapper(task_worktime_by_phase_user)
+
+
+@pytest.mark.parametrize("max_points_per_line", [None, 100])
+def bench_AnnotatorCumulativeProductivity__plot_production_volume_metrics_with_selector(
+    bench: Benchmark, annotator_cumulative_productivity: AnnotatorCumulativeProductivity, tmp_path: Path, max_points_per_line: int | None
+) -> None:
+    output_file = tmp_path / "累積折れ線-横軸_生産量-教師付者用.html"
+    bench(annotator_cumulative_productivity.plot_production_volume_metrics_with_selector, output_file, max_points_per_line=max_points_per_line)
+    bench.extra_info["html_size_kib"] = round(output_file.stat().st_size / 1024)
+
+
+def bench_AnnotatorCumulativeProductivity__plot_production_volume_metrics_with_selector__compress_html(
+    bench: Benchmark, annotator_cumulative_productivity: AnnotatorCumulativeProductivity, tmp_path: Path
+) -> None:
+    output_file = tmp_path / "累積折れ線-横軸_生産量-教師付者用.html"
+    bench(annotator_cumulative_productivity.plot_production_volume_metrics_with_selector, output_file, compress_html=True)
+    bench.extra_info["html_size_kib"] = round(output_file.stat().st_size / 1024)
@@ -0,0 +1,67 @@
+from pathlib import Path
+from unittest.mock import Mock
+
+import pytest
+
+from annofabcli.statistics.visualization.dataframe.actual_worktime import ActualWorktime
+from annofabcli.statistics.visualization.dataframe.task import Task
+from annofabcli.statistics.visualization.dataframe.task_history import TaskHistory
+from annofabcli.statistics.visualization.dataframe.task_worktime_by_phase_user import TaskWorktimeByPhaseUser
+from annofabcli.statistics.visualization.dataframe.user import User
+from annofabcli.statistics.visualization.dataframe.user_performance import UserPerformance
+from annofabcli.statistics.visualization.dataframe.worktime_per_date import WorktimePerDate
+from annofabcli.statistics.visualization.model import TaskCompletionCriteria
+from annofabcli.task_history_event.list_worktime import ListWorktimeFromTaskHistoryEventMain
+from benchmarks.conftest import Benchmark
+from benchmarks.generators import PROJECT_ID, SyntheticProject, create_task_df, create_user_df
+
+
+@pytest.fixture(scope="module")
+def task_history(synthetic_project: SyntheticProject) -> TaskHistory:
+    return TaskHistory.from_api_content(synthetic_project.task_histories)
+
+
+@pytest.fixture(scope="module")
+def task(synthetic_project: SyntheticProject) -> Task:
+    return Task(create_task_df(synthetic_project))
+
+
+@pytest.fixture(scope="module")
+def user(synthetic_project: SyntheticProject) -> User:
+    return User(create_user_df(synthetic_project))
+
+
+@pytest.fixture(scope="module")
+def service(synthetic_project: SyntheticProject) -> Mock:
+    """プロジェクトメンバの取得だけを行うWebAPIのダミー"""
+    service = Mock()
+    service.wrapper.get_all_project_members.return_value = synthetic_project.project_member_list
+    return service
+
+
+def get_worktime_per_date(service: Mock, task_history_event_json: Path, user: User) -> WorktimePerDate:
+    worktime_list = ListWorktimeFromTaskHistoryEventMain(service, project_id=PROJECT_ID).get_worktime_list(PROJECT_ID, task_history_event_json=task_history_event_json)
+    df = WorktimePerDate.get_df_worktime(worktime_list, user.df, ActualWorktime.empty())
+    return WorktimePerDate(df)
+
+
+def bench_TaskHistory__from_api_content(bench: Benchmark, synthetic_project: SyntheticProject) -> None:
+    actual = bench(TaskHistory.from_api_content, synthetic_project.task_histories)
+    assert len(actual.df) == sum(len(e) for e in synthetic_project.task_histories.values())
+
+
+def bench_TaskWorktimeByPhaseUser__from_df_wrapper(bench: Benchmark, task_history: TaskHistory, user: User, task: Task) -> None:
+    actual = bench(TaskWorktimeByPhaseUser.from_df_wrapper, task_history, user, task, PROJECT_ID)
+    assert not actual.is_empty()
+
+
+def bench_WorktimePerDate__from_task_history_event(bench: Benchmark, service: Mock, task_history_event_json: Path, user: User) -> None:
+    actual = bench(get_worktime_per_date, service, task_history_event_json, user)
+    assert not actual.is_empty()
+
+
+def bench_UserPerformance__from_df_wrapper(bench: Benchmark, service: Mock, task_history_event_json: Path, task_history: TaskHistory, user: User, task: Task) -> None:
+    worktime_per_date = get_worktime_per_date(service, task_history_event_json, user)
+    task_worktime_by_phase_user = TaskWorktimeByPhaseUser.from_df_wrapper(task_history, user, task, PROJECT_ID)
+    actual = bench(UserPerformance.from_df_wrapper, worktime_per_date, task_worktime_by_phase_user, TaskCompletionCriteria.ACCEPTANCE_COMPLETED)
+    assert len(actual.df) == len(user.df)
@@ -0,0 +1,203 @@
+"""
+ベンチマーク用のpytestの設定
+
+``bench`` fixtureで処理時間とピークメモリ使用量を計測します。
+外部のベンチマーク用ライブラリには依存せず、オフラインで実行できます。
+"""
+
+from __future__ import annotations
+
+import gc
+import json
+import os
+import platform
+import time
+import tracemalloc
+from collections.abc import Callable
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, ParamSpec, TypeVar
+
+import pytest
+
+from benchmarks.generators import SyntheticProject, SyntheticProjectOptions, generate_synthetic_project, write_annotation_zip, write_json
+
+P = ParamSpec("P")
+R = TypeVar("R")
+
+DEFAULT_TASK_COUNT = 1000
+
+_results_key = pytest.StashKey[list["BenchmarkResult"]]()
+
+
+@dataclass(frozen=True)
+class BenchmarkResult:
+    name: str
+    task_count: int
+    rounds: int
+    min_seconds: float
+    mean_seconds: float
+    peak_memory_mib: float
+    """ `tracemalloc` で計測したピークメモリ使用量[MiB]"""
+    extra_info: dict[str, Any] = field(default_factory=dict)
+    """出力ファイルのサイズなど、処理時間とメモリ使用量以外の計測値"""
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    group = parser.getgroup("annofabcli-benchmark")
+    group.addoption(
+        "--task_count",
+        type=int,
+        default=int(os.environ.get("ANNOFABCLI_BENCHMARK_TASK_COUNT", DEFAULT_TASK_COUNT)),
+        help=f"合成するプロジェクトのタスク数。環境変数 ``ANNOFABCLI_BENCHMARK_TASK_COUNT`` でも指定できます。デフォルトは{DEFAULT_TASK_COUNT}です。",
+    )
+    group.addoption("--benchmark_rounds", type=int, default=3, help="処理時間を計測する回数。最小値と平均値を記録します。")
+    group.addoption("--benchmark_save", type=Path, help="計測結果をJSON形式で出力するファイルのパス")
+    group.addoption("--benchmark_compare", type=Path, help="比較対象の計測結果（ ``--benchmark_save`` で出力したJSON）のパス")
+    group.addoption(
+        "--benchmark_max_ratio",
+        type=float,
+        default=1.5,
+        help="``--benchmark_compare`` の計測結果に比べて、処理時間またはピークメモリ使用量が何倍を超えたら失敗とみなすか",
+    )
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    config.stash[_results_key] = []
+
+
+def _load_baseline(path: Path | None) -> dict[tuple[str, int], BenchmarkResult]:
+    if path is None:
+        return {}
+    with path.open(encoding="utf-8") as f:
+        content = json.load(f)
+    return {(e["name"], e["task_count"]): BenchmarkResult(**e) for e in content["results"]}
+
+
+class Benchmark:
+    """
+    関数の処理時間とピークメモリ使用量を計測します。
+
+    処理時間は ``rounds`` 回計測します。ピークメモリ使用量は、 ``tracemalloc`` のオーバーヘッドが処理時間に影響しないように、別途1回実行して計測します。
+    """
+
+    def __init__(self, name: str, *, task_count: int, rounds: int, results: list[BenchmarkResult], baseline: BenchmarkResult | None, max_ratio: float) -> None:
+        self.name = name
+        self.task_count = task_count
+        self.rounds = rounds
+        self.results = results
+        self.baseline = baseline
+        self.max_ratio = max_ratio
+        self.extra_info: dict[str, Any] = {}
+        """計測結果に含める任意の情報。 ``bench`` を呼び出した後に設定しても反映されます。"""
+
+    def __call__(self, func: Callable[P, R], *args: P.args, **kwargs: P.kwargs) -> R:
+        seconds_list = []
+        result: R
+        for _ in range(self.rounds):
+            gc.collect()
+            start_time = time.perf_counter()
+            result = func(*args, **kwargs)
+            seconds_list.append(time.perf_counter() - start_time)
+
+        gc.collect()
+        tracemalloc.start()
+        try:
+            func(*args, **kwargs)
+            _, peak_memory = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        benchmark_result = BenchmarkResult(
+            name=self.name,
+            task_count=self.task_count,
+            rounds=self.rounds,
+            min_seconds=min(seconds_list),
+            mean_seconds=sum(seconds_list) / len(seconds_list),
+            peak_memory_mib=peak_memory / 1024**2,
+            extra_info=self.extra_info,
+        )
+        self.results.append(benchmark_result)
+        self._compare(benchmark_result)
+        return result
+
+    def _compare(self, actual: BenchmarkResult) -> None:
+        baseline = self.baseline
+        if baseline is None:
+            return
+
+        messages = []
+        if actual.min_seconds > baseline.min_seconds * self.max_ratio:
+            messages.append(f"処理時間が{baseline.min_seconds:.3f}秒から{actual.min_seconds:.3f}秒に増加しました。")
+        if actual.peak_memory_mib > baseline.peak_memory_mib * self.max_ratio:
+            messages.append(f"ピークメモリ使用量が{baseline.peak_memory_mib:.1f}MiBから{actual.peak_memory_mib:.1f}MiBに増加しました。")
+        if len(messages) > 0:
+            pytest.fail(f"'{self.name}'の性能が{self.max_ratio}倍を超えて劣化しました。 :: {' '.join(messages)}")
+
+
+@pytest.fixture
+def bench(request: pytest.FixtureRequest, task_count: int) -> Benchmark:
+    config = request.config
+    name = request.node.name
+    baseline = _load_baseline(config.getoption("benchmark_compare")).get((name, task_count))
+    return Benchmark(
+        name,
+        task_count=task_count,
+        rounds=config.getoption("benchmark_rounds"),
+        results=config.stash[_results_key],
+        baseline=baseline,
+        max_ratio=config.getoption("benchmark_max_ratio"),
+    )
+
+
+@pytest.fixture(scope="session")
+def task_count(pytestconfig: pytest.Config) -> int:
+    return pytestconfig.getoption("task_count")
+
+
+@pytest.fixture(scope="session")
+def synthetic_project(task_count: int) -> SyntheticProject:
+    return generate_synthetic_project(SyntheticProjectOptions(task_count=task_count))
+
+
+@pytest.fixture(scope="session")
+def annotation_zip(synthetic_project: SyntheticProject, tmp_path_factory: pytest.TempPathFactory) -> Path:
+    output_zip = tmp_path_factory.mktemp("annotation") / "annotation.zip"
+    write_annotation_zip(synthetic_project, output_zip)
+    return output_zip
+
+
+@pytest.fixture(scope="session")
+def task_history_event_json(synthetic_project: SyntheticProject, tmp_path_factory: pytest.TempPathFactory) -> Path:
+    output_json = tmp_path_factory.mktemp("task_history_event") / "task_history_event.json"
+    write_json(synthetic_project.task_history_event_list, output_json)
+    return output_json
+
+
+def pytest_terminal_summary(terminalreporter: pytest.TerminalReporter, config: pytest.Config) -> None:
+    results = config.stash[_results_key]
+    if len(results) == 0:
+        return
+
+    terminalreporter.section("benchmark")
+    terminalreporter.write_line(f"{'name':<70} {'task_count':>10} {'min[s]':>10} {'mean[s]':>10} {'peak[MiB]':>10}")
+    for e in results:
+        extra_info = " ".join(f"{key}={value}" for key, value in e.extra_info.items())
+        terminalreporter.write_line(f"{e.name:<70} {e.task_count:>10} {e.min_seconds:>10.3f} {e.mean_seconds:>10.3f} {e.peak_memory_mib:>10.1f} {extra_info}".rstrip())
+
+
+def pytest_sessionfinish(session: pytest.Session) -> None:
+    config = session.config
+    output: Path | None = config.getoption("benchmark_save")
+    results = config.stash[_results_key]
+    if output is None or len(results) == 0:
+        return
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    content = {
+        "python_version": platform.python_version(),
+        "machine": platform.machine(),
+        "results": [asdict(e) for e in results],
+    }
+    with output.open(mode="w", encoding="utf-8") as f:
+        json.dump(content, f, ensure_ascii=False, indent=2)
@@ -0,0 +1,305 @@
+"""
+ベンチマーク用に、大規模プロジェクトを模した合成データを生成する関数の集まり
+
+生成するデータはAnnofabのWebAPIやダウンロードファイルと同じ構造です。
+乱数のシードを固定しているので、同じ引数なら常に同じデータを生成します。
+"""
+
+from __future__ import annotations
+
+import datetime
+import json
+import random
+import zipfile
+from collections.abc import Iterator
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import pandas
+
+PROJECT_ID = "00000000-0000-0000-0000-000000000000"
+BASE_DATETIME = datetime.datetime(2024, 1, 1, 9, 0, 0, tzinfo=datetime.timezone(datetime.timedelta(hours=9)))
+LABELS = ["car", "bike", "person", "traffic_sign", "traffic_light"]
+TASK_PERIOD_DAYS = 90
+"""タスクの作業日の範囲[日]"""
+
+
+def _format_datetime(dt: datetime.datetime) -> str:
+    return dt.isoformat(timespec="milliseconds")
+
+
+@dataclass(frozen=True)
+class SyntheticProjectOptions:
+    task_count: int
+    input_data_count_per_task: int = 2
+    annotation_count_per_input_data: int = 10
+    user_count: int = 50
+    seed: int = 0
+
+
+@dataclass
+class SyntheticProject:
+    """
+    合成したプロジェクトのデータ。各要素の構造はWebAPIのレスポンスと同じです。
+    """
+
+    options: SyntheticProjectOptions
+    project_member_list: list[dict[str, Any]]
+    task_list: list[dict[str, Any]]
+    input_data_list: list[dict[str, Any]]
+    task_histories: dict[str, list[dict[str, Any]]]
+    """key:task_id, value:タスク履歴のlist"""
+    task_history_event_list: list[dict[str, Any]]
+
+
+def generate_project_member_list(user_count: int) -> list[dict[str, Any]]:
+    return [
+        {
+            "project_id": PROJECT_ID,
+            "account_id": f"account{i:05d}",
+            "user_id": f"user{i:05d}",
+            "username": f"User {i:05d}",
+            "biography": "Japan" if i % 2 == 0 else "Vietnam",
+            "member_status": "active",
+            "member_role": "worker",
+        }
+        for i in range(user_count)
+    ]
+
+
+def _generate_task(options: SyntheticProjectOptions, rng: random.Random, task_index: int, account_ids: list[str]) -> tuple[dict[str, Any], list[dict[str, Any]], list[dict[str, Any]]]:
+    """
+    1個のタスクと、そのタスク履歴、タスク履歴イベントを生成します。
+    教師付フェーズで作業し、一部のタスクは検査フェーズを経由して受入フェーズで完了します。
+    """
+    task_id = f"task{task_index:07d}"
+    started = BASE_DATETIME + datetime.timedelta(seconds=rng.randrange(TASK_PERIOD_DAYS * 86400))
+
+    phases = ["annotation", "inspection", "acceptance"] if rng.random() < 0.3 else ["annotation", "acceptance"]
+    completed = rng.random() < 0.8
+
+    task_history_list: list[dict[str, Any]] = []
+    event_list: list[dict[str, Any]] = [
+        {
+            "project_id": PROJECT_ID,
+            "task_id": task_id,
+            "task_history_id": f"{task_id}_event0",
+            "created_datetime": _format_datetime(started - datetime.timedelta(days=1)),
+            "phase": "annotation",
+            "phase_stage": 1,
+            "status": "not_started",
+            "account_id": None,
+            "request": {"status": "not_started", "force": False, "account_id": None, "last_updated_datetime": None},
+        }
+    ]
+
+    current = started
+    for phase_index, phase in enumerate(phases):
+        is_last_phase = phase_index == len(phases) - 1
+        # 1つのフェーズを1~2回に分けて作業する
+        work_count = rng.randint(1, 2)
+        account_id = rng.choice(account_ids)
+        for work_index in range(work_count):
+            worktime = datetime.timedelta(seconds=rng.randrange(60, 2 * 3600))
+            ended = current + worktime
+            history_index = len(task_history_list)
+            task_history_list.append(
+                {
+                    "project_id": PROJECT_ID,
+                    "task_id": task_id,
+                    "task_history_id": f"{task_id}_history{history_index}",
+                    "started_datetime": _format_datetime(current),
+                    "ended_datetime": _format_datetime(ended),
+                    "accumulated_labor_time_milliseconds": f"PT{worktime.total_seconds():.3f}S",
+                    "phase": phase,
+                    "phase_stage": 1,
+                    "account_id": account_id,
+                }
+            )
+
+            end_status = "complete" if work_index == work_count - 1 else "break"
+            if is_last_phase and not completed:
+                end_status = "break"
+            for status, created in [("working", current), (end_status, ended)]:
+                event_list.append(
+                    {
+                        "project_id": PROJECT_ID,
+                        "task_id": task_id,
+                        "task_history_id": f"{task_id}_event{len(event_list)}",
+                        "created_datetime": _format_datetime(created),
+                        "phase": phase,
+                        "phase_stage": 1,
+                        "status": status,
+                        "account_id": account_id,
+                        "request": {"status": status, "force": False, "account_id": account_id, "last_updated_datetime": None},
+                    }
+                )
+            # 次の作業は数時間後に開始する
+            current = ended + datetime.timedelta(seconds=rng.randrange(600, 6 * 3600))
+
+    task = {
+        "project_id": PROJECT_ID,
+        "task_id": task_id,
+        "phase": phases[-1],
+        "phase_stage": 1,
+        "status": "complete" if completed else "break",
+        "input_data_id_list": [f"{task_id}_input{i}" for i in range(options.input_data_count_per_task)],
+        "account_id": task_history_list[-1]["account_id"],
+        "histories_by_phase": [{"account_id": e["account_id"], "phase": e["phase"], "phase_stage": e["phase_stage"], "worked": True} for e in task_history_list],
+        "work_time_span": 0,
+        "number_of_rejections": 0,
+        "started_datetime": task_history_list[-1]["started_datetime"],
+        "updated_datetime": task_history_list[-1]["ended_datetime"],
+        "operation_updated_datetime": task_history_list[-1]["ended_datetime"],
+        "sampling": None,
+    }
+    return task, task_history_list, event_list
+
+
+def generate_synthetic_project(options: SyntheticProjectOptions) -> SyntheticProject:
+    """
+    タスク、入力データ、タスク履歴、タスク履歴イベント、プロジェクトメンバを生成します。
+    """
+    rng = random.Random(options.seed)
+    project_member_list = generate_project_member_list(options.user_count)
+    account_ids = [e["account_id"] for e in project_member_list]
+
+    task_list = []
+    task_histories = {}
+    task_history_event_list = []
+    for task_index in range(options.task_count):
+        task, task_history_list, event_list = _generate_task(options, rng, task_index, account_ids)
+        task_list.append(task)
+        task_histories[task["task_id"]] = task_history_list
+        task_history_event_list.extend(event_list)
+
+    input_data_list = [
+        {
+            "project_id": PROJECT_ID,
+            "input_data_id": input_data_id,
+            "input_data_name": f"{input_data_id}.png",
+            "input_data_path": f"s3://example/{input_data_id}.png",
+            "updated_datetime": task["updated_datetime"],
+            "original_resolution": {"width": 1920, "height": 1080},
+            "system_metadata": {"input_duration": None, "_type": "Image"},
+            "metadata": {"camera": "front"},
+        }
+        for task in task_list
+        for input_data_id in task["input_data_id_list"]
+    ]
+
+    return SyntheticProject(
+        options=options,
+        project_member_list=project_member_list,
+        task_list=task_list,
+        input_data_list=input_data_list,
+        task_histories=task_histories,
+        task_history_event_list=task_history_event_list,
+    )
+
+
+def _iter_simple_annotation(project: SyntheticProject) -> Iterator[dict[str, Any]]:
+    rng = random.Random(project.options.seed)
+    for task in project.task_list:
+        for input_data_id in task["input_data_id_list"]:
+            details = []
+            for annotation_index in range(project.options.annotation_count_per_input_data):
+                x = rng.randrange(1800)
+                y = rng.randrange(1000)
+                details.append(
+                    {
+                        "label": rng.choice(LABELS),
+                        "annotation_id": f"{input_data_id}_anno{annotation_index}",
+                        "data": {
+                            "_type": "BoundingBox",
+                            "left_top": {"x": x, "y": y},
+                            "right_bottom": {"x": x + rng.randrange(1, 120), "y": y + rng.randrange(1, 80)},
+                        },
+                        "attributes": {"occluded": rng.random() < 0.2, "direction": rng.choice(["front", "rear", "side"])},
+                    }
+                )
+            yield {
+                "project_id": PROJECT_ID,
+                "annotation_format_version": "1.2.0",
+                "task_id": task["task_id"],
+                "task_phase": task["phase"],
+                "task_phase_stage": task["phase_stage"],
+                "task_status": task["status"],
+                "input_data_id": input_data_id,
+                "input_data_name": f"{input_data_id}.png",
+                "details": details,
+                "updated_datetime": task["updated_datetime"],
+            }
+
+
+def write_annotation_zip(project: SyntheticProject, output_zip: Path) -> None:
+    """
+    アノテーションZIPを出力します。ZIPの構造は、Annofabからダウンロードしたアノテーションzipと同じです。
+    全アノテーションをメモリに載せないように、入力データごとに生成しながら書き込みます。
+    """
+    output_zip.parent.mkdir(parents=True, exist_ok=True)
+    with zipfile.ZipFile(output_zip, mode="w", compression=zipfile.ZIP_DEFLATED, compresslevel=1) as zip_file:
+        for simple_annotation in _iter_simple_annotation(project):
+            zip_file.writestr(f"{simple_annotation['task_id']}/{simple_annotation['input_data_id']}.json", json.dumps(simple_annotation, ensure_ascii=False))
+
+
+def write_json(obj: Any, output_json: Path) -> None:  # noqa: ANN401
+    output_json.parent.mkdir(parents=True, exist_ok=True)
+    with output_json.open(mode="w", encoding="utf-8") as f:
+        json.dump(obj, f, ensure_ascii=False)
+
+
+def create_user_df(project: SyntheticProject) -> pandas.DataFrame:
+    """`User` クラスに渡すDataFrameを生成します。"""
+    return pandas.DataFrame(project.project_member_list, columns=["account_id", "user_id", "username", "biography"])
+
+
+def create_task_df(project: SyntheticProject) -> pandas.DataFrame:
+    """
+    `Task` クラスに渡すDataFrameを生成します。
+    フェーズごとの作業時間や作業者は、タスク履歴から算出します。
+    """
+    dict_member = {e["account_id"]: e for e in project.project_member_list}
+    rng = random.Random(project.options.seed)
+
+    rows = []
+    for task in project.task_list:
+        task_history_list = project.task_histories[task["task_id"]]
+        row: dict[str, Any] = {
+            "project_id": task["project_id"],
+            "task_id": task["task_id"],
+            "phase": task["phase"],
+            "phase_stage": task["phase_stage"],
+            "status": task["status"],
+            "number_of_rejections_by_inspection": 0,
+            "number_of_rejections_by_acceptance": 0,
+            "created_datetime": _format_datetime(BASE_DATETIME),
+            "first_acceptance_completed_datetime": task["updated_datetime"] if task["status"] == "complete" else None,
+            "worktime_hour": 0.0,
+            "input_data_count": len(task["input_data_id_list"]),
+            "annotation_count": project.options.annotation_count_per_input_data * len(task["input_data_id_list"]),
+            "inspection_comment_count": rng.randrange(3),
+            "inspection_comment_count_in_inspection_phase": 0,
+            "inspection_comment_count_in_acceptance_phase": 0,
+        }
+        for phase in ["annotation", "inspection", "acceptance"]:
+            sub_history_list = [e for e in task_history_list if e["phase"] == phase]
+            worktime_hour = sum(float(e["accumulated_labor_time_milliseconds"][2:-1]) for e in sub_history_list) / 3600
+            first_history = sub_history_list[0] if len(sub_history_list) > 0 else None
+            first_member = dict_member[first_history["account_id"]] if first_history is not None else None
+            row.update(
+                {
+                    f"first_{phase}_user_id": first_member["user_id"] if first_member is not None else None,
+                    f"first_{phase}_username": first_member["username"] if first_member is not None else None,
+                    f"first_{phase}_worktime_hour": worktime_hour,
+                    f"first_{phase}_started_datetime": first_history["started_datetime"] if first_history is not None else None,
+                    f"{phase}_worktime_hour": worktime_hour,
+                }
+            )
+            if phase != "annotation":
+                row[f"first_{phase}_reached_datetime"] = row[f"first_{phase}_started_datetime"]
+            row["worktime_hour"] += worktime_hour
+        rows.append(row)
+
+    return pandas.DataFrame(rows)
@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import copy
+import json
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from annofabcli.annotation_specs.apply_annotation_specs import (
+    AnnotationSpecsPlan,
+    apply_plan,
+    get_removed_choices,
+    get_removed_labels,
+    parse_plan,
+    validate_annotation_specs,
+)
+
+DATA_DIR = Path("./tests/data/annotation_specs")
+
+
+def load_annotation_specs() -> dict[str, Any]:
+    with (DATA_DIR / "annotation_specs.json").open(encoding="utf-8") as f:
+        annotation_specs = json.load(f)
+    annotation_specs["updated_datetime"] = "2026-04-24T00:00:00+09:00"
+    return annotation_specs
+
+
+def get_label_by_name_en(annotation_specs: dict[str, Any], label_name_en: str) -> dict[str, Any]:
+    return next(label for label in annotation_specs["labels"] if label["label_name"]["messages"][0]["message"] == label_name_en)
+
+
+class TestParsePlan:
+    def test_parse_plan(self) -> None:
+        plan = parse_plan(
+            {
+                "comment": "foo",
+                "operations": [
+                    {"operation": "add_label", "label_name_en": "truck", "annotation_type": "bounding_box"},
+                    {"operation": "delete_labels", "label_name_en": ["bike"]},
+                ],
+            }
+        )
+        assert plan.comment == "foo"
+        assert [operation.operation_type for operation in plan.operations] == ["add_label", "delete_labels"]
+        assert plan.operations[1].index == 2
+        assert plan.operations[1].arguments == {"label_name_en": ["bike"]}
+
+    def test_parse_plan__存在しない操作を指定するとエラー(self) -> None:
+        with pytest.raises(ValueError, match="1件目の操作"):
+            parse_plan({"operations": [{"operation": "unknown"}]})
+
+    def test_parse_plan__指定できないキーがあるとエラー(self) -> None:
+        with pytest.raises(ValueError, match="指定できないキー"):
+            parse_plan({"operations": [{"operation": "delete_labels", "label_name": ["bike"]}]})
+
+    def test_parse_plan__必須のキーがないとエラー(self) -> None:
+        with pytest.raises(ValueError, match="必須のキー"):
+            parse_plan({"operations": [{"operation": "add_label", "label_name_en": "truck"}]})
+
+    def test_parse_plan__操作が空だとエラー(self) -> None:
+        with pytest.raises(ValueError):
+            parse_plan({"operations": []})
+
+
+class TestApplyPlan:
+    def test_apply_plan__前の操作の結果に対して次の操作を適用する(self) -> None:
+        annotation_specs = load_annotation_specs()
+        original_annotation_specs = copy.deepcopy(annotation_specs)
+        plan = parse_plan(
+            {
+                "operations": [
+                    {"operation": "add_label", "label_name_en": "truck", "annotation_type": "bounding_box", "label_id": "truck_label_id"},
+                    {"operation": "add_attribute", "attribute_type": "flag", "attribute_name_en": "occluded", "attribute_id": "occluded_id", "label_name_en": ["car", "truck"]},
+                    {"operation": "put_label_color", "label_color": {"truck": [255, 0, 0]}},
+                    {"operation": "delete_labels", "label_name_en": ["bike"]},
+                    {"operation": "reorder_labels", "label_name_en": ["truck", "car", "bus"]},
+                ]
+            }
+        )
+
+        actual = apply_plan(annotation_specs, plan)
+
+        # 引数のアノテーション仕様は変更しない
+        assert annotation_specs == original_annotation_specs
+        assert [label["label_id"] for label in actual["labels"]] == ["truck_label_id", "car_label_id", "22b5189b-af7b-4d9c-83a5-b92f122170ec"]
+        truck_label = get_label_by_name_en(actual, "truck")
+        assert truck_label["color"] == {"red": 255, "green": 0, "blue": 0}
+        assert "occluded_id" in truck_label["additional_data_definitions"]
+        assert "occluded_id" in get_label_by_name_en(actual, "car")["additional_data_definitions"]
+        assert actual["last_updated_datetime"] == "2026-04-24T00:00:00+09:00"
+        # プランにコメントがないので、各操作のコメントを連結する
+        assert "truck" in actual["comment"]
+        assert "occluded" in actual["comment"]
+
+    def test_apply_plan__プランのコメントを優先する(self) -> None:
+        plan = AnnotationSpecsPlan(operations=parse_plan({"operations": [{"operation": "delete_labels", "label_name_en": ["bike"]}]}).operations, comment="foo")
+        actual = apply_plan(load_annotation_specs(), plan)
+        assert actual["comment"] == "foo"
+
+    def test_apply_plan__途中の操作が失敗すると何番目の操作か分かるエラーになる(self) -> None:
+        plan = parse_plan(
+            {
+                "operations": [
+                    {"operation": "delete_labels", "label_name_en": ["bike"]},
+                    {"operation": "reorder_labels", "label_name_en": ["bike", "car", "bus"]},
+                ]
+            }
+        )
+        with pytest.raises(ValueError, match="2件目の操作 'reorder_labels'"):
+            apply_plan(load_annotation_specs(), plan)
+
+    def test_apply_plan__同じラベルを2回追加するとエラー(self) -> None:
+        plan = parse_plan(
+            {
+                "operations": [
+                    {"operation": "add_label", "label_name_en": "truck", "annotation_type": "bounding_box"},
+                    {"operation": "add_label", "label_name_en": "truck", "annotation_type": "polygon"},
+                ]
+            }
+        )
+        with pytest.raises(ValueError, match="2件目の操作"):
+            apply_plan(load_annotation_specs(), plan)
+
+
+class TestValidateAnnotationSpecs:
+    def test_validate_annotation_specs(self) -> None:
+        validate_annotation_specs(load_annotation_specs())
+
+    def test_validate_annotation_specs__存在しない属性を参照しているとエラー(self) -> None:
+        annotation_specs = load_annotation_specs()
+        get_label_by_name_en(annotation_specs, "bike")["additional_data_definitions"].append("unknown_attribute_id")
+        with pytest.raises(ValueError, match="存在しない属性"):
+            validate_annotation_specs(annotation_specs)
+
+    def test_validate_annotation_specs__label_idが重複しているとエラー(self) -> None:
+        annotation_specs = load_annotation_specs()
+        get_label_by_name_en(annotation_specs, "bike")["label_id"] = "car_label_id"
+        with pytest.raises(ValueError, match="label_id"):
+            validate_annotation_specs(annotation_specs)
+
+
+def test_get_removed_labels_and_choices() -> None:
+    old_annotation_specs = load_annotation_specs()
+    plan = parse_plan(
+        {
+            "operations": [
+                {"operation": "delete_labels", "label_name_en": ["bike"]},
+                {"operation": "delete_choices", "attribute_name_en": "type", "choice_name_en": ["small"]},
+            ]
+        }
+    )
+    new_annotation_specs = apply_plan(old_annotation_specs, plan)
+
+    assert [label["label_id"] for label in get_removed_labels(old_annotation_specs, new_annotation_specs)] == ["40f7796b-3722-4eed-9c0c-04a27f9165d2"]
+    assert [(attribute["additional_data_definition_id"], choice["name"]["messages"][0]["message"]) for attribute, choice in get_removed_choices(old_annotation_specs, new_annotation_specs)] == [
+        ("71620647-98cf-48ad-b43b-4af425a24f32", "small")
+    ]
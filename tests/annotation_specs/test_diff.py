@@ -12,6 +12,7 @@ import yaml
 from annofabcli.__main__ import main
 from annofabcli.annotation_specs.diff_annotation_specs import AnnotationSpecsDiffCommand
 from annofabcli.annotation_specs.diff_compare import create_annotation_specs_diff
+from annofabcli.annotation_specs.diff_index import AnnotationSpecsIndex
 from annofabcli.annotation_specs.diff_text_formatter import format_annotation_specs_diff_as_text
 from annofabcli.common.facade import AnnofabApiFacade
 
@@ -294,6 +295,32 @@ class TestCreateAnnotationSpecsDiff:
             "changed_inspection_phrases": [],
         }
 
+    def test_属性制約の順序だけが異なる場合は差分にしない(self):
+        left_specs = _create_annotation_specs()
+        left_specs["restrictions"] = [
+            _create_restriction("attr_occluded", {"_type": "Equals", "value": "choice_yes"}),
+            _create_restriction("attr_truncated", {"_type": "CanInput", "enable": False}),
+            _create_restriction("attr_occluded", {"_type": "NotEquals", "value": "choice_no"}),
+        ]
+        right_specs = copy.deepcopy(left_specs)
+        right_specs["restrictions"].reverse()
+
+        actual = create_annotation_specs_diff(left_specs, right_specs, targets={"attribute_restrictions"})
+
+        assert actual.has_changes() is False
+
+    def test_索引を渡しても同じ差分になる(self):
+        left_specs = _create_annotation_specs()
+        right_specs = copy.deepcopy(left_specs)
+        right_specs["labels"][0]["color"] = {"red": 0, "green": 255, "blue": 0}
+        right_specs["additionals"][0]["default"] = True
+
+        left_index = AnnotationSpecsIndex(left_specs)
+        right_index = AnnotationSpecsIndex(right_specs)
+
+        assert create_annotation_specs_diff(left_index, right_index) == create_annotation_specs_diff(left_specs, right_specs)
+        assert create_annotation_specs_diff(left_index, AnnotationSpecsIndex(copy.deepcopy(left_specs))).has_changes() is False
+
     def test_定型指摘の名前変更だけを差分にできる(self):
         left_specs = _create_annotation_specs()
         right_specs = copy.deepcopy(left_specs)
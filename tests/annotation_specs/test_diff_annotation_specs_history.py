@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import copy
+import json
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from annofabcli.annotation_specs.diff_annotation_specs_history import (
+    AnnotationSpecsHistoryCache,
+    create_annotation_specs_history_diffs,
+    select_histories,
+)
+
+DATA_DIR = Path("./tests/data/annotation_specs")
+
+
+def load_annotation_specs() -> dict[str, Any]:
+    with (DATA_DIR / "annotation_specs.json").open(encoding="utf-8") as f:
+        annotation_specs = json.load(f)
+    # テストデータは古い形式なので、差分の比較に必要なキーを補う
+    for label in annotation_specs["labels"]:
+        label.setdefault("field_values", {})
+    return annotation_specs
+
+
+def create_history(history_id: str, updated_datetime: str) -> dict[str, Any]:
+    return {"history_id": history_id, "updated_datetime": updated_datetime}
+
+
+def test_create_annotation_specs_history_diffs__差分がある履歴の組み合わせだけを生成する():
+    specs1 = load_annotation_specs()
+    specs2 = copy.deepcopy(specs1)
+    specs3 = copy.deepcopy(specs2)
+    specs3["labels"][0]["color"] = {"red": 1, "green": 2, "blue": 3}
+    specs4 = copy.deepcopy(specs3)
+    specs4["labels"].pop()
+
+    histories_with_specs = [
+        (create_history("h1", "2024-01-01T00:00:00+09:00"), specs1),
+        (create_history("h2", "2024-01-02T00:00:00+09:00"), specs2),
+        (create_history("h3", "2024-01-03T00:00:00+09:00"), specs3),
+        (create_history("h4", "2024-01-04T00:00:00+09:00"), specs4),
+    ]
+    actual = list(create_annotation_specs_history_diffs(histories_with_specs, targets=["labels"]))
+
+    assert [(e.left_history["history_id"], e.right_history["history_id"]) for e in actual] == [("h2", "h3"), ("h3", "h4")]
+    assert actual[0].diff.labels is not None
+    assert [e.label_id for e in actual[0].diff.labels.changed_labels] == [specs1["labels"][0]["label_id"]]
+    assert actual[1].diff.labels is not None
+    assert actual[1].diff.labels.removed_label_ids == [specs3["labels"][-1]["label_id"]]
+    # 前後の比較で同じ索引を使う
+    assert actual[0].right_index is actual[1].left_index
+
+    actual_dict = actual[1].to_dict()
+    assert actual_dict["left_history_id"] == "h3"
+    assert actual_dict["right_history_id"] == "h4"
+    assert actual[1].to_text(detail=False).startswith("=== 2024-01-03T00:00:00+09:00 (history_id='h3') -> 2024-01-04T00:00:00+09:00 (history_id='h4') ===\n[labels]")
+
+
+def create_histories() -> list[dict[str, Any]]:
+    return [
+        create_history("h3", "2024-01-03T00:00:00+09:00"),
+        create_history("h1", "2024-01-01T00:00:00+09:00"),
+        create_history("h2", "2024-01-02T00:00:00+09:00"),
+    ]
+
+
+class TestSelectHistories:
+    def test_範囲を指定しない場合は古い順にすべて返す(self):
+        actual = select_histories(create_histories(), from_history_id=None, to_history_id=None)
+        assert [e["history_id"] for e in actual] == ["h1", "h2", "h3"]
+
+    def test_範囲を指定する(self):
+        actual = select_histories(create_histories(), from_history_id="h2", to_history_id="h3")
+        assert [e["history_id"] for e in actual] == ["h2", "h3"]
+
+    def test_存在しないhistory_idを指定するとエラー(self):
+        with pytest.raises(ValueError):
+            select_histories(create_histories(), from_history_id="unknown", to_history_id=None)
+
+    def test_範囲の先頭が末尾より新しいとエラー(self):
+        with pytest.raises(ValueError):
+            select_histories(create_histories(), from_history_id="h3", to_history_id="h1")
+
+    def test_履歴が存在しない場合は空のlistを返す(self):
+        assert select_histories([], from_history_id=None, to_history_id=None) == []
+        with pytest.raises(ValueError, match="history_id='h1'"):
+            select_histories([], from_history_id="h1", to_history_id=None)
+
+
+def test_annotation_specs_history_cache(tmp_path: Path):
+    cache = AnnotationSpecsHistoryCache(tmp_path)
+    annotation_specs = load_annotation_specs()
+
+    assert cache.get("prj1", "h1") is None
+    cache.put("prj1", "h1", annotation_specs)
+    assert cache.get("prj1", "h1") == annotation_specs
+    assert cache.get("prj2", "h1") is None
@@ -1,6 +1,11 @@
+import json
+import shutil
+import zipfile
 from pathlib import Path
 
 from annofabcli.__main__ import main
+from annofabcli.annotation_zip.filter import load_annotation_json_header
+from annofabcli.common.zip_reader import ZipReader
 
 data_dir = Path("./tests/data/filesystem")
 out_dir = Path("./tests/out/annotation_zip")
@@ -44,3 +49,33 @@ class TestCommandLine:
         )
 
         assert (output_dir / "task2/input2/1e2931d2-de34-4956-ab75-81f710dc0108").exists()
+
+    def test_filter_to_zip(self):
+        zip_path = data_dir / "simple-annotation.zip"
+        output_dir = out_dir / "filter-output-for-zip"
+        output_zip = out_dir / "filter-output.zip"
+        shutil.rmtree(output_dir, ignore_errors=True)
+        output_zip.unlink(missing_ok=True)
+
+        for output_args in [["--output_dir", str(output_dir)], ["--output_zip", str(output_zip)]]:
+            main(["annotation_zip", "filter", "--annotation", str(zip_path), *output_args, "--task_query", '{"status":"complete"}'])
+
+        expected = sorted(p.relative_to(output_dir).as_posix() for p in output_dir.glob("**/*") if p.is_file())
+        with zipfile.ZipFile(output_zip) as zip_file:
+            assert zip_file.testzip() is None
+            assert sorted(info.filename for info in zip_file.infolist() if not info.is_dir()) == expected
+            for name in expected:
+                assert zip_file.read(name) == (output_dir / name).read_bytes()
+
+
+class Test_load_annotation_json_header:
+    def test_detailsより前の部分だけを読み込む(self):
+        with ZipReader(data_dir / "simple-annotation.zip") as zip_reader:
+            json_file_path = "sample_1/c6e1c2ec-6c7c-41c6-9639-4244c2ed2839.json"
+            header = load_annotation_json_header(zip_reader, json_file_path)
+            annotation = json.loads(zip_reader.read(json_file_path))
+
+        assert header is not None
+        assert "details" not in header
+        assert header == {key: value for key, value in annotation.items() if key in header}
+        assert header["task_status"] == annotation["task_status"]
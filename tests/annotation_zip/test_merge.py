@@ -1,5 +1,6 @@
 import json
 import shutil
+import zipfile
 from pathlib import Path
 
 from annofabcli.__main__ import main
@@ -73,3 +74,38 @@ class TestCommandLine:
         assert merged_annotation_by_id["anno2"]["data"]["right_bottom"] == {"x": 120, "y": 120}
         assert (output_dir1 / "task3/input2.json").exists()
         assert (output_dir2 / "task2/input2.json").exists()
+
+    def test_merge_to_zip_in_parallel(self):
+        annotation_dir1 = data_dir / "merge/annotation-A"
+        annotation_dir2 = data_dir / "merge/annotation-B"
+        output_zip = out_dir / "merge-output3.zip"
+        output_zip.unlink(missing_ok=True)
+
+        main(
+            [
+                "annotation_zip",
+                "merge",
+                "--annotation",
+                str(annotation_dir1),
+                str(annotation_dir2),
+                "--output_zip",
+                str(output_zip),
+                "--parallelism",
+                "2",
+            ]
+        )
+
+        with zipfile.ZipFile(output_zip) as zip_file:
+            assert sorted(zip_file.namelist()) == [
+                "task1/input1.json",
+                "task1/input2.json",
+                "task1/input3.json",
+                "task2/input2.json",
+                "task2/input2/1e2931d2-de34-4956-ab75-81f710dc0108",
+                "task3/input2.json",
+            ]
+            assert zip_file.getinfo("task2/input2/1e2931d2-de34-4956-ab75-81f710dc0108").compress_type == zipfile.ZIP_STORED
+            merged_annotation = json.loads(zip_file.read("task1/input1.json"))
+
+        merged_annotation_by_id = {e["annotation_id"]: e for e in merged_annotation["details"]}
+        assert merged_annotation_by_id["anno2"]["data"]["right_bottom"] == {"x": 120, "y": 120}
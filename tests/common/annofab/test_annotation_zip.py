@@ -0,0 +1,39 @@
+from pathlib import Path
+
+import pytest
+from annofabapi.exceptions import AnnotationOuterFileNotFoundError
+from annofabapi.parser import lazy_parse_simple_annotation_zip, lazy_parse_simple_annotation_zip_by_task
+
+from annofabcli.common.annofab.annotation_zip import lazy_parse_simple_annotation_by_input_data, lazy_parse_simple_annotation_by_task
+
+annotation_zip_path = Path("./tests/data/simple-annotation.zip")
+
+
+def test_lazy_parse_simple_annotation_by_input_data__zip():
+    expected = {parser.json_file_path: parser.load_json() for parser in lazy_parse_simple_annotation_zip(annotation_zip_path)}
+    actual = {parser.json_file_path: parser.load_json() for parser in lazy_parse_simple_annotation_by_input_data(annotation_zip_path)}
+    assert len(actual) > 0
+    assert actual == expected
+
+
+def test_lazy_parse_simple_annotation_by_input_data__外部ファイルを開く():
+    for parser in lazy_parse_simple_annotation_by_input_data(annotation_zip_path):
+        for detail in parser.load_json()["details"]:
+            data_uri = detail["data"].get("data_uri")
+            if data_uri is not None:
+                with parser.open_outer_file(data_uri) as f:
+                    assert len(f.read()) > 0
+
+        with pytest.raises(AnnotationOuterFileNotFoundError):
+            parser.open_outer_file("not-exists")
+
+
+def test_lazy_parse_simple_annotation_by_task__zip():
+    expected = {task_parser.task_id: task_parser.json_file_path_list for task_parser in lazy_parse_simple_annotation_zip_by_task(annotation_zip_path)}
+    actual = {task_parser.task_id: task_parser.json_file_path_list for task_parser in lazy_parse_simple_annotation_by_task(annotation_zip_path)}
+    assert actual == expected
+
+
+def test_lazy_parse_simple_annotation_by_input_data__存在しないパス():
+    with pytest.raises(ValueError):
+        lazy_parse_simple_annotation_by_input_data(Path("not-exists.zip"))
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from annofabcli.common.annofab.project_mirror import MirrorNotSyncedError, MirrorResource, ProjectMirror
+
+
+def create_task(task_id: str, input_data_id_list: list[str]) -> dict:
+    return {
+        "project_id": "prj1",
+        "task_id": task_id,
+        "phase": "acceptance",
+        "phase_stage": 1,
+        "status": "not_started",
+        "account_id": None,
+        "updated_datetime": "2024-01-01T10:00:00.000+09:00",
+        "input_data_id_list": input_data_id_list,
+    }
+
+
+def create_input_data(input_data_id: str) -> dict:
+    return {"input_data_id": input_data_id, "input_data_name": f"{input_data_id}.png", "updated_datetime": "2024-01-01T10:00:00.000+09:00"}
+
+
+class TestProjectMirror:
+    def test_replace_tasks__プロジェクト単位で置き換える(self, tmp_path: Path):
+        with ProjectMirror(tmp_path / "mirror.sqlite3") as mirror:
+            mirror.replace_tasks("prj1", [create_task("task1", ["i1"]), create_task("task2", ["i2"])], dump_last_modified="v1")
+            mirror.replace_tasks("prj2", [create_task("task9", ["i9"])])
+            mirror.replace_tasks("prj1", [create_task("task2", ["i2", "i3"]), create_task("task3", ["i3"])], dump_last_modified="v2")
+
+            assert [e["task_id"] for e in mirror.get_tasks("prj1")] == ["task2", "task3"]
+            assert [e["task_id"] for e in mirror.get_tasks("prj1", task_ids=["task3", "task9"])] == ["task3"]
+            assert [e["task_id"] for e in mirror.get_tasks("prj2")] == ["task9"]
+            assert mirror.get_task_ids_by_input_data_id("prj1") == {"i2": ["task2"], "i3": ["task2", "task3"]}
+            assert mirror.get_dump_last_modified("prj1", MirrorResource.TASK) == "v2"
+
+    def test_get_input_data_list(self, tmp_path: Path):
+        with ProjectMirror(tmp_path / "mirror.sqlite3") as mirror:
+            mirror.replace_input_data("prj1", [create_input_data("i2"), create_input_data("i1")])
+            assert [e["input_data_id"] for e in mirror.get_input_data_list("prj1")] == ["i1", "i2"]
+            assert [e["input_data_name"] for e in mirror.get_input_data_list("prj1", input_data_ids={"i2"})] == ["i2.png"]
+
+    def test_get_task_history_dict__タスク履歴の順番を保持する(self, tmp_path: Path):
+        histories = [
+            {"task_history_id": history_id, "phase": phase, "phase_stage": 1, "account_id": "alice", "started_datetime": None, "ended_datetime": None}
+            for history_id, phase in [("h2", "annotation"), ("h1", "acceptance")]
+        ]
+        with ProjectMirror(tmp_path / "mirror.sqlite3") as mirror:
+            mirror.replace_task_histories("prj1", {"task1": histories, "task2": []})
+            assert mirror.get_task_history_dict("prj1") == {"task1": histories}
+            assert mirror.get_task_history_dict("prj1", task_ids=["task2"]) == {}
+
+    def test_get_comments__コメントの種類で絞り込む(self, tmp_path: Path):
+        comments = [
+            {"task_id": "task1", "input_data_id": "i1", "comment_id": "c1", "comment_type": "inspection", "created_datetime": "2024-01-01"},
+            {"task_id": "task1", "input_data_id": "i1", "comment_id": "c2", "comment_type": "onhold", "created_datetime": "2024-01-02"},
+        ]
+        with ProjectMirror(tmp_path / "mirror.sqlite3") as mirror:
+            mirror.replace_comments("prj1", comments)
+            assert [e["comment_id"] for e in mirror.get_comments("prj1", comment_type="onhold")] == ["c2"]
+            assert len(mirror.get_comments("prj1", task_ids=["task1"])) == 2
+
+    def test_get_annotation_counts(self, tmp_path: Path):
+        with ProjectMirror(tmp_path / "mirror.sqlite3") as mirror:
+            mirror.replace_annotation_counts("prj1", [("task1", "i1", "dog", 2), ("task1", "i1", "cat", 1)])
+            assert mirror.get_annotation_counts("prj1") == [
+                {"task_id": "task1", "input_data_id": "i1", "label": "cat", "annotation_count": 1},
+                {"task_id": "task1", "input_data_id": "i1", "label": "dog", "annotation_count": 2},
+            ]
+
+    def test_同期していない情報を取得するとエラーになる(self, tmp_path: Path):
+        with ProjectMirror(tmp_path / "mirror.sqlite3") as mirror:
+            mirror.replace_tasks("prj1", [])
+            assert mirror.get_tasks("prj1") == []
+            with pytest.raises(MirrorNotSyncedError):
+                mirror.get_comments("prj1")
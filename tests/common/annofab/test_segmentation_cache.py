@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import io
+import json
+import zipfile
+from pathlib import Path
+
+import numpy
+from annofabapi.parser import SimpleAnnotationZipParser
+from annofabapi.segmentation import write_binary_image
+from PIL import Image, ImageDraw
+
+from annofabcli.common.annofab.segmentation_cache import SegmentationStats, SegmentationStatsCache, SegmentationStatsReader
+from annofabcli.filesystem.draw_annotation import DrawingAnnotationForOneImage
+
+
+def create_binary_image_array() -> numpy.ndarray:
+    binary_image_array = numpy.zeros((6, 8), dtype=bool)
+    binary_image_array[2:5, 3:7] = True
+    binary_image_array[3, 4] = False
+    return binary_image_array
+
+
+def write_annotation_zip(zip_path: Path, binary_image_array: numpy.ndarray) -> None:
+    png = io.BytesIO()
+    write_binary_image(binary_image_array, png)
+    simple_annotation = {
+        "task_id": "task1",
+        "input_data_id": "input1",
+        "details": [{"label": "car", "annotation_id": "anno1", "data": {"_type": "SegmentationV2", "data_uri": "anno1"}}],
+    }
+    with zipfile.ZipFile(zip_path, mode="w") as zip_file:
+        zip_file.writestr("task1/input1.json", json.dumps(simple_annotation))
+        zip_file.writestr("task1/input1/anno1", png.getvalue())
+
+
+class TestSegmentationStats:
+    def test_from_binary_image(self):
+        stats = SegmentationStats.from_binary_image(create_binary_image_array(), include_run_length=True)
+        assert stats.area == 11
+        assert stats.bounding_box == (3, 2, 6, 4)
+        assert stats.to_bounding_box_dict() == {"left_top": {"x": 3, "y": 2}, "right_bottom": {"x": 6, "y": 4}}
+        cropped_mask = stats.decode_cropped_mask()
+        assert cropped_mask is not None
+        numpy.testing.assert_array_equal(cropped_mask, create_binary_image_array()[2:5, 3:7])
+
+    def test_from_binary_image__塗りつぶし領域がない(self):
+        stats = SegmentationStats.from_binary_image(numpy.zeros((6, 8), dtype=bool), include_run_length=True)
+        assert stats.area == 0
+        assert stats.bounding_box is None
+        assert stats.decode_cropped_mask() is None
+
+    def test_from_binary_image__先頭が塗られている(self):
+        binary_image_array = numpy.ones((2, 3), dtype=bool)
+        binary_image_array[1, 2] = False
+        stats = SegmentationStats.from_binary_image(binary_image_array, include_run_length=True)
+        cropped_mask = stats.decode_cropped_mask()
+        assert cropped_mask is not None
+        numpy.testing.assert_array_equal(cropped_mask, binary_image_array)
+
+
+class TestSegmentationStatsCache:
+    def test_get_put(self, tmp_path):
+        stats = SegmentationStats.from_binary_image(create_binary_image_array(), include_run_length=True)
+        with SegmentationStatsCache(tmp_path / "cache.sqlite3") as cache:
+            cache.put((1, 100), stats)
+            cache.put((2, 100), SegmentationStats.from_binary_image(create_binary_image_array()))
+
+        with SegmentationStatsCache(tmp_path / "cache.sqlite3") as cache:
+            actual = cache.get((1, 100), require_run_length=True)
+            assert actual is not None
+            assert actual.area == stats.area
+            assert actual.bounding_box == stats.bounding_box
+            numpy.testing.assert_array_equal(actual.decode_cropped_mask(), stats.decode_cropped_mask())
+
+            assert cache.get((2, 100)) is not None
+            # run lengthを保持していないエントリは、run lengthが必要なときは存在しないものとみなす
+            assert cache.get((2, 100), require_run_length=True) is None
+            assert cache.get((3, 100)) is None
+
+    def test_evict__最大サイズを超えたら古いエントリから削除する(self, tmp_path):
+        stats = SegmentationStats.from_binary_image(create_binary_image_array())
+        with SegmentationStatsCache(tmp_path / "cache.sqlite3", max_size=64 * 10) as cache:
+            for crc32 in range(20):
+                cache.put((crc32, 100), stats)
+
+        with SegmentationStatsCache(tmp_path / "cache.sqlite3") as cache:
+            assert cache.get((0, 100)) is None
+            assert cache.get((19, 100)) is not None
+
+
+class TestSegmentationStatsReader:
+    def test_read__2回目はキャッシュから取得する(self, tmp_path):
+        zip_path = tmp_path / "annotation.zip"
+        write_annotation_zip(zip_path, create_binary_image_array())
+
+        for expected_cache_hit_count in [0, 1]:
+            with SegmentationStatsCache(tmp_path / "cache.sqlite3") as cache, zipfile.ZipFile(zip_path) as zip_file:
+                reader = SegmentationStatsReader(zip_path, cache=cache)
+                stats = reader.read(SimpleAnnotationZipParser(zip_file, "task1/input1.json"), "anno1")
+                assert stats.area == 11
+                assert reader.cache_hit_count == expected_cache_hit_count
+                assert reader.decoded_count == 1 - expected_cache_hit_count
+
+    def test_draw_segmentation__キャッシュを使っても描画結果は同じ(self, tmp_path):
+        zip_path = tmp_path / "annotation.zip"
+        write_annotation_zip(zip_path, create_binary_image_array())
+
+        def draw(segmentation_stats_reader: SegmentationStatsReader | None) -> numpy.ndarray:
+            image = Image.new("RGBA", (8, 6), color="black")
+            with zipfile.ZipFile(zip_path) as zip_file:
+                drawing = DrawingAnnotationForOneImage(segmentation_stats_reader=segmentation_stats_reader)
+                drawing._draw_annotations(ImageDraw.Draw(image), SimpleAnnotationZipParser(zip_file, "task1/input1.json"))
+            return numpy.array(image)
+
+        with SegmentationStatsCache(tmp_path / "cache.sqlite3") as cache:
+            numpy.testing.assert_array_equal(draw(SegmentationStatsReader(zip_path, cache=cache)), draw(None))
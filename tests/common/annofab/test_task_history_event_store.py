@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import datetime
+import json
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import requests
+
+from annofabcli.common.annofab.task_history_event_store import TaskHistoryEventStore
+
+
+def create_event(task_history_id: str, task_id: str, account_id: str, created_datetime: str) -> dict:
+    return {
+        "project_id": "prj1",
+        "task_id": task_id,
+        "task_history_id": task_history_id,
+        "created_datetime": created_datetime,
+        "phase": "annotation",
+        "phase_stage": 1,
+        "status": "working",
+        "account_id": account_id,
+        "request": None,
+    }
+
+
+EVENTS = [
+    create_event("h1", "task1", "alice", "2024-01-01T10:00:00.000+09:00"),
+    create_event("h2", "task1", "alice", "2024-01-02T10:00:00.000+09:00"),
+    create_event("h3", "task2", "bob", "2024-01-02T11:00:00.000+09:00"),
+]
+
+
+class TestTaskHistoryEventStore:
+    def test_ingest__取り込み済みのタスク履歴イベントは追加しない(self, tmp_path: Path):
+        with TaskHistoryEventStore(tmp_path / "store.sqlite3") as store:
+            assert store.ingest("prj1", EVENTS[:2], dump_last_modified="2024-01-02") == 2
+            new_event = create_event("h4", "task2", "bob", "2024-01-03T09:00:00.000+09:00")
+            assert store.ingest("prj1", [*EVENTS, new_event], dump_last_modified="2024-01-03") == 2
+            assert store.get_dump_last_modified("prj1") == "2024-01-03"
+            assert [e["task_history_id"] for e in store.query("prj1")] == ["h1", "h2", "h3", "h4"]
+            assert store.query("prj2") == []
+
+    def test_query__タスク_ユーザ_日付で絞り込む(self, tmp_path: Path):
+        with TaskHistoryEventStore(tmp_path / "store.sqlite3") as store:
+            store.ingest("prj1", EVENTS)
+            assert [e["task_history_id"] for e in store.query("prj1", task_ids=["task1"])] == ["h1", "h2"]
+            assert [e["task_history_id"] for e in store.query("prj1", account_ids={"bob"})] == ["h3"]
+            assert [e["task_history_id"] for e in store.query("prj1", start_date="2024-01-02", end_date="2024-01-02")] == ["h2", "h3"]
+            assert store.query("prj1", task_ids=[]) == []
+
+    def test_update__全件ファイルが更新されていなければダウンロードしない(self, tmp_path: Path):
+        def download(url, dest_path, **kwargs):  # noqa: ANN001, ANN202, ARG001
+            Path(dest_path).write_text(json.dumps(EVENTS), encoding="utf-8")
+
+        service = MagicMock()
+        service.api.get_project_task_history_events_url.return_value = ({"url": "https://example.com/events.json"}, None)
+        service.api.session.get.return_value.__enter__.return_value.headers = {"Last-Modified": "Tue, 02 Jan 2024 17:00:00 GMT"}
+        service.wrapper.download_project_task_history_events_url.side_effect = download
+
+        with TaskHistoryEventStore(tmp_path / "store.sqlite3") as store:
+            assert store.update(service, "prj1") == 3
+            assert store.update(service, "prj1") is None
+            assert service.wrapper.download_project_task_history_events_url.call_count == 1
+            assert store.get_dump_last_modified("prj1") == datetime.datetime(2024, 1, 2, 17, tzinfo=datetime.UTC).isoformat()
+            assert len(store.query("prj1")) == 3
+
+    def test_update__全件ファイルが存在しなければNoneを返す(self, tmp_path: Path):
+        response = requests.Response()
+        response.status_code = 404
+        service = MagicMock()
+        service.api.get_project_task_history_events_url.return_value = ({"url": "https://example.com/events.json"}, None)
+        # 全件ファイルが存在しないので、署名付きURLへのリクエストも404になる
+        service.api.session.get.return_value.__enter__.return_value = response
+        service.wrapper.download_project_task_history_events_url.side_effect = requests.HTTPError(response=response)
+
+        with TaskHistoryEventStore(tmp_path / "store.sqlite3") as store:
+            assert store.update(service, "prj1") is None
+            assert store.query("prj1") == []
@@ -1,4 +1,15 @@
-from annofabcli.common.bokeh import create_pretext_from_metadata
+import base64
+import gzip
+import json
+import re
+from pathlib import Path
+
+import numpy
+import pandas
+from bokeh.models import ColumnDataSource
+from bokeh.plotting import figure
+
+from annofabcli.common.bokeh import create_pretext_from_metadata, write_bokeh_html
 
 
 def test__create_pretext_from_metadata() -> None:
@@ -8,3 +19,40 @@ def test__create_pretext_from_metadata() -> None:
     }
     pretext = create_pretext_from_metadata(metadata)
     assert pretext.text == 'project_id = "id1"\nproject_title = "title1"'
+
+
+class Test__write_bokeh_html:
+    @staticmethod
+    def _create_figure() -> tuple[figure, ColumnDataSource]:
+        source = ColumnDataSource(pandas.DataFrame({"x": [1.0, 2.0, 3.0], "y": [0.1, 0.2, 0.3], "task_id": ["task1", "task2", "task3"]}))
+        fig = figure(title="sample")
+        fig.line(source=source, x="x", y="y")
+        return fig, source
+
+    def test_圧縮しない(self, tmp_path: Path) -> None:
+        fig, _ = self._create_figure()
+        output_file = tmp_path / "sub/graph.html"
+        write_bokeh_html(fig, output_file)
+        html = output_file.read_text(encoding="utf-8")
+        assert "task1" in html
+        assert "DecompressionStream" not in html
+
+    def test_圧縮する(self, tmp_path: Path) -> None:
+        fig, source = self._create_figure()
+        output_file = tmp_path / "sub/graph.html"
+        write_bokeh_html(fig, output_file, compress_html=True)
+
+        html = output_file.read_text(encoding="utf-8")
+        assert "<title>graph</title>" in html
+        assert "DecompressionStream" in html
+        assert "task1" not in html
+
+        payload = re.search(r'<script type="application/octet-stream" id="[^"]+">\s*(.+?)\s*</script>', html, re.DOTALL)
+        assert payload is not None
+        docs_json = json.loads(gzip.decompress(base64.b64decode(payload.group(1))))
+        assert "task1" in json.dumps(docs_json)
+
+        # float32に変換しても値が変わらない列だけfloat32に変換する
+        assert "index" not in source.data
+        assert numpy.asarray(source.data["x"]).dtype == numpy.float32
+        assert numpy.asarray(source.data["y"]).dtype == numpy.float64
@@ -0,0 +1,75 @@
+import argparse
+import http.server
+import threading
+from collections.abc import Iterator
+
+import pytest
+import requests
+
+from annofabcli.common.http_session import DEFAULT_POOL_MAXSIZE, PooledHTTPAdapter, configure_session
+from annofabcli.common.profiling import get_timing_recorder, instrument_session, profile_from_args
+
+
+class KeepAliveHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = b"ok"
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):  # noqa: A002
+        pass
+
+
+@pytest.fixture
+def server_url() -> Iterator[str]:
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+class Test_configure_session:
+    def test_parallelismに合わせてコネクションプールの大きさを設定する(self):
+        session = requests.Session()
+        configure_session(session, parallelism=100)
+        adapter = session.get_adapter("https://annofab.com")
+        assert isinstance(adapter, PooledHTTPAdapter)
+        assert adapter._pool_maxsize == 100
+
+        session2 = requests.Session()
+        configure_session(session2)
+        adapter2 = session2.get_adapter("https://annofab.com")
+        assert isinstance(adapter2, PooledHTTPAdapter)
+        assert adapter2._pool_maxsize == DEFAULT_POOL_MAXSIZE
+
+    def test_コネクションを再利用した回数を記録する(self, server_url: str, tmp_path):
+        session = requests.Session()
+        configure_session(session)
+        with profile_from_args(argparse.Namespace(timing_report=tmp_path / "report.json", profile=None)):
+            instrument_session(session)
+            for _ in range(5):
+                session.get(server_url).raise_for_status()
+
+            recorder = get_timing_recorder()
+            assert recorder is not None
+            assert recorder.new_connection_count == {"127.0.0.1": 1}
+            connections = recorder.to_dict()["connections"]
+            assert connections == [{"host": "127.0.0.1", "request_count": 5, "new_connection_count": 1, "connection_reuse_ratio": 0.8}]
+
+    def test_reset_connection_poolで既存のコネクションを使わなくなる(self, server_url: str):
+        session = requests.Session()
+        configure_session(session)
+        session.get(server_url).raise_for_status()
+        adapter = session.get_adapter(server_url)
+        assert isinstance(adapter, PooledHTTPAdapter)
+        old_poolmanager = adapter.poolmanager
+
+        adapter.reset_connection_pool()
+        assert adapter.poolmanager is not old_poolmanager
+        session.get(server_url).raise_for_status()
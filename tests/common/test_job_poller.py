@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+from unittest.mock import Mock
+
+import pytest
+from annofabapi.models import JobStatus, ProjectJobType
+
+from annofabcli.common.dataclasses import WaitOptions
+from annofabcli.common.job_poller import BackoffOptions, JobPoller
+
+BACKOFF_OPTIONS = BackoffOptions(initial_interval=0.01, multiplier=2, jitter=0.1)
+
+
+def create_job(job_id: str, job_type: ProjectJobType, job_status: JobStatus) -> dict:
+    return {"job_id": job_id, "job_type": job_type.value, "job_status": job_status.value, "errors": {}}
+
+
+class TestJobPoller:
+    def test_submit__同じジョブ種別のジョブは1回のAPIでまとめて問い合わせる(self):
+        def get_project_job(project_id: str, query_params: dict):  # noqa: ARG001
+            # 監視中のジョブより新しい、別の種別のジョブが多数あっても、ジョブ種別ごとに問い合わせるので見つかる
+            if query_params["type"] == ProjectJobType.GEN_ANNOTATION.value:
+                return {"list": [create_job("job3", ProjectJobType.GEN_ANNOTATION, JobStatus.SUCCEEDED)]}, None
+            job_list = [create_job("job1", ProjectJobType.GEN_TASKS_LIST, JobStatus.SUCCEEDED), create_job("job2", ProjectJobType.GEN_TASKS_LIST, JobStatus.FAILED)]
+            return {"list": job_list}, None
+
+        service = Mock()
+        service.api.get_project_job.side_effect = get_project_job
+        wait_options = WaitOptions(interval=1, max_tries=10)
+        with JobPoller(service, backoff_options=BACKOFF_OPTIONS) as poller:
+            # 1回目の問い合わせで3つのジョブをまとめて問い合わせるように、スレッドが問い合わせる前に登録する
+            with poller._condition:
+                future1 = poller.submit("prj1", ProjectJobType.GEN_TASKS_LIST, "job1", wait_options=wait_options)
+                future2 = poller.submit("prj1", ProjectJobType.GEN_TASKS_LIST, "job2", wait_options=wait_options)
+                future3 = poller.submit("prj1", ProjectJobType.GEN_ANNOTATION, "job3", wait_options=wait_options)
+
+            assert future1.result(timeout=10) == JobStatus.SUCCEEDED
+            assert future2.result(timeout=10) == JobStatus.FAILED
+            assert future3.result(timeout=10) == JobStatus.SUCCEEDED
+
+        assert poller.api_call_count == 2
+        assert sorted(kwargs["query_params"]["type"] for _, kwargs in service.api.get_project_job.call_args_list) == [
+            ProjectJobType.GEN_ANNOTATION.value,
+            ProjectJobType.GEN_TASKS_LIST.value,
+        ]
+
+    def test_submit__監視中のジョブが見つからなくなった場合は例外を設定する(self):
+        service = Mock()
+        service.api.get_project_job.side_effect = [
+            ({"list": [create_job("job1", ProjectJobType.GEN_TASKS_LIST, JobStatus.PROGRESS)]}, None),
+            ({"list": []}, None),
+        ]
+        with JobPoller(service, backoff_options=BACKOFF_OPTIONS) as poller:
+            future = poller.submit("prj1", ProjectJobType.GEN_TASKS_LIST, "job1")
+            with pytest.raises(RuntimeError):
+                future.result(timeout=10)
+
+    def test_submit__想定外のエラーが発生した場合は監視中のすべてのジョブに例外を設定する(self):
+        service = Mock()
+        service.api.get_project_job.return_value = ({"list": [create_job("job1", ProjectJobType.GEN_TASKS_LIST, JobStatus.PROGRESS)]}, None)
+        poller = JobPoller(service, backoff_options=BACKOFF_OPTIONS)
+        with poller._condition:
+            future1 = poller.submit("prj1", ProjectJobType.GEN_TASKS_LIST, "job1")
+            future2 = poller.submit("prj2", ProjectJobType.GEN_TASKS_LIST, "job1")
+            # 問い合わせるプロジェクトを選ぶ処理で失敗させる
+            poller._clock = Mock(side_effect=ValueError("clock error"))
+
+        for future in [future1, future2]:
+            with pytest.raises(ValueError, match="clock error"):
+                future.result(timeout=10)
+        poller.close()
+        poller._clock = lambda: 0
+        with pytest.raises(RuntimeError):
+            poller.submit("prj1", ProjectJobType.GEN_TASKS_LIST, "job1")
+
+    def test_submit__複数プロジェクトのジョブを待つ(self):
+        def get_project_job(project_id: str, query_params: dict):  # noqa: ARG001
+            job_status = JobStatus.SUCCEEDED if project_id == "prj1" else JobStatus.FAILED
+            return {"list": [create_job(f"{project_id}_job", ProjectJobType.GEN_INPUTS_LIST, job_status)]}, None
+
+        service = Mock()
+        service.api.get_project_job.side_effect = get_project_job
+        with JobPoller(service, backoff_options=BACKOFF_OPTIONS) as poller:
+            future1 = poller.submit("prj1", ProjectJobType.GEN_INPUTS_LIST, "prj1_job")
+            future2 = poller.submit("prj2", ProjectJobType.GEN_INPUTS_LIST, "prj2_job")
+            assert future1.result(timeout=10) == JobStatus.SUCCEEDED
+            assert future2.result(timeout=10) == JobStatus.FAILED
+
+    def test_submit__job_idを指定しない場合は進行中の最新のジョブを待つ(self):
+        service = Mock()
+        service.api.get_project_job.side_effect = [
+            ({"list": [create_job("job2", ProjectJobType.GEN_TASKS_LIST, JobStatus.PROGRESS), create_job("job1", ProjectJobType.GEN_TASKS_LIST, JobStatus.SUCCEEDED)]}, None),
+            ({"list": [create_job("job2", ProjectJobType.GEN_TASKS_LIST, JobStatus.SUCCEEDED), create_job("job1", ProjectJobType.GEN_TASKS_LIST, JobStatus.SUCCEEDED)]}, None),
+        ]
+        with JobPoller(service, backoff_options=BACKOFF_OPTIONS) as poller:
+            assert poller.wait("prj1", ProjectJobType.GEN_TASKS_LIST) == JobStatus.SUCCEEDED
+
+    def test_submit__進行中のジョブが存在しない場合はNoneを返す(self):
+        service = Mock()
+        service.api.get_project_job.return_value = ({"list": [create_job("job1", ProjectJobType.GEN_TASKS_LIST, JobStatus.SUCCEEDED)]}, None)
+        with JobPoller(service, backoff_options=BACKOFF_OPTIONS) as poller:
+            assert poller.wait("prj1", ProjectJobType.GEN_TASKS_LIST) is None
+
+    def test_submit__指定した時間を過ぎても終了しない場合はPROGRESSを返す(self):
+        service = Mock()
+        service.api.get_project_job.return_value = ({"list": [create_job("job1", ProjectJobType.GEN_TASKS_LIST, JobStatus.PROGRESS)]}, None)
+        wait_options = WaitOptions(interval=0.05, max_tries=2)  # type: ignore[arg-type]
+        with JobPoller(service, backoff_options=BACKOFF_OPTIONS) as poller:
+            assert poller.wait("prj1", ProjectJobType.GEN_TASKS_LIST, "job1", wait_options=wait_options) == JobStatus.PROGRESS
+        # 間隔を伸ばしながら問い合わせるので、問い合わせ回数は`max_tries`より多くなる
+        assert service.api.get_project_job.call_count > 2
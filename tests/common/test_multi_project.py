@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import threading
+
+import pytest
+
+from annofabcli.common.multi_project import run_projects_in_pipeline
+
+
+class TestRunProjectsInPipeline:
+    def test_指定した順番で集計結果を返す(self):
+        actual = list(run_projects_in_pipeline(["prj1", "prj2", "prj3"], prepare=lambda project_id: project_id.upper(), compute=lambda project_id, prepared: f"{project_id}:{prepared}"))
+
+        assert [e.project_id for e in actual] == ["prj1", "prj2", "prj3"]
+        assert [e.result for e in actual] == ["prj1:PRJ1", "prj2:PRJ2", "prj3:PRJ3"]
+        assert all(e.is_succeeded for e in actual)
+
+    def test_失敗したプロジェクトがあっても残りのプロジェクトを処理する(self):
+        def prepare(project_id: str) -> str:
+            if project_id == "prj1":
+                raise RuntimeError("prepare failed")
+            return project_id
+
+        def compute(project_id: str, prepared: str) -> str:
+            if project_id == "prj2":
+                raise RuntimeError("compute failed")
+            return prepared
+
+        actual = list(run_projects_in_pipeline(["prj1", "prj2", "prj3"], prepare, compute))
+
+        assert [e.is_succeeded for e in actual] == [False, False, True]
+        assert str(actual[0].error) == "prepare failed"
+        assert str(actual[1].error) == "compute failed"
+        assert actual[2].result == "prj3"
+
+    def test_log_tracebackがFalseならトレースバックをログに出力しない(self, caplog: pytest.LogCaptureFixture):
+        def prepare(_project_id: str) -> str:
+            raise RuntimeError("prepare failed")
+
+        actual = list(run_projects_in_pipeline(["prj1"], prepare, compute=lambda _project_id, prepared: prepared, log_traceback=False))
+
+        assert str(actual[0].error) == "prepare failed"
+        warning_records = [record for record in caplog.records if record.levelname == "WARNING"]
+        assert len(warning_records) == 1
+        assert not warning_records[0].exc_info
+
+    def test_集計している間に次のプロジェクトを準備する(self):
+        prepared_project_ids: list[str] = []
+        next_prepared = threading.Event()
+
+        def prepare(project_id: str) -> str:
+            prepared_project_ids.append(project_id)
+            if project_id == "prj2":
+                next_prepared.set()
+            return project_id
+
+        def compute(project_id: str, _prepared: str) -> bool:
+            if project_id == "prj1":
+                # prj1の集計中に、prj2の準備が始まっている
+                return next_prepared.wait(timeout=10)
+            return True
+
+        actual = list(run_projects_in_pipeline(["prj1", "prj2", "prj3"], prepare, compute))
+
+        assert [e.result for e in actual] == [True, True, True]
+        assert prepared_project_ids == ["prj1", "prj2", "prj3"]
+
+    def test_先読みするプロジェクトの数はmax_prefetch以下(self):
+        lock = threading.Lock()
+        prepared_count = 0
+        max_unconsumed_count = 0
+        computed_count = 0
+
+        def prepare(project_id: str) -> str:
+            nonlocal prepared_count, max_unconsumed_count
+            with lock:
+                prepared_count += 1
+                max_unconsumed_count = max(max_unconsumed_count, prepared_count - computed_count)
+            return project_id
+
+        def compute(_project_id: str, prepared: str) -> str:
+            nonlocal computed_count
+            with lock:
+                computed_count += 1
+            return prepared
+
+        project_ids = [f"prj{i}" for i in range(10)]
+        actual = list(run_projects_in_pipeline(project_ids, prepare, compute, max_prefetch=2))
+
+        assert [e.result for e in actual] == project_ids
+        # 集計中のプロジェクトの1件 + 先読みする2件
+        assert max_unconsumed_count <= 3
+
+    def test_max_prefetchに0以下を指定するとエラー(self):
+        with pytest.raises(ValueError):
+            list(run_projects_in_pipeline(["prj1"], prepare=lambda project_id: project_id, compute=lambda _project_id, prepared: prepared, max_prefetch=0))
@@ -0,0 +1,26 @@
+import numpy
+import pandas
+
+from annofabcli.common.pandas import replace_values, replace_values_by_column
+
+
+def test_replace_values():
+    series = pandas.Series(["alice", "bob", None, "carol", "alice"])
+    replacement_dict = {"alice": "AA", "carol": "CC"}
+
+    actual = replace_values(series, replacement_dict)
+
+    assert actual.equals(series.replace(replacement_dict))
+    assert actual[[0, 1, 3, 4]].tolist() == ["AA", "bob", "CC", "AA"]
+    assert pandas.isna(actual[2])
+
+
+def test_replace_values_by_column():
+    df = pandas.DataFrame({"user_id": ["alice", "bob"], "username": ["Alice", "Bob"], "worktime": [1.0, numpy.nan]})
+    replacement_dict_by_column = {"user_id": {"alice": "AA"}, "username": {"Alice": "AA"}, "account_id": {"x": "y"}, "biography": None}
+
+    actual = replace_values_by_column(df, replacement_dict_by_column)
+
+    assert actual.equals(df.replace({"user_id": {"alice": "AA"}, "username": {"Alice": "AA"}}))
+    # 引数のDataFrameは変更しない
+    assert df["user_id"].tolist() == ["alice", "bob"]
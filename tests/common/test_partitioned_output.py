@@ -0,0 +1,99 @@
+import argparse
+from pathlib import Path
+
+import pandas
+import pytest
+
+from annofabcli.common.enums import OutputFormat
+from annofabcli.common.partitioned_output import PartitionedOutputOptions, PartitionedRecordWriter, validate_partitioned_output_arguments
+
+COLUMNS = ["task_id", "task_phase", "area"]
+
+
+def create_records(count: int) -> list[dict]:
+    return [{"task_id": f"t{i}", "task_phase": "annotation" if i % 2 == 0 else "acceptance", "area": i} for i in range(count)]
+
+
+def read_csv_files(paths: list[Path]) -> pandas.DataFrame:
+    return pandas.concat([pandas.read_csv(path, encoding="utf_8_sig") for path in paths], ignore_index=True)
+
+
+class TestPartitionedRecordWriter:
+    def test_chunk_size件ごとに書き込み_max_rows_per_fileで次のファイルに出力する(self, tmp_path: Path):
+        options = PartitionedOutputOptions(output_dir=tmp_path, file_format=OutputFormat.CSV, max_rows_per_file=4)
+        records = create_records(10)
+        with PartitionedRecordWriter(options, columns=COLUMNS, categorical_columns=["task_phase"], chunk_size=3) as writer:
+            for record in records:
+                writer.append(record)
+
+        paths = sorted(tmp_path.glob("*.csv"))
+        assert [p.name for p in paths] == ["part-00000.csv", "part-00001.csv", "part-00002.csv"]
+        assert [len(pandas.read_csv(p)) for p in paths] == [4, 4, 2]
+        assert writer.written_count == 10
+        assert read_csv_files(paths).to_dict("records") == records
+
+    def test_partition_byの値ごとにディレクトリを分ける(self, tmp_path: Path):
+        options = PartitionedOutputOptions(output_dir=tmp_path, file_format=OutputFormat.CSV, partition_by="task_phase")
+        records = [*create_records(5), {"task_id": "x", "task_phase": "a/b", "area": 1}]
+        with PartitionedRecordWriter(options, columns=COLUMNS, chunk_size=2) as writer:
+            for record in records:
+                writer.append(record)
+
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["task_phase=a%2Fb", "task_phase=acceptance", "task_phase=annotation"]
+        df = read_csv_files(sorted((tmp_path / "task_phase=annotation").glob("*.csv")))
+        assert list(df["task_id"]) == ["t0", "t2", "t4"]
+
+    def test_列が増えたら次のファイルに出力する(self, tmp_path: Path):
+        options = PartitionedOutputOptions(output_dir=tmp_path, file_format=OutputFormat.CSV)
+        records = [
+            {"task_id": "t1", "attributes": {"color": "red"}},
+            {"task_id": "t2", "attributes": {"color": "blue"}},
+            {"task_id": "t3", "attributes": {"occluded": True}},
+            {"task_id": "t4", "attributes": {"color": "red"}},
+        ]
+        with PartitionedRecordWriter(options, columns=["task_id"], dynamic_column_prefixes=["attributes."], chunk_size=2) as writer:
+            for record in records:
+                writer.append(record)
+
+        paths = sorted(tmp_path.glob("*.csv"))
+        assert [list(pandas.read_csv(p).columns) for p in paths] == [["task_id", "attributes.color"], ["task_id", "attributes.color", "attributes.occluded"]]
+
+    def test_レコードが0件なら列名だけのファイルを出力する(self, tmp_path: Path):
+        options = PartitionedOutputOptions(output_dir=tmp_path, file_format=OutputFormat.CSV, partition_by="task_phase")
+        with PartitionedRecordWriter(options, columns=COLUMNS):
+            pass
+
+        paths = list(tmp_path.glob("**/*.csv"))
+        assert len(paths) == 1
+        assert list(pandas.read_csv(paths[0]).columns) == COLUMNS
+
+    def test_parquet形式で出力する(self, tmp_path: Path):
+        pytest.importorskip("pyarrow")
+        options = PartitionedOutputOptions(output_dir=tmp_path, file_format=OutputFormat.PARQUET, max_rows_per_file=4)
+        records = create_records(10)
+        with PartitionedRecordWriter(options, columns=COLUMNS, categorical_columns=["task_phase"], chunk_size=3) as writer:
+            for record in records:
+                writer.append(record)
+
+        paths = sorted(tmp_path.glob("*.parquet"))
+        assert len(paths) == 3
+        df = pandas.concat([pandas.read_parquet(p) for p in paths], ignore_index=True)
+        assert df.to_dict("records") == records
+
+
+class TestValidatePartitionedOutputArguments:
+    @pytest.mark.parametrize(
+        ("kwargs", "is_valid"),
+        [
+            ({"format": "json"}, True),
+            ({"format": "parquet"}, False),
+            ({"format": "csv", "partition_by": "label"}, False),
+            ({"format": "csv", "output_dir": Path("out")}, True),
+            ({"format": "json", "output_dir": Path("out")}, False),
+            ({"format": "csv", "output_dir": Path("out"), "output": "out.csv"}, False),
+            ({"format": "csv", "output_dir": Path("out"), "max_rows_per_file": 0}, False),
+        ],
+    )
+    def test_validate(self, kwargs: dict, is_valid: bool):  # noqa: FBT001
+        args = argparse.Namespace(**{"output": None, "output_dir": None, "partition_by": None, "max_rows_per_file": None, **kwargs})
+        assert (validate_partitioned_output_arguments(args) is None) == is_valid
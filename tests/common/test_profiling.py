@@ -0,0 +1,79 @@
+import argparse
+import datetime
+import json
+from pathlib import Path
+from unittest.mock import Mock
+
+import pandas
+import requests
+
+from annofabcli.common.profiling import TimingRecorder, get_timing_recorder, profile_from_args, span, timed
+
+
+def create_response(status_code: int, seconds: float, content_length: str | None = None) -> requests.Response:
+    response = requests.Response()
+    response.status_code = status_code
+    response.url = "https://annofab.com/api/v1/my/account"
+    response.elapsed = datetime.timedelta(seconds=seconds)
+    response.request = Mock(method="GET")
+    if content_length is not None:
+        response.headers["Content-Length"] = content_length
+    return response
+
+
+@timed()
+def add(x: int, y: int) -> int:
+    return x + y
+
+
+class TestTimingRecorder:
+    def test_add_response(self):
+        recorder = TimingRecorder()
+        recorder.add_response(create_response(200, 0.03, "100"))
+        recorder.add_response(create_response(429, 0.3))
+        recorder.add_response(create_response(503, 20, "10"))
+
+        stat = recorder.http[("GET", "annofab.com")]
+        assert stat.count == 3
+        assert stat.response_bytes == 110
+        assert stat.too_many_requests_count == 1
+        assert stat.server_error_count == 1
+        assert stat.max_seconds == 20
+        assert stat.latency_histogram == [1, 0, 0, 1, 0, 0, 0, 0, 1]
+
+    def test_write_report(self, tmp_path: Path):
+        recorder = TimingRecorder()
+        recorder.add_span("foo", 1.0)
+        recorder.add_span("foo", 3.0)
+        recorder.add_response(create_response(200, 0.03, "100"))
+
+        recorder.write_report(tmp_path / "report.json")
+        report = json.loads((tmp_path / "report.json").read_text(encoding="utf-8"))
+        assert report["spans"] == [{"name": "foo", "count": 2, "total_seconds": 4.0, "max_seconds": 3.0}]
+
+        recorder.write_report(tmp_path / "report.csv")
+        df = pandas.read_csv(tmp_path / "report.csv")
+        assert list(df["category"]) == ["span", "http", "connection"]
+        assert list(df["name"]) == ["foo", "GET annofab.com", "annofab.com"]
+
+
+class Test_profile_from_args:
+    def test_timing_reportを指定した場合はspanが記録される(self, tmp_path: Path):
+        args = argparse.Namespace(timing_report=tmp_path / "report.json", profile=tmp_path / "profile.pstats")
+        with profile_from_args(args):
+            recorder = get_timing_recorder()
+            assert recorder is not None
+            with span("bar"):
+                pass
+            assert add(1, 2) == 3
+            assert set(recorder.spans.keys()) == {"bar", "add"}
+
+        assert get_timing_recorder() is None
+        assert (tmp_path / "report.json").exists()
+        assert (tmp_path / "profile.pstats").exists()
+
+    def test_timing_reportを指定しない場合は何も記録しない(self):
+        args = argparse.Namespace(timing_report=None, profile=None)
+        with profile_from_args(args):
+            assert get_timing_recorder() is None
+            assert add(1, 2) == 3
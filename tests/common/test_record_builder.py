@@ -0,0 +1,59 @@
+from typing import Any
+
+import pandas
+
+from annofabcli.common.record_builder import ColumnarRecordBuilder, flatten_record
+
+RECORDS: list[dict[str, Any]] = [
+    {"task_id": "t1", "phase_stage": 1, "area": 1.5, "point": {"x": 1, "y": 2}, "attributes": {"color": "red", "occluded": True}},
+    {"task_id": "t1", "phase_stage": 2, "area": None, "point": {"x": 3, "y": 4}, "attributes": {"color": "blue"}},
+    {"task_id": None, "phase_stage": None, "area": 2, "point": None, "attributes": {"occluded": False, "count": 3}},
+    {"task_id": "t2", "phase_stage": 3, "area": 0.5, "point": {"x": 5, "y": 6}, "attributes": {}},
+]
+COLUMNS = ["task_id", "phase_stage", "area", "point.x", "point.y"]
+
+
+def create_expected_df(records: list[dict]) -> pandas.DataFrame:
+    df = pandas.json_normalize(records)
+    attribute_columns = sorted(col for col in df.columns if col.startswith("attributes."))
+    return df[COLUMNS + attribute_columns]
+
+
+class TestColumnarRecordBuilder:
+    def test_to_dataframe__json_normalizeと同じ値になる(self):
+        builder = ColumnarRecordBuilder(COLUMNS, categorical_columns=["task_id"], dynamic_column_prefixes=["attributes."])
+        builder.extend(RECORDS)
+
+        actual = builder.to_dataframe()
+
+        assert len(builder) == 4
+        assert isinstance(actual["task_id"].dtype, pandas.CategoricalDtype)
+        assert actual.to_csv(index=False) == create_expected_df(RECORDS).to_csv(index=False)
+
+    def test_to_dataframe__型が混在する列はオブジェクトとして保持する(self):
+        builder = ColumnarRecordBuilder(["value"])
+        builder.extend([{"value": 1}, {"value": 2.5}, {"value": "text"}, {"value": None}])
+
+        actual = builder.to_dataframe()
+
+        assert actual["value"].tolist()[:3] == [1, 2.5, "text"]
+        assert pandas.isna(actual["value"].iloc[3])
+
+    def test_to_dataframe__レコードに存在しない列は欠損値になる(self):
+        builder = ColumnarRecordBuilder(["task_id", "area"])
+        builder.append({"task_id": "t1"})
+
+        actual = builder.to_dataframe()
+
+        assert list(actual.columns) == ["task_id", "area"]
+        assert actual["area"].isna().all()
+
+    def test_to_dataframe__0件ならヘッダのみ(self):
+        actual = ColumnarRecordBuilder(COLUMNS, dynamic_column_prefixes=["attributes."]).to_dataframe()
+
+        assert len(actual) == 0
+        assert list(actual.columns) == COLUMNS
+
+
+def test_flatten_record():
+    assert flatten_record({"a": 1, "b": {"c": 2, "d": {"e": 3}}, "f": [1, 2], "g": None}) == {"a": 1, "b.c": 2, "b.d.e": 3, "f": [1, 2], "g": None}
@@ -0,0 +1,112 @@
+import hashlib
+import threading
+from pathlib import Path
+from unittest.mock import Mock
+
+import pytest
+
+from annofabcli.common.upload_pipeline import LocalFile, UploadManifest, UploadPipeline, UploadRequest
+
+
+def create_mock_service(*, broken_file_names: set[str] | None = None) -> Mock:
+    """
+    一時データ保存先へのアップロードを模したMockを生成します。
+    ``broken_file_names`` に含まれるファイルは、ETagが一致しないレスポンスを返します。
+    """
+    broken_file_names = broken_file_names or set()
+    service = Mock()
+    service.api.create_temp_path.side_effect = lambda _project_id: ({"url": "https://s3.example.com/tmp/abc?token=x", "path": "s3://tmp/abc"}, None)
+
+    def put(url, params, data, headers):  # noqa: ANN001, ANN202, ARG001
+        body = data.read()
+        md5 = "broken" if Path(data.name).name in broken_file_names else hashlib.md5(body, usedforsecurity=False).hexdigest()
+        response = Mock()
+        response.headers = {"ETag": f'"{md5}"'}
+        return response
+
+    service.api.session.put.side_effect = put
+    return service
+
+
+@pytest.fixture
+def files(tmp_path: Path) -> list[Path]:
+    paths = []
+    for i in range(5):
+        path = tmp_path / f"file{i}.txt"
+        path.write_text(f"content{i}")
+        paths.append(path)
+    return paths
+
+
+class TestUploadPipeline:
+    def test_run__ローカルファイルはアップロードしてから登録する(self, files: list[Path]):
+        registered: dict[str, str | None] = {}
+        lock = threading.Lock()
+
+        def register(payload: str, s3_path: str | None) -> None:
+            with lock:
+                registered[payload] = s3_path
+
+        items = [*[str(p) for p in files], "s3://bucket/remote.png"]
+        pipeline: UploadPipeline[str, str] = UploadPipeline(
+            create_mock_service(),
+            "prj1",
+            prepare=lambda item: UploadRequest(key=item, file_path=None if item.startswith("s3://") else Path(item), payload=item),
+            register=register,
+            parallelism=2,
+        )
+        result = pipeline.run(items)
+
+        assert result.succeeded_count == 6
+        assert result.stages["アップロード"].count == 5
+        assert registered["s3://bucket/remote.png"] is None
+        assert registered[str(files[0])] == "s3://tmp/abc"
+
+    def test_run__確認ステージでNoneを返した要素と_チェックサムが一致しない要素は登録しない(self, files: list[Path]):
+        register = Mock()
+        pipeline: UploadPipeline[Path, Path] = UploadPipeline(
+            create_mock_service(broken_file_names={"file1.txt"}),
+            "prj1",
+            prepare=lambda path: None if path.name == "file0.txt" else UploadRequest(key=path.name, file_path=path, payload=path),
+            register=register,
+            parallelism=3,
+        )
+        result = pipeline.run(files)
+
+        assert (result.succeeded_count, result.skipped_count, result.failed_count) == (3, 1, 1)
+        assert sorted(call.args[0].name for call in register.call_args_list) == ["file2.txt", "file3.txt", "file4.txt"]
+
+    def test_run__マニフェストに登録済みのファイルはアップロードしない(self, tmp_path: Path, files: list[Path]):
+        manifest_path = tmp_path / "manifest.jsonl"
+        manifest = UploadManifest(manifest_path)
+        manifest.add("prj1", "file0.txt", LocalFile.from_path(files[0]))
+        manifest.add("prj1", "file1.txt", LocalFile.from_path(files[1]))
+        # 別のプロジェクトに登録したファイルは、登録済みとみなさない
+        manifest.add("prj2", "file2.txt", LocalFile.from_path(files[2]))
+        # 登録後に内容が変わったファイルは、再度アップロードする
+        files[1].write_text("modified content")
+
+        service = create_mock_service()
+        pipeline: UploadPipeline[Path, Path] = UploadPipeline(
+            service,
+            "prj1",
+            prepare=lambda path: UploadRequest(key=path.name, file_path=path, payload=path),
+            register=lambda payload, s3_path: None,  # noqa: ARG005
+            parallelism=2,
+            manifest=UploadManifest(manifest_path),
+        )
+        result = pipeline.run(files)
+
+        assert (result.succeeded_count, result.skipped_count) == (4, 1)
+        assert service.api.session.put.call_count == 4
+        assert len(UploadManifest(manifest_path)) == 6
+        assert not UploadManifest(manifest_path).is_registered("prj2", "file0.txt", files[0])
+
+
+def test_LocalFile_from_path(tmp_path: Path):
+    path = tmp_path / "image.png"
+    path.write_bytes(b"\x89PNG" * 1000)
+    actual = LocalFile.from_path(path)
+    assert actual.size == 4000
+    assert actual.md5 == hashlib.md5(b"\x89PNG" * 1000, usedforsecurity=False).hexdigest()
+    assert actual.content_type == "image/png"
@@ -0,0 +1,87 @@
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from annofabcli.common.zip_reader import ZipReader
+
+
+@pytest.fixture
+def zip_path(tmp_path: Path) -> Path:
+    path = tmp_path / "sample.zip"
+    with zipfile.ZipFile(path, "w") as zip_file:
+        zip_file.writestr("task1/input1.json", '{"details": []}', compress_type=zipfile.ZIP_STORED)
+        zip_file.writestr("task1/input1/anno1", b"\x89PNG" * 100, compress_type=zipfile.ZIP_DEFLATED)
+        # ローカルファイルヘッダの拡張フィールドの長さが、セントラルディレクトリと異なるメンバ
+        info = zipfile.ZipInfo("task2/input2.json")
+        info.extra = b"\x99\x99\x04\x00abcd"
+        zip_file.writestr(info, '{"task_id": "task2"}')
+    return path
+
+
+class TestZipReader:
+    def test_read(self, zip_path: Path):
+        with ZipReader(zip_path) as reader, zipfile.ZipFile(zip_path) as zip_file:
+            assert len(reader) == 3
+            for info in zip_file.infolist():
+                assert reader.read(info.filename) == zip_file.read(info.filename)
+                with reader.open(info.filename) as f:
+                    assert f.read() == zip_file.read(info.filename)
+
+    def test_contains_and_getinfo(self, zip_path: Path):
+        with ZipReader(zip_path) as reader:
+            assert "task1/input1.json" in reader
+            assert "task1/input2.json" not in reader
+            assert reader.getinfo("task1/input1/anno1").compress_type == zipfile.ZIP_DEFLATED
+            assert [info.filename for info in reader.infolist()] == ["task1/input1.json", "task1/input1/anno1", "task2/input2.json"]
+            with pytest.raises(KeyError):
+                reader.getinfo("task1/input2.json")
+
+    def test_read__壊れた無圧縮のメンバはBadZipFile(self, zip_path: Path):
+        data = zip_path.read_bytes()
+        zip_path.write_bytes(data.replace(b'{"details": []}', b'{"details": [1]'))
+        with ZipReader(zip_path) as reader, pytest.raises(zipfile.BadZipFile):
+            reader.read("task1/input1.json")
+
+    def test_copy_raw_to(self, zip_path: Path, tmp_path: Path):
+        output_path = tmp_path / "output.zip"
+        with ZipReader(zip_path) as reader, zipfile.ZipFile(output_path, "w") as output_zip_file:
+            for info in reader.infolist():
+                reader.copy_raw_to(info.filename, output_zip_file)
+            output_zip_file.writestr("added.txt", "added")
+
+        with zipfile.ZipFile(output_path) as actual, zipfile.ZipFile(zip_path) as expected:
+            assert actual.testzip() is None
+            assert actual.namelist() == [*expected.namelist(), "added.txt"]
+            for info in expected.infolist():
+                assert actual.getinfo(info.filename).compress_type == info.compress_type
+                assert actual.read(info.filename) == expected.read(info.filename)
+
+    def test_copy_raw_to__追記モードで開いたZipFileにコピーする(self, zip_path: Path, tmp_path: Path):
+        output_path = tmp_path / "output.zip"
+        with zipfile.ZipFile(output_path, "w") as output_zip_file:
+            output_zip_file.writestr("existing.txt", "existing")
+
+        with ZipReader(zip_path) as reader, zipfile.ZipFile(output_path, "a") as output_zip_file:
+            reader.copy_raw_to("task1/input1/anno1", output_zip_file)
+
+        with zipfile.ZipFile(output_path) as actual, zipfile.ZipFile(zip_path) as expected:
+            assert actual.testzip() is None
+            assert actual.namelist() == ["existing.txt", "task1/input1/anno1"]
+            assert actual.read("task1/input1/anno1") == expected.read("task1/input1/anno1")
+
+    def test_copy_raw_to__書き込めないZipFileにはコピーしない(self, zip_path: Path, tmp_path: Path):
+        output_path = tmp_path / "output.zip"
+        with ZipReader(zip_path) as reader:
+            with zipfile.ZipFile(zip_path) as read_only_zip_file, pytest.raises(ValueError, match="書き込み用"):
+                reader.copy_raw_to("task1/input1.json", read_only_zip_file)
+
+            with zipfile.ZipFile(output_path, "w") as output_zip_file:
+                with output_zip_file.open("writing.txt", "w") as f:
+                    f.write(b"writing")
+                    with pytest.raises(ValueError, match="書き込み中"):
+                        reader.copy_raw_to("task1/input1.json", output_zip_file)
+
+        with zipfile.ZipFile(output_path) as actual:
+            assert actual.testzip() is None
+            assert actual.namelist() == ["writing.txt"]
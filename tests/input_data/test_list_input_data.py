@@ -0,0 +1,57 @@
+import itertools
+import urllib.parse
+from typing import Any
+from unittest.mock import Mock
+
+from annofabcli.input_data.list_input_data import AddingDetailsToInputData, create_input_data_id_chunks
+
+
+def test_create_input_data_id_chunks():
+    input_data_id_list = [f"画像{i:03d}.jpg" for i in range(100)]
+    max_query_length = 300
+    actual = create_input_data_id_chunks(input_data_id_list, max_query_length=max_query_length)
+
+    assert [e for chunk in actual for e in chunk] == input_data_id_list
+    for chunk in actual:
+        assert len(urllib.parse.quote(",".join(chunk))) <= max_query_length
+    # 次の入力データIDを追加すると上限を超えるところで分割している
+    for chunk, next_chunk in itertools.pairwise(actual):
+        assert len(urllib.parse.quote(",".join([*chunk, next_chunk[0]]))) > max_query_length
+
+
+def test_create_input_data_id_chunks__上限より長い入力データIDは単独のchunkにする():
+    assert create_input_data_id_chunks(["a" * 20, "b", "c"], max_query_length=10) == [["a" * 20], ["b", "c"]]
+
+
+def test_add_parent_task_id_list_to_input_data_list():
+    tasks = [
+        {"task_id": "task1", "input_data_id_list": ["i1", "i2"]},
+        {"task_id": "task2", "input_data_id_list": ["i2", "i3"]},
+    ]
+
+    def get_all_tasks(project_id, query_params):  # noqa: ANN001, ANN202, ARG001
+        input_data_ids = set(query_params["input_data_ids"].split(","))
+        return [t for t in tasks if len(input_data_ids & set(t["input_data_id_list"])) > 0]
+
+    service = Mock()
+    service.wrapper.get_all_tasks.side_effect = get_all_tasks
+    input_data_list: list[dict[str, Any]] = [{"input_data_id": f"i{i}"} for i in range(1, 5)]
+
+    AddingDetailsToInputData(service, "prj1").add_parent_task_id_list_to_input_data_list(input_data_list)
+
+    assert [e["parent_task_id_list"] for e in input_data_list] == [["task1"], ["task1", "task2"], ["task2"], []]
+
+
+def test_add_supplementary_data_count_to_input_data_list__取得に失敗した入力データは個数をNoneにする():
+    def get_supplementary_data_list_or_none(project_id, input_data_id):  # noqa: ANN001, ANN202, ARG001
+        if input_data_id == "error":
+            raise RuntimeError("error")
+        return [{"supplementary_data_id": "s1"}, {"supplementary_data_id": "s2"}]
+
+    service = Mock()
+    service.wrapper.get_supplementary_data_list_or_none.side_effect = get_supplementary_data_list_or_none
+    input_data_list: list[dict[str, Any]] = [{"input_data_id": "i1"}, {"input_data_id": "error"}]
+
+    AddingDetailsToInputData(service, "prj1").add_supplementary_data_count_to_input_data_list(input_data_list)
+
+    assert [e["supplementary_data_count"] for e in input_data_list] == [2, None]
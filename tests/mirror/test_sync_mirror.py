@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import json
+import zipfile
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import requests
+
+from annofabcli.common.annofab.project_mirror import MirrorResource, ProjectMirror
+from annofabcli.mirror.sync_mirror import SyncProjectMirrorMain, iter_annotation_counts
+
+TASKS = [
+    {
+        "project_id": "prj1",
+        "task_id": "task1",
+        "phase": "annotation",
+        "phase_stage": 1,
+        "status": "complete",
+        "account_id": "alice",
+        "updated_datetime": "2024-01-01T10:00:00.000+09:00",
+        "input_data_id_list": ["i1"],
+    }
+]
+
+TASK_HISTORY_EVENTS = [
+    {
+        "project_id": "prj1",
+        "task_id": "task1",
+        "task_history_id": "h1",
+        "created_datetime": "2024-01-01T10:00:00.000+09:00",
+        "phase": "annotation",
+        "phase_stage": 1,
+        "status": "working",
+        "account_id": "alice",
+        "request": None,
+    }
+]
+
+
+def test_iter_annotation_counts(tmp_path: Path):
+    zip_path = tmp_path / "annotation.zip"
+    details = [{"label": "dog"}, {"label": "cat"}, {"label": "dog"}]
+    with zipfile.ZipFile(zip_path, mode="w") as zip_file:
+        zip_file.writestr("task1/i1.json", json.dumps({"task_id": "task1", "input_data_id": "i1", "details": details}))
+        zip_file.writestr("task1/i2.json", json.dumps({"task_id": "task1", "input_data_id": "i2", "details": []}))
+
+    assert sorted(iter_annotation_counts(zip_path)) == [("task1", "i1", "cat", 1), ("task1", "i1", "dog", 2)]
+
+
+class TestSyncProjectMirrorMain:
+    def test_sync_task__全件ファイルが更新されていなければダウンロードしない(self, tmp_path: Path):
+        def download(project_id, dest_path, **kwargs):  # noqa: ANN001, ANN202, ARG001
+            Path(dest_path).write_text(json.dumps(TASKS), encoding="utf-8")
+
+        service = MagicMock()
+        service.api.get_project_tasks_url.return_value = ({"url": "https://example.com/task.json"}, None)
+        service.api.session.get.return_value.__enter__.return_value.headers = {"Last-Modified": "Tue, 02 Jan 2024 17:00:00 GMT"}
+        service.wrapper.download_project_tasks_url.side_effect = download
+
+        with ProjectMirror(tmp_path / "mirror.sqlite3") as mirror:
+            main_obj = SyncProjectMirrorMain(service, mirror)
+            main_obj.sync("prj1", {MirrorResource.TASK})
+            main_obj.sync("prj1", {MirrorResource.TASK})
+            assert service.wrapper.download_project_tasks_url.call_count == 1
+            assert [e["task_id"] for e in mirror.get_tasks("prj1")] == ["task1"]
+
+            SyncProjectMirrorMain(service, mirror, force=True).sync("prj1", {MirrorResource.TASK})
+            assert service.wrapper.download_project_tasks_url.call_count == 2
+
+    def test_sync_task_history_event__forceを指定すると全件ファイルが更新されていなくてもダウンロードする(self, tmp_path: Path):
+        def download(project_id, dest_path, **kwargs):  # noqa: ANN001, ANN202, ARG001
+            Path(dest_path).write_text(json.dumps(TASK_HISTORY_EVENTS), encoding="utf-8")
+
+        service = MagicMock()
+        service.api.get_project_task_history_events_url.return_value = ({"url": "https://example.com/events.json"}, None)
+        service.api.session.get.return_value.__enter__.return_value.headers = {"Last-Modified": "Tue, 02 Jan 2024 17:00:00 GMT"}
+        service.wrapper.download_project_task_history_events_url.side_effect = download
+
+        with ProjectMirror(tmp_path / "mirror.sqlite3") as mirror:
+            SyncProjectMirrorMain(service, mirror).sync("prj1", {MirrorResource.TASK_HISTORY_EVENT})
+            SyncProjectMirrorMain(service, mirror).sync("prj1", {MirrorResource.TASK_HISTORY_EVENT})
+            assert service.wrapper.download_project_task_history_events_url.call_count == 1
+            assert mirror.is_synced("prj1", MirrorResource.TASK_HISTORY_EVENT)
+
+            SyncProjectMirrorMain(service, mirror, force=True).sync("prj1", {MirrorResource.TASK_HISTORY_EVENT})
+            assert service.wrapper.download_project_task_history_events_url.call_count == 2
+
+    def test_sync_task_history_event__全件ファイルが存在しなければ同期済みにしない(self, tmp_path: Path):
+        response = requests.Response()
+        response.status_code = 404
+        service = MagicMock()
+        service.api.get_project_task_history_events_url.return_value = ({"url": "https://example.com/events.json"}, None)
+        # 全件ファイルが存在しないので、署名付きURLへのリクエストも404になる
+        service.api.session.get.return_value.__enter__.return_value = response
+        service.wrapper.download_project_task_history_events_url.side_effect = requests.HTTPError(response=response)
+
+        with ProjectMirror(tmp_path / "mirror.sqlite3") as mirror:
+            SyncProjectMirrorMain(service, mirror).sync("prj1", {MirrorResource.TASK_HISTORY_EVENT})
+            assert not mirror.is_synced("prj1", MirrorResource.TASK_HISTORY_EVENT)
+
+    def test_sync_comment__全件ファイルが存在しなければ同期済みにしない(self, tmp_path: Path):
+        response = requests.Response()
+        response.status_code = 404
+        service = MagicMock()
+        service.api.get_project_comments_url.return_value = ({"url": "https://example.com/comment.json"}, None)
+        # 全件ファイルが存在しないので、署名付きURLへのリクエストも404になる
+        service.api.session.get.return_value.__enter__.return_value = response
+        service.wrapper.download_project_comments_url.side_effect = requests.HTTPError(response=response)
+
+        with ProjectMirror(tmp_path / "mirror.sqlite3") as mirror:
+            SyncProjectMirrorMain(service, mirror).sync("prj1", {MirrorResource.COMMENT})
+            assert not mirror.is_synced("prj1", MirrorResource.COMMENT)
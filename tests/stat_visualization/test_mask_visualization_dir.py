@@ -14,3 +14,18 @@ def test__mask_visualization_dir__minimal():
         output_project_dir=ProjectDir(output_dir / "masked-visualization", TaskCompletionCriteria.ACCEPTANCE_COMPLETED),
         minimal_output=True,
     )
+
+
+def test__mask_visualization_dir__parallelism():
+    for dir_name, parallelism in [("masked-visualization-sequential", None), ("masked-visualization-parallel", 2)]:
+        mask_visualization_dir(
+            project_dir=ProjectDir(data_dir / "visualization1", TaskCompletionCriteria.ACCEPTANCE_COMPLETED),
+            output_project_dir=ProjectDir(output_dir / dir_name, TaskCompletionCriteria.ACCEPTANCE_COMPLETED),
+            minimal_output=True,
+            parallelism=parallelism,
+        )
+
+    for file_name in [ProjectDir.FILENAME_USER_PERFORMANCE, ProjectDir.FILENAME_TASK_LIST, ProjectDir.FILENAME_TASK_WORKTIME_LIST]:
+        actual = (output_dir / "masked-visualization-parallel" / file_name).read_text(encoding="utf_8_sig")
+        expected = (output_dir / "masked-visualization-sequential" / file_name).read_text(encoding="utf_8_sig")
+        assert actual == expected
@@ -0,0 +1,40 @@
+import numpy
+import pandas
+
+from annofabcli.statistics.linegraph import downsample_dataframe_by_lttb, get_lttb_indices, split_dataframe_by_user
+
+
+def test_split_dataframe_by_user():
+    df = pandas.DataFrame({"user_id": ["alice", "bob", "alice", "carol"], "value": [1, 2, 3, 4]})
+    actual = split_dataframe_by_user(df, ["alice", "bob", "dave"])
+    assert actual.keys() == {"alice", "bob"}
+    assert actual["alice"]["value"].tolist() == [1, 3]
+    assert actual["bob"]["value"].tolist() == [2]
+
+
+class Test_get_lttb_indices:
+    def test_点の個数がmax_points以下なら間引かない(self):
+        x = numpy.arange(5)
+        assert get_lttb_indices(x, x, 5).tolist() == [0, 1, 2, 3, 4]
+
+    def test_先頭と末尾とピークを残す(self):
+        x = numpy.arange(100, dtype=float)
+        y = numpy.zeros(100)
+        y[37] = 10
+        actual = get_lttb_indices(x, y, 10)
+        assert len(actual) == 10
+        assert actual[0] == 0
+        assert actual[-1] == 99
+        assert 37 in actual
+        assert (numpy.diff(actual) > 0).all()
+
+
+def test_downsample_dataframe_by_lttb():
+    df = pandas.DataFrame({"x": numpy.arange(100), "y1": numpy.zeros(100), "y2": numpy.zeros(100)})
+    df.loc[20, "y1"] = 1
+    df.loc[80, "y2"] = 1
+    actual = downsample_dataframe_by_lttb(df, [("x", "y1"), ("x", "y2")], 10)
+    # どちらの折れ線のピークも残る
+    assert {20, 80} <= set(actual["x"])
+    assert actual["x"].is_monotonic_increasing
+    assert len(actual) < len(df)
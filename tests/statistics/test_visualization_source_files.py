@@ -1,9 +1,10 @@
 import json
-from unittest.mock import Mock
+from unittest.mock import MagicMock, Mock
 
 import pytest
+import requests
 
-from annofabcli.statistics.visualization.visualization_source_files import VisualizationSourceFiles
+from annofabcli.statistics.visualization.visualization_source_files import TaskHistoryStore, VisualizationSourceFiles
 
 
 class TestVisualizationSourceFiles:
@@ -53,3 +54,66 @@ class TestVisualizationSourceFiles:
         # 期待値: 120秒 = 2分、180秒 = 3分
         expected = {"task1": 2.0, "task2": 3.0}
         assert result == expected
+
+    def test_write_task_histories_json_with_executing_webapi(self, visualization_source_files, mock_service):
+        """更新されていないタスクの履歴は、記録済みのものを再利用する"""
+        mock_service.api.get_task_histories.side_effect = lambda project_id, task_id: ([{"task_id": task_id, "project_id": project_id}], None)  # noqa: ARG005
+        tasks = [{"task_id": "task1", "updated_datetime": "2024-01-01"}, {"task_id": "task2", "updated_datetime": "2024-01-01"}]
+        visualization_source_files._write_task_histories_json_with_executing_webapi(tasks)
+        assert mock_service.api.get_task_histories.call_count == 2
+        assert visualization_source_files.read_task_histories_json() == {
+            "task1": [{"task_id": "task1", "project_id": "test_project"}],
+            "task2": [{"task_id": "task2", "project_id": "test_project"}],
+        }
+
+        # 書き込み中に中断された行があっても読み込める
+        with visualization_source_files.task_history_store_path.open("a", encoding="utf-8") as f:
+            f.write('{"task_id": "task3", "upda')
+
+        mock_service.api.get_task_histories.reset_mock()
+        tasks = [{"task_id": "task1", "updated_datetime": "2024-01-02"}, *tasks[1:], {"task_id": "task3", "updated_datetime": "2024-01-01"}]
+        visualization_source_files._write_task_histories_json_with_executing_webapi(tasks)
+        assert sorted(call.args[1] for call in mock_service.api.get_task_histories.call_args_list) == ["task1", "task3"]
+        assert list(visualization_source_files.read_task_histories_json().keys()) == ["task1", "task2", "task3"]
+        assert len(TaskHistoryStore(visualization_source_files.task_history_store_path)) == 3
+        # 出力後にストアを書き直すので、更新前のタスク履歴や中断された行は残らない
+        lines = visualization_source_files.task_history_store_path.read_text(encoding="utf-8").splitlines()
+        assert [(json.loads(line)["task_id"], json.loads(line)["updated_datetime"]) for line in lines] == [
+            ("task1", "2024-01-02"),
+            ("task2", "2024-01-01"),
+            ("task3", "2024-01-01"),
+        ]
+
+    def test_write_task_history_events_json_from_store__全件ファイルが存在しなければ空のlistを出力する(self, visualization_source_files, mock_service, tmp_path, monkeypatch):
+        monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+        response = requests.Response()
+        response.status_code = 404
+        mock_service.api.get_project_task_history_events_url.return_value = ({"url": "https://example.com/events.json"}, None)
+        mock_service.api.session.get.return_value = MagicMock(__enter__=Mock(return_value=response))
+        mock_service.wrapper.download_project_task_history_events_url.side_effect = requests.HTTPError(response=response)
+
+        visualization_source_files._write_task_history_events_json_from_store()
+        assert json.loads(visualization_source_files.task_history_event_json_path.read_text(encoding="utf-8")) == []
+
+
+class TestTaskHistoryStore:
+    def test_get(self, tmp_path):
+        store = TaskHistoryStore(tmp_path / "store.jsonl")
+        store.add("task1", "2024-01-01", [{"task_history_id": "h1"}])
+        store.add("task2", "2024-01-01", [{"task_history_id": "h2"}])
+        store.add("task1", "2024-01-02", [{"task_history_id": "h3"}])
+
+        # ファイルから読み込み直しても、後から記録したタスク履歴を返す
+        for actual_store in [store, TaskHistoryStore(tmp_path / "store.jsonl")]:
+            assert actual_store.get("task1", "2024-01-02") == [{"task_history_id": "h3"}]
+            assert actual_store.get("task1", "2024-01-01") is None
+            assert not actual_store.contains("task3", None)
+            assert list(actual_store.iter_task_histories([("task2", "2024-01-01"), ("task3", None)])) == [
+                ("task2", [{"task_history_id": "h2"}]),
+                ("task3", None),
+            ]
+
+        store.compact()
+        assert len((tmp_path / "store.jsonl").read_text(encoding="utf-8").splitlines()) == 2
+        assert store.get("task1", "2024-01-02") == [{"task_history_id": "h3"}]
+        assert store.get("task2", "2024-01-01") == [{"task_history_id": "h2"}]
@@ -0,0 +1,53 @@
+import argparse
+from pathlib import Path
+from unittest.mock import Mock
+
+import pytest
+
+from annofabcli.statistics.visualization.filtering_query import FilteringQuery
+from annofabcli.statistics.visualization.model import TaskCompletionCriteria
+from annofabcli.statistics.visualize_statistics import PreparedProject, VisualizeStatistics, VisualizingStatisticsMain
+
+
+class TestVisualizingStatisticsMain:
+    def test_visualize_statistics_for_project_list(self, tmp_path: Path):
+        main_obj = VisualizingStatisticsMain(
+            Mock(),
+            temp_dir=tmp_path,
+            task_completion_criteria=TaskCompletionCriteria.ACCEPTANCE_COMPLETED,
+            filtering_query=FilteringQuery(),
+        )
+
+        def prepare_project(project_id: str, output_project_dir: Path, **kwargs) -> PreparedProject:  # noqa: ARG001
+            if project_id == "prj2":
+                raise RuntimeError("failed to download")
+            return PreparedProject(project_info=Mock(project_id=project_id), output_project_dir=output_project_dir, annotation_count=None)
+
+        def write_project(prepared_project: PreparedProject) -> None:
+            if prepared_project.project_info.project_id == "prj3":
+                raise RuntimeError("failed to write")
+
+        main_obj.prepare_project = Mock(side_effect=prepare_project)  # type: ignore[method-assign]
+        main_obj.write_project = Mock(side_effect=write_project)  # type: ignore[method-assign]
+
+        actual = main_obj.visualize_statistics_for_project_list(["prj1", "prj2", "prj3", "prj4"], root_output_dir=tmp_path)
+
+        # 失敗したプロジェクトは除外され、残りのプロジェクトはproject_id_listの順番に並ぶ
+        assert actual == [tmp_path / "prj1", tmp_path / "prj4"]
+        assert main_obj.write_project.call_count == 3
+
+    def test_visualize_statistics_for_project_list__プロジェクトが空(self, tmp_path: Path):
+        main_obj = VisualizingStatisticsMain(
+            Mock(),
+            temp_dir=tmp_path,
+            task_completion_criteria=TaskCompletionCriteria.ACCEPTANCE_COMPLETED,
+            filtering_query=FilteringQuery(),
+        )
+        assert main_obj.visualize_statistics_for_project_list([], root_output_dir=tmp_path) == []
+
+
+class TestVisualizeStatistics:
+    @pytest.mark.parametrize(("max_points_per_line", "expected"), [(None, True), (3, True), (2, False), (0, False)])
+    def test_validate__max_points_per_line(self, max_points_per_line: int | None, expected: bool):  # noqa: FBT001
+        args = argparse.Namespace(start_date=None, end_date=None, not_download=False, temp_dir=None, max_points_per_line=max_points_per_line)
+        assert VisualizeStatistics.validate(args) == expected
@@ -0,0 +1,43 @@
+from pathlib import Path
+from unittest.mock import Mock
+
+from annofabcli.supplementary.list_supplementary_data import SupplementaryDataCache, SupplementaryDataFetcher
+
+
+def create_mock_service() -> Mock:
+    def get_supplementary_data_list_or_none(project_id, input_data_id):  # noqa: ANN001, ANN202, ARG001
+        if input_data_id == "not_found":
+            return None
+        if input_data_id == "error":
+            raise RuntimeError("error")
+        return [{"input_data_id": input_data_id, "supplementary_data_id": f"{input_data_id}_s1", "url": "https://example.com"}]
+
+    service = Mock()
+    service.wrapper.get_supplementary_data_list_or_none.side_effect = get_supplementary_data_list_or_none
+    return service
+
+
+class TestSupplementaryDataFetcher:
+    def test_fetch_all(self):
+        fetcher = SupplementaryDataFetcher(create_mock_service(), "prj1", parallelism=3, max_requests_per_second=1000)
+        actual = fetcher.fetch_all(["i1", "not_found", "error", "i2"])
+
+        assert list(actual.keys()) == ["i1", "not_found", "error", "i2"]
+        assert actual["i1"] == [{"input_data_id": "i1", "supplementary_data_id": "i1_s1"}]
+        assert actual["not_found"] is None
+        assert actual["error"] is None
+
+    def test_fetch_all__キャッシュに記録済みの入力データはAPIを実行しない(self, tmp_path: Path):
+        cache_file = tmp_path / "cache.jsonl"
+        SupplementaryDataFetcher(create_mock_service(), "prj1", cache=SupplementaryDataCache(cache_file)).fetch_all(["i1", "error"])
+        # 書き込み中に中断された行
+        with cache_file.open("a", encoding="utf-8") as f:
+            f.write('{"input_data_id": "i2", "supp')
+
+        service = create_mock_service()
+        actual = SupplementaryDataFetcher(service, "prj1", cache=SupplementaryDataCache(cache_file)).fetch_all(["i1", "error", "i2"])
+
+        assert actual["i1"] == [{"input_data_id": "i1", "supplementary_data_id": "i1_s1"}]
+        # 取得に失敗した入力データはキャッシュに記録されていないので、再度APIを実行する
+        assert [call.args[1] for call in service.wrapper.get_supplementary_data_list_or_none.call_args_list] == ["error", "i2"]
+        assert len(SupplementaryDataCache(cache_file)["i2"]) == 1
@@ -1,9 +1,11 @@
 from __future__ import annotations
 
 import argparse
+import datetime
 from unittest.mock import Mock
 
 import pytest
+import requests
 from annofabapi.dataclass.task import Task
 from annofabapi.models import TaskPhase
 
@@ -22,6 +24,8 @@ def create_args_dict(**kwargs: object) -> dict[str, object]:
         "parallelism": None,
         "include_break_task": False,
         "include_on_hold_task": False,
+        "prefetch": False,
+        "prefetch_max_age_hours": 24,
         "yes": True,
     }
     args.update(kwargs)
@@ -299,3 +303,55 @@ def test_main_passes_include_status_options_to_main_object(monkeypatch: pytest.M
     complete_task_list_mock.assert_called_once()
     assert complete_task_list_mock.call_args.args[0] == "project1"
     assert complete_task_list_mock.call_args.kwargs["target_phase"] == TaskPhase.ANNOTATION
+
+
+def create_prefetched(task_dict: dict[str, object], comment_list: list[dict[str, object]]) -> complete_tasks.PrefetchedTaskAndComment:
+    return complete_tasks.PrefetchedTaskAndComment(
+        [task_dict],
+        comment_list,
+        comment_json_last_modified=datetime.datetime(2024, 1, 2, tzinfo=datetime.UTC),
+    )
+
+
+def test_complete_task_uses_prefetched_task_and_comments() -> None:
+    service = Mock()
+    service.api.account_id = "account1"
+    service.wrapper.change_task_status_to_working.return_value = create_task_dict(status="working")
+    main_obj = complete_tasks.CompleteTasksMain(service, all_yes=True)
+    main_obj.prefetched = create_prefetched(create_task_dict(), [])
+
+    result = main_obj.complete_task(project_id="project1", task_id="task1", target_phase=TaskPhase.ANNOTATION, target_phase_stage=1)
+
+    assert result is True
+    service.wrapper.get_task_or_none.assert_not_called()
+    service.api.get_comments.assert_not_called()
+    assert service.wrapper.change_task_status_to_working.call_args.kwargs["last_updated_datetime"] == "2024-01-01T00:00:00+00:00"
+
+
+def test_complete_task_reads_latest_task_when_prefetched_task_is_updated() -> None:
+    service = Mock()
+    service.api.account_id = "account1"
+    conflict_response = Mock(status_code=requests.codes.conflict)
+    service.wrapper.change_task_status_to_working.side_effect = [
+        requests.HTTPError(response=conflict_response),
+        create_task_dict(status="working"),
+    ]
+    latest_task = {**create_task_dict(), "updated_datetime": "2024-01-01T12:00:00+00:00"}
+    service.wrapper.get_task_or_none.return_value = latest_task
+    service.api.get_comments.return_value = ([], None)
+    main_obj = complete_tasks.CompleteTasksMain(service, all_yes=True)
+    main_obj.prefetched = create_prefetched(create_task_dict(), [])
+
+    result = main_obj.complete_task(project_id="project1", task_id="task1", target_phase=TaskPhase.ANNOTATION, target_phase_stage=1)
+
+    assert result is True
+    service.wrapper.get_task_or_none.assert_called_once()
+    service.api.get_comments.assert_called_once()
+    assert service.wrapper.change_task_status_to_working.call_args.kwargs["last_updated_datetime"] == "2024-01-01T12:00:00+00:00"
+
+
+def test_prefetched_task_and_comment_get_task_returns_none_when_task_is_updated_near_comment_json() -> None:
+    prefetched = create_prefetched({**create_task_dict(), "updated_datetime": "2024-01-01T23:30:00+00:00"}, [])
+
+    assert prefetched.get_task("task1") is None
+    assert prefetched.get_task("not_exists") is None
@@ -1,4 +1,18 @@
-from annofabcli.task_count.list_by_phase import create_df_task
+import copy
+import random
+
+import pandas
+import pytest
+
+from annofabcli.task_count.list_by_phase import (
+    AggregationUnit,
+    TaskStatusForSummary,
+    aggregate_df,
+    classify_task_status_for_summary,
+    concat_summary_df_by_project,
+    create_df_task,
+    create_empty_summary_df,
+)
 
 
 def create_task(*, task_id: str, status: str = "not_started", account_id: str | None = None) -> dict:
@@ -30,3 +44,91 @@ def test_create_df_task_treats_missing_task_history_as_empty() -> None:
             "task_status_for_summary": "never_worked.unassigned",
         }
     ]
+
+
+def test_concat_summary_df_by_project() -> None:
+    df_prj1 = aggregate_df(create_df_task([create_task(task_id="task1"), create_task(task_id="task2", status="complete")], {}))
+    df_prj2 = create_empty_summary_df()
+
+    actual = concat_summary_df_by_project({"prj1": df_prj1, "prj2": df_prj2})
+
+    assert list(actual.columns) == ["project_id", *df_prj1.columns]
+    assert actual[["project_id", "phase", "never_worked.unassigned", "complete"]].to_dict(orient="records") == [
+        {"project_id": "prj1", "phase": "annotation", "never_worked.unassigned": 1, "complete": 1},
+    ]
+
+
+def test_concat_summary_df_by_project__すべて0件ならヘッダのみ() -> None:
+    actual = concat_summary_df_by_project({"prj1": create_empty_summary_df(["category"])}, ["category"])
+
+    assert len(actual) == 0
+    assert list(actual.columns)[:3] == ["project_id", "phase", "metadata.category"]
+
+
+def create_random_task_list(seed: int, task_count: int) -> tuple[list[dict], dict[str, list[dict]], dict[str, dict]]:
+    """
+    差し戻しや多段検査、タスク履歴なしのタスクを含む、ランダムなタスク・タスク履歴・入力データを生成する。
+    """
+    rng = random.Random(seed)
+    phases = ["annotation", "inspection", "acceptance"]
+    durations = ["PT0S", "PT0.5S", "PT1S", "PT1M", "PT1H2M3.456S"]
+    input_data_dict = {f"input{i}": {"input_data_id": f"input{i}", "system_metadata": {"input_duration": rng.uniform(0, 600)}} for i in range(10)}
+    task_list = []
+    task_history_dict = {}
+    for i in range(task_count):
+        task_id = f"task{i}"
+        histories_by_phase = [{"phase": rng.choice(phases), "phase_stage": rng.choice([1, 2]), "worked": rng.random() < 0.7, "account_id": "alice"} for _ in range(rng.randint(0, 6))]
+        task_list.append(
+            {
+                "task_id": task_id,
+                "status": rng.choice(["not_started", "working", "break", "on_hold", "complete"]),
+                "phase": rng.choice(phases),
+                "phase_stage": rng.choice([1, 2]),
+                "histories_by_phase": histories_by_phase,
+                "account_id": rng.choice([None, "alice"]),
+                "input_data_id_list": rng.sample([*input_data_dict.keys(), "unknown"], rng.randint(1, 3)),
+                "metadata": {"category": rng.choice(["a", "b"])},
+            }
+        )
+        if rng.random() < 0.9:
+            task_history_dict[task_id] = [{"phase": rng.choice(phases), "accumulated_labor_time_milliseconds": rng.choice(durations)} for _ in range(rng.randint(0, 4))]
+    return task_list, task_history_dict, input_data_dict
+
+
+def create_df_task_one_by_one(task_list: list[dict], task_history_dict: dict[str, list[dict]], *, not_worked_threshold_second: float, input_data_dict: dict[str, dict]) -> pandas.DataFrame:
+    """
+    タスクを1件ずつ `TaskStatusForSummary.from_task` で判定する、比較用の実装
+    """
+    records = []
+    for task in task_list:
+        durations = [input_data_dict[input_data_id]["system_metadata"]["input_duration"] for input_data_id in task["input_data_id_list"] if input_data_id in input_data_dict]
+        records.append(
+            {
+                "task_id": task["task_id"],
+                "phase": task["phase"],
+                "input_data_count": len(task["input_data_id_list"]),
+                "video_duration_hour": sum(duration / 3600 for duration in durations),
+                "video_duration_minute": sum(duration / 60 for duration in durations),
+                "metadata.category": task["metadata"].get("category"),
+                "task_status_for_summary": TaskStatusForSummary.from_task(task, task_history_dict.get(task["task_id"], []), not_worked_threshold_second).value,
+            }
+        )
+    return pandas.DataFrame(records)
+
+
+@pytest.mark.parametrize("not_worked_threshold_second", [0, 1, 3600])
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_create_df_task__1件ずつ判定した結果と一致する(seed: int, not_worked_threshold_second: float) -> None:
+    task_list, task_history_dict, input_data_dict = create_random_task_list(seed, task_count=500)
+    expected = create_df_task_one_by_one(copy.deepcopy(task_list), task_history_dict, not_worked_threshold_second=not_worked_threshold_second, input_data_dict=input_data_dict)
+
+    actual = create_df_task(task_list, task_history_dict, not_worked_threshold_second=not_worked_threshold_second, metadata_keys=["category"], input_data_dict=input_data_dict)
+
+    pandas.testing.assert_frame_equal(actual, expected, check_dtype=False)
+    for unit in AggregationUnit:
+        pandas.testing.assert_frame_equal(aggregate_df(actual, ["category"], unit), aggregate_df(expected, ["category"], unit), check_dtype=False)
+
+
+def test_classify_task_status_for_summary__対象外のステータスはエラー() -> None:
+    with pytest.raises(RuntimeError):
+        classify_task_status_for_summary([create_task(task_id="task1", status="cancelled")], {})